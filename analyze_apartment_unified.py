@@ -7,23 +7,55 @@ Analyse style, cuisine, salle de bain, luminosité en UNE SEULE requête
 import json
 import os
 import base64
+import threading
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
 from typing import Dict, List, Optional
 from pathlib import Path
 from photo_manager import PhotoManager
+from photo_fetcher import get_photo_fetcher
 from cache_api import get_cache
 from dotenv import load_dotenv
 
 load_dotenv()
 
 
+# Session HTTP partagée (pool de connexions keep-alive) pour l'API et les photos
+_http_session = None
+_http_session_lock = threading.Lock()
+
+
+def get_http_session(pool_size: int = 16) -> requests.Session:
+    """Retourne la session HTTP partagée (thread-safe pour des requêtes concurrentes)"""
+    global _http_session
+    if _http_session is None:
+        with _http_session_lock:
+            if _http_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _http_session = session
+    return _http_session
+
+
 class UnifiedApartmentAnalyzer:
     """Analyseur unifié qui analyse tout en une seule requête"""
     
-    def __init__(self):
+    def __init__(self, api_timeout: float = 60, photo_timeout: float = 10):
+        """
+        Args:
+            api_timeout: Timeout (s) de la requête Vision
+            photo_timeout: Timeout (s) du téléchargement de chaque photo
+        """
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.openai_base_url = "https://api.openai.com/v1"
         self.model = "gpt-4o-mini"  # GPT mini pour économiser
+        self.api_timeout = api_timeout
+        self.photo_timeout = photo_timeout
+        self.session = get_http_session()
+        self.photo_fetcher = get_photo_fetcher()
         self.photo_manager = PhotoManager()
         self.cache = get_cache()
     
@@ -43,31 +75,30 @@ class UnifiedApartmentAnalyzer:
         Returns:
             Liste des contenus binaires des images
         """
-        image_contents = []
+        selected = photos[:max_photos]
+        # Téléchargements en parallèle, ordre des photos préservé
+        with ThreadPoolExecutor(max_workers=max(1, len(selected))) as executor:
+            loaded = list(executor.map(self._load_single_photo, selected))
         
-        for photo in photos[:max_photos]:
-            # Charger depuis le chemin local si disponible, sinon depuis l'URL
-            local_path = photo.get('local_path')
-            if local_path and os.path.exists(local_path):
-                try:
-                    with open(local_path, 'rb') as f:
-                        image_contents.append(f.read())
-                except Exception as e:
-                    print(f"   ⚠️  Erreur chargement {local_path}: {e}")
-                    continue
-            else:
-                # Télécharger depuis l'URL
-                photo_url = photo.get('url', '')
-                if photo_url:
-                    try:
-                        response = requests.get(photo_url, timeout=10)
-                        if response.status_code == 200:
-                            image_contents.append(response.content)
-                    except Exception as e:
-                        print(f"   ⚠️  Erreur téléchargement {photo_url[:50]}...: {e}")
-                        continue
+        return [content for content in loaded if content]
+    
+    def _load_single_photo(self, photo: Dict) -> Optional[bytes]:
+        """Charge une photo depuis son chemin local, sinon depuis son URL"""
+        local_path = photo.get('local_path')
+        if local_path and os.path.exists(local_path):
+            try:
+                with open(local_path, 'rb') as f:
+                    return f.read()
+            except Exception as e:
+                print(f"   ⚠️  Erreur chargement {local_path}: {e}")
+                return None
+        
+        # Télécharger depuis l'URL (au plus une fois par changement)
+        photo_url = photo.get('url', '')
+        if photo_url:
+            return self.photo_fetcher.fetch_bytes(photo_url, timeout=self.photo_timeout)
         
-        return image_contents
+        return None
     
     def analyze_apartment_unified(
         self, 
@@ -108,29 +139,11 @@ class UnifiedApartmentAnalyzer:
         
         print(f"   🤖 Analyse unifiée avec {self.model} ({len(photos[:max_photos])} photos)...")
         
-        # Charger les photos depuis les chemins locaux
-        image_contents = self._load_photos_for_analysis(photos, max_photos=max_photos)
-        
-        if not image_contents:
+        payload = self._build_unified_payload(description, caracteristiques, photos, max_photos=max_photos)
+        if not payload:
             print(f"   ⚠️  Impossible de charger les photos")
             return None
         
-        # Préparer le prompt unifié
-        prompt = self._create_unified_prompt(description, caracteristiques)
-        
-        # Préparer le contenu avec texte + toutes les images
-        content = [{"type": "text", "text": prompt}]
-        
-        # Ajouter toutes les images en base64
-        for i, image_content in enumerate(image_contents, 1):
-            image_base64 = base64.b64encode(image_content).decode('utf-8')
-            content.append({
-                "type": "image_url",
-                "image_url": {
-                    "url": f"data:image/jpeg;base64,{image_base64}"
-                }
-            })
-        
         try:
             # UNE SEULE requête pour tout analyser
             headers = {
@@ -138,23 +151,11 @@ class UnifiedApartmentAnalyzer:
                 'Content-Type': 'application/json'
             }
             
-            payload = {
-                'model': self.model,
-                'messages': [
-                    {
-                        'role': 'user',
-                        'content': content
-                    }
-                ],
-                'temperature': 0.3,
-                'max_tokens': 2000
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 f'{self.openai_base_url}/chat/completions',
                 headers=headers,
                 json=payload,
-                timeout=60
+                timeout=self.api_timeout
             )
             
             if response.status_code != 200:
@@ -183,6 +184,55 @@ class UnifiedApartmentAnalyzer:
             traceback.print_exc()
             return None
     
+    def _build_unified_payload(
+        self,
+        description: str,
+        caracteristiques: str,
+        photos: List[Dict],
+        max_photos: int = 5
+    ) -> Optional[Dict]:
+        """
+        Construit le corps de la requête Vision (prompt + photos en base64)
+        
+        Partagé par l'analyse synchrone et le mode batch (vision_batch.py).
+        
+        Returns:
+            Corps JSON de la requête /chat/completions, ou None si aucune photo chargée
+        """
+        # Charger les photos depuis les chemins locaux
+        image_contents = self._load_photos_for_analysis(photos, max_photos=max_photos)
+        
+        if not image_contents:
+            return None
+        
+        # Préparer le prompt unifié
+        prompt = self._create_unified_prompt(description, caracteristiques)
+        
+        # Préparer le contenu avec texte + toutes les images
+        content = [{"type": "text", "text": prompt}]
+        
+        # Ajouter toutes les images en base64
+        for i, image_content in enumerate(image_contents, 1):
+            image_base64 = base64.b64encode(image_content).decode('utf-8')
+            content.append({
+                "type": "image_url",
+                "image_url": {
+                    "url": f"data:image/jpeg;base64,{image_base64}"
+                }
+            })
+        
+        return {
+            'model': self.model,
+            'messages': [
+                {
+                    'role': 'user',
+                    'content': content
+                }
+            ],
+            'temperature': 0.3,
+            'max_tokens': 2000
+        }
+    
     def _create_unified_prompt(self, description: str, caracteristiques: str) -> str:
         """Crée le prompt unifié pour analyser tout en une fois"""
         return f"""Analyse ces photos d'appartement et le texte pour déterminer TOUS les éléments suivants en UNE SEULE analyse :
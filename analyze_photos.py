@@ -9,11 +9,11 @@ import json
 import os
 import requests
 from typing import Dict, List, Optional
-from io import BytesIO
-from PIL import Image
-import numpy as np
 from dotenv import load_dotenv
 from cache_api import get_cache
+from photo_store import get_photo_store
+from photo_fetcher import get_photo_fetcher
+from brightness_engine import compute_brightness
 
 load_dotenv()
 
@@ -24,6 +24,20 @@ class PhotoAnalyzer:
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.openai_base_url = "https://api.openai.com/v1"
         self.cache = get_cache()
+        self.photo_store = get_photo_store()
+        self.photo_fetcher = get_photo_fetcher()
+    
+    def _get_cached_photo_analysis(self, analysis_type: str, photo_url: str) -> Optional[Dict]:
+        """Cherche l'analyse d'une photo par digest du contenu, puis par URL"""
+        key = self.photo_store.analysis_key(photo_url)
+        cached_result = self.cache.get(analysis_type, key)
+        if cached_result is None and key != photo_url:
+            cached_result = self.cache.get(analysis_type, photo_url)
+        return cached_result
+    
+    def _set_cached_photo_analysis(self, analysis_type: str, photo_url: str, analysis: Dict):
+        """Met en cache l'analyse d'une photo (par digest du contenu si connu)"""
+        self.cache.set(analysis_type, self.photo_store.analysis_key(photo_url), analysis)
         
     def analyze_photos_exposition(self, photos_urls: List[str]) -> Dict:
         """Analyse les photos pour déterminer l'exposition"""
@@ -64,14 +78,14 @@ class PhotoAnalyzer:
     def _analyze_single_photo(self, photo_url: str) -> Optional[Dict]:
         """Analyse une photo individuelle avec cache"""
         # Vérifier le cache d'abord
-        cached_result = self.cache.get('exposition_photo', photo_url)
+        cached_result = self._get_cached_photo_analysis('exposition_photo', photo_url)
         if cached_result:
             # Si le cache n'a pas brightness_value, le calculer maintenant
             if cached_result.get('brightness_value') is None:
                 try:
-                    response = requests.get(photo_url, timeout=5)
-                    if response.status_code == 200:
-                        brightness = self._calculate_photo_brightness(response.content)
+                    image_content = self.photo_fetcher.fetch_bytes(photo_url, timeout=5)
+                    if image_content:
+                        brightness = self._calculate_photo_brightness(image_content)
                         cached_result['brightness_value'] = brightness
                 except:
                     pass
@@ -79,14 +93,11 @@ class PhotoAnalyzer:
         
         try:
             # Télécharger l'image
-            response = requests.get(photo_url, timeout=5)
-            if response.status_code != 200:
-                print(f"   ❌ Erreur téléchargement: {response.status_code}")
+            image_content = self.photo_fetcher.fetch_bytes(photo_url, timeout=5)
+            if not image_content:
+                print(f"   ❌ Erreur téléchargement: {photo_url[:50]}...")
                 return None
             
-            # Sauvegarder le contenu pour calcul brightness
-            image_content = response.content
-            
             # Encoder en base64
             image_base64 = base64.b64encode(image_content).decode('utf-8')
             
@@ -164,7 +175,7 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
                 print(f"   ✅ Photo analysée: luminosité {analysis.get('luminosite_relative', 'N/A')} (brightness: {brightness:.2f})")
                 
                 # Mettre en cache avant de retourner
-                self.cache.set('exposition_photo', photo_url, analysis)
+                self._set_cached_photo_analysis('exposition_photo', photo_url, analysis)
                 
                 return analysis
             except json.JSONDecodeError:
@@ -183,46 +194,12 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
     
     def _calculate_photo_brightness(self, image_data: bytes) -> float:
         """Calcule la luminosité moyenne d'une photo (0.0 = sombre, 1.0 = très lumineux)"""
-        try:
-            # Vérifier que ce sont bien des bytes
-            if not isinstance(image_data, bytes):
-                return 0.5
-            
-            # Ouvrir l'image depuis les bytes
-            image_bytes_io = BytesIO(image_data)
-            image = Image.open(image_bytes_io)
-            
-            # Convertir en RGB si nécessaire
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
-            
-            # Redimensionner si trop grande (pour performance)
-            max_size = 1000
-            if image.size[0] > max_size or image.size[1] > max_size:
-                image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
-            
-            # Convertir en numpy array
-            img_array = np.array(image)
-            
-            # Vérifier les dimensions
-            if len(img_array.shape) != 3 or img_array.shape[2] != 3:
-                return 0.5
-            
-            # Calculer la luminance moyenne (formule standard: 0.299*R + 0.587*G + 0.114*B)
-            # Normaliser entre 0 et 1
-            luminance = (0.299 * img_array[:, :, 0] + 
-                        0.587 * img_array[:, :, 1] + 
-                        0.114 * img_array[:, :, 2]) / 255.0
-            
-            # Moyenne de la luminance
-            brightness = float(np.mean(luminance))
-            
-            return brightness
-        except Exception as e:
-            print(f"   ⚠️ Erreur calcul brightness: {e}")
-            import traceback
-            traceback.print_exc()
-            return 0.5  # Valeur par défaut si erreur
+        # Vérifier que ce sont bien des bytes
+        if not isinstance(image_data, bytes):
+            return 0.5
+        
+        # Décodage réduit + luminance vectorisée (voir brightness_engine)
+        return compute_brightness(image_data)
     
     def _aggregate_photo_results(self, results: List[Dict]) -> Dict:
         """Agrège les résultats de plusieurs photos avec luminosité moyenne
@@ -375,16 +352,16 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
     def _analyze_single_photo_baignoire(self, photo_url: str) -> Optional[Dict]:
         """Analyse une photo pour détecter baignoire/douche avec cache"""
         # Vérifier le cache d'abord
-        cached_result = self.cache.get('baignoire_photo', photo_url)
+        cached_result = self._get_cached_photo_analysis('baignoire_photo', photo_url)
         if cached_result:
             return cached_result
         
         try:
-            response = requests.get(photo_url, timeout=5)
-            if response.status_code != 200:
+            image_content = self.photo_fetcher.fetch_bytes(photo_url, timeout=5)
+            if not image_content:
                 return None
             
-            image_base64 = base64.b64encode(response.content).decode('utf-8')
+            image_base64 = base64.b64encode(image_content).decode('utf-8')
             
             headers = {
                 'Authorization': f'Bearer {self.openai_api_key}',
@@ -450,7 +427,7 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
                 analysis = json.loads(content)
                 
                 # Mettre en cache avant de retourner
-                self.cache.set('baignoire_photo', photo_url, analysis)
+                self._set_cached_photo_analysis('baignoire_photo', photo_url, analysis)
                 
                 return analysis
             except json.JSONDecodeError:
@@ -551,16 +528,16 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
     def _analyze_single_photo_cuisine(self, photo_url: str) -> Optional[Dict]:
         """Analyse une photo pour détecter cuisine ouverte/fermée avec cache"""
         # Vérifier le cache d'abord
-        cached_result = self.cache.get('cuisine_photo', photo_url)
+        cached_result = self._get_cached_photo_analysis('cuisine_photo', photo_url)
         if cached_result:
             return cached_result
         
         try:
-            response = requests.get(photo_url, timeout=5)
-            if response.status_code != 200:
+            image_content = self.photo_fetcher.fetch_bytes(photo_url, timeout=5)
+            if not image_content:
                 return None
             
-            image_base64 = base64.b64encode(response.content).decode('utf-8')
+            image_base64 = base64.b64encode(image_content).decode('utf-8')
             
             headers = {
                 'Authorization': f'Bearer {self.openai_api_key}',
@@ -626,7 +603,7 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
                 analysis = json.loads(content)
                 
                 # Mettre en cache avant de retourner
-                self.cache.set('cuisine_photo', photo_url, analysis)
+                self._set_cached_photo_analysis('cuisine_photo', photo_url, analysis)
                 
                 return analysis
             except json.JSONDecodeError:
@@ -10,6 +10,7 @@ import requests
 from typing import Dict, List, Optional
 from dotenv import load_dotenv
 from cache_api import get_cache
+from photo_fetcher import get_photo_fetcher
 
 load_dotenv()
 
@@ -20,6 +21,7 @@ class UnifiedPhotoAnalyzer:
         self.openai_api_key = os.getenv('OPENAI_API_KEY')
         self.openai_base_url = "https://api.openai.com/v1"
         self.cache = get_cache()
+        self.photo_fetcher = get_photo_fetcher()
     
     def analyze_photo_unified(self, photo_url: str, cache_key_prefix: str = "") -> Optional[Dict]:
         """
@@ -45,11 +47,10 @@ class UnifiedPhotoAnalyzer:
         
         try:
             # Télécharger l'image
-            response = requests.get(photo_url, timeout=10)
-            if response.status_code != 200:
+            image_content = self.photo_fetcher.fetch_bytes(photo_url, timeout=10)
+            if not image_content:
                 return None
             
-            image_content = response.content
             image_base64 = base64.b64encode(image_content).decode('utf-8')
             
             # Appel UNIQUE à OpenAI Vision avec prompt unifié
@@ -13,25 +13,15 @@ from cache_api import get_cache
 
 load_dotenv()
 
-class TextAIAnalyzer:
-    """Analyseur de texte intelligent avec IA pour annonces immobilières"""
-    
-    def __init__(self):
-        self.openai_api_key = os.getenv('OPENAI_API_KEY')
-        self.openai_base_url = "https://api.openai.com/v1"
-        self.model = "gpt-4o-mini"  # Utiliser mini pour économiser
-        self.cache = get_cache()
-    
-    def analyze_exposition(self, description: str, caracteristiques: str = "", etage: str = "") -> Dict:
-        """Analyse l'exposition avec IA en combinant étage, vue et exposition explicite pour une confiance globale"""
-        prompt = f"""Tu es un expert en annonces immobilières parisiennes. Analyse ce texte de manière GLOBALE pour déterminer l'exposition et la qualité de la luminosité.
+# Consigne commune de format de réponse
+JSON_ONLY = "\n\nRéponds UNIQUEMENT au format JSON (pas de texte avant/après):\n"
 
-Texte à analyser:
-Description: {description}
-Caractéristiques: {caracteristiques}
-Étage: {etage}
-
-## TÂCHES D'ANALYSE :
+# Analyses textuelles: introduction, consignes et format JSON attendu.
+# Partagées par les prompts individuels et le prompt combiné (une requête par appartement).
+TEXT_ANALYSES = {
+    'exposition': {
+        'intro': "Tu es un expert en annonces immobilières parisiennes. Analyse ce texte de manière GLOBALE pour déterminer l'exposition et la qualité de la luminosité.",
+        'instructions': """## TÂCHES D'ANALYSE :
 
 ### 1. EXPOSITION EXPLICITE
 Détecte si une EXPOSITION (orientation) est vraiment mentionnée.
@@ -62,66 +52,47 @@ Calcule une confiance globale (0.0-1.0) basée sur :
 - Vue dégagée mentionnée = +0.1 à +0.2
 - Combinaison de plusieurs indices positifs = +0.1 bonus
 - Faux positif détecté = confiance très faible (0.0-0.2)
-- Aucun indice = confiance faible (0.2-0.4)
-
-Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
-{{
+- Aucun indice = confiance faible (0.2-0.4)""",
+        'schema': """{
     "exposition": "sud|sud_ouest|ouest|est|nord|nord_est|null",
     "confiance_exposition": 0.0-1.0,
     "confiance_globale": 0.0-1.0,
-    "etage_analyse": {{
+    "etage_analyse": {
         "etage_trouve": "4ème|5ème|3ème|2ème|1er|RDC|null",
         "impact_luminosite": "positif|neutre|negatif|null",
         "confiance_etage": 0.0-1.0
-    }},
-    "vue_mentionnee": {{
+    },
+    "vue_mentionnee": {
         "vue_trouvee": true|false,
         "type_vue": "degagee|panoramique|correcte|vis_a_vis|obstruee|null",
         "impact_luminosite": "positif|neutre|negatif|null",
         "confiance_vue": 0.0-1.0
-    }},
+    },
     "justification": "explication détaillée combinant exposition, étage et vue",
     "est_faux_positif": true|false,
     "indices_trouves": ["liste des indices détectés"]
-}}"""
-
-        return self._call_ai(prompt, "exposition")
-    
-    def analyze_baignoire(self, description: str, caracteristiques: str = "") -> Dict:
-        """Analyse la présence de baignoire avec IA"""
-        prompt = f"""Tu es un expert en annonces immobilières parisiennes. Analyse ce texte et détermine si une BAIGNOIRE est mentionnée.
-
-Texte à analyser:
-Description: {description}
-Caractéristiques: {caracteristiques}
-
-⚠️ ATTENTION: Sois précis !
+}""",
+        'uses_etage': True,
+    },
+    'baignoire': {
+        'intro': 'Tu es un expert en annonces immobilières parisiennes. Analyse ce texte et détermine si une BAIGNOIRE est mentionnée.',
+        'instructions': """⚠️ ATTENTION: Sois précis !
 - "baignoire" = présence confirmée
 - "salle de bain" seule = ambigu (peut être douche ou baignoire)
 - "douche" ou "douche italienne" = PAS de baignoire
 - "salle d'eau" = généralement douche, PAS baignoire
-- Si ambiguïté, retourne null
-
-Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
-{{
+- Si ambiguïté, retourne null""",
+        'schema': """{
     "baignoire_presente": true|false|null,
     "douche_seule": true|false,
     "confiance": 0.0-1.0,
     "justification": "explication courte",
     "indices": ["liste des indices trouvés"]
-}}"""
-
-        return self._call_ai(prompt, "baignoire")
-    
-    def analyze_cuisine_ouverte(self, description: str, caracteristiques: str = "") -> Dict:
-        """Analyse si la cuisine est ouverte avec IA"""
-        prompt = f"""Tu es un expert en annonces immobilières parisiennes. Analyse ce texte et détermine si la CUISINE EST OUVERTE.
-
-Texte à analyser:
-Description: {description}
-Caractéristiques: {caracteristiques}
-
-⚠️ ATTENTION: Sois précis !
+}""",
+    },
+    'cuisine': {
+        'intro': 'Tu es un expert en annonces immobilières parisiennes. Analyse ce texte et détermine si la CUISINE EST OUVERTE.',
+        'instructions': """⚠️ ATTENTION: Sois précis !
 - "cuisine américaine" = OUVERTE
 - "cuisine ouverte" = OUVERTE
 - "cuisine intégrée" = OUVERTE
@@ -129,27 +100,17 @@ Caractéristiques: {caracteristiques}
 - "pièce à vivre" = généralement OUVERTE
 - "cuisine fermée" = FERMÉE
 - "cuisine indépendante" = généralement FERMÉE
-- Si pas mentionné = null (ambigu)
-
-Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
-{{
+- Si pas mentionné = null (ambigu)""",
+        'schema': """{
     "cuisine_ouverte": true|false|null,
     "confiance": 0.0-1.0,
     "justification": "explication courte",
     "indices": ["liste des indices trouvés"]
-}}"""
-
-        return self._call_ai(prompt, "cuisine")
-    
-    def analyze_style(self, description: str, caracteristiques: str = "") -> Dict:
-        """Analyse le style architectural avec IA en comprenant le contexte complet"""
-        prompt = f"""Tu es un expert en architecture parisienne et en immobilier. Analyse ce texte de manière GLOBALE pour déterminer le STYLE ARCHITECTURAL avec précision.
-
-Texte à analyser:
-Description: {description}
-Caractéristiques: {caracteristiques}
-
-## TÂCHES D'ANALYSE :
+}""",
+    },
+    'style': {
+        'intro': 'Tu es un expert en architecture parisienne et en immobilier. Analyse ce texte de manière GLOBALE pour déterminer le STYLE ARCHITECTURAL avec précision.',
+        'instructions': """## TÂCHES D'ANALYSE :
 
 ### 1. STYLE ARCHITECTURAL PRINCIPAL
 Détermine le style parmi ces catégories :
@@ -212,32 +173,272 @@ Calcule une confiance globale (0.0-1.0) basée sur :
 - Plusieurs indices cohérents avec le style = +0.2 à +0.3
 - Contexte clair (conversion d'entrepôt mentionnée) = +0.2
 - Indices contradictoires = -0.2 à -0.3
-- Peu d'indices = confiance faible (0.3-0.5)
-
-Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
-{{
+- Peu d'indices = confiance faible (0.3-0.5)""",
+        'schema': """{
     "style": "haussmannien|atypique|moderne|autre",
     "confiance_globale": 0.0-1.0,
     "style_principal": "haussmannien|atypique|moderne|autre",
-    "contexte_detection": {{
+    "contexte_detection": {
         "est_conversion": true|false,
         "type_conversion": "entrepot|usine|atelier|garage|loft|null",
         "indices_conversion": ["liste des indices de conversion trouvés"],
         "periode_mentionnee": "1850-1900|70s|80s|90s|2000+|null",
         "confiance_contexte": 0.0-1.0
-    }},
-    "indices_architecturaux": {{
+    },
+    "indices_architecturaux": {
         "elements_haussmannien": ["parquet", "moulures", "cheminée", "balcon fer forgé", "balcons fer forgé", "poutres apparentes" (si contexte ancien), "restauré", "rénové", ...],
         "elements_atypique": ["poutres" (si contexte industriel/entrepôt), "briques", "volumes", ...],
         "elements_moderne": ["design", "contemporain", ...],
         "confiance_indices": 0.0-1.0
-    }},
+    },
     "justification": "explication détaillée du style détecté et du contexte",
     "indices": ["liste complète de tous les indices trouvés"],
     "note_scoring": "Haussmannien=20pts | Atypique=10pts | Moderne/autre=0pts"
-}}"""
+}""",
+    },
+}
+
+# Analyse combinée: réponse plus longue (4 critères) et délai plus large
+COMBINED_MAX_TOKENS = 2000
+COMBINED_TIMEOUT = 30
+# Étage envoyé avec le texte, conservé dans l'analyse combinée en cache
+COMBINED_ETAGE_KEY = 'etage_envoye'
 
-        return self._call_ai(prompt, "style")
+
+class TextAIAnalyzer:
+    """Analyseur de texte intelligent avec IA pour annonces immobilières"""
+    
+    def __init__(self):
+        self.openai_api_key = os.getenv('OPENAI_API_KEY')
+        self.openai_base_url = "https://api.openai.com/v1"
+        self.model = "gpt-4o-mini"  # Utiliser mini pour économiser
+        self.cache = get_cache()
+        # Mode combiné: les 4 critères extraits en une seule requête par appartement
+        # (description et caractéristiques envoyées une fois, un seul résultat en cache)
+        self.combined_mode = True
+        # Textes (description, caractéristiques) dont la requête combinée a échoué pendant
+        # ce run: leurs autres critères partent directement en requêtes individuelles
+        self._failed_combined = set()
+    
+    def analyze_exposition(self, description: str, caracteristiques: str = "", etage: str = "") -> Dict:
+        """Analyse l'exposition avec IA en combinant étage, vue et exposition explicite pour une confiance globale"""
+        return self._analyze_criterion('exposition', description, caracteristiques, etage)
+    
+    def analyze_baignoire(self, description: str, caracteristiques: str = "") -> Dict:
+        """Analyse la présence de baignoire avec IA"""
+        return self._analyze_criterion('baignoire', description, caracteristiques)
+    
+    def analyze_cuisine_ouverte(self, description: str, caracteristiques: str = "") -> Dict:
+        """Analyse si la cuisine est ouverte avec IA"""
+        return self._analyze_criterion('cuisine', description, caracteristiques)
+    
+    def analyze_style(self, description: str, caracteristiques: str = "") -> Dict:
+        """Analyse le style architectural avec IA en comprenant le contexte complet"""
+        return self._analyze_criterion('style', description, caracteristiques)
+    
+    def analyze_all(self, description: str, caracteristiques: str = "", etage: str = "") -> Dict:
+        """
+        Analyse les 4 critères textuels (exposition, baignoire, cuisine, style) en une requête
+        
+        Returns:
+            Dict avec 'available' et un résultat par critère (même format que les
+            méthodes analyze_xxx individuelles)
+        """
+        analysis = self._combined_analysis(description, caracteristiques, etage)
+        if not analysis.get('available'):
+            # Échec de la requête combinée: critères individuels (cache d'abord)
+            results = {
+                analysis_type: self._call_ai(self._build_prompt(analysis_type, description, caracteristiques, etage), analysis_type)
+                for analysis_type in TEXT_ANALYSES
+            }
+            return {'available': any(result.get('available') for result in results.values()), **results}
+        
+        combined = self._split_combined(analysis)
+        if analysis.get(COMBINED_ETAGE_KEY, '') != etage:
+            combined['exposition'] = self._call_ai(self._build_prompt('exposition', description, caracteristiques, etage), 'exposition')
+        return combined
+    
+    def analyze_all_batch(self, apartments: List[Dict], batch_size: int = 4) -> List[Dict]:
+        """
+        Analyse les critères textuels de plusieurs appartements, par lots
+        
+        Chaque requête regroupe jusqu'à batch_size appartements; chaque résultat
+        est mis en cache sous la même clé que analyze_all().
+        
+        Args:
+            apartments: Appartements (clés description, caracteristiques, etage)
+            batch_size: Nombre d'appartements par requête
+        
+        Returns:
+            Liste de résultats analyze_all(), dans l'ordre des appartements
+        """
+        results: List[Optional[Dict]] = [None] * len(apartments)
+        pending = []
+        for i, apartment in enumerate(apartments):
+            texte = (
+                apartment.get('description', '') or '',
+                apartment.get('caracteristiques', '') or '',
+                apartment.get('etage', '') or ''
+            )
+            if self._cached_analysis(*texte):
+                results[i] = self.analyze_all(*texte)
+            else:
+                pending.append((i, texte))
+        
+        for start in range(0, len(pending), max(1, batch_size)):
+            group = pending[start:start + max(1, batch_size)]
+            
+            if len(group) > 1 and self.openai_api_key:
+                analysis = self._request_json(
+                    self._build_combined_prompt([texte for _, texte in group]),
+                    'texte_complet',
+                    max_tokens=min(COMBINED_MAX_TOKENS * len(group), 16000),
+                    timeout=COMBINED_TIMEOUT * len(group)
+                )
+                items = analysis.get('appartements') if analysis.get('available') else None
+                if isinstance(items, list) and len(items) == len(group) and all(isinstance(item, dict) for item in items):
+                    for (i, texte), item in zip(group, items):
+                        item['available'] = True
+                        self._set_cached_combined(texte, item)
+                        results[i] = self._split_combined(item)
+                    continue
+            
+            # Lot d'un seul appartement, ou réponse de lot inexploitable
+            for i, texte in group:
+                results[i] = self.analyze_all(*texte)
+        
+        return results
+    
+    def _analyze_criterion(self, analysis_type: str, description: str, caracteristiques: str = "", etage: str = "") -> Dict:
+        """Résultat d'un critère: depuis l'analyse combinée, sinon requête individuelle"""
+        if self.combined_mode:
+            analysis = self._combined_analysis(description, caracteristiques, etage)
+            # Exposition: l'analyse combinée doit avoir été faite avec le même étage
+            same_etage = analysis_type != 'exposition' or analysis.get(COMBINED_ETAGE_KEY, '') == etage
+            if analysis.get('available') and same_etage:
+                result = self._split_combined(analysis)[analysis_type]
+                # Critère absent d'une réponse combinée valide → requête individuelle
+                if result.get('available'):
+                    return result
+        
+        return self._call_ai(self._build_prompt(analysis_type, description, caracteristiques, etage), analysis_type)
+    
+    def _combined_analysis(self, description: str, caracteristiques: str, etage: str) -> Dict:
+        """Analyse combinée brute: cache, sinon une requête pour les 4 critères"""
+        cached_result = self._cached_analysis(description, caracteristiques, etage)
+        if cached_result:
+            return cached_result
+        if (description, caracteristiques) in self._failed_combined:
+            return {
+                'error': 'Combined request already failed',
+                'available': False
+            }
+        
+        texte = (description, caracteristiques, etage)
+        analysis = self._request_json(
+            self._build_combined_prompt([texte]),
+            'texte_complet',
+            max_tokens=COMBINED_MAX_TOKENS,
+            timeout=COMBINED_TIMEOUT
+        )
+        if analysis.get('available'):
+            self._set_cached_combined(texte, analysis)
+        else:
+            self._failed_combined.add((description, caracteristiques))
+        return analysis
+    
+    def _cached_analysis(self, description: str, caracteristiques: str, etage: str) -> Optional[Dict]:
+        """
+        Analyse combinée en cache, ou reconstituée depuis les 4 résultats individuels en cache
+        (analyses faites avant le mode combiné: pas de nouvelle requête)
+        """
+        cached_result = self._get_cached_combined(description, caracteristiques)
+        if cached_result:
+            return cached_result
+        
+        analysis = {'available': True, COMBINED_ETAGE_KEY: etage}
+        for analysis_type in TEXT_ANALYSES:
+            result = self.cache.get(analysis_type, self._build_prompt(analysis_type, description, caracteristiques, etage))
+            if not result:
+                return None
+            analysis[analysis_type] = result
+        return analysis
+    
+    def _build_prompt(self, analysis_type: str, description: str, caracteristiques: str = "", etage: str = "") -> str:
+        """Prompt d'un critère individuel"""
+        spec = TEXT_ANALYSES[analysis_type]
+        texte = f"Description: {description}\nCaractéristiques: {caracteristiques}"
+        if spec.get('uses_etage'):
+            texte += f"\nÉtage: {etage}"
+        return f"{spec['intro']}\n\nTexte à analyser:\n{texte}\n\n{spec['instructions']}{JSON_ONLY}{spec['schema']}"
+    
+    def _build_combined_prompt(self, textes: List[tuple]) -> str:
+        """
+        Prompt combiné: les 4 analyses pour un appartement, ou pour un lot d'appartements
+        
+        Args:
+            textes: Tuples (description, caracteristiques, etage)
+        """
+        parts = [
+            "Tu es un expert en annonces immobilières parisiennes et en architecture. "
+            "Analyse chaque texte UNE SEULE FOIS pour produire les 4 analyses indépendantes "
+            f"ci-dessous ({', '.join(TEXT_ANALYSES)})."
+        ]
+        
+        if len(textes) == 1:
+            description, caracteristiques, etage = textes[0]
+            parts.append(f"Texte à analyser:\nDescription: {description}\nCaractéristiques: {caracteristiques}\nÉtage: {etage}")
+        else:
+            for number, (description, caracteristiques, etage) in enumerate(textes, 1):
+                parts.append(f"### APPARTEMENT {number}\nDescription: {description}\nCaractéristiques: {caracteristiques}\nÉtage: {etage}")
+        
+        for analysis_type, spec in TEXT_ANALYSES.items():
+            parts.append(
+                f"# ANALYSE \"{analysis_type}\"\n{spec['intro']}\n\n{spec['instructions']}\n\n"
+                f"Format de \"{analysis_type}\":\n{spec['schema']}"
+            )
+        
+        analyses_format = ', '.join(f'"{analysis_type}": {{...}}' for analysis_type in TEXT_ANALYSES)
+        if len(textes) == 1:
+            response_format = f"{{{analyses_format}}}"
+        else:
+            response_format = (
+                f"{{\"appartements\": [{{{analyses_format}}}, ...]}}\n"
+                f"avec exactement {len(textes)} éléments, dans l'ordre des appartements"
+            )
+        parts.append(f"{JSON_ONLY.strip()}\n{response_format}")
+        return "\n\n".join(parts)
+    
+    def _get_cached_combined(self, description: str, caracteristiques: str) -> Optional[Dict]:
+        return self.cache.get('texte_complet', self._build_combined_prompt([(description, caracteristiques, '')]))
+    
+    def _set_cached_combined(self, texte: tuple, analysis: Dict):
+        """
+        Met en cache une analyse combinée sous la clé (description, caractéristiques)
+        
+        L'étage envoyé est conservé dans le résultat: baignoire, cuisine et style
+        n'en dépendent pas, l'exposition est redemandée seule pour un autre étage.
+        """
+        description, caracteristiques, etage = texte
+        analysis[COMBINED_ETAGE_KEY] = etage
+        self.cache.set('texte_complet', self._build_combined_prompt([(description, caracteristiques, '')]), analysis)
+    
+    def _split_combined(self, analysis: Dict) -> Dict:
+        """Sépare une analyse combinée en résultats par critère"""
+        combined = {'available': bool(analysis.get('available'))}
+        for analysis_type in TEXT_ANALYSES:
+            if not combined['available']:
+                combined[analysis_type] = dict(analysis)
+                continue
+            result = analysis.get(analysis_type)
+            if isinstance(result, dict):
+                combined[analysis_type] = {**result, 'available': True}
+            else:
+                combined[analysis_type] = {
+                    'error': f'Critère {analysis_type} absent de la réponse combinée',
+                    'available': False
+                }
+        return combined
     
     def _call_ai(self, prompt: str, analysis_type: str) -> Dict:
         """Appel générique à l'API OpenAI avec cache"""
@@ -252,6 +453,20 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
         if cached_result:
             return cached_result
         
+        analysis = self._request_json(prompt, analysis_type)
+        if analysis.get('available'):
+            # Mettre en cache avant de retourner
+            self.cache.set(analysis_type, prompt, analysis)
+        return analysis
+    
+    def _request_json(self, prompt: str, analysis_type: str, max_tokens: int = 500, timeout: float = 10) -> Dict:
+        """Requête chat completion et parsing de la réponse JSON (sans cache)"""
+        if not self.openai_api_key:
+            return {
+                'error': 'No API key',
+                'available': False
+            }
+        
         try:
             headers = {
                 'Authorization': f'Bearer {self.openai_api_key}',
@@ -273,14 +488,17 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
                     }
                 ],
                 'temperature': 0.1,  # Basse température pour plus de précision
-                'max_tokens': 500  # Augmenté pour les réponses enrichies avec étage/vue
+                'max_tokens': max_tokens  # 500 par défaut: réponses enrichies avec étage/vue
             }
+            if analysis_type == 'texte_complet':
+                # Sortie structurée: un objet JSON valide garanti
+                payload['response_format'] = {'type': 'json_object'}
             
             response = requests.post(
                 f"{self.openai_base_url}/chat/completions",
                 headers=headers,
                 json=payload,
-                timeout=10
+                timeout=timeout
             )
             
             if response.status_code != 200:
@@ -302,22 +520,18 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
                 
                 analysis = json.loads(content)
                 analysis['available'] = True
-                
-                # Mettre en cache avant de retourner
-                self.cache.set(analysis_type, prompt, analysis)
-                
                 return analysis
-                
+            
             except json.JSONDecodeError as e:
                 return {
                     'error': f'JSON parse error: {e}',
                     'raw_content': content[:200],
                     'available': False
                 }
-                
+        
         except requests.exceptions.Timeout:
             return {
-                'error': 'Timeout (10s)',
+                'error': f'Timeout ({timeout:g}s)',
                 'available': False
             }
         except Exception as e:
@@ -332,7 +546,8 @@ Réponds UNIQUEMENT au format JSON (pas de texte avant/après):
             'exposition': 'Tu es un expert en analyse d\'annonces immobilières. Tu détectes les expositions réelles et évites les faux positifs.',
             'baignoire': 'Tu es un expert en analyse d\'annonces immobilières. Tu détectes précisément la présence de baignoire ou douche.',
             'cuisine': 'Tu es un expert en analyse d\'annonces immobilières. Tu détectes si une cuisine est ouverte ou fermée.',
-            'style': 'Tu es un expert en architecture parisienne. Tu identifies le style architectural des appartements.'
+            'style': 'Tu es un expert en architecture parisienne. Tu identifies le style architectural des appartements.',
+            'texte_complet': 'Tu es un expert en analyse d\'annonces immobilières et en architecture parisienne. Tu produis plusieurs analyses indépendantes d\'un même texte, sans faux positifs, au format JSON demandé.'
         }
         return prompts.get(analysis_type, 'Tu es un expert en analyse d\'annonces immobilières.')
 
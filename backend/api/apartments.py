@@ -1,39 +1,38 @@
 """
 API endpoint pour récupérer les appartements
 """
+import base64
+import gzip
+import hashlib
 import json
+import math
 import os
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+import re
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
 import sys
 
 # Ajouter le répertoire parent au path pour importer generate_scorecard_html
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
-from generate_scorecard_html import load_scored_apartments
-from criteria import format_cuisine, format_baignoire, format_style, format_exposition
+from serving_snapshot import build_enriched_apartments, load_serving_snapshot, save_serving_snapshot, snapshot_sources
+from criteria.localisation import get_quartier_name, get_all_metro_stations
+from location_index import normalize_location
 
-# Importer la fonction de scoring pour valider les scores style
+# Prix/m² pour les filtres et le tri
 try:
-    from scoring import score_style
-    import json as json_module
-    _scoring_config = None
-    def load_scoring_config():
-        """Charge la configuration de scoring"""
-        global _scoring_config
-        if _scoring_config is None:
-            try:
-                config_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'scoring_config.json')
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    _scoring_config = json_module.load(f)
-            except Exception as e:
-                print(f"⚠️ Erreur chargement scoring_config: {e}")
-                _scoring_config = {}
-        return _scoring_config
+    from scoring import calculate_prix_m2
 except ImportError:
-    print("⚠️ Module scoring non disponible, validation style désactivée")
-    score_style = None
-    load_scoring_config = None
+    calculate_prix_m2 = None
+
+# Encodeur JSON rapide (optionnel), json de la bibliothèque standard sinon
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 router = APIRouter(prefix="/api", tags=["apartments"])
 
@@ -41,161 +40,324 @@ router = APIRouter(prefix="/api", tags=["apartments"])
 _cached_apartments = None
 _cache_timestamp = 0
 
-def validate_style_score(apartment: Dict[str, Any]) -> Dict[str, Any]:
-    """Valide et corrige le score style selon les règles strictes"""
-    if not score_style or 'scores_detaille' not in apartment:
-        return apartment
-    
-    try:
-        config = load_scoring_config()
-        if not config or 'axes' not in config or 'style' not in config['axes']:
-            return apartment
-        
-        # Utiliser score_style pour calculer le score selon les règles
-        style_result = score_style(apartment, config)
-        
-        # Override le score style dans scores_detaille avec les valeurs calculées
-        if 'style' not in apartment['scores_detaille']:
-            apartment['scores_detaille']['style'] = {}
-        
-        apartment['scores_detaille']['style']['score'] = style_result['score']
-        apartment['scores_detaille']['style']['tier'] = style_result['tier']
-        apartment['scores_detaille']['style']['justification'] = style_result['justification']
-        if style_result.get('confidence'):
-            apartment['scores_detaille']['style']['confidence'] = style_result['confidence']
-        
-    except Exception as e:
-        # En cas d'erreur, ne pas bloquer le chargement
-        print(f"⚠️ Erreur validation style pour {apartment.get('id')}: {e}")
-    
-    return apartment
+# Index reconstruits uniquement quand load_apartments_data recharge les données
+_apartments_by_id: Dict[str, Dict[str, Any]] = {}
+_facets_by_id: Dict[str, Dict[str, Any]] = {}
+_sort_indexes: Dict[tuple, List[str]] = {}
+_sort_ranks: Dict[tuple, Dict[str, int]] = {}
+
+# Le rechargement peut venir du thread du WatchService: les index, la version et le
+# cache de réponses sont remplacés ensemble sous ce verrou, et les requêtes en lisent
+# une vue cohérente (_current_index) au lieu des globales une à une
+_state_lock = threading.RLock()
+# Un seul rechargement à la fois (requête HTTP ou thread de surveillance)
+_reload_lock = threading.Lock()
+
+# Clés de tri disponibles (?sort=...) → champ des facettes
+SORT_KEYS = ('score', 'mega_score', 'prix_m2', 'prix', 'surface')
+SORT_ORDERS = ('asc', 'desc')
+MAX_PAGE_SIZE = 200
+
+# Réponses déjà encodées (JSON + gzip) pour la version courante des données
+_data_version = ''
+_response_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+RESPONSE_CACHE_SIZE = 256
+GZIP_MIN_SIZE = 1024
+
+def _parse_int(value: Any) -> Optional[int]:
+    """Extrait un entier depuis une valeur scrapée ("450 000 €", "42 m²"...)"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if not value or not isinstance(value, str):
+        return None
+    match = re.search(r'\d+', value.replace(' ', '').replace('\u202f', '').replace('\xa0', ''))
+    return int(match.group(0)) if match else None
+
+def _exposition_main_value(apartment: Dict[str, Any]) -> str:
+    """Valeur affichée de l'exposition (formatExpositionCriterion de frontend/src/utils/scoreUtils.js)"""
+    formatted = (apartment.get('formatted_data') or {}).get('exposition')
+    if formatted:
+        return formatted.get('main_value') or 'Sombre'
+
+    exposition = apartment.get('exposition')
+    direction = (exposition.get('exposition') if isinstance(exposition, dict) else None) or ''
+    if direction:
+        normalized = re.sub(r'[_\s-]', '', direction.lower())
+        if normalized in ('sud', 'sudouest', 'sudest'):
+            return 'Lumineux'
+        if normalized in ('nord', 'nordouest', 'nordest'):
+            return 'Sombre'
+        return 'Luminosité moyenne'
+
+    luminosite = (((apartment.get('style_analysis') or {}).get('luminosite') or {}).get('type') or '').lower()
+    if 'excellente' in luminosite:
+        return 'Lumineux'
+    if 'bonne' in luminosite or 'moyenne' in luminosite:
+        return 'Luminosité moyenne'
+    return 'Sombre'
+
+def mega_score(apartment: Dict[str, Any]) -> float:
+    """
+    Mega score affiché par les cartes (calculateMegaScore de frontend/src/utils/scoreUtils.js)
+
+    Exposition et cuisine sont comptées selon le tier cohérent avec la valeur affichée.
+    """
+    scores = apartment.get('scores_detaille') or {}
+    score = 0
+    for key in ('localisation', 'prix', 'style', 'baignoire'):
+        if scores.get(key) is not None:
+            score += scores[key].get('score') or 0
+
+    if scores.get('ensoleillement') is not None:
+        tier = {'Lumineux': 'tier1', 'Luminosité moyenne': 'tier2', 'Sombre': 'tier3'}.get(
+            _exposition_main_value(apartment), scores['ensoleillement'].get('tier') or 'tier3')
+        score += {'tier1': 20, 'tier2': 10}.get(tier, 0)
+
+    if scores.get('cuisine') is not None:
+        ouverte = ((apartment.get('style_analysis') or {}).get('cuisine') or {}).get('ouverte')
+        score += 10 if ouverte else 0
+
+    # Math.round(score * 10) / 10
+    return math.floor(score * 10 + 0.5) / 10
+
+def build_apartment_facets(apartment: Dict[str, Any]) -> Dict[str, Any]:
+    """Valeurs de filtre et de tri d'un appartement, calculées une fois au chargement"""
+    score = apartment.get('score_total')
+    prix_m2 = None
+    if calculate_prix_m2:
+        try:
+            prix_m2 = calculate_prix_m2(apartment)
+        except Exception:
+            prix_m2 = None
+    if prix_m2 is None:
+        prix_m2 = _parse_int(apartment.get('prix_m2'))
 
-def validate_ensoleillement_score(apartment: Dict[str, Any]) -> Dict[str, Any]:
-    """Valide et recalcule le score ensoleillement selon les nouvelles règles de vote"""
-    if 'scores_detaille' not in apartment:
-        return apartment
-    
     try:
-        from scoring import score_ensoleillement
-        config = load_scoring_config()
-        if not config or 'axes' not in config or 'ensoleillement' not in config['axes']:
-            return apartment
-        
-        # Recalculer le score avec les nouvelles règles
-        ensoleillement_result = score_ensoleillement(apartment, config)
-        
-        # Mettre à jour le score dans scores_detaille
-        if 'ensoleillement' not in apartment['scores_detaille']:
-            apartment['scores_detaille']['ensoleillement'] = {}
-        
-        apartment['scores_detaille']['ensoleillement']['score'] = ensoleillement_result['score']
-        apartment['scores_detaille']['ensoleillement']['tier'] = ensoleillement_result['tier']
-        apartment['scores_detaille']['ensoleillement']['justification'] = ensoleillement_result['justification']
-        if ensoleillement_result.get('confidence'):
-            apartment['scores_detaille']['ensoleillement']['confidence'] = ensoleillement_result['confidence']
-        
-    except Exception as e:
-        # En cas d'erreur, ne pas bloquer le chargement
-        print(f"⚠️ Erreur validation ensoleillement pour {apartment.get('id')}: {e}")
-        import traceback
-        traceback.print_exc()
-    
-    return apartment
+        stations = get_all_metro_stations(apartment)
+    except Exception:
+        stations = []
+
+    return {
+        'tier': apartment.get('tier'),
+        'score': score if isinstance(score, (int, float)) else None,
+        'mega_score': mega_score(apartment),
+        'prix_m2': prix_m2,
+        'prix': _parse_int(apartment.get('prix')),
+        'surface': _parse_int(apartment.get('surface')),
+        'quartier': normalize_location(get_quartier_name(apartment) or ''),
+        'stations': [normalize_location(station) for station in stations],
+    }
+
+def _current_index() -> tuple:
+    """Vue cohérente des index: (apartments_by_id, facets_by_id, sort_indexes, sort_ranks)"""
+    with _state_lock:
+        return _apartments_by_id, _facets_by_id, _sort_indexes, _sort_ranks
+
+def build_indexes(apartments: List[Dict[str, Any]]):
+    """Construit l'index id → appartement et les ordres de tri précalculés"""
+    global _apartments_by_id, _facets_by_id, _sort_indexes, _sort_ranks
+
+    apartments_by_id = {}
+    facets_by_id = {}
+    for apt in apartments:
+        apt_id = str(apt.get('id'))
+        # En cas de doublon, garder la première occurrence (comme l'ancien parcours linéaire)
+        if apt_id not in apartments_by_id:
+            apartments_by_id[apt_id] = apt
+            facets_by_id[apt_id] = build_apartment_facets(apt)
+
+    # Ordre du fichier de scores, utilisé sans tri explicite
+    sort_indexes = {(None, 'asc'): list(apartments_by_id)}
+    sort_ranks = {(None, 'asc'): {apt_id: rank for rank, apt_id in enumerate(apartments_by_id)}}
+    for key in SORT_KEYS:
+        with_value = [apt_id for apt_id, facets in facets_by_id.items() if facets[key] is not None]
+        without_value = [apt_id for apt_id, facets in facets_by_id.items() if facets[key] is None]
+        ascending = sorted(with_value, key=lambda apt_id: facets_by_id[apt_id][key])
+        descending = sorted(with_value, key=lambda apt_id: facets_by_id[apt_id][key], reverse=True)
+        # Les appartements sans valeur restent en fin de liste, quel que soit l'ordre
+        for order, ordered_ids in (('asc', ascending), ('desc', descending)):
+            sort_indexes[(key, order)] = ordered_ids + without_value
+            sort_ranks[(key, order)] = {apt_id: rank for rank, apt_id in enumerate(sort_indexes[(key, order)])}
+
+    full_list = encode_json(list(apartments_by_id.values()))
+    with _state_lock:
+        _apartments_by_id = apartments_by_id
+        _facets_by_id = facets_by_id
+        _sort_indexes = sort_indexes
+        _sort_ranks = sort_ranks
+        reset_response_cache(full_list)
+
+def encode_json(payload: Any) -> bytes:
+    """Sérialise en JSON compact (orjson si disponible)"""
+    if HAS_ORJSON:
+        try:
+            return orjson.dumps(payload)
+        except TypeError:
+            # Clés non-str, entiers hors 64 bits...: encodeur standard
+            pass
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+
+def encoded_response(body: bytes, etag: str) -> Dict[str, Any]:
+    """Réponse encodée une fois: corps JSON, copie gzip (si utile) et ETag"""
+    compressed = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_SIZE else None
+    return {'etag': etag, 'body': body, 'gzip': compressed}
+
+def reset_response_cache(full_list: bytes):
+    """
+    Nouvelle version des données: remplace les réponses encodées
+
+    La version est l'empreinte de la liste complète (déjà encodée), gardée comme
+    réponse de /apartments sans paramètre. Appelée sous _state_lock.
+    """
+    global _data_version, _response_cache
+    _data_version = hashlib.sha1(full_list).hexdigest()[:16]
+    cache_key = query_cache_key()
+    _response_cache = OrderedDict([(cache_key, encoded_response(full_list, response_etag(cache_key)))])
 
-def enrich_apartment_with_indices(apartment: Dict[str, Any]) -> Dict[str, Any]:
-    """Enrichit un appartement avec les indices formatés depuis le module criteria"""
+def query_cache_key(**params: Any) -> str:
+    """Clé de cache d'une requête (paramètres non nuls, ordre stable)"""
+    return json.dumps({key: value for key, value in params.items() if value is not None}, sort_keys=True)
+
+def response_etag(cache_key: str, data_version: Optional[str] = None) -> str:
+    """ETag fort: version des données + requête (connu sans rien encoder)"""
+    version = _data_version if data_version is None else data_version
+    return f'"{version}-{hashlib.md5(cache_key.encode("utf-8")).hexdigest()[:12]}"'
+
+def encoded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag fort d'une représentation (distinct pour chaque encodage, comme StaticAsset.etag_for)"""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> Optional[str]:
+    """ETag (identité ou gzip) correspondant à If-None-Match, None si aucun"""
+    if not if_none_match:
+        return None
+    if if_none_match.strip() == '*':
+        return etag
+    representations = (etag, encoded_etag(etag, 'gzip'))
+    for tag in if_none_match.split(','):
+        tag = tag.strip().removeprefix('W/')
+        if tag in representations:
+            return tag
+    return None
+
+def cached_json_response(request: Request, cache_key: str, build) -> Response:
+    """
+    Répond depuis le cache de réponses encodées (304 si le client a déjà cette version)
+
+    Args:
+        request: Requête (If-None-Match, Accept-Encoding)
+        cache_key: Clé de la requête (query_cache_key)
+        build: Fonction retournant le payload si la réponse n'est pas en cache
+    """
+    with _state_lock:
+        data_version, response_cache = _data_version, _response_cache
+    etag = response_etag(cache_key, data_version)
+    headers = {'ETag': etag, 'Cache-Control': 'no-cache', 'Vary': 'Accept-Encoding'}
+    matched_etag = _etag_matches(request.headers.get('if-none-match'), etag)
+    if matched_etag:
+        headers['ETag'] = matched_etag
+        return Response(status_code=304, headers=headers)
+
+    with _state_lock:
+        entry = response_cache.get(cache_key)
+        if entry is not None:
+            response_cache.move_to_end(cache_key)
+    if entry is None or entry['etag'] != etag:
+        entry = encoded_response(encode_json(build()), etag)
+        with _state_lock:
+            # Cache d'une version remplacée entre-temps: réponse servie sans être gardée
+            response_cache[cache_key] = entry
+            while len(response_cache) > RESPONSE_CACHE_SIZE:
+                response_cache.popitem(last=False)
+
+    if entry['gzip'] is not None and 'gzip' in request.headers.get('accept-encoding', '').lower():
+        headers['Content-Encoding'] = 'gzip'
+        headers['ETag'] = encoded_etag(etag, 'gzip')
+        return Response(content=entry['gzip'], media_type='application/json', headers=headers)
+    return Response(content=entry['body'], media_type='application/json', headers=headers)
+
+def _matches_filters(facets: Dict[str, Any], tiers: Optional[set], min_score: Optional[float],
+                     prix_m2_min: Optional[int], prix_m2_max: Optional[int],
+                     quartier: str, metro: str) -> bool:
+    """Vérifie qu'un appartement satisfait les filtres de la requête"""
+    if tiers and facets['tier'] not in tiers:
+        return False
+    if min_score is not None and (facets['score'] is None or facets['score'] < min_score):
+        return False
+    if prix_m2_min is not None and (facets['prix_m2'] is None or facets['prix_m2'] < prix_m2_min):
+        return False
+    if prix_m2_max is not None and (facets['prix_m2'] is None or facets['prix_m2'] > prix_m2_max):
+        return False
+    if quartier and quartier not in facets['quartier']:
+        return False
+    if metro and not any(metro in station for station in facets['stations']):
+        return False
+    return True
+
+def encode_cursor(apartment_id: str) -> str:
+    """Curseur opaque: id du dernier appartement de la page"""
+    return base64.urlsafe_b64encode(apartment_id.encode('utf-8')).decode('ascii')
+
+def decode_cursor(cursor: str) -> str:
     try:
-        # Valider les scores selon les règles strictes
-        apartment = validate_style_score(apartment)
-        apartment = validate_ensoleillement_score(apartment)
-        
-        # Enrichir avec les indices pour cuisine, baignoire et style
-        if 'scores_detaille' in apartment:
-            # Cuisine
-            if 'cuisine' in apartment.get('scores_detaille', {}):
-                try:
-                    cuisine_formatted = format_cuisine(apartment)
-                    if 'formatted_data' not in apartment:
-                        apartment['formatted_data'] = {}
-                    apartment['formatted_data']['cuisine'] = {
-                        'indices': cuisine_formatted.get('indices')
-                    }
-                except Exception as e:
-                    # En cas d'erreur, utiliser la phrase par défaut
-                    if 'formatted_data' not in apartment:
-                        apartment['formatted_data'] = {}
-                    apartment['formatted_data']['cuisine'] = {
-                        'indices': "Style expo cuisine et baignoire"
-                    }
-            
-            # Baignoire
-            if 'baignoire' in apartment.get('scores_detaille', {}):
-                try:
-                    baignoire_formatted = format_baignoire(apartment)
-                    if 'formatted_data' not in apartment:
-                        apartment['formatted_data'] = {}
-                    apartment['formatted_data']['baignoire'] = {
-                        'main_value': baignoire_formatted.get('main_value'),
-                        'indices': baignoire_formatted.get('indices'),
-                        'confidence': baignoire_formatted.get('confidence')
-                    }
-                except Exception as e:
-                    # En cas d'erreur, utiliser la phrase par défaut
-                    if 'formatted_data' not in apartment:
-                        apartment['formatted_data'] = {}
-                    apartment['formatted_data']['baignoire'] = {
-                        'main_value': 'Non',
-                        'indices': "Style expo cuisine et baignoire",
-                        'confidence': None
-                    }
-            
-            # Style
-            if 'style' in apartment.get('scores_detaille', {}):
-                try:
-                    style_formatted = format_style(apartment)
-                    if 'formatted_data' not in apartment:
-                        apartment['formatted_data'] = {}
-                    apartment['formatted_data']['style'] = {
-                        'indices': style_formatted.get('indices')  # Peut être None si pas d'indices trouvés
-                    }
-                except Exception as e:
-                    # En cas d'erreur, ne pas mettre de fallback générique
-                    # Le frontend gérera l'affichage si pas d'indices
-                    if 'formatted_data' not in apartment:
-                        apartment['formatted_data'] = {}
-                    apartment['formatted_data']['style'] = {
-                        'indices': None
-                    }
-            
-            # Exposition
-            # Créer formatted_data.exposition si l'appartement a soit scores_detaille.ensoleillement, soit exposition (depuis scraping), soit etage_num depuis API
-            has_ensoleillement_score = 'ensoleillement' in apartment.get('scores_detaille', {})
-            exposition_obj = apartment.get('exposition', {})
-            has_exposition_data = bool(exposition_obj.get('exposition'))
-            has_etage_num = 'etage_num' in exposition_obj.get('details', {})
-            
-            if has_ensoleillement_score or has_exposition_data or has_etage_num:
-                try:
-                    exposition_formatted = format_exposition(apartment)
-                    if 'formatted_data' not in apartment:
-                        apartment['formatted_data'] = {}
-                    apartment['formatted_data']['exposition'] = {
-                        'main_value': exposition_formatted.get('main_value'),
-                        'indices': exposition_formatted.get('indices'),
-                        'confidence': exposition_formatted.get('confidence')
-                    }
-                except Exception as e:
-                    # Logger l'erreur pour debug
-                    import traceback
-                    print(f"❌ Erreur format_exposition pour {apartment.get('id')}: {e}")
-                    print(traceback.format_exc())
-                    # En cas d'erreur, ne pas ajouter de données formatées
-                    pass
-    except Exception as e:
-        # Ne pas faire échouer la requête si l'enrichissement échoue
-        pass
-    
-    return apartment
+        return base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    except Exception:
+        raise HTTPException(status_code=400, detail="Curseur invalide")
+
+def query_apartments(tier: Optional[str] = None, min_score: Optional[float] = None,
+                     prix_m2_min: Optional[int] = None, prix_m2_max: Optional[int] = None,
+                     quartier: Optional[str] = None, metro: Optional[str] = None,
+                     sort: Optional[str] = None, order: str = 'desc',
+                     limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Filtre, trie et pagine les appartements en s'appuyant sur les index précalculés
+
+    Returns:
+        Dict avec 'items', 'next_cursor' (None en fin de liste) et 'total'
+        (nombre d'appartements correspondant aux filtres)
+    """
+    load_apartments_data()
+
+    if sort is not None and sort not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"Tri inconnu: {sort} (valeurs: {', '.join(SORT_KEYS)})")
+    if order not in SORT_ORDERS:
+        raise HTTPException(status_code=400, detail=f"Ordre inconnu: {order} (valeurs: {', '.join(SORT_ORDERS)})")
+
+    # Sans tri explicite: ordre du fichier de scores (comportement historique)
+    index_key = (sort, order) if sort else (None, 'asc')
+    apartments_by_id, facets_by_id, sort_indexes, sort_ranks = _current_index()
+    ordered_ids = sort_indexes.get(index_key, [])
+    ranks = sort_ranks.get(index_key, {})
+
+    tiers = {t.strip() for t in tier.split(',') if t.strip()} if tier else None
+    quartier = normalize_location(quartier.strip()) if quartier else ''
+    metro = normalize_location(metro.strip()) if metro else ''
+
+    if tiers or min_score is not None or prix_m2_min is not None or prix_m2_max is not None or quartier or metro:
+        matching = [
+            apt_id for apt_id in ordered_ids
+            if _matches_filters(facets_by_id[apt_id], tiers, min_score, prix_m2_min, prix_m2_max, quartier, metro)
+        ]
+    else:
+        matching = ordered_ids
+
+    remaining = matching
+    if cursor:
+        last_id = decode_cursor(cursor)
+        if last_id not in ranks:
+            raise HTTPException(status_code=400, detail="Curseur expiré: appartement absent des données")
+        # Reprise juste après le dernier appartement envoyé, par rang dans l'ordre de tri
+        start = ranks[last_id] + 1
+        remaining = [apt_id for apt_id in matching if ranks[apt_id] >= start]
+
+    page_ids = remaining if limit is None else remaining[:limit]
+    next_cursor = encode_cursor(page_ids[-1]) if page_ids and len(page_ids) < len(remaining) else None
+
+    return {
+        'items': [apartments_by_id[apt_id] for apt_id in page_ids],
+        'next_cursor': next_cursor,
+        'total': len(matching),
+    }
 
 def load_apartments_data() -> List[Dict[str, Any]]:
     """Charge les appartements scorés et fusionne avec les données scrapées"""
@@ -211,45 +373,91 @@ def load_apartments_data() -> List[Dict[str, Any]]:
         max_mtime = max(scores_mtime, scraped_mtime)
         
         # Si le cache est encore valide, le retourner
-        if _cached_apartments is not None and max_mtime <= _cache_timestamp:
-            return _cached_apartments
+        with _state_lock:
+            if _cached_apartments is not None and max_mtime <= _cache_timestamp:
+                return _cached_apartments
         
-        # Sinon, recharger les données
-        apartments = load_scored_apartments()
-        
-        # Enrichir chaque appartement avec les indices formatés
-        enriched_apartments = [enrich_apartment_with_indices(apt) for apt in apartments]
-        
-        _cached_apartments = enriched_apartments
-        _cache_timestamp = max_mtime
-        
-        return _cached_apartments
+        with _reload_lock:
+            # Rechargement terminé par un autre thread pendant l'attente
+            with _state_lock:
+                if _cached_apartments is not None and max_mtime <= _cache_timestamp:
+                    return _cached_apartments
+            
+            # Sinon, recharger les données: snapshot pré-enrichi par le pipeline de scoring
+            enriched_apartments = load_serving_snapshot()
+            if enriched_apartments is None:
+                # Snapshot absent ou périmé: fusion + enrichissement, puis snapshot pour les prochains chargements
+                sources = snapshot_sources()
+                enriched_apartments = build_enriched_apartments()
+                try:
+                    save_serving_snapshot(enriched_apartments, sources=sources)
+                except OSError as e:
+                    print(f"⚠️ Erreur écriture du snapshot de service: {e}")
+            
+            # Index remplacés avant le cache: un lecteur qui voit les nouvelles données voit leurs index
+            build_indexes(enriched_apartments)
+            with _state_lock:
+                _cached_apartments = enriched_apartments
+                _cache_timestamp = max_mtime
+            
+            return enriched_apartments
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur lors du chargement des données: {str(e)}")
 
 @router.get("/apartments")
-async def get_apartments() -> List[Dict[str, Any]]:
+async def get_apartments(
+    request: Request,
+    tier: Optional[str] = Query(None, description="Tier(s) global(aux), séparés par des virgules (ex: tier1,tier2)"),
+    min_score: Optional[float] = Query(None, description="Score total minimum"),
+    prix_m2_min: Optional[int] = Query(None, ge=0, description="Prix/m² minimum"),
+    prix_m2_max: Optional[int] = Query(None, ge=0, description="Prix/m² maximum"),
+    quartier: Optional[str] = Query(None, description="Quartier (recherche partielle, accents ignorés)"),
+    metro: Optional[str] = Query(None, description="Station de métro (recherche partielle, accents ignorés)"),
+    sort: Optional[str] = Query(None, description=f"Clé de tri: {', '.join(SORT_KEYS)}"),
+    order: str = Query('desc', description="Ordre de tri: asc ou desc"),
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Taille de page (active la pagination)"),
+    cursor: Optional[str] = Query(None, description="Curseur next_cursor de la page précédente"),
+) -> Response:
     """
-    Retourne la liste de tous les appartements avec leurs scores et détails
+    Retourne les appartements avec leurs scores et détails
+
+    Sans limit ni cursor: liste complète (filtrée/triée si demandé), comme avant.
+    Avec limit ou cursor: page {items, next_cursor, total}.
+
+    Réponses encodées une fois par version des données (gzip si accepté),
+    304 sur If-None-Match tant que les données et la requête sont les mêmes.
     """
     try:
-        apartments = load_apartments_data()
-        return apartments
+        load_apartments_data()
+        params = dict(
+            tier=tier, min_score=min_score, prix_m2_min=prix_m2_min, prix_m2_max=prix_m2_max,
+            quartier=quartier, metro=metro, sort=sort, order=order, limit=limit, cursor=cursor
+        )
+        # order par défaut sans tri: même réponse (et même clé) que la liste brute
+        key_params = dict(params, order=order if (sort or order != 'desc') else None)
+
+        def build():
+            result = query_apartments(**params)
+            if limit is None and cursor is None:
+                return result['items']
+            return result
+
+        return cached_json_response(request, query_cache_key(**key_params), build)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur serveur: {str(e)}")
 
 @router.get("/apartments/{apartment_id}")
-async def get_apartment(apartment_id: str) -> Dict[str, Any]:
+async def get_apartment(request: Request, apartment_id: str) -> Response:
     """
     Retourne les détails d'un appartement spécifique
     """
     try:
-        apartments = load_apartments_data()
-        for apt in apartments:
-            if str(apt.get('id')) == str(apartment_id):
-                return apt
+        load_apartments_data()
+        apt = _current_index()[0].get(str(apartment_id))
+        if apt is not None:
+            return cached_json_response(request, query_cache_key(apartment_id=str(apartment_id)), lambda: apt)
         raise HTTPException(status_code=404, detail=f"Appartement {apartment_id} non trouvé")
     except HTTPException:
         raise
@@ -259,8 +467,10 @@ async def get_apartment(apartment_id: str) -> Dict[str, Any]:
 def invalidate_cache():
     """Invalide le cache pour forcer un rechargement"""
     global _cached_apartments, _cache_timestamp
-    _cached_apartments = None
-    _cache_timestamp = 0
+    # Les index servis restent en place jusqu'à ce que build_indexes les remplace
+    with _state_lock:
+        _cached_apartments = None
+        _cache_timestamp = 0
 
 @router.post("/apartments/invalidate-cache")
 async def invalidate_apartments_cache():
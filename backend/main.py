@@ -3,8 +3,11 @@ Serveur FastAPI principal pour l'API HomeScore
 """
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.staticfiles import StaticFiles
 from backend.api import apartments
 from backend.watch_service import WatchService
+import json
+import os
 import uvicorn
 
 app = FastAPI(
@@ -25,36 +28,72 @@ app.add_middleware(
 # Inclure les routers
 app.include_router(apartments.router)
 
+# Photos locales et leurs déclinaisons responsive (URLs "local_photos" du payload)
+PHOTO_DIRS = ("data/photos", "data/photos_v2", "data/photo_store/blobs")
+for photos_path in PHOTO_DIRS:
+    app.mount(f"/{photos_path}", StaticFiles(directory=photos_path, check_dir=False), name=photos_path)
+
 # Store des connexions WebSocket actives
 active_connections: list[WebSocket] = []
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
-    """Endpoint WebSocket pour les mises à jour en temps réel"""
+    """
+    Endpoint WebSocket pour les mises à jour en temps réel
+    
+    Le serveur pousse des messages "apartments_delta" numérotés (seq).
+    Un client qui se reconnecte envoie {"type": "resume", "last_seq": N}
+    pour recevoir les deltas manqués, ou "resync_required" si l'historique
+    ne suffit pas (rechargement complet de /api/apartments).
+    """
     await websocket.accept()
     active_connections.append(websocket)
     
     try:
-        # Envoyer un message de bienvenue
+        # Envoyer un message de bienvenue (avec la séquence courante)
         await websocket.send_json({
             "type": "connected",
-            "message": "Connexion WebSocket établie"
+            "message": "Connexion WebSocket établie",
+            "seq": watch_service_instance.sequence if watch_service_instance else 0
         })
         
         # Attendre les messages du client (pour garder la connexion ouverte)
         while True:
             try:
                 data = await websocket.receive_text()
-                # Pour l'instant, on ignore les messages du client
-                # On pourrait implémenter des commandes si nécessaire
             except WebSocketDisconnect:
                 break
+            await handle_client_message(websocket, data)
     except Exception as e:
         print(f"Erreur WebSocket: {e}")
     finally:
         if websocket in active_connections:
             active_connections.remove(websocket)
 
+async def handle_client_message(websocket: WebSocket, data: str):
+    """Traite les commandes client (reprise après reconnexion)"""
+    try:
+        command = json.loads(data)
+    except ValueError:
+        return
+    if not isinstance(command, dict) or command.get("type") != "resume" or not watch_service_instance:
+        return
+    
+    try:
+        last_seq = int(command.get("last_seq"))
+    except (TypeError, ValueError):
+        last_seq = -1
+    
+    missed = watch_service_instance.messages_since(last_seq)
+    if missed is None:
+        await websocket.send_json({
+            "type": "resync_required",
+            "seq": watch_service_instance.sequence
+        })
+        return
+    for message in missed:
+        await websocket.send_json(message)
+
 async def broadcast_to_clients(message: dict):
     """Envoie un message à tous les clients WebSocket connectés"""
     disconnected = []
@@ -78,6 +117,9 @@ async def startup_event():
     """Démarre le service de surveillance des fichiers"""
     global watch_service_instance
     print("🚀 Démarrage du serveur HomeScore API")
+    # StaticFiles exige des dossiers existants (ils peuvent être vides avant le premier téléchargement)
+    for photos_path in PHOTO_DIRS:
+        os.makedirs(photos_path, exist_ok=True)
     watch_service_instance = WatchService(broadcast_callback=broadcast_to_clients)
     watch_service_instance.start_watching()
 
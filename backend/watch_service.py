@@ -1,14 +1,29 @@
 """
 Service de surveillance des fichiers pour détecter les changements
 et notifier les clients via WebSocket
+
+Les notifications sont des deltas par appartement (ajoutés, modifiés,
+supprimés), détectés par hash du contenu de chaque fiche et numérotés
+par une séquence: un client qui se reconnecte reprend au dernier numéro reçu.
 """
-import os
-import time
+import hashlib
+import json
 import threading
-from pathlib import Path
-from typing import Callable, Dict, List
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
 from datetime import datetime
 
+from file_watcher import FileWatcher, HAS_WATCHDOG
+
+# Nombre de deltas conservés pour la reprise des clients reconnectés
+DELTA_HISTORY_SIZE = 100
+
+
+def record_hash(apartment: Dict[str, Any]) -> str:
+    """Hash stable du contenu d'une fiche appartement"""
+    payload = json.dumps(apartment, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
 class WatchService:
     """Service de surveillance des fichiers JSON et notification via WebSocket"""
     
@@ -16,7 +31,8 @@ class WatchService:
         """
         Args:
             broadcast_callback: Fonction appelée pour envoyer des messages aux clients WebSocket
-            debounce_seconds: Délai en secondes avant d'envoyer une notification après un changement
+            debounce_seconds: Délai sans nouvel événement avant d'envoyer une notification
+                (les changements rapprochés sont regroupés en une seule notification)
         """
         import asyncio
         self.loop = None
@@ -27,9 +43,7 @@ class WatchService:
             pass
         self.broadcast_callback = broadcast_callback
         self.debounce_seconds = debounce_seconds
-        self.last_notification_time = {}
-        self.watching = False
-        self.watch_thread = None
+        self.watcher = None
         
         # Fichiers à surveiller
         self.files_to_watch = [
@@ -37,46 +51,83 @@ class WatchService:
             'data/scraped_apartments.json',
         ]
         
-        # Cache des temps de modification
-        self.file_mtimes: Dict[str, float] = {}
+        # Hash par appartement et historique des deltas envoyés (reprise par séquence)
+        self.sequence = 0
+        self.record_hashes: Dict[str, str] = {}
+        self.delta_history = deque(maxlen=DELTA_HISTORY_SIZE)
+        self.delta_lock = threading.Lock()
         self.init_cache()
     
     def init_cache(self):
-        """Initialise le cache avec les temps de modification actuels"""
-        for filepath in self.files_to_watch:
-            if os.path.exists(filepath):
-                self.file_mtimes[filepath] = os.path.getmtime(filepath)
+        """Initialise les hash des appartements actuellement servis"""
+        try:
+            self.record_hashes = self.hash_records(self.load_records())
+        except Exception as e:
+            print(f"⚠️  Impossible d'initialiser les hash des appartements: {e}")
     
-    def check_changes(self) -> List[str]:
-        """Vérifie si des fichiers ont changé et retourne la liste des fichiers modifiés"""
-        changed_files = []
+    def load_records(self) -> List[Dict[str, Any]]:
+        """Recharge les appartements servis par l'API (après invalidation du cache)"""
+        from backend.api.apartments import load_apartments_data
+        return load_apartments_data()
+    
+    def hash_records(self, apartments: List[Dict[str, Any]]) -> Dict[str, str]:
+        return {str(apt.get('id')): record_hash(apt) for apt in apartments}
+    
+    def compute_delta(self, apartments: List[Dict[str, Any]]) -> Dict[str, List]:
+        """
+        Compare les appartements aux hash précédents et met à jour ces hash
         
-        for filepath in self.files_to_watch:
-            if not os.path.exists(filepath):
+        Returns:
+            Dict avec 'added' et 'updated' (fiches complètes) et 'removed' (ids)
+        """
+        new_hashes = {}
+        added, updated = [], []
+        for apt in apartments:
+            apt_id = str(apt.get('id'))
+            if apt_id in new_hashes:
                 continue
-            
-            current_mtime = os.path.getmtime(filepath)
-            cached_mtime = self.file_mtimes.get(filepath, 0)
-            
-            if current_mtime > cached_mtime:
-                changed_files.append(filepath)
-                self.file_mtimes[filepath] = current_mtime
+            new_hashes[apt_id] = record_hash(apt)
+            previous_hash = self.record_hashes.get(apt_id)
+            if previous_hash is None:
+                added.append(apt)
+            elif previous_hash != new_hashes[apt_id]:
+                updated.append(apt)
         
-        return changed_files
+        removed = [apt_id for apt_id in self.record_hashes if apt_id not in new_hashes]
+        self.record_hashes = new_hashes
+        return {'added': added, 'updated': updated, 'removed': removed}
+    
+    def record_message(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Attribue le numéro de séquence suivant et conserve le message pour la reprise"""
+        with self.delta_lock:
+            self.sequence += 1
+            message['seq'] = self.sequence
+            self.delta_history.append(message)
+        return message
+    
+    def messages_since(self, last_seq: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Messages envoyés après last_seq, pour un client qui se reconnecte
+        
+        Returns:
+            Liste (éventuellement vide) des messages manqués, ou None si
+            l'historique ne remonte pas assez loin (rechargement complet requis)
+        """
+        with self.delta_lock:
+            if last_seq == self.sequence:
+                return []
+            if last_seq > self.sequence or not self.delta_history or self.delta_history[0]['seq'] > last_seq + 1:
+                return None
+            return [message for message in self.delta_history if message['seq'] > last_seq]
     
     def notify_change(self, changed_files: List[str]):
         """Notifie les clients d'un changement via WebSocket"""
         if not self.broadcast_callback:
             return
         
-        # Debounce: éviter les notifications trop fréquentes
-        current_time = time.time()
-        last_time = self.last_notification_time.get('apartments', 0)
-        
-        if current_time - last_time < self.debounce_seconds:
-            return
-        
-        self.last_notification_time['apartments'] = current_time
+        print(f"📝 [{datetime.now().strftime('%H:%M:%S')}] Fichiers modifiés détectés:")
+        for filepath in changed_files:
+            print(f"   • {filepath}")
         
         # Invalider le cache de l'API apartments
         try:
@@ -85,70 +136,83 @@ class WatchService:
         except Exception as e:
             print(f"⚠️  Erreur lors de l'invalidation du cache: {e}")
         
-        # Envoyer la notification aux clients
-        message = {
-            "type": "apartments_updated",
-            "timestamp": datetime.now().isoformat(),
-            "changed_files": changed_files
-        }
+        # Calculer les appartements ajoutés / modifiés / supprimés
+        try:
+            delta = self.compute_delta(self.load_records())
+        except Exception as e:
+            print(f"⚠️  Erreur lors du calcul du delta, rechargement complet demandé: {e}")
+            delta = None
+        
+        if delta is not None and not any(delta.values()):
+            print(f"ℹ️  [{datetime.now().strftime('%H:%M:%S')}] Fichiers modifiés sans changement d'appartement")
+            return
+        
+        # Envoyer la notification aux clients (delta, ou rechargement complet en cas d'erreur)
+        if delta is not None:
+            message = {
+                "type": "apartments_delta",
+                "timestamp": datetime.now().isoformat(),
+                "changed_files": changed_files,
+                **delta
+            }
+        else:
+            message = {
+                "type": "apartments_updated",
+                "timestamp": datetime.now().isoformat(),
+                "changed_files": changed_files
+            }
+        self.record_message(message)
         
         try:
             if self.broadcast_callback:
                 import asyncio
                 # Si callback est async, créer une task
                 if asyncio.iscoroutinefunction(self.broadcast_callback):
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            asyncio.create_task(self.broadcast_callback(message))
-                        else:
+                    if self.loop is not None and self.loop.is_running():
+                        # Thread de surveillance → boucle du serveur (où vivent les connexions WebSocket)
+                        asyncio.run_coroutine_threadsafe(self.broadcast_callback(message), self.loop)
+                    else:
+                        try:
+                            loop = asyncio.get_event_loop()
+                            if loop.is_running():
+                                asyncio.create_task(self.broadcast_callback(message))
+                            else:
+                                loop.run_until_complete(self.broadcast_callback(message))
+                        except RuntimeError:
+                            # Nouveau thread si nécessaire
+                            loop = asyncio.new_event_loop()
+                            asyncio.set_event_loop(loop)
                             loop.run_until_complete(self.broadcast_callback(message))
-                    except RuntimeError:
-                        # Nouveau thread si nécessaire
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        loop.run_until_complete(self.broadcast_callback(message))
-                        loop.close()
+                            loop.close()
                 else:
                     self.broadcast_callback(message)
-            print(f"📢 [{datetime.now().strftime('%H:%M:%S')}] Notification envoyée: {len(changed_files)} fichier(s) modifié(s)")
+            self._log_notification(message)
         except Exception as e:
             print(f"⚠️  Erreur lors de l'envoi de la notification: {e}")
     
-    def watch_loop(self):
-        """Boucle de surveillance (à exécuter dans un thread séparé)"""
-        print("👀 Surveillance des fichiers démarrée")
-        print(f"   Fichiers surveillés: {', '.join(self.files_to_watch)}")
-        
-        while self.watching:
-            try:
-                changed_files = self.check_changes()
-                
-                if changed_files:
-                    print(f"📝 [{datetime.now().strftime('%H:%M:%S')}] Fichiers modifiés détectés:")
-                    for filepath in changed_files:
-                        print(f"   • {filepath}")
-                    self.notify_change(changed_files)
-                
-                time.sleep(1)  # Vérifier toutes les secondes
-            except Exception as e:
-                print(f"⚠️  Erreur dans la boucle de surveillance: {e}")
-                time.sleep(5)  # Attendre plus longtemps en cas d'erreur
+    def _log_notification(self, message: Dict[str, Any]):
+        """Trace la notification envoyée"""
+        if message['type'] == 'apartments_delta':
+            print(f"📢 [{datetime.now().strftime('%H:%M:%S')}] Delta #{message['seq']} envoyé: "
+                  f"{len(message['added'])} ajouté(s), {len(message['updated'])} modifié(s), {len(message['removed'])} supprimé(s)")
+        else:
+            print(f"📢 [{datetime.now().strftime('%H:%M:%S')}] Notification #{message['seq']} envoyée: {len(message['changed_files'])} fichier(s) modifié(s)")
     
     def start_watching(self):
-        """Démarre la surveillance dans un thread séparé"""
-        if self.watching:
+        """Démarre la surveillance (événements système via watchdog, sans polling)"""
+        if self.watcher:
             return
         
-        self.watching = True
-        self.watch_thread = threading.Thread(target=self.watch_loop, daemon=True)
-        self.watch_thread.start()
+        self.watcher = FileWatcher(self.files_to_watch, self.notify_change, debounce_seconds=self.debounce_seconds)
+        self.watcher.start()
+        print("👀 Surveillance des fichiers démarrée" + ("" if HAS_WATCHDOG else " (polling, watchdog non installé)"))
+        print(f"   Fichiers surveillés: {', '.join(self.files_to_watch)}")
         print("✅ Service de surveillance démarré")
     
     def stop_watching(self):
         """Arrête la surveillance"""
-        self.watching = False
-        if self.watch_thread:
-            self.watch_thread.join(timeout=2)
+        if self.watcher:
+            self.watcher.stop()
+            self.watcher = None
         print("🛑 Service de surveillance arrêté")
 
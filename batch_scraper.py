@@ -45,6 +45,9 @@ class BatchScraper:
                 print("❌ Échec de la connexion")
                 return
             
+            # Une page par appartement traité en parallèle, toutes dans le contexte connecté
+            await self.scraper.open_page_pool(self.max_concurrent)
+            
             # 2. Scraper toutes les pages de l'alerte
             all_apartments = await self.scrape_all_pages(alert_url, pages_to_scrape)
             
@@ -87,8 +90,8 @@ class BatchScraper:
                 page_url = f"{alert_url}?page={page}"
             
             try:
-                # Scraper la page
-                apartments = await self.scraper.scrape_alert_page(page_url)
+                # Récupérer les URLs des annonces de la page (scrapées ensuite en parallèle)
+                apartments = await self.scraper.collect_apartment_urls(page_url)
                 
                 if apartments:
                     all_apartments.extend(apartments)
@@ -120,15 +123,15 @@ class BatchScraper:
         print("-" * 50)
         
         processed = []
-        semaphore = asyncio.Semaphore(self.max_concurrent)
         
         async def process_single_apartment(apartment_url, index):
-            async with semaphore:
+            # Le pool borne la concurrence: chaque annonce a sa propre page
+            async with self.scraper.checkout_page() as worker:
                 try:
                     print(f"🏠 Appartement {index+1}/{len(apartments)}")
                     
                     # Scraper les détails de l'appartement
-                    apartment_data = await self.scraper.scrape_apartment_details(apartment_url)
+                    apartment_data = await worker.scrape_apartment(apartment_url)
                     
                     if apartment_data:
                         # Analyser le style avec les photos
@@ -149,7 +152,7 @@ class BatchScraper:
                     print(f"   ❌ Erreur appartement {index+1}: {e}")
                     self.errors.append(f"Appartement {index+1}: {e}")
         
-        # Traiter tous les appartements avec concurrence limitée
+        # Traiter tous les appartements avec concurrence limitée (taille du pool de pages)
         tasks = [process_single_apartment(url, i) for i, url in enumerate(apartments)]
         await asyncio.gather(*tasks, return_exceptions=True)
         
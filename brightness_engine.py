@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Calcul de luminosité (brightness) des photos, en lot
+
+- Décodage JPEG en mode draft (réduction 1/2, 1/4 ou 1/8 faite par le décodeur)
+- Luminance moyenne = 0.299*R + 0.587*G + 0.114*B appliquée aux moyennes de
+  canaux (linéaire, donc identique à la moyenne par pixel) en float32
+- Photos réparties sur un pool de processus
+- Résultats persistés par digest SHA-256 (data/photo_store/brightness.json)
+"""
+
+import json
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+# Coefficients de luminance (ITU-R BT.601)
+LUMINANCE_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+# Taille cible du décodage: largement suffisant pour une moyenne
+DRAFT_SIZE = (256, 256)
+
+# Modes acceptés par Image.reduce (convertis en RGB après réduction)
+REDUCIBLE_MODES = ('RGB', 'L', 'RGBA', 'CMYK')
+
+
+def _brightness_from_image(image: Image.Image) -> float:
+    """Luminance moyenne (0.0 = sombre, 1.0 = très lumineux) d'une image PIL"""
+    # Le décodeur JPEG réduit directement l'image (aucun effet sur les autres formats)
+    image.draft('RGB', DRAFT_SIZE)
+    # reduce() ne gère pas tous les modes (palette 'P', 1 bit...): conversion d'abord
+    if image.mode not in REDUCIBLE_MODES:
+        image = image.convert('RGB')
+    # Autres formats (PNG, WebP...): réduction entière rapide
+    factor = max(image.size) // (2 * DRAFT_SIZE[0])
+    if factor > 1:
+        image = image.reduce(factor)
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+
+    pixels = np.asarray(image, dtype=np.uint8).reshape(-1, 3)
+    channel_means = pixels.mean(axis=0, dtype=np.float32)
+    return float(channel_means @ LUMINANCE_WEIGHTS) / 255.0
+
+
+def compute_brightness(image_data: bytes) -> float:
+    """
+    Calcule la luminosité moyenne d'une photo à partir de ses octets
+
+    Returns:
+        Luminosité entre 0.0 et 1.0 (0.5 si l'image est illisible)
+    """
+    try:
+        with Image.open(BytesIO(image_data)) as image:
+            return _brightness_from_image(image)
+    except Exception as e:
+        print(f"   ⚠️ Erreur calcul brightness: {e}")
+        return 0.5
+
+
+def compute_brightness_from_path(path: str) -> Optional[float]:
+    """Calcule la luminosité d'une photo sur disque (None si illisible)"""
+    try:
+        with Image.open(path) as image:
+            return _brightness_from_image(image)
+    except Exception:
+        return None
+
+
+class BrightnessEngine:
+    """Calcul en lot de la luminosité, avec résultats persistés par digest"""
+
+    def __init__(self, results_file: str = 'data/photo_store/brightness.json', max_workers: Optional[int] = None):
+        """
+        Args:
+            results_file: Fichier des résultats par digest
+            max_workers: Nombre de processus (nombre de CPU par défaut)
+        """
+        self.results_file = results_file
+        self.max_workers = max_workers
+        self._results: Optional[Dict[str, float]] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, float]:
+        if self._results is None:
+            self._results = {}
+            if os.path.exists(self.results_file):
+                try:
+                    with open(self.results_file, 'r', encoding='utf-8') as f:
+                        self._results = json.load(f)
+                except Exception as e:
+                    print(f"⚠️ Erreur chargement brightness: {e}")
+        return self._results
+
+    def save(self):
+        """Sauvegarde les résultats (une écriture par lot)"""
+        with self._lock:
+            results = dict(self._load())
+        results_dir = os.path.dirname(self.results_file)
+        if results_dir:
+            os.makedirs(results_dir, exist_ok=True)
+        tmp_file = f"{self.results_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(results, f)
+        os.replace(tmp_file, self.results_file)
+
+    def get(self, digest: str) -> Optional[float]:
+        """Luminosité déjà calculée pour ce digest, ou None"""
+        with self._lock:
+            return self._load().get(digest)
+
+    def compute_many(self, photos: Iterable[Tuple[str, str]], force: bool = False) -> Dict[str, float]:
+        """
+        Calcule la luminosité d'un ensemble de photos
+
+        Args:
+            photos: Couples (digest, chemin local)
+            force: Recalculer même si le digest est déjà connu
+
+        Returns:
+            Dict digest → luminosité (photos illisibles absentes)
+        """
+        photos = dict(photos)
+        with self._lock:
+            known = self._load()
+            pending = {digest: path for digest, path in photos.items() if force or digest not in known}
+
+        if pending:
+            digests = list(pending.keys())
+            paths = [pending[digest] for digest in digests]
+            chunksize = max(1, len(paths) // ((self.max_workers or os.cpu_count() or 1) * 4))
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                values = list(executor.map(compute_brightness_from_path, paths, chunksize=chunksize))
+
+            with self._lock:
+                for digest, value in zip(digests, values):
+                    if value is not None:
+                        known[digest] = value
+            self.save()
+
+        with self._lock:
+            return {digest: known[digest] for digest in photos if digest in known}
+
+
+# Instance globale
+_global_engine = None
+
+def get_brightness_engine() -> BrightnessEngine:
+    """Retourne l'instance globale du moteur de luminosité"""
+    global _global_engine
+    if _global_engine is None:
+        _global_engine = BrightnessEngine()
+    return _global_engine
@@ -2,153 +2,237 @@
 """
 Module de cache pour les résultats d'API OpenAI
 Cache les résultats par hash de l'input (texte ou URL photo) + type d'analyse
+
+Stockage: base SQLite en mode WAL (data/api_cache.db), une ligne par entrée.
+Chaque set() écrit une seule ligne au lieu de réécrire tout le fichier JSON.
+L'ancien fichier data/api_cache.json est importé automatiquement au premier accès.
 """
 
 import json
 import os
 import hashlib
+import sqlite3
+import threading
 from typing import Dict, Optional, Any
 from datetime import datetime, timedelta
 
 class APICache:
     """Cache pour les résultats d'API OpenAI"""
-    
-    def __init__(self, cache_file='data/api_cache.json', ttl_days=30):
+
+    def __init__(self, cache_file='data/api_cache.db', ttl_days=30, legacy_json_file='data/api_cache.json'):
         """
         Args:
-            cache_file: Chemin vers le fichier de cache
+            cache_file: Chemin vers la base SQLite du cache
             ttl_days: Durée de vie du cache en jours (30 par défaut)
+            legacy_json_file: Ancien cache JSON à importer au premier accès (None pour désactiver)
         """
         self.cache_file = cache_file
         self.ttl_days = ttl_days
-        self.cache = self._load_cache()
-    
-    def _load_cache(self) -> Dict:
-        """Charge le cache depuis le fichier"""
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    cache = json.load(f)
-                    # Nettoyer les entrées expirées
-                    return self._clean_expired(cache)
-            except Exception as e:
-                print(f"⚠️ Erreur chargement cache: {e}")
-                return {}
-        return {}
-    
-    def _clean_expired(self, cache: Dict) -> Dict:
-        """Nettoie les entrées expirées du cache"""
-        cleaned = {}
-        cutoff_date = datetime.now() - timedelta(days=self.ttl_days)
-        
-        for key, value in cache.items():
-            cached_at_str = value.get('cached_at')
-            if cached_at_str:
-                try:
-                    cached_at = datetime.fromisoformat(cached_at_str)
-                    if cached_at > cutoff_date:
-                        cleaned[key] = value
-                except:
-                    # Si erreur parsing date, garder l'entrée
-                    cleaned[key] = value
-            else:
-                # Pas de date, garder l'entrée
-                cleaned[key] = value
-        
-        return cleaned
-    
-    def _save_cache(self):
-        """Sauvegarde le cache dans le fichier"""
+        self.legacy_json_file = legacy_json_file
+        self._conn = None
+        # Connexion partagée entre threads (analyses concurrentes)
+        self._lock = threading.RLock()
+
+    def _get_conn(self) -> sqlite3.Connection:
+        """Ouvre la base au premier accès (chargement paresseux)"""
+        if self._conn is not None:
+            return self._conn
+
+        with self._lock:
+            if self._conn is not None:
+                return self._conn
+
+            cache_dir = os.path.dirname(self.cache_file)
+            if cache_dir:
+                os.makedirs(cache_dir, exist_ok=True)
+
+            conn = sqlite3.connect(self.cache_file, check_same_thread=False, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS api_cache ('
+                ' key TEXT PRIMARY KEY,'
+                ' analysis_type TEXT,'
+                ' input_hash TEXT,'
+                ' cached_at TEXT,'
+                ' result TEXT)'
+            )
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_api_cache_type ON api_cache(analysis_type)')
+            self._conn = conn
+
+            self._import_legacy_json()
+            self._clean_expired()
+
+        return self._conn
+
+    def _import_legacy_json(self):
+        """Importe l'ancien cache JSON (une seule fois, si la base est vide)"""
+        if not self.legacy_json_file or not os.path.exists(self.legacy_json_file):
+            return
+
+        count = self._conn.execute('SELECT COUNT(*) FROM api_cache').fetchone()[0]
+        if count > 0:
+            return
+
         try:
-            os.makedirs(os.path.dirname(self.cache_file), exist_ok=True)
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache, f, indent=2, ensure_ascii=False)
+            with open(self.legacy_json_file, 'r', encoding='utf-8') as f:
+                legacy = json.load(f)
         except Exception as e:
-            print(f"⚠️ Erreur sauvegarde cache: {e}")
-    
+            print(f"⚠️ Erreur chargement ancien cache JSON: {e}")
+            return
+
+        rows = []
+        for key, value in legacy.items():
+            if not isinstance(value, dict):
+                continue
+            rows.append((
+                key,
+                value.get('analysis_type', 'unknown'),
+                value.get('input_hash'),
+                value.get('cached_at'),
+                json.dumps(value.get('result'), ensure_ascii=False)
+            ))
+
+        with self._conn:
+            self._conn.execute('BEGIN')
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO api_cache (key, analysis_type, input_hash, cached_at, result) '
+                'VALUES (?, ?, ?, ?, ?)',
+                rows
+            )
+        print(f"💾 {len(rows)} entrées importées depuis {self.legacy_json_file}")
+
+    def _cutoff(self) -> str:
+        return (datetime.now() - timedelta(days=self.ttl_days)).isoformat()
+
+    def _clean_expired(self):
+        """Nettoie les entrées expirées du cache"""
+        # Les entrées sans date sont conservées (comme avant)
+        self._conn.execute(
+            'DELETE FROM api_cache WHERE cached_at IS NOT NULL AND cached_at < ?',
+            (self._cutoff(),)
+        )
+
     def _generate_key(self, analysis_type: str, input_data: str) -> str:
         """
         Génère une clé de cache unique
-        
+
         Args:
             analysis_type: Type d'analyse (ex: 'exposition', 'baignoire', 'style', 'cuisine')
             input_data: Données d'entrée (texte ou URL photo)
-        
+
         Returns:
             Clé de cache (hash)
         """
         key_string = f"{analysis_type}:{input_data}"
         return hashlib.md5(key_string.encode('utf-8')).hexdigest()
-    
+
     def get(self, analysis_type: str, input_data: str) -> Optional[Dict]:
         """
         Récupère un résultat depuis le cache
-        
+
         Args:
             analysis_type: Type d'analyse
             input_data: Données d'entrée (texte ou URL photo)
-        
+
         Returns:
             Résultat en cache ou None
         """
         key = self._generate_key(analysis_type, input_data)
-        cached_result = self.cache.get(key)
-        
-        if cached_result:
-            # Vérifier si expiré
-            cached_at_str = cached_result.get('cached_at')
-            if cached_at_str:
-                try:
-                    cached_at = datetime.fromisoformat(cached_at_str)
-                    if cached_at < datetime.now() - timedelta(days=self.ttl_days):
-                        # Expiré, supprimer
-                        del self.cache[key]
-                        self._save_cache()
-                        return None
-                except:
-                    pass
-            
-            print(f"   💾 Cache hit: {analysis_type} (key: {key[:8]}...)")
-            return cached_result.get('result')
-        
-        return None
-    
+        conn = self._get_conn()
+
+        with self._lock:
+            row = conn.execute(
+                'SELECT cached_at, result FROM api_cache WHERE key = ?', (key,)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            cached_at_str, result_json = row
+            if cached_at_str and cached_at_str < self._cutoff():
+                # Expiré, supprimer (une seule ligne)
+                conn.execute('DELETE FROM api_cache WHERE key = ?', (key,))
+                return None
+
+        try:
+            result = json.loads(result_json)
+        except (TypeError, ValueError):
+            return None
+
+        print(f"   💾 Cache hit: {analysis_type} (key: {key[:8]}...)")
+        return result
+
     def set(self, analysis_type: str, input_data: str, result: Dict):
         """
         Stocke un résultat dans le cache
-        
+
         Args:
             analysis_type: Type d'analyse
             input_data: Données d'entrée (texte ou URL photo)
             result: Résultat à mettre en cache
         """
         key = self._generate_key(analysis_type, input_data)
-        self.cache[key] = {
-            'result': result,
-            'cached_at': datetime.now().isoformat(),
-            'analysis_type': analysis_type,
-            'input_hash': hashlib.md5(input_data.encode('utf-8')).hexdigest()[:8]
-        }
-        self._save_cache()
+        conn = self._get_conn()
+
+        try:
+            with self._lock:
+                conn.execute(
+                    'INSERT OR REPLACE INTO api_cache (key, analysis_type, input_hash, cached_at, result) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (
+                        key,
+                        analysis_type,
+                        hashlib.md5(input_data.encode('utf-8')).hexdigest()[:8],
+                        datetime.now().isoformat(),
+                        json.dumps(result, ensure_ascii=False)
+                    )
+                )
+        except Exception as e:
+            print(f"⚠️ Erreur sauvegarde cache: {e}")
+            return
+
         print(f"   💾 Cache miss: {analysis_type} (key: {key[:8]}...) - sauvegardé")
-    
+
+    def delete_by_type(self, analysis_type: str) -> int:
+        """
+        Supprime toutes les entrées d'un type d'analyse
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        conn = self._get_conn()
+        with self._lock:
+            cursor = conn.execute('DELETE FROM api_cache WHERE analysis_type = ?', (analysis_type,))
+        return cursor.rowcount
+
     def clear(self):
         """Vide le cache"""
-        self.cache = {}
-        self._save_cache()
+        conn = self._get_conn()
+        with self._lock:
+            conn.execute('DELETE FROM api_cache')
+            conn.execute('VACUUM')
         print("🗑️ Cache vidé")
-    
+
+    def close(self):
+        """Ferme la connexion SQLite"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
     def stats(self) -> Dict:
         """Retourne les statistiques du cache"""
-        total = len(self.cache)
-        by_type = {}
-        
-        for key, value in self.cache.items():
-            analysis_type = value.get('analysis_type', 'unknown')
-            by_type[analysis_type] = by_type.get(analysis_type, 0) + 1
-        
+        conn = self._get_conn()
+        with self._lock:
+            rows = conn.execute(
+                'SELECT COALESCE(analysis_type, \'unknown\'), COUNT(*) FROM api_cache GROUP BY 1'
+            ).fetchall()
+
+        by_type = {analysis_type: count for analysis_type, count in rows}
+
         return {
-            'total_entries': total,
+            'total_entries': sum(by_type.values()),
             'by_type': by_type,
             'cache_file': self.cache_file
         }
@@ -157,9 +241,8 @@ class APICache:
 _global_cache = None
 
 def get_cache() -> APICache:
-    """Retourne l'instance globale du cache"""
+    """Retourne l'instance globale du cache (la base n'est ouverte qu'au premier accès)"""
     global _global_cache
     if _global_cache is None:
         _global_cache = APICache()
     return _global_cache
-
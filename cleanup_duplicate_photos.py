@@ -2,11 +2,13 @@
 """
 Script pour nettoyer les photos en doublon/triplon
 Garde seulement les 4 photos les plus récentes par appartement
+(ancien dossier data/photos/ uniquement: le store data/photo_store/ est déjà dédupliqué par contenu)
 """
 
 import os
 import glob
 from pathlib import Path
+from photo_manifest import get_photo_manifest
 
 def cleanup_duplicate_photos():
     """Nettoie les photos en doublon dans data/photos/"""
@@ -55,6 +57,8 @@ def cleanup_duplicate_photos():
                 print(f"      ❌ Erreur suppression {file_to_delete.name}: {e}")
         
         total_kept += len(files_to_keep)
+        # Le rendu lit la liste des photos depuis le manifeste
+        get_photo_manifest().scan(apartment_id)
     
     print(f"\n✅ Nettoyage terminé !")
     print(f"   📸 Photos gardées: {total_kept}")
@@ -4,8 +4,8 @@ Format: "Metro · Quartier"
 """
 
 import re
-import json
-import os
+
+from location_index import get_location_index
 
 
 def get_quartier_name(apartment):
@@ -63,17 +63,6 @@ def get_quartier_name(apartment):
     return None
 
 
-def load_scoring_config():
-    """Charge la configuration de scoring"""
-    try:
-        config_path = os.path.join(os.path.dirname(__file__), '..', 'scoring_config.json')
-        with open(config_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"⚠️ Erreur chargement config pour métro: {e}")
-        return None
-
-
 def get_metro_tier(station_name, config=None):
     """
     Détermine le tier d'une station de métro selon scoring_config.json
@@ -81,61 +70,11 @@ def get_metro_tier(station_name, config=None):
     Returns:
         str: 'tier1', 'tier2', 'tier3', ou None si non trouvé
     """
-    if not config:
-        config = load_scoring_config()
-    if not config:
+    # Index compilé une seule fois par config (zone contenue ou contenante, ou mot commun)
+    index = get_location_index(config)
+    if not index:
         return None
-    
-    station_lower = station_name.lower().strip()
-    tier_config = config.get('axes', {}).get('localisation', {}).get('tiers', {})
-    
-    # Mapping explicite des stations de métro par tier pour meilleure précision
-    # Tier 1 stations
-    tier1_stations = [
-        'alexandre dumas', 'philippe auguste', 'belleville', 'ménilmontant', 'avron',
-        'place de la réunion'
-    ]
-    
-    # Tier 2 stations
-    tier2_stations = [
-        'goncourt', 'pyrénées', 'jourdain', 'rue des boulets', 'nation'
-    ]
-    
-    # Vérifier d'abord avec le mapping explicite
-    if station_lower in tier1_stations:
-        return 'tier1'
-    if station_lower in tier2_stations:
-        return 'tier2'
-    
-    # Ensuite vérifier avec les zones du config (qui peuvent contenir des descriptions plus générales)
-    # Vérifier tier1
-    tier1_zones = [z.lower() for z in tier_config.get('tier1', {}).get('zones', [])]
-    for zone in tier1_zones:
-        # Vérifier si la zone est contenue dans le nom de la station ou vice versa
-        # Utiliser un matching plus flexible (mots-clés)
-        zone_words = set(zone.split())
-        station_words = set(station_lower.split())
-        # Si au moins 2 mots correspondent, c'est probablement la bonne zone
-        if len(zone_words & station_words) >= 1 or zone in station_lower or station_lower in zone:
-            return 'tier1'
-    
-    # Vérifier tier2
-    tier2_zones = [z.lower() for z in tier_config.get('tier2', {}).get('zones', [])]
-    for zone in tier2_zones:
-        zone_words = set(zone.split())
-        station_words = set(station_lower.split())
-        if len(zone_words & station_words) >= 1 or zone in station_lower or station_lower in zone:
-            return 'tier2'
-    
-    # Vérifier tier3
-    tier3_zones = [z.lower() for z in tier_config.get('tier3', {}).get('zones', [])]
-    for zone in tier3_zones:
-        zone_words = set(zone.split())
-        station_words = set(station_lower.split())
-        if len(zone_words & station_words) >= 1 or zone in station_lower or station_lower in zone:
-            return 'tier3'
-    
-    return None
+    return index.station_tier(station_name)
 
 
 def get_all_metro_stations(apartment):
@@ -166,8 +105,9 @@ def get_all_metro_stations(apartment):
         'Botzaris', 'Buttes-Chaumont', 'Place des Fêtes', 'Rébeval',
         'Goncourt', 'République', 'Nation', 'Bastille', 'Gare de Lyon', 'Avron'
     ]
+    justification_lower = justification.lower()
     for station in known_metros:
-        if station.lower() in justification.lower() and station not in all_stations:
+        if station.lower() in justification_lower and station not in all_stations:
             all_stations.append(station)
     
     # Priorité 2: map_info.metros (toutes les stations)
@@ -235,9 +175,6 @@ def get_metro_name(apartment):
     if not all_stations:
         return None
     
-    # Charger la config pour classifier les stations
-    config = load_scoring_config()
-    
     # Classer les stations par tier (tier1 > tier2 > tier3 > None)
     stations_by_tier = {
         'tier1': [],
@@ -247,7 +184,7 @@ def get_metro_name(apartment):
     }
     
     for station in all_stations:
-        tier = get_metro_tier(station, config)
+        tier = get_metro_tier(station)
         if tier:
             stations_by_tier[tier].append(station)
         else:
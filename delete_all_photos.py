@@ -5,6 +5,7 @@ Script pour supprimer toutes les photos existantes dans data/photos et data/phot
 
 import os
 import shutil
+from photo_manifest import PHOTO_MANIFEST_FILE
 
 def delete_all_photos():
     """Supprime toutes les photos existantes"""
@@ -46,6 +47,11 @@ def delete_all_photos():
         else:
             print(f"\n📁 {photo_dir} n'existe pas (déjà vide)")
     
+    # Le manifeste des photos locales décrit les dossiers supprimés
+    if os.path.exists(PHOTO_MANIFEST_FILE):
+        os.remove(PHOTO_MANIFEST_FILE)
+        print(f"\n🗑️  Manifeste {PHOTO_MANIFEST_FILE} supprimé")
+    
     print(f"\n🎉 SUPPRESSION TERMINÉE")
     print(f"   📁 Dossiers supprimés: {len(deleted_dirs)}")
     print(f"   📸 Fichiers images supprimés: {deleted_count}")
@@ -10,6 +10,7 @@ import requests
 from datetime import datetime
 from playwright.async_api import async_playwright
 from dotenv import load_dotenv
+from photo_manifest import get_photo_manifest
 
 load_dotenv()
 
@@ -385,11 +386,14 @@ class ApartmentPhotoDownloader:
                     print(f"      ❌ Erreur téléchargement photo {i+1}: {e}")
                     continue
             
+            # Photos remplacées: le rendu lit la liste depuis le manifeste
+            get_photo_manifest().scan(apartment_id)
             print(f"   ✅ {len(downloaded_photos)} photos téléchargées avec succès")
             return downloaded_photos
                 
         except Exception as e:
             print(f"   ❌ Erreur téléchargement: {e}")
+            get_photo_manifest().scan(apartment_id)
             return []
     
     async def process_apartment(self, apartment_url: str):
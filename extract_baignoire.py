@@ -24,6 +24,8 @@ class BaignoireExtractor:
         self.text_ai_analyzer = TextAIAnalyzer()
         self.use_ai_analysis = True  # Activer l'analyse IA pour éviter faux positifs
         self.cache = get_cache()  # Cache partagé (photo_analyzer a déjà son propre cache)
+        # Résultats de repli (timeout ou erreur): à ne pas figer dans un cache de rendu
+        self.degraded_results = 0
         
         # Mots-clés baignoire
         self.baignoire_keywords = [
@@ -216,13 +218,14 @@ class BaignoireExtractor:
             import requests
             import base64
             
-            response = requests.get(photo_url, timeout=5)
-            if response.status_code != 200:
-                print(f"   ❌ Erreur téléchargement: {response.status_code}")
+            # Téléchargement partagé (session persistante + revalidation conditionnelle)
+            image_content = self.photo_analyzer.photo_fetcher.fetch_bytes(photo_url, timeout=5)
+            if not image_content:
+                print(f"   ❌ Erreur téléchargement: {photo_url[:50]}...")
                 return None
             
             # Encoder en base64
-            image_base64 = base64.b64encode(response.content).decode('utf-8')
+            image_base64 = base64.b64encode(image_content).decode('utf-8')
             
             # Appel à OpenAI Vision
             import os
@@ -533,6 +536,7 @@ Réponds au format JSON STRICT:
                 return result
         except FutureTimeoutError:
             print(f"   ⏱️ Timeout global (30s) pour l'extraction de baignoire")
+            self.degraded_results += 1
             # Retourner résultat basé uniquement sur texte (rapide)
             text_result = self.extract_baignoire_textuelle(description, caracteristiques)
             return {
@@ -542,13 +546,15 @@ Réponds au format JSON STRICT:
                 'tier': text_result.get('tier', 'tier3'),
                 'justification': f"{text_result.get('justification', '')} (analyse photos timeout)",
                 'photos_analyzed': 0,
-                'confidence': text_result.get('confidence', 0)
+                'confidence': text_result.get('confidence', 0),
+                'degraded': True
             }
         except Exception as e:
             print(f"   ❌ Erreur extraction baignoire: {e}")
+            self.degraded_results += 1
             # Fallback sur texte uniquement
             text_result = self.extract_baignoire_textuelle(description, caracteristiques)
-            return text_result
+            return {**text_result, 'degraded': True}
 
 
 def test_baignoire_extraction():
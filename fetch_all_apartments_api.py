@@ -180,7 +180,8 @@ async def fetch_all_apartments_with_photos():
     
     alert_url = "https://www.jinka.fr/asrenter/alert/dashboard/26c2ec3064303aa68ffa43f7c6518733"
     
-    scraper = JinkaAPIScraper()
+    # Mode incrémental: seules les annonces nouvelles ou modifiées sont re-téléchargées
+    scraper = JinkaAPIScraper(incremental=True)
     photo_manager = PhotoManager()
     
     try:
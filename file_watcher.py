@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""
+Surveillance de fichiers partagée (watchdog) avec debounce coalescent
+
+Les événements du système de fichiers (inotify/FSEvents via watchdog) sont
+regroupés: le callback reçoit la liste des fichiers modifiés une fois que
+plus aucun changement n'est arrivé pendant debounce_seconds. Aucun changement
+n'est perdu (ceux survenus pendant un callback partent au lot suivant) et
+le thread de dispatch dort tant qu'il ne se passe rien.
+
+Un dossier encore absent (ex: data/scores/ avant le premier scoring) est
+surveillé via son plus proche ancêtre existant, puis directement dès sa création.
+
+Sans watchdog installé, repli sur un polling des mtimes.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Iterable, List
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+    HAS_WATCHDOG = True
+except ImportError:
+    HAS_WATCHDOG = False
+    FileSystemEventHandler = object
+
+
+class _ChangeHandler(FileSystemEventHandler):
+    """Transmet au FileWatcher les chemins créés, modifiés ou renommés"""
+
+    def __init__(self, watcher: 'FileWatcher'):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        if event.event_type not in ('created', 'modified', 'moved'):
+            return
+        if event.is_directory:
+            if event.event_type != 'modified':
+                self.watcher.on_directory_created()
+            return
+        # Écriture atomique (fichier temporaire puis rename): le fichier surveillé est la destination
+        path = getattr(event, 'dest_path', '') if event.event_type == 'moved' else event.src_path
+        self.watcher.on_change(path)
+
+
+class FileWatcher:
+    """Surveille une liste de fichiers et appelle callback(fichiers_modifiés) après debounce"""
+
+    def __init__(self, paths: Iterable[str], callback: Callable[[List[str]], None],
+                 debounce_seconds: float = 1.0, poll_interval: float = 1.0):
+        """
+        Args:
+            paths: Fichiers à surveiller (ils peuvent ne pas encore exister)
+            callback: Appelé avec les chemins modifiés, tels que donnés dans paths
+            debounce_seconds: Délai sans nouvel événement avant d'appeler le callback
+            poll_interval: Intervalle du polling de repli (sans watchdog)
+        """
+        self.paths = list(dict.fromkeys(paths))
+        self.callback = callback
+        self.debounce_seconds = debounce_seconds
+        self.poll_interval = poll_interval
+
+        # Chemin absolu → chemin tel que fourni par l'appelant
+        self._watched: Dict[str, str] = {os.path.abspath(path): path for path in self.paths}
+        self._pending: Dict[str, None] = {}
+        self._last_event = 0.0
+        self._condition = threading.Condition()
+        self._running = False
+        self._observer = None
+        # Dossiers surveillés par watchdog, et dossiers des fichiers encore absents
+        self._scheduled: set = set()
+        self._missing_directories: set = set()
+        self._directories_lock = threading.RLock()
+        self._threads: List[threading.Thread] = []
+
+    def on_change(self, path: str):
+        """Enregistre un changement (appelé par watchdog ou par le polling)"""
+        original = self._watched.get(os.path.abspath(path))
+        if original is None:
+            return
+        with self._condition:
+            self._pending[original] = None
+            self._last_event = time.monotonic()
+            self._condition.notify_all()
+
+    def start(self):
+        """Démarre la surveillance (threads en arrière-plan)"""
+        if self._running:
+            return
+        self._running = True
+
+        if HAS_WATCHDOG:
+            self._observer = Observer()
+            with self._directories_lock:
+                self._missing_directories = {os.path.dirname(path) for path in self._watched}
+                self._watch_directories()
+            self._observer.start()
+        else:
+            self._threads.append(threading.Thread(target=self._poll_loop, daemon=True))
+
+        self._threads.append(threading.Thread(target=self._dispatch_loop, daemon=True))
+        for thread in self._threads:
+            thread.start()
+
+    def on_directory_created(self):
+        """Un dossier est apparu: surveiller les dossiers attendus qui existent maintenant"""
+        with self._directories_lock:
+            if self._observer is None or not self._missing_directories:
+                return
+            for directory in self._watch_directories():
+                # Fichiers créés avant que le dossier ne soit surveillé
+                for path in self._watched:
+                    if os.path.dirname(path) == directory and os.path.exists(path):
+                        self.on_change(path)
+
+    def _watch_directories(self) -> List[str]:
+        """
+        Surveille chaque dossier attendu, ou son plus proche ancêtre existant s'il est absent
+
+        Returns:
+            Dossiers attendus surveillés directement lors de cet appel
+        """
+        ready = []
+        for directory in sorted(self._missing_directories):
+            target = directory
+            while not os.path.isdir(target) and os.path.dirname(target) != target:
+                target = os.path.dirname(target)
+            if target == directory:
+                ready.append(directory)
+            if target not in self._scheduled:
+                if target != directory:
+                    print(f"⏳ Dossier absent, surveillé via {target}: {directory}")
+                self._observer.schedule(_ChangeHandler(self), target, recursive=False)
+                self._scheduled.add(target)
+        self._missing_directories.difference_update(ready)
+        return ready
+
+    def stop(self, timeout: float = 2):
+        """Arrête la surveillance"""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=timeout)
+            with self._directories_lock:
+                self._observer = None
+                self._scheduled = set()
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=timeout)
+        self._threads = []
+
+    def _dispatch_loop(self):
+        """Appelle le callback une fois les événements retombés (un lot à la fois)"""
+        while True:
+            with self._condition:
+                while self._running and not self._pending:
+                    self._condition.wait()
+                # Attendre debounce_seconds sans nouvel événement
+                while self._running:
+                    remaining = self._last_event + self.debounce_seconds - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                if not self._running:
+                    return
+                changed_files = list(self._pending)
+                self._pending.clear()
+
+            try:
+                self.callback(changed_files)
+            except Exception as e:
+                print(f"⚠️  Erreur dans le callback de surveillance: {e}")
+
+    def _poll_loop(self):
+        """Repli sans watchdog: comparaison des mtimes"""
+        mtimes = {path: self._mtime(path) for path in self._watched}
+        while True:
+            with self._condition:
+                if not self._running:
+                    return
+                self._condition.wait(self.poll_interval)
+                if not self._running:
+                    return
+            for path, previous in mtimes.items():
+                current = self._mtime(path)
+                if current != previous:
+                    mtimes[path] = current
+                    if current is not None:
+                        self.on_change(path)
+
+    @staticmethod
+    def _mtime(path: str):
+        try:
+            return os.path.getmtime(path)
+        except OSError:
+            return None
@@ -3,28 +3,67 @@ import ApartmentCard from './components/ApartmentCard'
 import { calculateMegaScore } from './utils/scoreUtils'
 import './App.css'
 
+// Nombre de cartes chargées par page (pagination côté serveur)
+const PAGE_SIZE = 24
+
+// Page d'appartements triée par mega score côté serveur (même formule que calculateMegaScore)
+async function fetchApartmentsPage(cursor = null) {
+  const params = new URLSearchParams({ sort: 'mega_score', order: 'desc', limit: String(PAGE_SIZE) })
+  if (cursor) {
+    params.set('cursor', cursor)
+  }
+  const response = await fetch(`/api/apartments?${params}`)
+  if (!response.ok) {
+    throw new Error(`HTTP error! status: ${response.status}`)
+  }
+  return response.json()
+}
+
+// Insérer un nouvel appartement à sa place dans la liste déjà triée par le serveur
+// (les cartes affichées ne sont pas réordonnées)
+function insertByMegaScore(apartments, apartment) {
+  const score = calculateMegaScore(apartment)
+  const index = apartments.findIndex(other => calculateMegaScore(other) < score)
+  return index === -1
+    ? [...apartments, apartment]
+    : [...apartments.slice(0, index), apartment, ...apartments.slice(index)]
+}
+
 function App() {
   const [apartments, setApartments] = useState([])
+  const [nextCursor, setNextCursor] = useState(null)
+  const [total, setTotal] = useState(0)
   const [loading, setLoading] = useState(true)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [error, setError] = useState(null)
 
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) {
+      return
+    }
+    try {
+      setLoadingMore(true)
+      const page = await fetchApartmentsPage(nextCursor)
+      setApartments(previous => [...previous, ...page.items])
+      setNextCursor(page.next_cursor)
+      setTotal(page.total)
+    } catch (err) {
+      console.error('Erreur lors du chargement des appartements:', err)
+      setError(err.message)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   useEffect(() => {
-    // Charger les données initiales
+    // Charger la première page (rechargée à chaque mise à jour des données)
     const loadApartments = async () => {
       try {
         setLoading(true)
-        const response = await fetch('/api/apartments')
-        if (!response.ok) {
-          throw new Error(`HTTP error! status: ${response.status}`)
-        }
-        const data = await response.json()
-        // Trier par mega score décroissant (du plus grand au plus petit)
-        const sorted = data.sort((a, b) => {
-          const scoreA = calculateMegaScore(a)
-          const scoreB = calculateMegaScore(b)
-          return scoreB - scoreA // Décroissant : plus grand score en premier
-        })
-        setApartments(sorted)
+        const page = await fetchApartmentsPage()
+        setApartments(page.items)
+        setNextCursor(page.next_cursor)
+        setTotal(page.total)
         setError(null)
       } catch (err) {
         console.error('Erreur lors du chargement des appartements:', err)
@@ -36,6 +75,25 @@ function App() {
 
     loadApartments()
 
+    // Dernier numéro de séquence reçu (reprise des deltas après reconnexion)
+    let lastSeq = null
+
+    // Appliquer un delta: seules les fiches modifiées transitent par le WebSocket
+    const applyDelta = (delta) => {
+      const removedIds = new Set(delta.removed.map(String))
+      const updatedById = new Map(delta.updated.map(apartment => [String(apartment.id), apartment]))
+      setApartments(previous => {
+        const loadedIds = new Set(previous.map(apartment => String(apartment.id)))
+        const kept = previous
+          .filter(apartment => !removedIds.has(String(apartment.id)))
+          .map(apartment => updatedById.get(String(apartment.id)) || apartment)
+        // Les nouveaux appartements sont affichés immédiatement, même hors de la page chargée
+        const added = delta.added.filter(apartment => !loadedIds.has(String(apartment.id)))
+        return added.reduce(insertByMegaScore, kept)
+      })
+      setTotal(previous => previous + delta.added.length - delta.removed.length)
+    }
+
     // WebSocket pour mises à jour en temps réel (optionnel - fonctionne même si backend non démarré)
     let ws = null
     let reconnectTimeout = null
@@ -63,6 +121,10 @@ function App() {
         
         ws.onopen = () => {
           isConnecting = false
+          // Reprendre les deltas manqués pendant la déconnexion
+          if (lastSeq !== null) {
+            ws.send(JSON.stringify({ type: 'resume', last_seq: lastSeq }))
+          }
           // Réinitialiser le délai de reconnexion en cas de succès
           if (reconnectTimeout) {
             clearTimeout(reconnectTimeout)
@@ -73,8 +135,24 @@ function App() {
         ws.onmessage = (event) => {
           try {
             const data = JSON.parse(event.data)
-            if (data.type === 'apartments_updated') {
+            if (data.type === 'connected') {
+              if (lastSeq === null) {
+                lastSeq = data.seq
+              }
+            } else if (data.type === 'apartments_delta') {
+              if (lastSeq !== null && data.seq <= lastSeq) {
+                return // Delta déjà appliqué
+              }
+              if (lastSeq !== null && data.seq !== lastSeq + 1) {
+                // Delta manquant: recharger les données
+                loadApartments()
+              } else {
+                applyDelta(data)
+              }
+              lastSeq = data.seq
+            } else if (data.type === 'apartments_updated' || data.type === 'resync_required') {
               // Recharger les données
+              lastSeq = data.seq
               loadApartments()
             }
           } catch (err) {
@@ -160,6 +238,13 @@ function App() {
           <ApartmentCard key={apartment.id} apartment={apartment} />
         ))}
       </div>
+      {nextCursor && (
+        <div style={{ textAlign: 'center', padding: '30px' }}>
+          <button onClick={loadMore} disabled={loadingMore}>
+            {loadingMore ? 'Chargement...' : `Afficher plus (${apartments.length}/${total})`}
+          </button>
+        </div>
+      )}
     </div>
   )
 }
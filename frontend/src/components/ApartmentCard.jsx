@@ -281,9 +281,12 @@ function ApartmentCard({ apartment }) {
     const apartmentId = apartment.id
     const photoUrls = []
     
-    // Chercher dans photos_v2
-    // Note: En production, on pourrait avoir un endpoint API pour les photos
-    // Pour l'instant, on utilise les URLs depuis les données scrapées
+    // Photos locales servies par le backend, avec leurs déclinaisons (srcset WebP/JPEG)
+    if (apartment.local_photos && apartment.local_photos.length > 0) {
+      return apartment.local_photos.slice(0, 10)
+    }
+    
+    // Sinon, URLs depuis les données scrapées
     if (apartment.photos && Array.isArray(apartment.photos)) {
       apartment.photos.forEach(photo => {
         const url = typeof photo === 'string' ? photo : photo.url
@@ -2,6 +2,40 @@ import { useState } from 'react'
 import ScoreBadge from './ScoreBadge'
 import './Carousel.css'
 
+// Largeur affichée selon la grille (3, 2 puis 1 colonne), comme le scorecard HTML
+const CARD_IMAGE_SIZES = '(max-width: 600px) 100vw, (max-width: 1000px) 50vw, 33vw'
+
+// Une photo est une URL, ou {src, srcset, webp_srcset} pour les photos locales déclinées
+const photoSrc = (photo) => (typeof photo === 'string' ? photo : photo.src)
+
+function PhotoImage({ photo, index }) {
+  const alt = `Photo ${index + 1}`
+  const onError = (e) => {
+    console.error('Erreur chargement image:', photoSrc(photo))
+    e.target.closest('.carousel-slide').style.display = 'none'
+  }
+  // Les slides suivantes ne sont chargées qu'à l'approche
+  const loading = index > 0 ? 'lazy' : undefined
+  
+  if (typeof photo === 'string' || !photo.srcset) {
+    return <img src={photoSrc(photo)} alt={alt} loading={loading} onError={onError} />
+  }
+  return (
+    <picture>
+      <source type="image/webp" srcSet={photo.webp_srcset} sizes={CARD_IMAGE_SIZES} />
+      <img
+        src={photo.src}
+        srcSet={photo.srcset}
+        sizes={CARD_IMAGE_SIZES}
+        alt={alt}
+        loading={loading}
+        decoding="async"
+        onError={onError}
+      />
+    </picture>
+  )
+}
+
 function Carousel({ photos, carouselId, score, maxScore = 90 }) {
   const [currentIndex, setCurrentIndex] = useState(0)
   
@@ -20,7 +54,7 @@ function Carousel({ photos, carouselId, score, maxScore = 90 }) {
         {score !== undefined && <ScoreBadge score={score} maxScore={maxScore} />}
         <div 
           className="apartment-image" 
-          style={{ backgroundImage: `url(${photos[0]})` }}
+          style={{ backgroundImage: `url(${photoSrc(photos[0])})` }}
         />
       </div>
     )
@@ -54,14 +88,7 @@ function Carousel({ photos, carouselId, score, maxScore = 90 }) {
         <div className="carousel-track" style={{ transform: `translateX(-${currentIndex * 100}%)` }}>
           {photos.map((photo, index) => (
             <div key={index} className="carousel-slide">
-              <img 
-                src={photo} 
-                alt={`Photo ${index + 1}`}
-                onError={(e) => {
-                  console.error('Erreur chargement image:', photo)
-                  e.target.parentElement.style.display = 'none'
-                }}
-              />
+              <PhotoImage photo={photo} index={index} />
             </div>
           ))}
         </div>
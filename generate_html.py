@@ -15,6 +15,7 @@ from criteria import (
     format_cuisine,
     format_baignoire
 )
+from photo_manifest import get_photo_manifest
 # BaignoireExtractor n'est plus importé ici pour éviter les blocages
 # L'extraction est faite dans criteria/baignoire.py avec fallback texte rapide
 
@@ -34,29 +35,10 @@ def get_all_apartment_photos(apartment):
     photos = []
     apartment_id = apartment.get('id')
     
-    # PRIORITÉ 1: photos depuis dossier local (téléchargées avec le nouveau système)
+    # PRIORITÉ 0/1: photos locales (store, puis dossiers de photos) déjà ordonnées
+    # par le manifeste que tiennent à jour les téléchargements: aucun parcours de dossier
     if apartment_id:
-        photos_dir = f"data/photos/{apartment_id}"
-        if os.path.exists(photos_dir):
-            photo_files = []
-            for filename in os.listdir(photos_dir):
-                if filename.endswith(('.jpg', '.jpeg', '.png')):
-                    # Extraire le numéro pour trier (photo1.jpg -> 1, photo2.jpg -> 2, etc.)
-                    try:
-                        if filename.startswith('photo') and filename[5:].replace('.jpg', '').replace('.jpeg', '').replace('.png', '').isdigit():
-                            photo_num = int(filename[5:].replace('.jpg', '').replace('.jpeg', '').replace('.png', ''))
-                            photo_files.append((filename, photo_num))
-                        else:
-                            # Sinon utiliser un grand numéro pour mettre à la fin
-                            photo_files.append((filename, 9999))
-                    except:
-                        photo_files.append((filename, 9999))
-            
-            # Trier par numéro (photo1, photo2, etc.)
-            photo_files.sort(key=lambda x: x[1])
-            for photo_file, _ in photo_files:
-                # Utiliser un chemin relatif depuis output/ vers data/photos/
-                photos.append(f"../data/photos/{apartment_id}/{photo_file}")
+        photos = [f"../{path}" for path in get_photo_manifest().photos_for(apartment_id)]
     
     # PRIORITÉ 2: fallback vers photos depuis données scrapées (si pas de photos locales)
     if not photos:
@@ -571,6 +553,9 @@ def generate_html(apartments):
         'baignoire': {'name': 'BAIGNOIRE', 'max': 10, 'formatter': format_baignoire}
     }
     
+    # Photos téléchargées depuis la dernière génération (un seul stat du manifeste)
+    get_photo_manifest().refresh()
+    
     for i, apartment in enumerate(sorted_apartments, 1):
         score_total = apartment.get('score_total', 0)
         apartment_info = format_apartment_info(apartment)
@@ -581,18 +566,9 @@ def generate_html(apartments):
         carousel_id = f"carousel-{i}"
         
         # Générer HTML des photos
-        # Filtrer les photos locales qui n'existent pas
-        valid_photos = []
-        for photo_url in all_photos:
-            if photo_url.startswith('../data/photos/'):
-                # Vérifier si le fichier existe
-                relative_path = photo_url.replace('../', '')
-                if os.path.exists(relative_path):
-                    valid_photos.append(photo_url)
-                # Sinon, ne pas l'inclure (fichier n'existe pas)
-            else:
-                # URL distante, toujours inclure
-                valid_photos.append(photo_url)
+        # Les photos locales viennent du manifeste (tenu à jour à chaque téléchargement):
+        # pas de vérification d'existence fichier par fichier
+        valid_photos = all_photos
         
         if len(valid_photos) > 1:
             slides_html = ""
@@ -3,11 +3,21 @@
 Génération du rapport HTML avec le design de scorecard
 """
 
+import hashlib
 import json
 import os
 import re
 from datetime import datetime
+from criteria.localisation import get_metro_name
 from extract_baignoire import BaignoireExtractor
+from photo_derivatives import CARD_IMAGE_SIZES, responsive_image
+from photo_manifest import EXCLUDED_PATTERNS, get_photo_manifest
+
+# Version du gabarit des cartes (à incrémenter si le rendu change sans changement des sources ci-dessous)
+CARD_TEMPLATE_VERSION = 1
+# Sources dont le contenu entre dans la clé des cartes en cache
+CARD_TEMPLATE_SOURCES = ('generate_scorecard_html.py', 'extract_baignoire.py', 'photo_derivatives.py', 'scoring_config.json')
+CARD_CACHE_FILE = 'data/cache/scorecard_cards.json'
 
 def load_scored_apartments():
     """Charge les appartements scorés et fusionne avec les données scrapées"""
@@ -227,70 +237,6 @@ def format_prix_k(prix_str):
     except:
         return None
 
-def get_metro_name(apartment):
-    """Extrait le nom du métro depuis différentes sources"""
-    # Priorité 1: scores_detaille.localisation.justification (extrait par l'IA de scoring)
-    scores_detaille = apartment.get('scores_detaille', {})
-    localisation_score = scores_detaille.get('localisation', {})
-    justification = localisation_score.get('justification', '')
-    
-    # Chercher "métro XXX" dans la justification
-    # Patterns: "métro Ménilmontant", "métro Rue des Boulets", etc.
-    metro_match = re.search(r'métro\s+([A-Za-z\s\-éàèùîêôûçâë]+?)(?:[,\.]|\s+(?:zone|ligne|arrondissement)|\s*$)', justification, re.IGNORECASE)
-    if metro_match:
-        metro = metro_match.group(1).strip()
-        # Vérifier que ce n'est pas un faux positif
-        if metro and len(metro) > 2 and len(metro) < 50 and metro not in ['non trouvé', 'proximité', 'immédiate']:
-            return metro
-    
-    # Chercher des noms de métros connus sans "métro" dans la justification
-    # Stations de métro parisiennes communes
-    known_metros = [
-        'Philippe Auguste', 'Charonne', 'Pyrénées', 'Jourdain', 'Pelleport', 'Gambetta',
-        'Ménilmontant', 'Alexandre Dumas', 'Rue des Boulets', 'Belleville', 'Couronnes',
-        'Botzaris', 'Buttes-Chaumont', 'Place des Fêtes', 'Rébeval', 'Pyrénées',
-        'Goncourt', 'République', 'Nation', 'Bastille', 'Gare de Lyon'
-    ]
-    for station in known_metros:
-        if station in justification:
-            return station
-    
-    # Priorité 2: map_info.metros (première station)
-    map_info = apartment.get('map_info', {})
-    metros = map_info.get('metros', [])
-    if metros and len(metros) > 0:
-        metro = metros[0].strip()
-        # Nettoyer (enlever "métro " si présent)
-        metro = re.sub(r'^métro\s+', '', metro, flags=re.IGNORECASE).strip()
-        # Si trop long, extraire juste le nom de la station (avant le premier "-" ou ",")
-        if len(metro) > 50:  # Si description longue
-            metro = metro.split('-')[0].split(',')[0].strip()
-        if metro and len(metro) > 2 and metro != "m" and len(metro) < 50:
-            return metro
-    
-    # Priorité 3: transports (première station valide)
-    transports = apartment.get('transports', [])
-    for transport in transports:
-        # Chercher une station de métro valide (nom + numéro de ligne potentiel)
-        if re.search(r'^[A-Za-z\s\-éàèùîêôûçâë]+$', transport.strip()) and len(transport.strip()) > 2:
-            # Vérifier que ce n'est pas un faux positif
-            excluded = ['Paris', 'Entre', '€', 'm²', 'pièces', 'chambres']
-            if not any(excl in transport for excl in excluded):
-                return transport.strip()
-    
-    # Priorité 4: chercher dans la description (supporte "métro" et "métros")
-    description = apartment.get('description', '')
-    metro_match = re.search(r'métro\w*\s+([A-Za-z\s\-éàèùîêôûçâë]+?)(?:,|\s+\(ligne|\s+[Ll]|\.|\s+et|\-)', description, re.IGNORECASE)
-    if metro_match:
-        metro = metro_match.group(1).strip()
-        # Si trop long, extraire juste le nom de la station
-        if len(metro) > 50:
-            metro = metro.split('-')[0].split(',')[0].strip()
-        if metro and len(metro) > 2 and len(metro) < 50:
-            return metro
-    
-    return None
-
 def get_style_name(apartment):
     """Extrait le nom du style depuis différentes sources"""
     # PRIORITÉ 1: Utiliser scores_detaille.style.tier pour déterminer Ancien/Neuf
@@ -986,69 +932,11 @@ def get_all_apartment_photos(apartment):
     apartment_id = apartment.get('id', 'unknown')
     
     # Liste des URLs à exclure (logos, placeholders)
-    excluded_patterns = [
-        'AppStore.png',
-        'GoogleStore.png',
-        'Logo-Jinka',
-        'logo-',
-        'source_logos',
-        'no-picture.png',
-        'placeholder',
-        'icon',
-        'logo'
-    ]
+    excluded_patterns = EXCLUDED_PATTERNS
     
-    photo_urls = []
-    
-    # Chercher d'abord dans photos_v2 (nouveau système), puis dans photos (ancien)
-    photos_dir_v2 = f"data/photos_v2/{apartment_id}"
-    photos_dir = f"data/photos/{apartment_id}"
-    
-    # Priorité 1: photos_v2 (nouveau système amélioré)
-    if os.path.exists(photos_dir_v2):
-        photo_files = []
-        for filename in os.listdir(photos_dir_v2):
-            if filename.endswith(('.jpg', '.jpeg', '.png')) and filename.startswith('photo_'):
-                # Vérifier que ce n'est pas un logo
-                is_excluded = any(pattern.lower() in filename.lower() for pattern in excluded_patterns)
-                if not is_excluded:
-                    file_path = os.path.join(photos_dir_v2, filename)
-                    file_mtime = os.path.getmtime(file_path)
-                    photo_files.append((filename, file_mtime))
-        
-        if photo_files:
-            # Trier par date de modification décroissante (plus récent en premier)
-            photo_files.sort(key=lambda x: x[1], reverse=True)
-            for filename, _ in photo_files:
-                photo_urls.append(f"../data/photos_v2/{apartment_id}/{filename}")
-    
-    # Priorité 2: photos (nouveau système avec photo1.jpg, photo2.jpg, etc.)
-    if not photo_urls and os.path.exists(photos_dir):
-        photo_files = []
-        for filename in os.listdir(photos_dir):
-            if filename.endswith(('.jpg', '.jpeg', '.png')):
-                # Vérifier que ce n'est pas un logo
-                is_excluded = any(pattern.lower() in filename.lower() for pattern in excluded_patterns)
-                if not is_excluded:
-                    file_path = os.path.join(photos_dir, filename)
-                    file_mtime = os.path.getmtime(file_path)
-                    # Extraire le numéro pour trier (photo1.jpg -> 1, photo2.jpg -> 2, etc.)
-                    try:
-                        # Si le nom commence par "photo" suivi d'un chiffre
-                        if filename.startswith('photo') and filename[5:].replace('.jpg', '').replace('.jpeg', '').replace('.png', '').isdigit():
-                            photo_num = int(filename[5:].replace('.jpg', '').replace('.jpeg', '').replace('.png', ''))
-                            photo_files.append((filename, photo_num, file_mtime))
-                        else:
-                            # Sinon utiliser la date de modification
-                            photo_files.append((filename, 9999, file_mtime))
-                    except:
-                        photo_files.append((filename, 9999, file_mtime))
-        
-        if photo_files:
-            # Trier d'abord par numéro (photo1, photo2, etc.), puis par date
-            photo_files.sort(key=lambda x: (x[1], x[2]))
-            for filename, _, _ in photo_files:
-                photo_urls.append(f"../data/photos/{apartment_id}/{filename}")
+    # Photos locales (store, puis photos_v2, puis photos) déjà ordonnées et filtrées
+    # par le manifeste que tiennent à jour les téléchargements: aucun parcours de dossier
+    photo_urls = [f"../{path}" for path in get_photo_manifest().photos_for(apartment_id)]
     
     # Fallback: chercher dans les photos de l'appartement depuis les URLs distantes
     if not photo_urls:
@@ -1099,16 +987,304 @@ def get_all_apartment_photos(apartment):
     
     return photo_urls if photo_urls else []
 
+def get_photo_sources(photo_url):
+    """Sources responsive d'une photo (déclinaisons enregistrées dans le manifeste, sans I/O)"""
+    if photo_url.startswith('../'):
+        path = photo_url[len('../'):]
+        return responsive_image(photo_url, path, get_photo_manifest().derivatives_for(path))
+    return responsive_image(photo_url, photo_url, None)
+
+def render_photo_img(photo_url, photo_idx):
+    """Balise image d'une slide: <picture> WebP + srcset JPEG si des déclinaisons existent"""
+    sources = get_photo_sources(photo_url)
+    # Les slides suivantes ne sont chargées qu'à l'approche (carousel hors écran)
+    loading = ' loading="lazy"' if photo_idx > 0 else ''
+    img_attrs = (
+        f'alt="Photo {photo_idx + 1}"{loading} decoding="async" style="width:100%;height:280px;object-fit:cover;" '
+        f'onerror="console.error(\'Erreur chargement image:\', this.currentSrc || this.src); this.closest(\'.carousel-slide\').style.display=\'none\'"'
+    )
+    if not sources['srcset']:
+        return f'<img src="{sources["src"]}" {img_attrs}>'
+    return (
+        f'<picture><source type="image/webp" srcset="{sources["webp_srcset"]}" sizes="{CARD_IMAGE_SIZES}">'
+        f'<img src="{sources["src"]}" srcset="{sources["srcset"]}" sizes="{CARD_IMAGE_SIZES}" {img_attrs}></picture>'
+    )
+
+def photo_set_candidates(sources):
+    """Candidats image-set() (1x/2x) pour une photo affichée en arrière-plan"""
+    webp = [candidate.rsplit(' ', 1)[0] for candidate in sources['webp_srcset'].split(', ')]
+    jpeg = [candidate.rsplit(' ', 1)[0] for candidate in sources['srcset'].split(', ')]
+    # Carte d'environ 400 px de large: 2e largeur en 1x, la plus grande en 2x
+    return ', '.join([
+        f"url('{webp[min(1, len(webp) - 1)]}') type('image/webp') 1x",
+        f"url('{webp[-1]}') type('image/webp') 2x",
+        f"url('{jpeg[min(1, len(jpeg) - 1)]}') type('image/jpeg') 1x",
+        f"url('{jpeg[-1]}') type('image/jpeg') 2x",
+    ])
+
 def get_apartment_photo(apartment):
     """Récupère la première photo d'appartement (pour compatibilité)"""
     photos = get_all_apartment_photos(apartment)
     return photos[0] if photos else None
 
-def generate_scorecard_html(apartments):
-    """Génère le HTML avec le design de scorecard EXACT"""
+def render_apartment_card(apartment, carousel_id, baignoire_extractor):
+    """Génère le HTML de la carte d'un appartement (photo(s), titre et critères)"""
+    apartment_info = format_apartment_info(apartment)
+    scores_detaille = apartment.get('scores_detaille', {})
+    
+    # Afficher les critères de scoring avec formatage structuré
+    criteria_mapping = {
+        'localisation': {'name': 'Localisation', 'max': 20, 'formatter': format_localisation_criterion},
+        'prix': {'name': 'Prix', 'max': 20, 'formatter': format_prix_criterion},
+        'style': {'name': 'Style', 'max': 20, 'formatter': format_style_criterion},
+        'ensoleillement': {'name': 'Exposition', 'max': 10, 'formatter': format_exposition_criterion},
+        'cuisine': {'name': 'Cuisine', 'max': 10, 'formatter': format_cuisine_criterion},
+        'baignoire': {'name': 'Baignoire', 'max': 10, 'formatter': format_baignoire_criterion}
+    }
+    
+    # Calculer le mega score comme la somme des scores affichés seulement
+    # Mettre en cache le résultat baignoire pour éviter de recalculer plusieurs fois
+    baignoire_data_cache = None
+    mega_score = 0
+    for key, info in criteria_mapping.items():
+        if key == 'baignoire':
+            # Pour baignoire, utiliser extract_baignoire (réutiliser l'instance unique et mettre en cache)
+            if baignoire_data_cache is None:
+                try:
+                    baignoire_data_cache = baignoire_extractor.extract_baignoire_ultimate(apartment)
+                except:
+                    baignoire_data_cache = {'score': 0}
+            mega_score += baignoire_data_cache.get('score', 0)
+        elif key in scores_detaille:
+            criterion = scores_detaille[key]
+            mega_score += criterion.get('score', 0)
+    
+    # Arrondir le mega score à 1 décimale si nécessaire
+    mega_score = round(mega_score, 1)
+    # Formater pour l'affichage (enlever .0 si entier, s'assurer que c'est toujours un nombre valide)
+    if mega_score == int(mega_score):
+        mega_score_display = int(mega_score)
+    else:
+        mega_score_display = mega_score
+    # S'assurer que le score est toujours un nombre valide (pas None, pas "00")
+    if mega_score_display is None or (isinstance(mega_score_display, str) and mega_score_display.strip() == ""):
+        mega_score_display = 0
+    # Convertir en string pour l'affichage (pour éviter les problèmes de formatage)
+    mega_score_display = str(mega_score_display)
+    # Correction: si le score affiche "00", le remplacer par "0"
+    if mega_score_display == "00":
+        mega_score_display = "0"
+    
+    # Récupérer toutes les photos de l'appartement
+    all_photos = get_all_apartment_photos(apartment)
+    
+    # Couleur du mega score badge (basée sur les 90 pts max des critères affichés)
+    score_badge_color = get_score_badge_color(mega_score, 90)
+    
+    # URL de l'appartement
+    apartment_url = apartment.get('url', '#')
+    
+    # Générer le HTML du carousel si plusieurs photos
+    if len(all_photos) > 1:
+        slides_html = ""
+        for photo_idx, photo_url in enumerate(all_photos):
+            slides_html += f'<div class="carousel-slide">{render_photo_img(photo_url, photo_idx)}</div>'
+        
+        dots_html = ""
+        # Générer un dot pour chaque photo (le JavaScript s'occupera de cacher ceux qui correspondent à des slides invalides)
+        for dot_idx in range(len(all_photos)):
+            dots_html += f'<div class="carousel-dot {"active" if dot_idx == 0 else ""}" data-slide-index="{dot_idx}" onclick="event.stopPropagation(); goToSlide(\'{carousel_id}\', {dot_idx})"></div>'
+        
+        photo_html = f"""
+                <div class="apartment-image-container">
+                    <div class="score-badge-top" style="background: {score_badge_color};">{mega_score_display}</div>
+                    <div class="carousel-container" data-carousel-id="{carousel_id}" data-total-slides="{len(all_photos)}">
+                        <button class="carousel-nav prev" onclick="event.stopPropagation(); prevSlide('{carousel_id}')">‹</button>
+                        <div class="carousel-track" id="{carousel_id}-track">
+                            {slides_html}
+                        </div>
+                        <button class="carousel-nav next" onclick="event.stopPropagation(); nextSlide('{carousel_id}')">›</button>
+                        <div class="carousel-dots">
+                            {dots_html}
+                        </div>
+                    </div>
+                </div>
+            """
+    elif len(all_photos) == 1:
+        # Une seule photo, pas de carousel
+        photo_url = all_photos[0]
+        photo_style = f"background-image: url('{photo_url}');"
+        sources = get_photo_sources(photo_url)
+        if sources['webp_srcset']:
+            # Déclinaisons: image-set() choisit WebP/JPEG selon la densité d'écran (ignoré par les anciens navigateurs)
+            photo_style += f" background-image: image-set({photo_set_candidates(sources)});"
+        photo_html = f'<div class="apartment-image-container"><div class="score-badge-top" style="background: {score_badge_color};">{mega_score_display}</div><div class="apartment-image" style="{photo_style}"></div></div>'
+    else:
+        # Aucune photo
+        photo_html = f'<div class="apartment-image-container"><div class="score-badge-top" style="background: {score_badge_color};">{mega_score_display}</div><div class="apartment-image-placeholder"></div></div>'
     
-    # Créer une seule instance de BaignoireExtractor pour tous les appartements (évite réinitialisations lourdes)
-    baignoire_extractor = BaignoireExtractor()
+    card_html = f"""
+            <div class="scorecard" onclick="window.open('{apartment_url}', '_blank')">
+                {photo_html}
+                <div class="apartment-info">
+                    <div class="apartment-title">{apartment_info['title']}</div>
+                    <div class="apartment-subtitle">{apartment_info['subtitle']}</div>
+"""
+    
+    for key, info in criteria_mapping.items():
+        # Pour baignoire, ne pas vérifier scores_detaille car il n'y est peut-être pas
+        if key == 'baignoire' or key in scores_detaille:
+            # Obtenir le score et le tier depuis scores_detaille si disponible
+            score = 0
+            tier = 'tier3'  # Défaut
+            if key in scores_detaille:
+                criterion = scores_detaille[key]
+                score = criterion.get('score', 0)
+                tier = criterion.get('tier', 'tier3')
+            elif key == 'baignoire':
+                # Pour baignoire, réutiliser les données en cache (évite recalcul)
+                if baignoire_data_cache is None:
+                    try:
+                        baignoire_data_cache = baignoire_extractor.extract_baignoire_ultimate(apartment)
+                    except:
+                        baignoire_data_cache = {'score': 0, 'tier': 'tier3'}
+                score = baignoire_data_cache.get('score', 0)
+                tier = baignoire_data_cache.get('tier', 'tier3')
+            
+            # Classe du badge de score basée sur le tier, pas le pourcentage
+            badge_class = get_tier_badge_class(tier)
+            
+            # Utiliser la fonction de formatage spécifique (passer baignoire_extractor si nécessaire)
+            if key == 'baignoire':
+                formatted = format_baignoire_criterion(apartment, baignoire_extractor)
+            else:
+                formatted = info['formatter'](apartment)
+            main_value = formatted.get('main_value', 'Non spécifié')
+            confidence = formatted.get('confidence')
+            indices = formatted.get('indices')
+            
+            # Construire le badge de confiance
+            confidence_html = ""
+            if confidence is not None:
+                confidence_html = f'<span class="confidence-badge">{confidence}% confiance</span>'
+            
+            # Construire le HTML selon le design
+            details_html = f'{main_value}{confidence_html}'
+            if indices:
+                # Les indices sont déjà formatés par les fonctions (peuvent contenir "Indices:" ou "Analyse photo:")
+                details_html += f'<div class="criterion-sub-details">{indices}</div>'
+            
+            card_html += f"""
+                        <div class="criterion">
+                            <div class="criterion-content">
+                                <div class="criterion-name">{info['name']}</div>
+                                <div class="criterion-details">{details_html}</div>
+                            </div>
+                            <span class="criterion-score-badge {badge_class}">{score} pts</span>
+                        </div>
+"""
+    
+    card_html += """
+                    </div>
+                </div>
+            </div>
+"""
+    
+    return card_html
+
+_card_template_signature = None
+
+def card_template_signature():
+    """Empreinte du gabarit des cartes: version + contenu du code de rendu et des critères"""
+    global _card_template_signature
+    if _card_template_signature is None:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        sources = [os.path.join(base_dir, name) for name in CARD_TEMPLATE_SOURCES]
+        criteria_dir = os.path.join(base_dir, 'criteria')
+        if os.path.isdir(criteria_dir):
+            sources += sorted(os.path.join(criteria_dir, name) for name in os.listdir(criteria_dir) if name.endswith('.py'))
+        
+        digest = hashlib.md5(f"v{CARD_TEMPLATE_VERSION}".encode('utf-8'))
+        for path in sources:
+            try:
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            except OSError:
+                digest.update(b'-')
+        _card_template_signature = digest.hexdigest()
+    return _card_template_signature
+
+def apartment_photos_signature(apartment):
+    """Photos locales lues par get_all_apartment_photos et leurs déclinaisons (manifeste en mémoire, sans I/O)"""
+    manifest = get_photo_manifest()
+    return [[path, manifest.derivatives_for(path)] for path in manifest.photos_for(apartment.get('id', 'unknown'))]
+
+def apartment_card_key(apartment, carousel_id):
+    """Clé de cache de la carte: gabarit + contenu de l'appartement + photos + position"""
+    payload = json.dumps(
+        [card_template_signature(), carousel_id, apartment_photos_signature(apartment), apartment],
+        sort_keys=True, ensure_ascii=False, default=str
+    )
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+class CardRenderCache:
+    """Fragments HTML des cartes, conservés d'une génération à l'autre (fichier JSON)"""
+    
+    def __init__(self, cache_file=CARD_CACHE_FILE):
+        self.cache_file = cache_file
+        self.cards = self._load()
+        self.used = {}
+        self.rendered = 0
+    
+    def _load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache = json.load(f)
+            if cache.get('template') == card_template_signature():
+                return cache.get('cards', {})
+        except Exception as e:
+            print(f"⚠️  Cache des cartes illisible, régénération complète: {e}")
+        return {}
+    
+    def get(self, card_key):
+        card_html = self.cards.get(card_key)
+        if card_html is not None:
+            self.used[card_key] = card_html
+        return card_html
+    
+    def set(self, card_key, card_html, cacheable=True):
+        """Enregistre une carte générée (cacheable=False: générée mais non conservée)"""
+        if cacheable:
+            self.used[card_key] = card_html
+        self.rendered += 1
+    
+    def save(self):
+        """Ne conserve que les cartes de la dernière génération et les écrit si elles ont changé"""
+        changed = self.used.keys() != self.cards.keys()
+        self.cards, self.used = self.used, {}
+        if not changed or not self.cache_file:
+            return
+        try:
+            os.makedirs(os.path.dirname(self.cache_file) or '.', exist_ok=True)
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump({'template': card_template_signature(), 'cards': self.cards}, f, ensure_ascii=False)
+            os.replace(tmp_file, self.cache_file)
+        except OSError as e:
+            print(f"⚠️  Erreur écriture du cache des cartes: {e}")
+
+def generate_scorecard_html(apartments, baignoire_extractor=None, card_cache=None):
+    """
+    Génère le HTML avec le design de scorecard EXACT
+    
+    Args:
+        apartments: Appartements scorés
+        baignoire_extractor: Instance réutilisée entre deux générations (créée sinon)
+        card_cache: CardRenderCache: seules les cartes des appartements modifiés
+            (ou déplacés dans le classement) sont régénérées
+    """
     
     html = f"""
 <!DOCTYPE html>
@@ -1314,6 +1490,10 @@ def generate_scorecard_html(apartments):
             height: 100%;
         }}
         
+        .carousel-slide picture {{
+            display: block;
+        }}
+        
         .carousel-slide img {{
             width: 100%;
             height: 286px;
@@ -1633,170 +1813,29 @@ def generate_scorecard_html(apartments):
     # Trier les appartements par score décroissant
     sorted_apartments = sorted(apartments, key=lambda x: x.get('score_total', 0), reverse=True)
     
+    # Photos téléchargées depuis la dernière génération (un seul stat du manifeste)
+    get_photo_manifest().refresh()
+    
     for i, apartment in enumerate(sorted_apartments, 1):
-        apartment_info = format_apartment_info(apartment)
-        scores_detaille = apartment.get('scores_detaille', {})
-        
-        # Afficher les critères de scoring avec formatage structuré
-        criteria_mapping = {
-            'localisation': {'name': 'Localisation', 'max': 20, 'formatter': format_localisation_criterion},
-            'prix': {'name': 'Prix', 'max': 20, 'formatter': format_prix_criterion},
-            'style': {'name': 'Style', 'max': 20, 'formatter': format_style_criterion},
-            'ensoleillement': {'name': 'Exposition', 'max': 10, 'formatter': format_exposition_criterion},
-            'cuisine': {'name': 'Cuisine', 'max': 10, 'formatter': format_cuisine_criterion},
-            'baignoire': {'name': 'Baignoire', 'max': 10, 'formatter': format_baignoire_criterion}
-        }
-        
-        # Calculer le mega score comme la somme des scores affichés seulement
-        # Mettre en cache le résultat baignoire pour éviter de recalculer plusieurs fois
-        baignoire_data_cache = None
-        mega_score = 0
-        for key, info in criteria_mapping.items():
-            if key == 'baignoire':
-                # Pour baignoire, utiliser extract_baignoire (réutiliser l'instance unique et mettre en cache)
-                if baignoire_data_cache is None:
-                    try:
-                        baignoire_data_cache = baignoire_extractor.extract_baignoire_ultimate(apartment)
-                    except:
-                        baignoire_data_cache = {'score': 0}
-                mega_score += baignoire_data_cache.get('score', 0)
-            elif key in scores_detaille:
-                criterion = scores_detaille[key]
-                mega_score += criterion.get('score', 0)
-        
-        # Arrondir le mega score à 1 décimale si nécessaire
-        mega_score = round(mega_score, 1)
-        # Formater pour l'affichage (enlever .0 si entier, s'assurer que c'est toujours un nombre valide)
-        if mega_score == int(mega_score):
-            mega_score_display = int(mega_score)
-        else:
-            mega_score_display = mega_score
-        # S'assurer que le score est toujours un nombre valide (pas None, pas "00")
-        if mega_score_display is None or (isinstance(mega_score_display, str) and mega_score_display.strip() == ""):
-            mega_score_display = 0
-        # Convertir en string pour l'affichage (pour éviter les problèmes de formatage)
-        mega_score_display = str(mega_score_display)
-        # Correction: si le score affiche "00", le remplacer par "0"
-        if mega_score_display == "00":
-            mega_score_display = "0"
-        
-        # Récupérer toutes les photos de l'appartement
-        all_photos = get_all_apartment_photos(apartment)
-        
-        # Couleur du mega score badge (basée sur les 90 pts max des critères affichés)
-        score_badge_color = get_score_badge_color(mega_score, 90)
-        
-        # URL de l'appartement
-        apartment_url = apartment.get('url', '#')
         carousel_id = f"carousel-{i}"
+        card_key = apartment_card_key(apartment, carousel_id) if card_cache is not None else None
+        card_html = card_cache.get(card_key) if card_cache is not None else None
         
-        # Générer le HTML du carousel si plusieurs photos
-        if len(all_photos) > 1:
-            slides_html = ""
-            for photo_idx, photo_url in enumerate(all_photos):
-                if photo_url.startswith('http://') or photo_url.startswith('https://'):
-                    slides_html += f'<div class="carousel-slide"><img src="{photo_url}" alt="Photo {photo_idx + 1}" style="width:100%;height:280px;object-fit:cover;" onerror="console.error(\'Erreur chargement image:\', this.src); this.parentElement.style.display=\'none\'"></div>'
-                else:
-                    slides_html += f'<div class="carousel-slide"><img src="{photo_url}" alt="Photo {photo_idx + 1}" style="width:100%;height:280px;object-fit:cover;" onerror="console.error(\'Erreur chargement image:\', this.src); this.parentElement.style.display=\'none\'"></div>'
-            
-            dots_html = ""
-            # Générer un dot pour chaque photo (le JavaScript s'occupera de cacher ceux qui correspondent à des slides invalides)
-            for dot_idx in range(len(all_photos)):
-                dots_html += f'<div class="carousel-dot {"active" if dot_idx == 0 else ""}" data-slide-index="{dot_idx}" onclick="event.stopPropagation(); goToSlide(\'{carousel_id}\', {dot_idx})"></div>'
-            
-            photo_html = f"""
-                <div class="apartment-image-container">
-                    <div class="score-badge-top" style="background: {score_badge_color};">{mega_score_display}</div>
-                    <div class="carousel-container" data-carousel-id="{carousel_id}" data-total-slides="{len(all_photos)}">
-                        <button class="carousel-nav prev" onclick="event.stopPropagation(); prevSlide('{carousel_id}')">‹</button>
-                        <div class="carousel-track" id="{carousel_id}-track">
-                            {slides_html}
-                        </div>
-                        <button class="carousel-nav next" onclick="event.stopPropagation(); nextSlide('{carousel_id}')">›</button>
-                        <div class="carousel-dots">
-                            {dots_html}
-                        </div>
-                    </div>
-                </div>
-            """
-        elif len(all_photos) == 1:
-            # Une seule photo, pas de carousel
-            photo_url = all_photos[0]
-            if photo_url.startswith('http://') or photo_url.startswith('https://'):
-                photo_style = f"background-image: url('{photo_url}');"
-            else:
-                photo_style = f"background-image: url('{photo_url}');"
-            photo_html = f'<div class="apartment-image-container"><div class="score-badge-top" style="background: {score_badge_color};">{mega_score_display}</div><div class="apartment-image" style="{photo_style}"></div></div>'
-        else:
-            # Aucune photo
-            photo_html = f'<div class="apartment-image-container"><div class="score-badge-top" style="background: {score_badge_color};">{mega_score_display}</div><div class="apartment-image-placeholder"></div></div>'
-        
-        html += f"""
-            <div class="scorecard" onclick="window.open('{apartment_url}', '_blank')">
-                {photo_html}
-                <div class="apartment-info">
-                    <div class="apartment-title">{apartment_info['title']}</div>
-                    <div class="apartment-subtitle">{apartment_info['subtitle']}</div>
-"""
-        
-        for key, info in criteria_mapping.items():
-            # Pour baignoire, ne pas vérifier scores_detaille car il n'y est peut-être pas
-            if key == 'baignoire' or key in scores_detaille:
-                # Obtenir le score et le tier depuis scores_detaille si disponible
-                score = 0
-                tier = 'tier3'  # Défaut
-                if key in scores_detaille:
-                    criterion = scores_detaille[key]
-                    score = criterion.get('score', 0)
-                    tier = criterion.get('tier', 'tier3')
-                elif key == 'baignoire':
-                    # Pour baignoire, réutiliser les données en cache (évite recalcul)
-                    if baignoire_data_cache is None:
-                        try:
-                            baignoire_data_cache = baignoire_extractor.extract_baignoire_ultimate(apartment)
-                        except:
-                            baignoire_data_cache = {'score': 0, 'tier': 'tier3'}
-                    score = baignoire_data_cache.get('score', 0)
-                    tier = baignoire_data_cache.get('tier', 'tier3')
-                
-                # Classe du badge de score basée sur le tier, pas le pourcentage
-                badge_class = get_tier_badge_class(tier)
-                
-                # Utiliser la fonction de formatage spécifique (passer baignoire_extractor si nécessaire)
-                if key == 'baignoire':
-                    formatted = format_baignoire_criterion(apartment, baignoire_extractor)
-                else:
-                    formatted = info['formatter'](apartment)
-                main_value = formatted.get('main_value', 'Non spécifié')
-                confidence = formatted.get('confidence')
-                indices = formatted.get('indices')
-                
-                # Construire le badge de confiance
-                confidence_html = ""
-                if confidence is not None:
-                    confidence_html = f'<span class="confidence-badge">{confidence}% confiance</span>'
-                
-                # Construire le HTML selon le design
-                details_html = f'{main_value}{confidence_html}'
-                if indices:
-                    # Les indices sont déjà formatés par les fonctions (peuvent contenir "Indices:" ou "Analyse photo:")
-                    details_html += f'<div class="criterion-sub-details">{indices}</div>'
-                
-                html += f"""
-                        <div class="criterion">
-                            <div class="criterion-content">
-                                <div class="criterion-name">{info['name']}</div>
-                                <div class="criterion-details">{details_html}</div>
-                            </div>
-                            <span class="criterion-score-badge {badge_class}">{score} pts</span>
-                        </div>
-"""
-        
-        html += """
-                    </div>
-                </div>
-            </div>
-"""
+        if card_html is None:
+            # Créer une seule instance de BaignoireExtractor pour tous les appartements (évite réinitialisations lourdes),
+            # et seulement si une carte doit être générée
+            if baignoire_extractor is None:
+                baignoire_extractor = BaignoireExtractor()
+            degraded_results = getattr(baignoire_extractor, 'degraded_results', 0)
+            card_html = render_apartment_card(apartment, carousel_id, baignoire_extractor)
+            if card_cache is not None:
+                # Baignoire en repli (timeout, erreur): carte régénérée à la prochaine génération
+                degraded = getattr(baignoire_extractor, 'degraded_results', 0) != degraded_results
+                card_cache.set(card_key, card_html, cacheable=not degraded)
+        html += card_html
+    
+    if card_cache is not None:
+        card_cache.save()
     
     html += """
         </div>
@@ -1958,8 +1997,10 @@ def main():
     # Créer le répertoire de sortie
     os.makedirs("output", exist_ok=True)
     
-    # Générer le HTML
-    html_content = generate_scorecard_html(apartments)
+    # Générer le HTML (cartes inchangées reprises du cache)
+    card_cache = CardRenderCache()
+    html_content = generate_scorecard_html(apartments, card_cache=card_cache)
+    print(f"🧩 {card_cache.rendered} carte(s) générée(s), {len(apartments) - card_cache.rendered} reprise(s) du cache")
     
     # Sauvegarder le fichier
     output_file = "output/homepage.html"
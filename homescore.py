@@ -7,6 +7,7 @@ Charge les données scrapées, calcule les scores, génère le HTML
 import json
 import os
 from scoring import score_all_apartments
+from serving_snapshot import build_serving_snapshot, SNAPSHOT_FILE
 from generate_html import generate_html, main as generate_html_main
 
 
@@ -33,6 +34,13 @@ def save_scores(scored_apartments):
     with open('data/scores/all_apartments_scores.json', 'w', encoding='utf-8') as f:
         json.dump(scored_apartments, f, indent=2, ensure_ascii=False)
     print(f"✅ Scores sauvegardés: data/scores/all_apartments_scores.json ({len(scored_apartments)} appartements)")
+    
+    # Snapshot pré-enrichi pour le backend (rechargement quasi instantané après un re-scoring)
+    try:
+        build_serving_snapshot()
+        print(f"✅ Snapshot de service généré: {SNAPSHOT_FILE}")
+    except Exception as e:
+        print(f"⚠️  Erreur génération du snapshot de service: {e}")
 
 
 def main():
@@ -10,9 +10,12 @@ import os
 from datetime import datetime
 from pathlib import Path
 from data_loader import load_apartments
-from scoring_optimized import score_apartment_optimized, load_scoring_config
+from scoring_optimized import score_all_apartments_optimized, load_scoring_config
 from generate_html import generate_html
 
+# Nombre d'appartements analysés en parallèle (appels Vision limités par la latence)
+MAX_CONCURRENT_SCORING = int(os.getenv('HOMESCORE_MAX_CONCURRENT', '4'))
+
 
 def save_scores_v2(scored_apartments):
     """Sauvegarde les scores dans data/scores_v2/"""
@@ -70,14 +73,10 @@ def main():
         print("❌ Erreur chargement config scoring")
         return
     
-    scored_apartments = []
-    for i, apartment in enumerate(apartments, 1):
-        print(f"\n🏠 Appartement {i}/{len(apartments)}: {apartment.get('id', 'N/A')}")
-        score_result = score_apartment_optimized(apartment, config)
-        if score_result:
-            # Fusionner avec données originales
-            score_result.update(apartment)
-            scored_apartments.append(score_result)
+    print(f"   ⚡ {MAX_CONCURRENT_SCORING} appartements analysés en parallèle")
+    scored_apartments = score_all_apartments_optimized(
+        apartments, config, max_workers=MAX_CONCURRENT_SCORING
+    )
     
     if not scored_apartments:
         print("❌ Erreur lors du calcul des scores")
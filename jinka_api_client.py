@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 from functools import lru_cache
 from dotenv import load_dotenv
 from scrape_jinka import JinkaScraper
+from session_vault import get_session_vault
 
 load_dotenv()
 
@@ -37,6 +38,54 @@ class NetworkError(APIError):
     pass
 
 
+class TokenBucketRateLimiter:
+    """
+    Rate limiter partagé (token bucket) pour les requêtes concurrentes
+    
+    - `rate` requêtes par seconde en régime établi, rafales jusqu'à `burst`
+    - `pause()` suspend toutes les requêtes (ex: après un 429), pas seulement la tâche courante
+    """
+    
+    def __init__(self, rate: float = 10.0, burst: int = 1):
+        """
+        Args:
+            rate: Nombre de requêtes autorisées par seconde
+            burst: Taille maximale d'une rafale
+        """
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._tokens = float(self.burst)
+        self._last_refill = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+    
+    def _refill(self, now: float):
+        elapsed = now - self._last_refill
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._last_refill = now
+    
+    async def acquire(self):
+        """Attend qu'un jeton soit disponible (et que la pause globale soit terminée)"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+    
+    def pause(self, seconds: float):
+        """Suspend toutes les requêtes pendant `seconds` secondes"""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+        self._tokens = 0.0
+
+
 class JinkaAPIClient:
     """Client pour interagir avec l'API Jinka"""
     
@@ -45,38 +94,50 @@ class JinkaAPIClient:
     RETRY_DELAY_BASE = 1  # secondes
     RATE_LIMIT_DELAY = 60  # secondes en cas de 429
     
-    def __init__(self, enable_cache: bool = True):
+    def __init__(self, enable_cache: bool = True, requests_per_second: float = 10.0, burst: int = 1,
+                 session_vault=None):
         """
         Initialise le client API
         
         Args:
             enable_cache: Active le cache des données statiques
+            requests_per_second: Débit maximal de requêtes (partagé entre tâches concurrentes)
+            burst: Nombre de requêtes pouvant partir en rafale
+            session_vault: Coffre de session (session_vault.py); None: coffre global,
+                False: connexion par email à chaque exécution
         """
         self.api_token: Optional[str] = None
         self.cookies: List[Dict[str, Any]] = []
         self.session: Optional[aiohttp.ClientSession] = None
         self.scraper: Optional[JinkaScraper] = None
         self.enable_cache = enable_cache
+        self.session_vault = get_session_vault() if session_vault is None else session_vault
         
         # Cache pour les données statiques
         self._cache: Dict[str, Dict[str, Any]] = {}
         self._cache_ttl: Dict[str, datetime] = {}
         
-        # Dernière requête pour éviter le rate limiting
-        self._last_request_time: Optional[float] = None
-        self._min_request_interval = 0.1  # 100ms entre les requêtes
+        # Rate limiter partagé par toutes les requêtes (10 req/s par défaut, comme l'ancien intervalle de 100ms)
+        self.rate_limiter = TokenBucketRateLimiter(rate=requests_per_second, burst=burst)
     
     async def login(self) -> bool:
         """
         Se connecte à Jinka via email code et récupère le token API
         
-        Réutilise la logique de login de JinkaScraper pour obtenir le token
+        Session du coffre d'abord (sans lancer de navigateur), sinon réutilise la
+        logique de login de JinkaScraper pour obtenir le token
         """
         print("🔐 Connexion à Jinka via API...")
         
         try:
-            # Utiliser le scraper existant pour le login
-            self.scraper = JinkaScraper()
+            vault_entry = await self.session_vault.valid_entry() if self.session_vault else None
+            if vault_entry:
+                self.cookies = vault_entry['storage_state'].get('cookies', [])
+                self.api_token = vault_entry['api_token']
+                return True
+            
+            # Utiliser le scraper existant pour le login (enregistre la session dans le coffre)
+            self.scraper = JinkaScraper(session_vault=self.session_vault)
             await self.scraper.setup()
             
             # Se connecter avec la méthode existante
@@ -155,15 +216,11 @@ class JinkaAPIClient:
             if cache_expiry and datetime.now() < cache_expiry:
                 return self._cache[cache_key]
         
-        # Respecter l'intervalle minimum entre requêtes
-        if self._last_request_time:
-            elapsed = time.time() - self._last_request_time
-            if elapsed < self._min_request_interval:
-                await asyncio.sleep(self._min_request_interval - elapsed)
-        
         # Retry avec backoff exponentiel
         for attempt in range(self.MAX_RETRIES):
             try:
+                # Respecter le débit global (partagé entre tâches concurrentes)
+                await self.rate_limiter.acquire()
                 result = await self._make_request_once(method, endpoint, **kwargs)
                 
                 # Si succès, mettre en cache si demandé
@@ -177,7 +234,8 @@ class JinkaAPIClient:
                 if attempt < self.MAX_RETRIES - 1:
                     wait_time = self.RATE_LIMIT_DELAY * (2 ** attempt)
                     print(f"⏳ Rate limit atteint, attente de {wait_time}s avant retry...")
-                    await asyncio.sleep(wait_time)
+                    # Pause globale: les autres tâches concurrentes attendent aussi
+                    self.rate_limiter.pause(wait_time)
                 else:
                     print(f"❌ Rate limit après {self.MAX_RETRIES} tentatives")
                     return None
@@ -206,8 +264,6 @@ class JinkaAPIClient:
         if 'headers' in kwargs:
             headers.update(kwargs.pop('headers'))
         
-        self._last_request_time = time.time()
-        
         try:
             async with self.session.request(method, url, headers=headers, **kwargs) as response:
                 if response.status == 200:
@@ -219,6 +275,8 @@ class JinkaAPIClient:
                         print(f"⚠️  Réponse non-JSON: {content_type}")
                         return {'text': text}
                 elif response.status == 401:
+                    if self.session_vault:
+                        self.session_vault.clear()
                     raise AuthenticationError("Token expiré ou invalide")
                 elif response.status == 429:
                     raise RateLimitError("Rate limit atteint")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Index persistant des annonces déjà récupérées (scraping incrémental)
+
+Pour chaque annonce: empreinte des champs du dashboard (prix, surface, photos, dates...)
+et dernière version des données détaillées. Si l'empreinte n'a pas changé depuis le
+dernier passage, les détails sont réutilisés sans appeler l'API.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Dict, Any, Optional
+
+
+# Champs du dashboard qui, s'ils changent, imposent de re-récupérer les détails
+FINGERPRINT_FIELDS = [
+    'rent', 'area', 'room', 'bedroom', 'floor', 'city', 'postal_code',
+    'quartier_name', 'description', 'created_at', 'updated_at',
+    'modified_at', 'expired_at', 'buy_type', 'owner_type',
+]
+
+
+def compute_listing_fingerprint(ad: Dict[str, Any]) -> str:
+    """
+    Calcule l'empreinte d'une annonce à partir des données du dashboard
+
+    Args:
+        ad: Annonce brute (élément de `ads` dans /apiv2/alert/{token}/dashboard)
+
+    Returns:
+        Empreinte hexadécimale (SHA-256)
+    """
+    payload = {field: ad.get(field) for field in FINGERPRINT_FIELDS}
+    # Hash du CSV d'images plutôt que le CSV lui-même
+    images_csv = ad.get('images') or ''
+    payload['images'] = hashlib.sha256(images_csv.encode('utf-8')).hexdigest()
+
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+class ListingIndex:
+    """Index id → empreinte + dernières données détaillées"""
+
+    def __init__(self, index_file: str = 'data/listing_index.json'):
+        """
+        Args:
+            index_file: Chemin vers le fichier d'index
+        """
+        self.index_file = index_file
+        self.entries: Dict[str, Dict[str, Any]] = self._load()
+        self.stats = {'new': 0, 'changed': 0, 'unchanged': 0}
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Charge l'index depuis le fichier"""
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Erreur chargement index des annonces: {e}")
+        return {}
+
+    def save(self):
+        """Sauvegarde l'index (une écriture par run, fichier temporaire puis rename)"""
+        try:
+            index_dir = os.path.dirname(self.index_file)
+            if index_dir:
+                os.makedirs(index_dir, exist_ok=True)
+            tmp_file = f"{self.index_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.entries, f, ensure_ascii=False, default=str)
+            os.replace(tmp_file, self.index_file)
+        except Exception as e:
+            print(f"⚠️ Erreur sauvegarde index des annonces: {e}")
+
+    def get_unchanged(self, apartment_id: str, fingerprint: str) -> Optional[Dict[str, Any]]:
+        """
+        Retourne les données connues si l'annonce n'a pas changé
+
+        Args:
+            apartment_id: ID de l'annonce
+            fingerprint: Empreinte actuelle (dashboard)
+
+        Returns:
+            Données détaillées de la dernière récupération, ou None si nouvelle/modifiée
+        """
+        entry = self.entries.get(str(apartment_id))
+        if entry is None:
+            self.stats['new'] += 1
+            return None
+
+        if entry.get('fingerprint') != fingerprint or not entry.get('apartment'):
+            self.stats['changed'] += 1
+            return None
+
+        self.stats['unchanged'] += 1
+        entry['last_seen'] = datetime.now().isoformat()
+        return entry['apartment']
+
+    def update(self, apartment_id: str, fingerprint: str, apartment: Dict[str, Any]):
+        """Enregistre les données détaillées fraîchement récupérées"""
+        now = datetime.now().isoformat()
+        self.entries[str(apartment_id)] = {
+            'fingerprint': fingerprint,
+            'fetched_at': now,
+            'last_seen': now,
+            'apartment': apartment,
+        }
+
+    def reset_stats(self):
+        """Remet à zéro les compteurs nouveaux/modifiés/inchangés"""
+        self.stats = {'new': 0, 'changed': 0, 'unchanged': 0}
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Index de localisation compilé depuis scoring_config.json
+
+- Noms de zones normalisés (minuscules, accents retirés) une seule fois par config
+- Un appel retourne le tier, la zone et la station de métro correspondants
+- Tier par station mémorisé (les mêmes stations reviennent dans toutes les annonces)
+- Partagé par scoring.score_localisation, criteria.localisation et
+  generate_scorecard_html (plus de relecture du fichier de config par station)
+"""
+
+import json
+import os
+import re
+import threading
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set
+
+# Ordre de priorité des tiers de localisation
+TIER_ORDER = ('tier1', 'tier2', 'tier3')
+
+CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_config.json')
+
+
+# Diacritiques combinants (après décomposition NFKD)
+_COMBINING_MARKS = re.compile('[\u0300-\u036f]')
+
+
+def normalize_location(text: str) -> str:
+    """Normalise un nom de lieu: minuscules, sans accents ("Ménilmontant" → "menilmontant")"""
+    if not text:
+        return ''
+    text = text.lower()
+    if text.isascii():
+        return text
+    return _COMBINING_MARKS.sub('', unicodedata.normalize('NFKD', text))
+
+
+class LocationIndex:
+    """Zones de localisation par tier, normalisées une fois pour toutes"""
+
+    def __init__(self, tiers_config: Dict):
+        """
+        Args:
+            tiers_config: config['axes']['localisation']['tiers']
+        """
+        # Zones dans l'ordre de priorité: (tier, nom en minuscules) par forme normalisée
+        self._zones: Dict[str, tuple] = {}
+        self._word_tiers: Dict[str, str] = {}
+        for tier in TIER_ORDER:
+            for zone in tiers_config.get(tier, {}).get('zones', []):
+                folded = normalize_location(zone).strip()
+                if not folded:
+                    continue
+                self._zones.setdefault(folded, (tier, zone.lower()))
+                for word in folded.split():
+                    self._word_tiers.setdefault(word, tier)
+
+        self._tier_rank = {tier: rank for rank, tier in enumerate(TIER_ORDER)}
+        # Orthographes recherchées dans les textes libres: avec et sans accents
+        # (évite de normaliser caractère par caractère chaque description)
+        self._spellings = [
+            (folded, spelling)
+            for folded, (_, label) in self._zones.items()
+            for spelling in dict.fromkeys((label, folded))
+        ]
+        self._station_tiers: Dict[str, Optional[str]] = {}
+        self._lock = threading.Lock()
+
+    def _zones_in_text(self, text: str) -> Set[str]:
+        """Toutes les zones présentes dans un texte libre (description...)"""
+        # Avec une vingtaine de zones, des recherches de sous-chaînes (faites en C)
+        # sont plus rapides qu'une alternance regex sur une longue description
+        if not text:
+            return set()
+        lowered = text.lower()
+        return {folded for folded, spelling in self._spellings if spelling in lowered}
+
+    def _zones_for_station(self, folded_station: str) -> Set[str]:
+        """Zones contenues dans le nom (normalisé) de la station, ou le contenant"""
+        return {zone for zone in self._zones if zone in folded_station or folded_station in zone}
+
+    def match(self, texts: Iterable[str] = (), stations: Iterable[str] = (),
+              tiers: Iterable[str] = TIER_ORDER) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Cherche la meilleure zone dans des textes libres et une liste de stations
+
+        Une zone trouvée dans un texte l'emporte sur la même zone trouvée via
+        une station; entre zones, l'ordre de priorité de la config s'applique.
+
+        Args:
+            texts: Textes libres (localisation, description, quartier...)
+            stations: Stations de métro, dans leur ordre de préférence
+            tiers: Tiers à considérer
+
+        Returns:
+            {'tier': ..., 'zone': ..., 'station': ... ou None} ou None
+        """
+        text_hits = set()
+        for text in texts:
+            text_hits |= self._zones_in_text(text)
+
+        station_hits: Dict[str, str] = {}
+        for station in stations:
+            folded_station = normalize_location(station).strip()
+            if not folded_station:
+                continue
+            for zone in self._zones_for_station(folded_station):
+                station_hits.setdefault(zone, station.lower())
+
+        allowed = set(tiers)
+        for folded, (tier, label) in self._zones.items():
+            if tier not in allowed:
+                continue
+            if folded in text_hits:
+                return {'tier': tier, 'zone': label, 'station': None}
+            if folded in station_hits:
+                return {'tier': tier, 'zone': label, 'station': station_hits[folded]}
+        return None
+
+    def station_tier(self, station_name: str) -> Optional[str]:
+        """
+        Tier d'une station de métro (zone contenue ou contenante, ou mot commun)
+
+        Returns:
+            'tier1', 'tier2', 'tier3', ou None si non trouvé
+        """
+        folded = normalize_location(station_name).strip()
+        if not folded:
+            return None
+        with self._lock:
+            if folded in self._station_tiers:
+                return self._station_tiers[folded]
+
+        # Meilleur tier parmi toutes les zones correspondantes (un nom exact est
+        # aussi une zone contenue)
+        candidates = [self._zones[zone][0] for zone in self._zones_for_station(folded)]
+        candidates += [self._word_tiers[word] for word in folded.split() if word in self._word_tiers]
+        tier = min(candidates, key=self._tier_rank.__getitem__) if candidates else None
+
+        with self._lock:
+            self._station_tiers[folded] = tier
+        return tier
+
+    @property
+    def zones(self) -> List[str]:
+        """Noms des zones (minuscules), dans l'ordre de priorité"""
+        return [label for _, label in self._zones.values()]
+
+
+# Index partagés, un par contenu de config
+_indexes: Dict[tuple, LocationIndex] = {}
+_default_config = None
+_indexes_lock = threading.Lock()
+
+
+def _load_default_config() -> Optional[Dict]:
+    global _default_config
+    if _default_config is None:
+        try:
+            with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
+                _default_config = json.load(f)
+        except Exception as e:
+            print(f"⚠️ Erreur chargement config pour localisation: {e}")
+            return None
+    return _default_config
+
+
+def get_location_index(config: Optional[Dict] = None) -> Optional[LocationIndex]:
+    """
+    Retourne l'index compilé pour cette config (scoring_config.json par défaut)
+
+    L'index est construit une seule fois par ensemble de zones.
+    """
+    if not config:
+        config = _load_default_config()
+    if not config:
+        return None
+
+    tiers_config = config.get('axes', {}).get('localisation', {}).get('tiers', {})
+    key = tuple(tuple(tiers_config.get(tier, {}).get('zones', [])) for tier in TIER_ORDER)
+    index = _indexes.get(key)
+    if index is None:
+        with _indexes_lock:
+            index = _indexes.get(key)
+            if index is None:
+                index = LocationIndex(tiers_config)
+                _indexes[key] = index
+    return index
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Attentes sur conditions concrètes pour le scraper Playwright
+
+Remplace les pauses fixes (wait_for_timeout / asyncio.sleep) par des
+attentes qui se terminent dès que la page est prête:
+
+- réseau calme: aucune requête en cours depuis une courte fenêtre
+  (suivi des événements request/requestfinished/requestfailed de la page)
+- sélecteur présent, images chargées (img.complete), tuiles de carte
+  Leaflet chargées et carte immobile
+
+Toutes les attentes d'une même navigation partagent une échéance globale
+(PAGE_DEADLINE_MS): une page lente ne coûte jamais plus que cette durée,
+et une attente expirée n'est pas une erreur (l'extraction continue avec
+ce qui est chargé, comme après les anciennes pauses fixes).
+"""
+
+import asyncio
+import time
+
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
+
+# Échéance par navigation (délai de navigation par défaut de Playwright)
+PAGE_DEADLINE_MS = 30000
+# Fenêtre sans requête réseau pour considérer la page chargée
+NETWORK_QUIET_MS = 500
+# Intervalle de vérification des conditions dans la page (pas de requestAnimationFrame:
+# suspendu dans les onglets en arrière-plan du pool de pages)
+POLLING_MS = 100
+
+# Toutes les images (éventuellement dans un conteneur) ont fini de charger
+IMAGES_COMPLETE_JS = '''
+(scope) => {
+    const root = scope ? document.querySelector(scope) : document;
+    if (!root) return true;
+    return Array.from(root.querySelectorAll('img'))
+        .every(img => !img.getAttribute('src') || img.complete);
+}
+'''
+
+# Tuiles Leaflet chargées et carte immobile (pas d'animation de zoom en cours)
+MAP_TILES_READY_JS = '''
+(map) => {
+    const tiles = Array.from(map.querySelectorAll('.leaflet-tile, img'));
+    if (tiles.length === 0) return false;
+    const loaded = tiles.every(tile => tile.classList.contains('leaflet-tile')
+        ? tile.classList.contains('leaflet-tile-loaded')
+        : tile.complete);
+    const animating = map.classList.contains('leaflet-zoom-anim') || map.querySelector('.leaflet-zoom-anim');
+    return loaded && !animating;
+}
+'''
+
+
+class PageReadiness:
+    """Suivi réseau d'une page et attentes bornées par une échéance par navigation"""
+
+    def __init__(self, page, deadline_ms: int = PAGE_DEADLINE_MS, quiet_ms: int = NETWORK_QUIET_MS):
+        """
+        Args:
+            page: Page Playwright (les écouteurs réseau sont attachés ici)
+            deadline_ms: Durée maximale des attentes après chaque navigation
+            quiet_ms: Fenêtre sans requête pour considérer le réseau calme
+        """
+        self.page = page
+        self.deadline_ms = deadline_ms
+        self.quiet_ms = quiet_ms
+        self.inflight = set()
+        self.last_activity = time.monotonic()
+        self.deadline = None
+        page.on('request', self._on_request)
+        page.on('requestfinished', self._on_request_done)
+        page.on('requestfailed', self._on_request_done)
+
+    def _on_request(self, request):
+        self.inflight.add(request)
+        self.last_activity = time.monotonic()
+
+    def _on_request_done(self, request):
+        self.inflight.discard(request)
+        self.last_activity = time.monotonic()
+
+    def start(self):
+        """Démarre l'échéance d'une nouvelle navigation"""
+        self.deadline = time.monotonic() + self.deadline_ms / 1000
+
+    def remaining_ms(self) -> int:
+        """Temps restant avant l'échéance (échéance complète si aucune navigation démarrée)"""
+        if self.deadline is None:
+            return self.deadline_ms
+        return max(0, int((self.deadline - time.monotonic()) * 1000))
+
+    async def goto(self, url: str):
+        """Navigue (DOM chargé) puis attend le calme réseau, le tout sous l'échéance"""
+        self.start()
+        await self.page.goto(url, wait_until='domcontentloaded', timeout=self.remaining_ms())
+        await self.network_quiet()
+
+    async def network_quiet(self) -> bool:
+        """Attend qu'aucune requête ne soit en cours depuis quiet_ms (False si échéance atteinte)"""
+        while True:
+            idle_ms = (time.monotonic() - self.last_activity) * 1000
+            if not self.inflight and idle_ms >= self.quiet_ms:
+                return True
+            remaining = self.remaining_ms()
+            if remaining <= 0:
+                return False
+            wait_ms = self.quiet_ms - idle_ms if not self.inflight else POLLING_MS
+            await asyncio.sleep(min(max(wait_ms, 10), remaining) / 1000)
+
+    async def _bounded(self, wait) -> bool:
+        """Exécute une attente Playwright avec le temps restant (False si expirée)"""
+        remaining = self.remaining_ms()
+        if remaining <= 0:
+            # timeout=0 désactive le délai dans Playwright: ne pas attendre du tout
+            return False
+        try:
+            await wait(remaining)
+            return True
+        except PlaywrightTimeoutError:
+            return False
+
+    async def selector(self, selector: str, state: str = 'attached') -> bool:
+        """Attend un sélecteur (plusieurs alternatives possibles, séparées par des virgules)"""
+        return await self._bounded(lambda timeout: self.page.wait_for_selector(selector, state=state, timeout=timeout))
+
+    async def visible(self, locator) -> bool:
+        """Attend qu'un locator soit visible"""
+        return await self._bounded(lambda timeout: locator.wait_for(state='visible', timeout=timeout))
+
+    async def images_complete(self, scope: str = None) -> bool:
+        """Attend la fin du chargement des images (de la page ou d'un conteneur)"""
+        return await self._bounded(lambda timeout: self.page.wait_for_function(
+            IMAGES_COMPLETE_JS, arg=scope, polling=POLLING_MS, timeout=timeout))
+
+    async def map_tiles(self, map_locator) -> bool:
+        """Attend que les tuiles de la carte soient chargées et la carte immobile"""
+        async def wait(timeout):
+            handle = await map_locator.element_handle(timeout=timeout)
+            await self.page.wait_for_function(MAP_TILES_READY_JS, arg=handle, polling=POLLING_MS, timeout=self.remaining_ms() or 1)
+        return await self._bounded(wait)
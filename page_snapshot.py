@@ -0,0 +1,871 @@
+#!/usr/bin/env python3
+"""
+Extraction d'une annonce Jinka depuis un instantané unique du DOM
+
+Au lieu d'interroger la page vivante champ par champ (une dizaine de
+méthodes extract_* et plusieurs dizaines d'allers-retours Playwright par
+annonce), le scraper exécute un seul page.evaluate(SNAPSHOT_SCRIPT) qui
+renvoie le HTML rendu, le texte de la page et la géométrie des images.
+Tous les champs sont ensuite calculés hors navigateur avec BeautifulSoup
+(parseur lxml), chacun une seule fois: l'étage, la surface ou la
+description sont réutilisés par les photos, le style et la localisation.
+
+Les règles (motifs d'étage, filtres de photos, score haussmannien,
+conversion des coordonnées Leaflet) sont partagées avec le mode live de
+scrape_jinka.py.
+"""
+
+import math
+import re
+from functools import cached_property
+from typing import Dict, List, Optional
+
+from bs4 import BeautifulSoup
+
+# Conteneurs de la galerie de photos, dans l'ordre de recherche
+# (les divs cachées display="none" contiennent souvent toutes les photos)
+GALLERY_SELECTORS = [
+    'div.sc-cJSrbW.juBoVb',  # Structure actuelle
+    'div.sc-gPEVay.jnWxBz',  # Ancienne structure
+    '[class*="sc-cJSrbW"][class*="juBoVb"]',  # Sélecteurs partiels
+    '[class*="sc-gPEVay"][class*="jnWxBz"]',
+    'div.sc-bdVaJa.InsofV',  # Div cachée avec toutes les photos (display="none")
+    '[class*="sc-bdVaJa"][class*="InsofV"]',
+    'div[style*="display: none"]',  # Toute div cachée
+]
+
+# Hébergeurs de vraies photos d'appartements
+PHOTO_URL_PATTERNS = [
+    'loueragile',
+    'upload_pro_ad',
+    'media.apimo.pro',
+    'studio-net.fr',
+    'images.century21.fr',
+    'biens',
+    'apartement',
+    'transopera',
+    'staticlbi',
+    'uploadcaregdc',
+    'uploadcare',
+    's3.amazonaws.com',
+    'googleusercontent.com',
+    'cdn.safti.fr',
+    'safti.fr',
+    'paruvendu.fr',
+    'immo-facile.com',
+    'mms.seloger.com',
+    'seloger.com',
+    'api.jinka.fr/apiv2/media/imgsrv',  # Proxy Jinka
+    'photos.ubif',  # Photos via proxy Jinka
+    'res.cloudinary.com',
+    'cloudinary.com',
+    'photos.',
+    'imagesv2.fnaim.fr',  # Accepter FNAIM si image visible
+]
+
+FNAIM_PLACEHOLDER = 'imagesv2.fnaim.fr/images1/img/'
+PLACEHOLDER_PATTERNS = [
+    FNAIM_PLACEHOLDER,
+    'placeholder',
+    'placeholder.jpg',
+    'no-image',
+    'default-image',
+]
+
+# Images de la galerie, dans l'ordre du DOM, avec leur position visuelle
+GALLERY_IMAGES_JS = '''
+el => {
+    // Obtenir toutes les images dans l'ordre exact du DOM (même cachées)
+    const allImgs = Array.from(el.querySelectorAll('img'));
+    
+    // Extraire les infos avec position visuelle pour tri correct
+    return allImgs.map((img, domIndex) => {
+        const rect = img.getBoundingClientRect();
+        const computedStyle = window.getComputedStyle(img);
+        return {
+            domIndex: domIndex,  // Index dans le DOM
+            src: img.src || img.getAttribute('data-src') || img.getAttribute('data-lazy-src') || '',
+            alt: img.alt || '',
+            width: img.naturalWidth || img.width || 0,
+            height: img.naturalHeight || img.height || 0,
+            display: computedStyle.display,
+            visibility: computedStyle.visibility,
+            top: rect.top,  // Position top pour tri visuel
+            left: rect.left  // Position left pour tri visuel
+        };
+    }).filter(img => {
+        // Garder toutes les images avec une URL valide
+        if (!img.src) return false;
+        
+        const srcLower = img.src.toLowerCase();
+        const altLower = img.alt.toLowerCase();
+        
+        // Vérifier si l'image est visible (pas display:none et position non-0,0)
+        const isVisible = img.display !== 'none' && (img.top !== 0 || img.left !== 0);
+        const hasGoodDimensions = img.width > 200 && img.height > 200;
+        
+        // 1. Exclure les placeholders explicites (toujours)
+        if (srcLower.includes('placeholder')) return false;
+        
+        // 2. LOGIQUE AMÉLIORÉE : Accepter les images VISIBLES même si FNAIM
+        // Si l'image est visible ET a de bonnes dimensions, c'est probablement une vraie photo
+        if (isVisible && hasGoodDimensions) {
+            // Accepter les images visibles même si elles utilisent FNAIM
+            // Car elles sont affichées sur la page
+            return true;
+        }
+        
+        // 3. Pour les images cachées ou petites, filtrer les placeholders FNAIM
+        const placeholderUrlPatterns = [
+            'imagesv2.fnaim.fr/images1/img/',  // Placeholder FNAIM
+            'placeholder',
+            'placeholder.jpg',
+            'placeholder.png',
+            'no-image',
+            'default-image',
+            'missing-image',
+        ];
+        const isPlaceholderUrl = placeholderUrlPatterns.some(pattern => srcLower.includes(pattern));
+        if (isPlaceholderUrl && !isVisible) {
+            // Si c'est un placeholder ET que l'image n'est pas visible, exclure
+            return false;
+        }
+        
+        // 4. Exclure les images avec alt="preloader" SI cachées ET placeholder FNAIM
+        if ((altLower.includes('preloader') || altLower === 'preloader') && 
+            srcLower.includes('imagesv2.fnaim.fr/images1/img/') && 
+            !isVisible) {
+            return false;
+        }
+        
+        // 5. Détecter les vraies photos d'appartements (patterns étendus)
+        const photoPatterns = [
+            'loueragile', 
+            'upload_pro_ad', 
+            'media.apimo.pro', 
+            'studio-net.fr', 
+            'images.century21.fr', 
+            'biens', 
+            'apartement', 
+            'transopera', 
+            'staticlbi', 
+            'uploadcaregdc', 
+            'uploadcare', 
+            's3.amazonaws.com', 
+            'googleusercontent.com', 
+            'cdn.safti.fr', 
+            'safti.fr', 
+            'paruvendu.fr', 
+            'immo-facile.com', 
+            'mms.seloger.com', 
+            'seloger.com',
+            'api.jinka.fr/apiv2/media/imgsrv',  // Proxy Jinka pour vraies photos
+            'photos.ubif',  // Photos originales via proxy Jinka
+            'res.cloudinary.com',  // Cloudinary (souvent utilisé pour photos immo)
+            'cloudinary.com',
+            'photos.',  // Pattern générique pour photos (mais pas "placeholder")
+            'imagesv2.fnaim.fr',  // Accepter FNAIM si image visible avec bonnes dimensions
+        ];
+        const hasValidPhotoPattern = photoPatterns.some(pattern => srcLower.includes(pattern));
+        
+        // 6. Si c'est une vraie photo (pattern valide), on la garde
+        // OU si c'est une image visible avec bonnes dimensions (même FNAIM)
+        if (hasValidPhotoPattern || (isVisible && hasGoodDimensions)) {
+            return true;
+        }
+        
+        return false;
+    });
+}
+'''
+
+# Un seul aller-retour: déclenche le chargement lazy, attend les images (au plus
+# imageTimeout ms), puis renvoie HTML, texte et images
+SNAPSHOT_SCRIPT = '''
+async ({gallerySelectors, imageTimeout}) => {
+    const pause = ms => new Promise(resolve => setTimeout(resolve, ms));
+    const imagesComplete = () => Array.from(document.images)
+        .every(img => !img.getAttribute('src') || img.complete);
+    const waitForImages = async () => {
+        const deadline = Date.now() + imageTimeout;
+        while (!imagesComplete() && Date.now() < deadline) {
+            await pause(100);
+        }
+    };
+    // Scroller un peu pour déclencher le chargement lazy des images
+    window.scrollTo(0, 200);
+    await pause(50);
+    await waitForImages();
+    window.scrollTo(0, 0);
+
+    const collectGallery = @@GALLERY_IMAGES_JS@@;
+    const galleries = gallerySelectors.map(selector => {
+        let el = null;
+        try { el = document.querySelector(selector); } catch (e) {}
+        return el ? collectGallery(el) : null;
+    });
+
+    const images = Array.from(document.querySelectorAll('img')).map(img => {
+        const rect = img.getBoundingClientRect();
+        const style = window.getComputedStyle(img);
+        return {
+            src: img.getAttribute('src'),
+            data_src: img.getAttribute('data-src'),
+            data_lazy_src: img.getAttribute('data-lazy-src'),
+            alt: img.getAttribute('alt') || '',
+            width: img.naturalWidth || img.width || 0,
+            height: img.naturalHeight || img.height || 0,
+            display: style.display,
+            visibility: style.visibility,
+            box_width: rect.width,
+            box_height: rect.height
+        };
+    });
+
+    return {
+        html: document.documentElement.outerHTML,
+        text: document.body ? document.body.textContent : '',
+        galleries: galleries,
+        images: images
+    };
+}
+'''.replace('@@GALLERY_IMAGES_JS@@', GALLERY_IMAGES_JS.strip())
+
+RDC_PATTERN = r'\bRDC\b|rez-de-chaussée|rez de chaussée|rez-de-jardin'
+
+# Étage dans la section Caractéristiques
+SECTION_ETAGE_PATTERNS = [
+    r'(\d+)(?:er?|e|ème?)\s*étage',
+    r'étage\s*(\d+)',
+    r'(\d+)(?:er?|e|ème?)\s*ét\.',
+    r'Étage[:\s]+(\d+)',
+    r'étage[:\s]+(\d+)',
+    r'(\d+)\s*étage',  # Format simple "2 étage"
+    r'étage\s*:\s*(\d+)',  # Format "étage: 2"
+]
+
+# Étage dans toute la page (priorité aux motifs avec "étage" explicite)
+PAGE_ETAGE_PATTERNS = [
+    r'(\d+)(?:er?|e|ème?)\s*étage',
+    r'étage\s*(\d+)',
+    r'(\d+)(?:er?|e|ème?)\s*ét\.',
+    r'au\s+(\d+)(?:er?|e|ème?)\s*étage',
+    r'(\d+)(?:er?|e|ème?)\s*étage\s*(?:avec|sans)',
+    r'étage\s*:\s*(\d+)',
+    r'(\d+)\s*étage',  # Format simple "2 étage"
+]
+
+# Formats courts ("2e") acceptés seulement dans la section Caractéristiques
+SHORT_ETAGE_PATTERNS = [
+    r'(\d+)(?:er|e|ème)(?:\s|,|\.|$)',
+]
+
+STYLE_KEYWORDS = {
+    'haussmannien': 'Haussmannien',
+    'haussmann': 'Haussmannien',
+    'moulures': 'Haussmannien',
+    'parquet': 'Haussmannien',
+    'cheminée': 'Haussmannien',
+    'restauré': 'Haussmannien',
+    'contemporain': 'Contemporain',
+    'moderne': 'Moderne',
+    'ancien': 'Ancien',
+    'neuf': 'Neuf'
+}
+
+HAUSSMANN_KEYWORDS = {
+    'architectural': [
+        'haussmannien', 'haussmannienne', 'haussmann',
+        'moulures', 'moulure', 'mouluré', 'moulurée',
+        'cheminée', 'cheminées', 'cheminée de marbre',
+        'parquet', 'parquets', 'parquet d\'origine', 'parquet ancien',
+        'corniches', 'corniche', 'corniche moulurée',
+        'rosaces', 'rosace', 'rosace de plafond',
+        'balcon', 'balcons', 'balcon en fer forgé', 'balcon forgé',
+        'fer forgé', 'fer forgée', 'grille en fer forgé',
+        'hauteur sous plafond', 'haut plafond', 'plafond haut',
+        'escalier', 'escaliers', 'escalier d\'honneur'
+    ],
+    'caractère': [
+        'caractère', 'caractères', 'caractéristique',
+        'restauré', 'restaurée', 'rénové', 'rénovée',
+        'authentique', 'authentiques', 'original', 'originale',
+        'époque', 'période', 'époque haussmannienne',
+        'ancien', 'ancienne', 'ancien immeuble',
+        'vieux', 'vieille', 'vieux immeuble',
+        'charme', 'charmant', 'charmante',
+        'prestige', 'prestigieux', 'prestigieuse',
+        'noble', 'noblesse', 'noblesse des matériaux'
+    ],
+    'matériaux': [
+        'marbre', 'marbres', 'marbre de carrare',
+        'bois', 'bois noble', 'bois précieux',
+        'pierre', 'pierres', 'pierre de taille',
+        'stuc', 'stucs', 'stuc décoratif',
+        'plâtre', 'plâtres', 'plâtre moulé',
+        'métal', 'métaux', 'métal forgé'
+    ],
+    'détails': [
+        'moulure', 'moulures', 'moulure de plafond',
+        'décoration', 'décoratif', 'décorative',
+        'ornement', 'ornements', 'ornemental',
+        'détail', 'détails', 'détail architectural',
+        'finesse', 'finesses', 'finitions',
+        'élégance', 'élégant', 'élégante'
+    ]
+}
+
+ADDRESS_PATTERNS = [
+    r'(\d+[,\s]*[a-zA-Z\s]*[Rr]ue[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Aa]venue[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Bb]oulevard[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Pp]lace[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Cc]ours[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Vv]illa[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Ii]mpasse[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Aa]llée[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Pp]assage[^,\n]*)',
+    r'(\d+[,\s]*[a-zA-Z\s]*[Cc]hemin[^,\n]*)'
+]
+
+LEAFLET_SELECTORS = [
+    '.leaflet-proxy',
+    '.leaflet-map-pane',
+    '.leaflet-container',
+    '[class*="leaflet"]'
+]
+
+TRANSLATE3D_PATTERNS = [
+    r'translate3d\(([^,]+),\s*([^,]+),\s*([^)]+)\)',
+    r'transform:\s*translate3d\(([^,]+),\s*([^,]+),\s*([^)]+)\)'
+]
+
+# Contexte qui désigne un arrondissement plutôt qu'un étage
+ARRONDISSEMENT_WORDS = ['arrondissement', 'arr.', 'arr ', 'paris']
+
+
+def format_etage(etage_num: str) -> str:
+    """'1' -> '1er étage', '4' -> '4e étage'"""
+    return "1er étage" if etage_num == '1' else f"{etage_num}e étage"
+
+
+def etage_from_section(caracteristiques_text: str) -> Optional[str]:
+    """Étage trouvé dans le texte de la section Caractéristiques (None sinon)"""
+    if not caracteristiques_text:
+        return None
+    # PRIORITÉ 1: RDC d'abord (car peut être mal interprété comme étage)
+    if re.search(RDC_PATTERN, caracteristiques_text, re.IGNORECASE):
+        return "RDC"
+
+    for pattern in SECTION_ETAGE_PATTERNS:
+        match_obj = re.search(pattern, caracteristiques_text, re.IGNORECASE)
+        if match_obj:
+            start = max(0, match_obj.start() - 20)
+            end = min(len(caracteristiques_text), match_obj.end() + 20)
+            context = caracteristiques_text[start:end].lower()
+            # Exclure si c'est un arrondissement
+            if not any(word in context for word in ARRONDISSEMENT_WORDS):
+                return format_etage(match_obj.group(1))
+    return None
+
+
+def etage_from_page(page_content: str, page_text: str) -> Optional[str]:
+    """
+    Étage trouvé dans toute la page
+
+    Args:
+        page_content: HTML de la page (recherche des motifs)
+        page_text: Texte de la page (vérification du contexte)
+    """
+    if re.search(RDC_PATTERN, page_text, re.IGNORECASE):
+        return "RDC"
+
+    for pattern in PAGE_ETAGE_PATTERNS:
+        matches = re.findall(pattern, page_content, re.IGNORECASE)
+        if matches:
+            # Vérifier le contexte pour éviter les faux positifs (arrondissements)
+            match_obj = re.search(pattern, page_text, re.IGNORECASE)
+            if match_obj:
+                start = max(0, match_obj.start() - 30)
+                end = min(len(page_text), match_obj.end() + 30)
+                context = page_text[start:end].lower()
+                if not any(word in context for word in ARRONDISSEMENT_WORDS + ['750']):
+                    return format_etage(matches[0])
+    return None
+
+
+def etage_from_short_formats(char_text: str) -> Optional[str]:
+    """Étage au format court ("2e") dans la section Caractéristiques, confirmé par le contexte"""
+    for pattern in SHORT_ETAGE_PATTERNS:
+        # Les caractéristiques listent généralement: pièces, étage, exposition, etc.
+        for etage_num in re.findall(pattern, char_text, re.IGNORECASE)[:3]:
+            match_obj = re.search(re.escape(etage_num) + r'(?:er|e|ème)?', char_text, re.IGNORECASE)
+            if not match_obj:
+                continue
+            start = max(0, match_obj.start() - 30)
+            end = min(len(char_text), match_obj.end() + 30)
+            context = char_text[start:end].lower()
+            if (any(word in context for word in ['étage', 'ét.', 'ét', 'ascenseur', 'rdc', 'rez'])
+                    and not any(word in context for word in ARRONDISSEMENT_WORDS + ['750'])
+                    and int(etage_num) <= 10):  # Les étages normaux sont <= 10
+                return format_etage(etage_num)
+    return None
+
+
+def style_haussmannien_from_description(description: str) -> Dict:
+    """Score de style haussmannien d'après les mots-clés de la description"""
+    if description == "Description non trouvée":
+        return {"score": 0, "elements": [], "keywords": []}
+
+    found_by_category = {}
+    total_found = 0
+    all_keywords = []
+    description_lower = description.lower()
+    for category, keywords in HAUSSMANN_KEYWORDS.items():
+        found_in_category = [keyword for keyword in keywords if keyword.lower() in description_lower]
+        if found_in_category:
+            found_by_category[category] = found_in_category
+            all_keywords.extend(found_in_category)
+            total_found += len(found_in_category)
+
+    return {
+        "score": min(100, (total_found * 10) + 20),  # 10 points par mot-clé + 20 de base
+        "elements": found_by_category,
+        "keywords": all_keywords,
+        "total_found": total_found
+    }
+
+
+def coordinates_from_style(style: str) -> Optional[Dict]:
+    """Coordonnées GPS tirées du translate3d d'un élément Leaflet (None si invalides)"""
+    print(f"   🔍 Style trouvé: {style[:100]}...")
+    for pattern in TRANSLATE3D_PATTERNS:
+        match = re.search(pattern, style)
+        if not match:
+            continue
+        try:
+            x_str = match.group(1).strip()
+            y_str = match.group(2).strip()
+            scale_str = match.group(3).strip()
+            print(f"   📍 Coordonnées brutes: x={x_str}, y={y_str}, scale={scale_str}")
+
+            x = float(x_str.replace('px', '').replace('e+', 'e'))
+            y = float(y_str.replace('px', '').replace('e+', 'e'))
+            scale = float(scale_str.replace('px', '')) if scale_str != '0px' else 1.0
+        except ValueError as ve:
+            print(f"   ❌ Erreur de conversion: {ve}")
+            continue
+
+        if abs(x) > 1000 and abs(y) > 1000:  # Coordonnées Web Mercator valides
+            lon = (x / 20037508.34) * 180
+            lat = (y / 20037508.34) * 180
+            lat = 180 / 3.14159265359 * (2 * math.atan(math.exp(lat * 3.14159265359 / 180)) - 3.14159265359 / 2)
+            print(f"   ✅ Coordonnées converties: {lat:.6f}, {lon:.6f}")
+            return {
+                "latitude": round(lat, 6),
+                "longitude": round(lon, 6),
+                "raw_x": x,
+                "raw_y": y,
+                "scale": scale
+            }
+        print(f"   ⚠️ Coordonnées invalides (trop petites): x={x}, y={y}")
+    return None
+
+
+def _is_placeholder(src_lower: str, alt_lower: str) -> bool:
+    return (any(pattern in src_lower for pattern in PLACEHOLDER_PATTERNS)
+            or ('preloader' in alt_lower and FNAIM_PLACEHOLDER in src_lower))
+
+
+def _has_photo_pattern(src_lower: str) -> bool:
+    return any(pattern in src_lower for pattern in PHOTO_URL_PATTERNS)
+
+
+def select_gallery_photos(img_elements: List[Dict], alt: str) -> List[Dict]:
+    """
+    Photos d'une galerie, dans l'ordre visuel de Jinka
+
+    Args:
+        img_elements: Images renvoyées par GALLERY_IMAGES_JS (déjà pré-filtrées)
+        alt: Description commune des photos
+
+    Returns:
+        Photos visibles triées par position, puis photos cachées dans l'ordre du DOM
+    """
+    photos_with_position = []
+    for img_data in img_elements:
+        src = img_data.get('src', '')
+        if not src:
+            continue
+        src_lower = src.lower()
+        alt_lower = img_data.get('alt', '').lower()
+
+        # Logos, placeholders et URLs inconnues (le filtre JS a déjà retenu les images visibles)
+        if 'logo' in src_lower or 'source_logos' in src_lower:
+            continue
+        if _is_placeholder(src_lower, alt_lower) or not _has_photo_pattern(src_lower):
+            continue
+
+        # Les logos font ~128x128px: exclure les images très petites (< 200px)
+        width = img_data.get('width', 0)
+        height = img_data.get('height', 0)
+        if width > 0 and height > 0 and (width < 200 or height < 200):
+            continue
+
+        photos_with_position.append({
+            'url': src,
+            'alt': alt or 'appartement',
+            'selector': 'gallery_div_visible',
+            'width': width,
+            'height': height,
+            'dom_index': img_data.get('domIndex', 0),
+            'position_top': img_data.get('top', 0),
+            'position_left': img_data.get('left', 0)
+        })
+
+    # Dédupliquer par URL en préférant l'occurrence visible (position non-0,0)
+    url_to_photo = {}
+    for photo in photos_with_position:
+        existing = url_to_photo.get(photo['url'])
+        if existing is None or (_is_positioned(photo) and not _is_positioned(existing)):
+            url_to_photo[photo['url']] = photo
+    photos_with_position = list(url_to_photo.values())
+
+    visible_photos = sorted((p for p in photos_with_position if _is_positioned(p)),
+                            key=lambda p: (p['position_top'], p['position_left']))
+    hidden_photos = sorted((p for p in photos_with_position if not _is_positioned(p)),
+                           key=lambda p: p['dom_index'])
+    print(f"      ✅ {len(visible_photos)} photos visibles + {len(hidden_photos)} photos cachées = {len(photos_with_position)} photos au total")
+
+    photos = []
+    for photo_with_pos in visible_photos + hidden_photos:
+        photos.append({k: v for k, v in photo_with_pos.items() if k not in ['dom_index', 'position_top', 'position_left']})
+        print(f"      📸 Photo galerie (top: {photo_with_pos['position_top']:.0f}, left: {photo_with_pos['position_left']:.0f}, {photo_with_pos['width']}x{photo_with_pos['height']}): {photo_with_pos['url'][:60]}...")
+    return photos
+
+
+def _is_positioned(photo: Dict) -> bool:
+    return photo.get('position_top', 0) != 0 or photo.get('position_left', 0) != 0
+
+
+def select_page_photos(images: List[Dict], alt: str) -> List[Dict]:
+    """
+    Photos hors galerie: images visibles avec une URL d'appartement, sinon toutes les images
+
+    Args:
+        images: Images de la page (SNAPSHOT_SCRIPT)
+        alt: Description commune des photos visibles
+    """
+    photos = []
+    for img in images:
+        has_box = img.get('box_width', 0) > 0 and img.get('box_height', 0) > 0
+        if not has_box or img.get('visibility') == 'hidden' or img.get('display') == 'none':
+            continue
+        width = img.get('width', 0)
+        height = img.get('height', 0)
+        if width > 0 and height > 0 and (width < 200 or height < 200):
+            continue
+        src = img.get('src') or img.get('data_src')
+        if not src:
+            continue
+        src_lower = src.lower()
+        good_visible = width > 200 and height > 200
+        if not good_visible and _is_placeholder(src_lower, img.get('alt', '').lower()):
+            continue
+        if not _has_photo_pattern(src_lower):
+            continue
+        if ('logo' in src_lower or 'source_logos' in src_lower) and not good_visible:
+            continue
+        photos.append({'url': src, 'alt': alt or 'appartement', 'selector': 'global_search_visible',
+                       'width': width, 'height': height})
+        print(f"      📸 Photo visible ({width}x{height}): {src[:60]}...")
+    if photos:
+        return photos
+
+    # Toutes les images, y compris lazy-loaded
+    for img in images:
+        src = img.get('src') or img.get('data_src') or img.get('data_lazy_src')
+        if not src:
+            continue
+        width = img.get('width', 0)
+        height = img.get('height', 0)
+        is_visible = img.get('box_width', 0) > 0 and img.get('box_height', 0) > 0
+        good_visible = is_visible and width > 200 and height > 200
+        src_lower = src.lower()
+        if not good_visible and _is_placeholder(src_lower, img.get('alt', '').lower()):
+            continue
+        if not _has_photo_pattern(src_lower) and not good_visible:
+            continue
+        if ('logo' in src_lower or 'source_logos' in src_lower) and not good_visible:
+            continue
+        if width > 0 and height > 0 and (width < 200 or height < 200) and not is_visible:
+            continue
+        photos.append({'url': src, 'alt': img.get('alt') or 'appartement', 'selector': 'global_search_all',
+                       'width': width, 'height': height})
+        print(f"      📸 Photo trouvée (lazy-loaded?): {src[:60]}...")
+    return photos
+
+
+def dedupe_photos(photos: List[Dict]) -> List[Dict]:
+    """Supprime les photos en double (même URL), en gardant la première"""
+    unique_photos = []
+    seen_urls = set()
+    for photo in photos:
+        if photo['url'] not in seen_urls:
+            unique_photos.append(photo)
+            seen_urls.add(photo['url'])
+    return unique_photos
+
+
+class PageSnapshot:
+    """Champs d'une annonce calculés hors navigateur depuis un instantané du DOM"""
+
+    def __init__(self, html: str, text: str = '', galleries: Optional[List] = None,
+                 images: Optional[List[Dict]] = None):
+        """
+        Args:
+            html: HTML rendu (document.documentElement.outerHTML)
+            text: Texte de la page (document.body.textContent)
+            galleries: Images de chaque GALLERY_SELECTORS (None si conteneur absent)
+            images: Toutes les images de la page avec leur géométrie
+        """
+        self.html = html
+        self.text = text
+        self.galleries = galleries or []
+        self.images = images or []
+        self.soup = BeautifulSoup(html, 'lxml')
+        for tag in self.soup(['script', 'style', 'noscript']):
+            tag.decompose()
+        self.body = self.soup.body or self.soup
+
+    def _text_elements(self, pattern: str) -> List[str]:
+        """
+        Textes des plus petits éléments dont le texte correspond au motif
+        (équivalent hors ligne des sélecteurs Playwright text=/.../)
+        """
+        regex = re.compile(pattern)
+        matching = [element for element in self.body.find_all(True) if regex.search(element.get_text())]
+        ancestors = {id(parent) for element in matching for parent in element.parents}
+        return [element.get_text() for element in matching if id(element) not in ancestors]
+
+    def _first_text(self, pattern: str) -> Optional[str]:
+        texts = self._text_elements(pattern)
+        return texts[0] if texts else None
+
+    def _select_text(self, selector: str) -> Optional[str]:
+        element = self.body.select_one(selector)
+        return element.get_text() if element is not None else None
+
+    @cached_property
+    def titre(self) -> str:
+        for selector in ['h1', '.title', '[data-testid="title"]', 'h2']:
+            text = self._select_text(selector)
+            if text and len(text.strip()) > 5:
+                return text.strip()
+        return "Titre non trouvé"
+
+    @cached_property
+    def prix(self) -> str:
+        text = self._select_text('.hmmXKG, [class*="price"], .price')
+        if text is None:
+            return "Prix non trouvé"
+        price = re.search(r'[\d\s]+€', text)
+        return price.group(0).strip() if price else "Prix non trouvé"
+
+    @cached_property
+    def prix_m2(self) -> Optional[str]:
+        text = self._first_text(r'€/m²')
+        if text:
+            match = re.search(r'([\d\s]+)\s*€\s*/?\s*m²', text, re.IGNORECASE)
+            if match:
+                return f"{match.group(1).strip()} € / m²"
+        return None
+
+    @cached_property
+    def surface(self) -> Optional[str]:
+        text = self._first_text(r'\d+\s*m²')
+        if text:
+            match = re.search(r'(\d+(?:[.,]\d+)?)\s*m²', text, re.IGNORECASE)
+            if match:
+                surface_num = float(match.group(1).replace(',', '.'))
+                return f"{int(surface_num)} m²" if surface_num == int(surface_num) else f"{surface_num:.1f} m²"
+        return None
+
+    @cached_property
+    def pieces(self) -> str:
+        text = self._first_text(r'\d+\s*pièces?')
+        return text.strip() if text else "Pièces non trouvées"
+
+    @cached_property
+    def date(self) -> str:
+        text = self._first_text(r'le \d+ \w+ à')
+        return text.strip() if text else "Date non trouvée"
+
+    def _caracteristiques_headers(self):
+        return [header for header in self.body.find_all(['h2', 'h3']) if 'caractéristiques' in header.get_text().lower()]
+
+    @cached_property
+    def caracteristiques(self) -> str:
+        for header in self.body.find_all('h3'):
+            if 'caractéristiques' in header.get_text().lower():
+                sibling = header.find_next_sibling()
+                if sibling is not None:
+                    return sibling.get_text().strip() or "Caractéristiques non trouvées"
+                break
+        return "Caractéristiques non trouvées"
+
+    @cached_property
+    def etage(self) -> Optional[str]:
+        # Section Caractéristiques: conteneur du titre, ou d'un élément dont la classe la nomme
+        section_text = ""
+        headers = self._caracteristiques_headers()
+        if headers and headers[0].parent is not None:
+            section_text = headers[0].parent.get_text()
+        if not section_text:
+            for element in self.body.select('[class*="caracteristiques"], [class*="Caractéristiques"]'):
+                section_text = (element.parent or element).get_text()
+                break
+        if not section_text:
+            match = re.search(r'Caractéristiques[:\s]*(.*?)(?:\n\n|\n[A-Z]|$)', self.text, re.IGNORECASE | re.DOTALL)
+            if match:
+                section_text = match.group(1)
+
+        etage = (etage_from_section(section_text)
+                 or etage_from_page(self.html, self.text))
+        if etage:
+            return etage
+        if headers and headers[0].parent is not None:
+            etage = etage_from_short_formats(headers[0].parent.get_text())
+            if etage:
+                return etage
+        return None
+
+    @cached_property
+    def style_for_photo(self) -> str:
+        for keyword, style in STYLE_KEYWORDS.items():
+            if re.search(keyword, self.text, re.IGNORECASE):
+                return style
+        return "Style Inconnu"
+
+    @cached_property
+    def transports(self) -> List[str]:
+        transports = []
+
+        # Méthode 1: section "Proche des stations"
+        stations_divs = [
+            div for div in self.body.select('div.fz-16.sc-bdVaJa.bDXQKW')
+            if any('proche des stations' in h3.get_text().lower() for h3 in div.find_all('h3'))
+        ]
+        spans = [span for div in stations_divs for span in div.select('ul li span')]
+        if spans:
+            for span in spans:
+                station_text = span.get_text().strip()
+                if len(station_text) > 2:
+                    transports.append(station_text)
+        else:
+            for li in (li for div in stations_divs for li in div.select('ul li')):
+                # Nettoyer le texte (enlever les numéros de ligne)
+                station_name = re.sub(r'\s+\d+\s*$', '', li.get_text().strip())
+                if len(station_name) > 2:
+                    transports.append(station_name)
+
+        # Méthode 2: images de métro, nom de la station dans le même conteneur
+        for img in self.body.select('img[src*="subway"], img[alt*="metro"]'):
+            if img.parent is None:
+                continue
+            station_name = re.split(r'\s+\d+\s*', img.parent.get_text())[0].strip()
+            if len(station_name) > 2 and station_name not in transports:
+                transports.append(station_name)
+
+        # Méthode 3: motifs de stations
+        if not transports:
+            for text in self._text_elements(r'[A-Za-z]+\s+\d+'):
+                if re.match(r'[A-Za-z]+\s+\d+', text.strip()):
+                    transports.append(text.strip())
+
+        return list(dict.fromkeys(transports))[:10]
+
+    @cached_property
+    def localisation(self) -> str:
+        adresses_trouvees = []
+        for pattern in ADDRESS_PATTERNS:
+            for match in re.findall(pattern, self.text, re.IGNORECASE):
+                clean_addr = re.sub(r'\s+', ' ', match.strip())
+                if len(clean_addr) > 5 and clean_addr not in adresses_trouvees:
+                    adresses_trouvees.append(clean_addr)
+        if adresses_trouvees:
+            return adresses_trouvees[0]
+
+        # Fallback 1: l'arrondissement
+        for text in (self._first_text(r'Paris \d+e'), self._first_text(r'750\d+'),
+                     self._select_text('[class*="location"]')):
+            if text and 'Paris' in text:
+                return text.strip()
+
+        # Fallback 2: les stations de métro
+        if self.transports:
+            return f"Proche de {', '.join(self.transports[:2])}"
+        return "Localisation non trouvée"
+
+    @cached_property
+    def description(self) -> str:
+        candidates = [
+            self._select_text('.fz-16.sc-bxivhb.fcnykg'),
+            self._select_text('[class*="description"]'),
+        ]
+        for tag in ('p', None, 'div', 'section'):
+            if tag is None:
+                candidates.append(self._first_text(r'Globalstone'))
+                continue
+            element = next((el for el in self.body.find_all(tag) if 'globalstone' in el.get_text().lower()), None)
+            candidates.append(element.get_text() if element is not None else None)
+
+        for text in candidates:
+            if text and len(text.strip()) > 50:  # S'assurer qu'on a une vraie description
+                return text.strip()
+        return "Description non trouvée"
+
+    @cached_property
+    def style_haussmannien(self) -> Dict:
+        return style_haussmannien_from_description(self.description)
+
+    @cached_property
+    def agence(self) -> str:
+        for text in self._text_elements(r'[A-Z][A-Z\s]+'):
+            if len(text.strip()) > 3 and text.isupper():
+                return text.strip()
+        return "Agence non trouvée"
+
+    @cached_property
+    def coordinates(self) -> Dict:
+        for selector in LEAFLET_SELECTORS:
+            for element in self.body.select(selector):
+                style = element.get('style')
+                if style and 'translate3d' in style:
+                    coordinates = coordinates_from_style(style)
+                    if coordinates:
+                        return coordinates
+        print("   ❌ Aucune coordonnée valide trouvée")
+        return {"latitude": None, "longitude": None, "error": "No valid coordinates found"}
+
+    def photos(self, alt: str) -> List[Dict]:
+        """
+        Photos de l'annonce (galeries, sinon images de la page), dédupliquées
+
+        Args:
+            alt: Description commune des photos (format_photo_description)
+        """
+        photos = []
+        for selector, img_elements in zip(GALLERY_SELECTORS, self.galleries):
+            if img_elements is None:
+                continue
+            print(f"      🎯 Div galerie trouvée ({selector}), extraction des images visibles...")
+            photos.extend(select_gallery_photos(img_elements, alt))
+
+        if not photos:
+            print("      ⚠️ Aucune photo dans la galerie, recherche d'images visibles...")
+            photos = select_page_photos(self.images, alt)
+
+        unique_photos = dedupe_photos(photos)
+        print(f"   ✅ {len(unique_photos)} photos d'appartement trouvées")
+        return unique_photos
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Déclinaisons responsive des photos (plusieurs largeurs, WebP + JPEG)
+
+Générées au téléchargement dans un sous-dossier derivatives/ à côté de
+l'original (les scans *.jpg existants ne les voient pas):
+
+    data/photos/<id>/photo1.jpg
+    data/photos/<id>/derivatives/photo1.w320.webp
+    data/photos/<id>/derivatives/photo1.w320.jpg
+    ...
+
+Les largeurs produites sont enregistrées dans le manifeste des photos
+(photo_manifest.py), si bien que le rendu construit les srcset sans I/O.
+`python photo_derivatives.py` génère les déclinaisons manquantes de toutes
+les photos du manifeste.
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from PIL import Image
+
+# Largeurs servies (cartes du scorecard: 1 à 3 colonnes, écrans haute densité)
+DERIVATIVE_WIDTHS = (320, 640, 960)
+DERIVATIVE_FORMATS = {'webp': ('WEBP', {'quality': 75, 'method': 4}),
+                      'jpg': ('JPEG', {'quality': 80, 'optimize': True, 'progressive': True})}
+DERIVATIVES_DIR = 'derivatives'
+
+# Largeur affichée selon la grille du scorecard (3, 2 puis 1 colonne)
+CARD_IMAGE_SIZES = "(max-width: 600px) 100vw, (max-width: 1000px) 50vw, 33vw"
+
+
+def derivative_path(path: str, width: int, ext: str) -> str:
+    """Chemin d'une déclinaison: <dossier>/derivatives/<nom>.w<largeur>.<ext>"""
+    original = Path(path)
+    return (original.parent / DERIVATIVES_DIR / f"{original.stem}.w{width}.{ext}").as_posix()
+
+
+def generate_derivatives(path: str, widths=DERIVATIVE_WIDTHS, force: bool = False) -> Optional[Dict]:
+    """
+    Génère les déclinaisons d'une photo (sans agrandir l'original)
+
+    Les déclinaisons plus récentes que l'original ne sont pas régénérées.
+
+    Args:
+        path: Chemin de la photo originale
+        widths: Largeurs cibles
+        force: Régénérer même si à jour
+
+    Returns:
+        {'width': largeur de l'original, 'widths': [largeurs produites]} ou None si illisible
+    """
+    try:
+        source_mtime = os.path.getmtime(path)
+        with Image.open(path) as image:
+            image.load()
+            original_width, original_height = image.size
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+
+            produced = []
+            for width in sorted(widths):
+                if width >= original_width:
+                    break
+                height = max(1, round(original_height * width / original_width))
+                resized = None
+                for ext, (image_format, options) in DERIVATIVE_FORMATS.items():
+                    target = derivative_path(path, width, ext)
+                    if not force and os.path.exists(target) and os.path.getmtime(target) >= source_mtime:
+                        continue
+                    if resized is None:
+                        resized = image.resize((width, height), Image.LANCZOS)
+                    os.makedirs(os.path.dirname(target), exist_ok=True)
+                    tmp_target = f"{target}.tmp"
+                    resized.save(tmp_target, format=image_format, **options)
+                    os.replace(tmp_target, target)
+                produced.append(width)
+    except Exception as e:
+        print(f"      ⚠️ Déclinaisons impossibles pour {path}: {e}")
+        return None
+
+    return {'width': original_width, 'widths': produced}
+
+
+def _srcset(url: str, path: str, info: Dict, ext: str) -> str:
+    """srcset des déclinaisons (+ l'original pour le JPEG)"""
+    prefix = url[:len(url) - len(path)]
+    candidates = [f"{prefix}{derivative_path(path, width, ext)} {width}w" for width in info.get('widths', [])]
+    if ext == 'jpg' and info.get('width'):
+        candidates.append(f"{url} {info['width']}w")
+    return ', '.join(candidates)
+
+
+def responsive_image(url: str, path: str, info: Optional[Dict]) -> Dict[str, str]:
+    """
+    Sources responsive d'une photo locale
+
+    Args:
+        url: URL servie de l'original (ex: ../data/photos/1/photo1.jpg)
+        path: Chemin de l'original relatif à la racine du projet (suffixe de url)
+        info: Déclinaisons enregistrées ({'width', 'widths'}), None si aucune
+
+    Returns:
+        {'src', 'srcset', 'webp_srcset'} (srcset vides sans déclinaison)
+    """
+    if not info or not info.get('widths'):
+        return {'src': url, 'srcset': '', 'webp_srcset': ''}
+    return {
+        'src': url,
+        'srcset': _srcset(url, path, info, 'jpg'),
+        'webp_srcset': _srcset(url, path, info, 'webp'),
+    }
+
+
+def generate_all_derivatives(apartment_ids: Optional[List[str]] = None) -> int:
+    """Génère les déclinaisons manquantes des photos du manifeste; retourne le nombre de photos traitées"""
+    from photo_manifest import get_photo_manifest
+
+    manifest = get_photo_manifest()
+    count = 0
+    for apartment_id in apartment_ids or manifest.apartment_ids():
+        for path in manifest.photos_for(apartment_id):
+            info = generate_derivatives(path)
+            if info is not None:
+                manifest.record_derivatives(path, info)
+                count += 1
+    return count
+
+
+if __name__ == "__main__":
+    count = generate_all_derivatives(sys.argv[1:] or None)
+    print(f"✅ Déclinaisons à jour pour {count} photos")
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Couche de téléchargement partagée pour les photos
+
+- Session HTTP persistante (pool de connexions keep-alive, thread-safe)
+- Corps des réponses conservés dans le store adressé par contenu (photo_store)
+- Revalidation conditionnelle (If-None-Match / If-Modified-Since): une photo
+  inchangée coûte un 304 sans corps, et n'est revalidée qu'une fois par run
+- Photo déjà stockée sans ETag ni Last-Modified: servie depuis le store sans
+  requête (rien ne permettrait de la revalider sans la re-télécharger)
+"""
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from photo_store import PhotoStore, get_photo_store
+
+
+class PhotoFetcher:
+    """Télécharge les photos au plus une fois par changement"""
+
+    def __init__(self, store: Optional[PhotoStore] = None, pool_size: int = 16):
+        """
+        Args:
+            store: Store de photos (data/photo_store par défaut)
+            pool_size: Taille du pool de connexions HTTP
+        """
+        self.store = store or get_photo_store()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        # URLs déjà téléchargées ou revalidées pendant ce run → chemin du blob
+        self._validated: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self.stats = {'downloaded': 0, 'not_modified': 0, 'memory_hits': 0, 'store_hits': 0, 'errors': 0}
+
+    def _count(self, stat: str):
+        """Incrémente un compteur (fetcher partagé entre threads)"""
+        with self._lock:
+            self.stats[stat] += 1
+
+    def fetch(self, url: str, timeout: float = 10, force: bool = False) -> Optional[Dict[str, str]]:
+        """
+        Récupère une photo (réseau uniquement si nouvelle ou modifiée)
+
+        Args:
+            url: URL de la photo
+            timeout: Timeout en secondes
+            force: Ignorer le cache et re-télécharger le corps
+
+        Returns:
+            {'digest': ..., 'path': ..., 'deduplicated': bool} ou None en cas d'échec
+            ('deduplicated': contenu téléchargé mais déjà présent sous une autre URL)
+        """
+        if not url:
+            return None
+
+        if not force:
+            with self._lock:
+                path = self._validated.get(url)
+            if path:
+                self._count('memory_hits')
+                return {'digest': self.store.digest_for_url(url), 'path': path}
+
+        cached_path = None if force else self.store.lookup_url(url)
+        headers = {}
+        if cached_path:
+            validators = self.store.validators_for_url(url)
+            if not validators.get('etag') and not validators.get('last_modified'):
+                # Pas de requête conditionnelle possible: le blob stocké fait foi (force=True pour rafraîchir)
+                self._count('store_hits')
+                with self._lock:
+                    self._validated[url] = cached_path
+                return {'digest': self.store.digest_for_url(url), 'path': cached_path}
+            if validators.get('etag'):
+                headers['If-None-Match'] = validators['etag']
+            if validators.get('last_modified'):
+                headers['If-Modified-Since'] = validators['last_modified']
+
+        try:
+            response = self.session.get(url, headers=headers, timeout=timeout)
+        except Exception as e:
+            self._count('errors')
+            print(f"   ⚠️  Erreur téléchargement {url[:60]}...: {e}")
+            # Hors ligne: la copie locale reste utilisable
+            return {'digest': self.store.digest_for_url(url), 'path': cached_path} if cached_path else None
+
+        if response.status_code == 304 and cached_path:
+            self._count('not_modified')
+            result = {'digest': self.store.digest_for_url(url), 'path': cached_path}
+        elif response.status_code == 200:
+            self._count('downloaded')
+            result = self.store.put(
+                response.content,
+                url=url,
+                etag=response.headers.get('ETag'),
+                last_modified=response.headers.get('Last-Modified')
+            )
+        else:
+            self._count('errors')
+            print(f"   ⚠️  Erreur HTTP {response.status_code} pour {url[:60]}...")
+            return None
+
+        with self._lock:
+            self._validated[url] = result['path']
+        return {
+            'digest': result['digest'],
+            'path': result['path'],
+            'deduplicated': result.get('deduplicated', False)
+        }
+
+    def fetch_bytes(self, url: str, timeout: float = 10, force: bool = False) -> Optional[bytes]:
+        """
+        Récupère le contenu binaire d'une photo (voir fetch())
+
+        Returns:
+            Octets de l'image ou None
+        """
+        result = self.fetch(url, timeout=timeout, force=force)
+        if not result:
+            return None
+        try:
+            with open(result['path'], 'rb') as f:
+                return f.read()
+        except OSError as e:
+            print(f"   ⚠️  Erreur lecture {result['path']}: {e}")
+            return None
+
+
+# Instance globale partagée par les analyseurs
+_global_fetcher = None
+_global_fetcher_lock = threading.Lock()
+
+def get_photo_fetcher() -> PhotoFetcher:
+    """Retourne l'instance globale du fetcher de photos"""
+    global _global_fetcher
+    if _global_fetcher is None:
+        with _global_fetcher_lock:
+            if _global_fetcher is None:
+                _global_fetcher = PhotoFetcher()
+    return _global_fetcher
@@ -5,73 +5,34 @@ Télécharge les photos en local et les utilise pour les analyses
 """
 
 import os
-import requests
 from pathlib import Path
 from typing import List, Dict, Optional
-from urllib.parse import urlparse
-import hashlib
+from photo_store import PhotoStore, get_photo_store
+from photo_fetcher import PhotoFetcher, get_photo_fetcher
+from photo_manifest import PhotoManifest, get_photo_manifest
+from photo_derivatives import generate_derivatives
 
 
 class PhotoManager:
     """Gestionnaire de téléchargement et stockage des photos"""
     
-    def __init__(self, base_dir: str = "data/photos"):
+    def __init__(
+        self,
+        store: Optional[PhotoStore] = None,
+        fetcher: Optional[PhotoFetcher] = None,
+        manifest: Optional[PhotoManifest] = None
+    ):
         """
         Initialise le gestionnaire de photos
         
         Args:
-            base_dir: Répertoire de base pour stocker les photos
+            store: Store adressé par contenu (data/photo_store par défaut)
+            fetcher: Couche de téléchargement partagée (session + revalidation)
+            manifest: Manifeste des photos locales lu par le rendu HTML
         """
-        self.base_dir = Path(base_dir)
-        self.base_dir.mkdir(parents=True, exist_ok=True)
-    
-    def get_photo_filename(self, url: str, index: int) -> str:
-        """
-        Génère un nom de fichier unique pour une photo
-        
-        Args:
-            url: URL de la photo
-            index: Index de la photo (1, 2, 3...)
-        
-        Returns:
-            Nom de fichier (ex: photo_1_abc123.jpg)
-        """
-        # Créer un hash de l'URL pour éviter les doublons
-        url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
-        
-        # Extraire l'extension depuis l'URL ou utiliser .jpg par défaut
-        parsed = urlparse(url)
-        ext = Path(parsed.path).suffix or '.jpg'
-        if ext not in ['.jpg', '.jpeg', '.png', '.webp']:
-            ext = '.jpg'
-        
-        return f"photo_{index}_{url_hash}{ext}"
-    
-    def download_photo(self, url: str, local_path: Path, timeout: int = 30) -> bool:
-        """
-        Télécharge une photo depuis une URL
-        
-        Args:
-            url: URL de la photo
-            local_path: Chemin local où sauvegarder
-            timeout: Timeout en secondes
-        
-        Returns:
-            True si succès, False sinon
-        """
-        try:
-            response = requests.get(url, timeout=timeout, stream=True)
-            if response.status_code == 200:
-                with open(local_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                return True
-            else:
-                print(f"   ⚠️  Erreur HTTP {response.status_code} pour {url[:60]}...")
-                return False
-        except Exception as e:
-            print(f"   ⚠️  Erreur téléchargement {url[:60]}...: {e}")
-            return False
+        self.store = store or get_photo_store()
+        self.fetcher = fetcher or (get_photo_fetcher() if store is None else PhotoFetcher(store=self.store))
+        self.manifest = manifest or get_photo_manifest()
     
     def download_apartment_photos(
         self, 
@@ -80,7 +41,12 @@ class PhotoManager:
         force_redownload: bool = False
     ) -> Dict:
         """
-        Télécharge les photos d'un appartement en local
+        Télécharge les photos d'un appartement dans le store adressé par contenu
+        
+        Les URLs déjà connues du store ne sont pas re-téléchargées, et une photo
+        identique à une photo d'un autre appartement n'est stockée qu'une fois.
+        Le manifeste de l'appartement (ordre des photos) et le manifeste des
+        photos locales lu par le rendu HTML sont mis à jour.
         
         Args:
             apartment_data: Données de l'appartement (avec photos)
@@ -88,7 +54,7 @@ class PhotoManager:
             force_redownload: Forcer le re-téléchargement même si déjà présent
         
         Returns:
-            Données de l'appartement avec local_path ajouté aux photos
+            Données de l'appartement avec local_path et digest ajoutés aux photos
         """
         apartment_id = apartment_data.get('id')
         if not apartment_id:
@@ -98,13 +64,10 @@ class PhotoManager:
         if not photos:
             return apartment_data
         
-        # Créer le dossier pour cet appartement
-        apartment_dir = self.base_dir / str(apartment_id)
-        apartment_dir.mkdir(parents=True, exist_ok=True)
-        
         downloaded_photos = []
         downloaded_count = 0
         skipped_count = 0
+        deduplicated_count = 0
         
         for i, photo in enumerate(photos[:max_photos], 1):
             if isinstance(photo, str):
@@ -117,21 +80,20 @@ class PhotoManager:
             if not url:
                 continue
             
-            # Générer le nom de fichier
-            filename = self.get_photo_filename(url, i)
-            local_path = apartment_dir / filename
-            
             # Préparer les données de la photo
             if isinstance(photo, dict):
                 photo_data = photo.copy()
             else:
                 photo_data = {'url': photo}
             
-            # Vérifier si déjà téléchargée
-            if local_path.exists() and not force_redownload:
+            # Vérifier si déjà téléchargée (lookup URL → digest)
+            existing_path = None if force_redownload else self.store.lookup_url(url)
+            if existing_path:
                 skipped_count += 1
+                self.ensure_derivatives(existing_path)
                 photo_data.update({
-                    'local_path': str(local_path),
+                    'local_path': existing_path,
+                    'digest': self.store.digest_for_url(url),
                     'alt': alt,
                     'downloaded': False  # Déjà présente
                 })
@@ -140,15 +102,21 @@ class PhotoManager:
             
             # Télécharger la photo
             print(f"   📥 Photo {i}/{min(len(photos), max_photos)}: {url[:60]}...")
-            if self.download_photo(url, local_path):
-                downloaded_count += 1
+            stored = self.fetcher.fetch(url, timeout=30, force=force_redownload)
+            if stored:
+                if stored.get('deduplicated'):
+                    deduplicated_count += 1
+                else:
+                    downloaded_count += 1
                 photo_data.update({
-                    'local_path': str(local_path),
+                    'local_path': stored['path'],
+                    'digest': stored['digest'],
                     'alt': alt,
                     'downloaded': True
                 })
                 downloaded_photos.append(photo_data)
-                print(f"      ✅ Sauvegardée: {local_path}")
+                print(f"      ✅ Sauvegardée: {stored['path']}")
+                self.ensure_derivatives(stored['path'])
             else:
                 # Même en cas d'échec, garder l'URL originale
                 photo_data.update({
@@ -161,11 +129,34 @@ class PhotoManager:
         # Mettre à jour les données de l'appartement
         apartment_data['photos'] = downloaded_photos
         
-        if downloaded_count > 0 or skipped_count > 0:
-            print(f"   📊 {downloaded_count} téléchargées, {skipped_count} déjà présentes")
+        # Manifeste ordonné des photos de l'appartement
+        self.store.write_manifest(str(apartment_id), [
+            {'url': p['url'], 'digest': p.get('digest'), 'path': p.get('local_path'), 'alt': p.get('alt', '')}
+            for p in downloaded_photos
+        ])
+        self.manifest.record(apartment_id, 'store', [p['local_path'] for p in downloaded_photos if p.get('local_path')])
+        
+        if downloaded_count > 0 or skipped_count > 0 or deduplicated_count > 0:
+            print(f"   📊 {downloaded_count} téléchargées, {skipped_count} déjà présentes, "
+                  f"{deduplicated_count} identiques à des photos existantes")
         
         return apartment_data
     
+    def ensure_derivatives(self, path: str):
+        """
+        Génère les déclinaisons responsive (largeurs, WebP/JPEG) d'une photo du store
+        
+        Les blobs étant adressés par contenu, une photo déjà déclinée ne l'est pas à nouveau.
+        
+        Args:
+            path: Chemin du blob
+        """
+        if self.manifest.derivatives_for(path) is not None:
+            return
+        info = generate_derivatives(path)
+        if info is not None:
+            self.manifest.record_derivatives(path, info)
+    
     def get_photo_path(self, photo: Dict) -> Optional[str]:
         """
         Retourne le chemin local d'une photo si disponible, sinon None
@@ -218,12 +209,7 @@ class PhotoManager:
         # Fallback : télécharger depuis l'URL
         url = photo.get('url')
         if url:
-            try:
-                response = requests.get(url, timeout=30)
-                if response.status_code == 200:
-                    return response.content
-            except Exception as e:
-                print(f"   ⚠️  Erreur téléchargement {url[:60]}...: {e}")
+            return self.fetcher.fetch_bytes(url, timeout=30)
         
         return None
 
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Manifeste persistant des photos locales de chaque appartement
+
+Les chemins de téléchargement (PhotoManager, JinkaScraper) enregistrent la
+liste ordonnée et déjà filtrée (logos, placeholders) des photos qu'ils
+viennent d'écrire. Le rendu HTML lit cette liste en mémoire, sans parcourir
+data/photos_v2/<id> ni data/photos/<id>.
+
+- data/photo_manifest.jsonl : une ligne par mise à jour
+  {"id": ..., "source": "store" | "photos_v2" | "photos", "photos": [...]}
+  {"path": ..., "derivatives": {"width": ..., "widths": [...]}} (photo_derivatives.py)
+  (journal en ajout seul, la dernière ligne pour un couple id/source l'emporte)
+
+Les scripts qui modifient ces dossiers (download_apartment_photos.py,
+cleanup_duplicate_photos.py) rescannent l'appartement concerné. Un
+appartement absent du manifeste (photos antérieures au manifeste), ou
+enregistré sans aucune photo, est scanné puis enregistré;
+`python photo_manifest.py --rebuild` reconstruit tout le manifeste depuis
+les dossiers.
+"""
+
+import json
+import os
+import sys
+import threading
+from typing import Dict, List, Optional
+
+from photo_store import get_photo_store
+
+PHOTO_MANIFEST_FILE = 'data/photo_manifest.jsonl'
+
+# Sources de photos locales, par ordre de priorité
+PHOTO_SOURCES = ('store', 'photos_v2', 'photos')
+PHOTO_DIRS = {'photos_v2': 'data/photos_v2', 'photos': 'data/photos'}
+
+PHOTO_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Noms de fichiers/URLs à exclure (logos, placeholders)
+EXCLUDED_PATTERNS = [
+    'AppStore.png',
+    'GoogleStore.png',
+    'Logo-Jinka',
+    'logo-',
+    'source_logos',
+    'no-picture.png',
+    'placeholder',
+    'icon',
+    'logo'
+]
+
+
+def is_excluded_photo(name: str) -> bool:
+    """True si le nom (ou l'URL) correspond à un logo ou un placeholder"""
+    name = name.lower()
+    return any(pattern.lower() in name for pattern in EXCLUDED_PATTERNS)
+
+
+def _photo_number(filename: str) -> int:
+    """photo1.jpg -> 1, photo2.jpg -> 2 (9999 pour les autres noms)"""
+    stem = os.path.splitext(filename)[0]
+    if stem.startswith('photo') and stem[5:].isdigit():
+        return int(stem[5:])
+    return 9999
+
+
+def scan_photo_dir(source: str, apartment_id: str) -> List[str]:
+    """
+    Liste ordonnée et filtrée des photos d'un dossier local (ancien parcours du rendu)
+
+    Args:
+        source: 'photos_v2' (photo_*.jpg, plus récentes d'abord) ou 'photos' (photo1.jpg, photo2.jpg...)
+        apartment_id: ID de l'appartement
+
+    Returns:
+        Chemins relatifs à la racine du projet
+    """
+    photos_dir = f"{PHOTO_DIRS[source]}/{apartment_id}"
+    if not os.path.isdir(photos_dir):
+        return []
+
+    photo_files = []
+    for filename in os.listdir(photos_dir):
+        if not filename.endswith(PHOTO_EXTENSIONS) or is_excluded_photo(filename):
+            continue
+        if source == 'photos_v2' and not filename.startswith('photo_'):
+            continue
+        file_mtime = os.path.getmtime(os.path.join(photos_dir, filename))
+        if source == 'photos_v2':
+            # Plus récent en premier
+            photo_files.append(((-file_mtime,), filename))
+        else:
+            # Par numéro (photo1, photo2, etc.), puis par date
+            photo_files.append(((_photo_number(filename), file_mtime), filename))
+
+    photo_files.sort()
+    return [f"{photos_dir}/{filename}" for _, filename in photo_files]
+
+
+def scan_store_manifest(apartment_id: str) -> List[str]:
+    """Chemins des blobs listés par le manifeste du store (ordre de l'annonce)"""
+    return [
+        photo['path'] for photo in get_photo_store().load_manifest(apartment_id)
+        if photo.get('path') and os.path.exists(photo['path'])
+    ]
+
+
+class PhotoManifest:
+    """Photos locales ordonnées par appartement et par source, gardées en mémoire"""
+
+    def __init__(self, manifest_file: str = PHOTO_MANIFEST_FILE):
+        """
+        Args:
+            manifest_file: Journal JSONL du manifeste
+        """
+        self.manifest_file = manifest_file
+        self._entries: Optional[Dict[str, Dict[str, List[str]]]] = None
+        self._derivatives: Dict[str, Dict] = {}
+        self._offset = 0
+        self._lock = threading.Lock()
+
+    def _read_journal(self, entries: Dict[str, Dict[str, List[str]]], offset: int) -> int:
+        """Applique les lignes du journal à partir de offset; retourne la nouvelle position"""
+        if not os.path.exists(self.manifest_file):
+            return 0
+        with open(self.manifest_file, 'rb') as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Ligne en cours d'écriture par un autre processus: relue au prochain refresh
+                    break
+                offset += len(line)
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get('source') in PHOTO_SOURCES:
+                    entries.setdefault(str(entry['id']), {})[entry['source']] = entry.get('photos', [])
+                elif 'derivatives' in entry:
+                    self._derivatives[entry['path']] = entry['derivatives']
+        return offset
+
+    def _load(self) -> Dict[str, Dict[str, List[str]]]:
+        """Charge le manifeste (au premier accès)"""
+        if self._entries is None:
+            entries = {}
+            self._derivatives = {}
+            self._offset = self._read_journal(entries, 0)
+            self._entries = entries
+        return self._entries
+
+    def refresh(self):
+        """
+        Relit les lignes ajoutées par d'autres processus (scraper, téléchargements)
+
+        Un seul stat du journal: à appeler une fois par génération, pas par appartement.
+        """
+        with self._lock:
+            if self._entries is None:
+                self._load()
+                return
+            try:
+                size = os.path.getsize(self.manifest_file)
+            except OSError:
+                size = 0
+            if size < self._offset:
+                # Journal réécrit (compaction): rechargement complet
+                self._entries = None
+                self._load()
+            elif size > self._offset:
+                self._offset = self._read_journal(self._entries, self._offset)
+
+    def record(self, apartment_id, source: str, photos: List[str]):
+        """
+        Enregistre la liste ordonnée des photos d'une source pour un appartement
+
+        Args:
+            apartment_id: ID de l'appartement
+            source: 'store', 'photos_v2' ou 'photos'
+            photos: Chemins relatifs à la racine du projet, déjà filtrés
+        """
+        if source not in PHOTO_SOURCES:
+            raise ValueError(f"Source de photos inconnue: {source}")
+        apartment_id = str(apartment_id)
+        photos = list(photos)
+        with self._lock:
+            entries = self._load()
+            if entries.get(apartment_id, {}).get(source) == photos:
+                return
+            entries.setdefault(apartment_id, {})[source] = photos
+            self._append({'id': apartment_id, 'source': source, 'photos': photos})
+
+    def _append(self, entry: Dict):
+        """Ajoute une ligne au journal"""
+        os.makedirs(os.path.dirname(self.manifest_file) or '.', exist_ok=True)
+        # La position de lecture n'avance pas: les lignes d'autres processus écrites
+        # avant celle-ci seront relues au prochain refresh (réappliquer la nôtre est sans effet)
+        with open(self.manifest_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def record_derivatives(self, path: str, info: Dict):
+        """
+        Enregistre les déclinaisons générées pour une photo
+
+        Args:
+            path: Chemin de la photo originale
+            info: {'width': largeur de l'original, 'widths': [largeurs des déclinaisons]}
+        """
+        with self._lock:
+            self._load()
+            if self._derivatives.get(path) == info:
+                return
+            self._derivatives[path] = info
+            self._append({'path': path, 'derivatives': info})
+
+    def derivatives_for(self, path: str) -> Optional[Dict]:
+        """Déclinaisons enregistrées d'une photo ({'width', 'widths'}), None si aucune"""
+        with self._lock:
+            self._load()
+            return self._derivatives.get(path)
+
+    def apartment_ids(self) -> List[str]:
+        """IDs des appartements présents dans le manifeste"""
+        with self._lock:
+            return list(self._load())
+
+    def scan(self, apartment_id):
+        """Enregistre les photos actuellement sur disque pour toutes les sources d'un appartement"""
+        apartment_id = str(apartment_id)
+        self.record(apartment_id, 'store', scan_store_manifest(apartment_id))
+        for source in PHOTO_DIRS:
+            self.record(apartment_id, source, scan_photo_dir(source, apartment_id))
+
+    def photos_for(self, apartment_id) -> List[str]:
+        """
+        Photos locales d'un appartement (source la plus prioritaire non vide)
+
+        Sans I/O disque, sauf pour un appartement inconnu ou enregistré sans photo
+        (photos téléchargées depuis par un script qui ne tient pas le manifeste à jour).
+        """
+        apartment_id = str(apartment_id)
+        with self._lock:
+            entry = self._load().get(apartment_id)
+        if entry is None or not any(entry.get(source) for source in PHOTO_SOURCES):
+            self.scan(apartment_id)
+            with self._lock:
+                entry = self._load().get(apartment_id, {})
+        for source in PHOTO_SOURCES:
+            if entry.get(source):
+                return list(entry[source])
+        return []
+
+    def rebuild(self) -> int:
+        """
+        Reconstruit le manifeste depuis les dossiers (journal compacté)
+
+        Les déclinaisons déjà enregistrées sont conservées pour les photos toujours listées.
+
+        Returns:
+            Nombre d'appartements enregistrés
+        """
+        apartment_ids = set(self._load())
+        for photos_dir in PHOTO_DIRS.values():
+            if os.path.isdir(photos_dir):
+                apartment_ids.update(os.listdir(photos_dir))
+        store_manifests = get_photo_store().manifests_dir
+        if store_manifests.is_dir():
+            apartment_ids.update(path.stem for path in store_manifests.glob('*.json'))
+
+        entries = {}
+        for apartment_id in sorted(apartment_ids):
+            sources = {'store': scan_store_manifest(apartment_id)}
+            for source in PHOTO_DIRS:
+                sources[source] = scan_photo_dir(source, apartment_id)
+            entries[apartment_id] = sources
+        listed = {path for sources in entries.values() for photos in sources.values() for path in photos}
+        derivatives = {path: info for path, info in self._derivatives.items() if path in listed}
+
+        with self._lock:
+            os.makedirs(os.path.dirname(self.manifest_file) or '.', exist_ok=True)
+            tmp_file = f"{self.manifest_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                for apartment_id, sources in entries.items():
+                    for source, photos in sources.items():
+                        f.write(json.dumps({'id': apartment_id, 'source': source, 'photos': photos}, ensure_ascii=False) + '\n')
+                for path, info in derivatives.items():
+                    f.write(json.dumps({'path': path, 'derivatives': info}, ensure_ascii=False) + '\n')
+            os.replace(tmp_file, self.manifest_file)
+            self._entries = entries
+            self._derivatives = derivatives
+            self._offset = os.path.getsize(self.manifest_file)
+        return len(entries)
+
+
+# Instance globale du manifeste
+_global_manifest = None
+
+def get_photo_manifest() -> PhotoManifest:
+    """Retourne l'instance globale du manifeste de photos"""
+    global _global_manifest
+    if _global_manifest is None:
+        _global_manifest = PhotoManifest()
+    return _global_manifest
+
+
+if __name__ == "__main__":
+    if '--rebuild' in sys.argv:
+        count = get_photo_manifest().rebuild()
+        print(f"✅ Manifeste des photos reconstruit: {count} appartements ({PHOTO_MANIFEST_FILE})")
+    else:
+        print("Usage: python photo_manifest.py --rebuild")
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Stockage des photos adressé par contenu (SHA-256)
+
+- data/photo_store/blobs/ab/cd/<sha256>.jpg : une seule copie par contenu,
+  même si la photo est republiée par l'agence sur plusieurs annonces
+- data/photo_store/url_index.jsonl : URL → digest (journal en ajout seul)
+- data/photo_store/manifests/<id>.json : photos ordonnées d'un appartement
+"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+
+ALLOWED_EXTENSIONS = ['.jpg', '.jpeg', '.png', '.webp']
+
+
+class PhotoStore:
+    """Store de photos adressé par contenu avec manifeste par appartement"""
+
+    def __init__(self, root_dir: str = "data/photo_store"):
+        """
+        Args:
+            root_dir: Répertoire racine du store
+        """
+        self.root_dir = Path(root_dir)
+        self.blobs_dir = self.root_dir / "blobs"
+        self.manifests_dir = self.root_dir / "manifests"
+        self.url_index_file = self.root_dir / "url_index.jsonl"
+        self._url_index: Optional[Dict[str, Dict[str, str]]] = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Index URL → digest
+    # ------------------------------------------------------------------
+
+    def _load_url_index(self) -> Dict[str, Dict[str, str]]:
+        """Charge l'index URL → digest (au premier accès)"""
+        if self._url_index is not None:
+            return self._url_index
+
+        index = {}
+        if self.url_index_file.exists():
+            with open(self.url_index_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    # La dernière entrée pour une URL l'emporte
+                    url = entry.pop('url')
+                    entry.setdefault('ext', '.jpg')
+                    index[url] = entry
+
+        self._url_index = index
+        return index
+
+    def _record_url(self, url: str, entry: Dict[str, str]):
+        """Ajoute une entrée URL → digest (une ligne, sans réécrire l'index)"""
+        index = self._load_url_index()
+        if index.get(url) == entry:
+            return
+        index[url] = entry
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.url_index_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'url': url, **entry}) + '\n')
+
+    def lookup_url(self, url: str) -> Optional[str]:
+        """
+        Retourne le chemin du blob déjà stocké pour cette URL, ou None
+
+        Args:
+            url: URL de la photo
+        """
+        with self._lock:
+            entry = self._load_url_index().get(url)
+        if not entry:
+            return None
+        path = self.blob_path(entry['digest'], entry['ext'])
+        return str(path) if path.exists() else None
+
+    def digest_for_url(self, url: str) -> Optional[str]:
+        """Retourne le digest SHA-256 connu pour une URL, ou None"""
+        with self._lock:
+            entry = self._load_url_index().get(url)
+        return entry['digest'] if entry else None
+
+    def validators_for_url(self, url: str) -> Dict[str, str]:
+        """Retourne les validateurs HTTP connus (etag, last_modified) pour une URL"""
+        with self._lock:
+            entry = self._load_url_index().get(url) or {}
+        return {key: entry[key] for key in ('etag', 'last_modified') if entry.get(key)}
+
+    def analysis_key(self, url: str) -> str:
+        """
+        Clé de cache d'analyse pour une photo: digest du contenu si connu, sinon l'URL
+
+        Une photo identique publiée sous plusieurs URLs n'est ainsi analysée qu'une fois.
+        """
+        digest = self.digest_for_url(url)
+        return f"sha256:{digest}" if digest else url
+
+    # ------------------------------------------------------------------
+    # Blobs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def extension_for_url(url: str) -> str:
+        """Extension de fichier à partir de l'URL (.jpg par défaut)"""
+        ext = Path(urlparse(url).path).suffix.lower() or '.jpg'
+        return ext if ext in ALLOWED_EXTENSIONS else '.jpg'
+
+    def blob_path(self, digest: str, ext: str = '.jpg') -> Path:
+        """Chemin shardé d'un blob: blobs/ab/cd/<digest><ext>"""
+        return self.blobs_dir / digest[:2] / digest[2:4] / f"{digest}{ext}"
+
+    def put(
+        self,
+        content: bytes,
+        url: Optional[str] = None,
+        ext: Optional[str] = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Stocke un contenu (une seule fois) et enregistre son URL
+
+        Args:
+            content: Octets de l'image
+            url: URL d'origine (optionnel)
+            ext: Extension (déduite de l'URL par défaut)
+            etag: En-tête ETag de la réponse (revalidation conditionnelle)
+            last_modified: En-tête Last-Modified de la réponse
+
+        Returns:
+            {'digest': ..., 'path': ..., 'deduplicated': bool}
+        """
+        digest = hashlib.sha256(content).hexdigest()
+        ext = ext or (self.extension_for_url(url) if url else '.jpg')
+        path = self.blob_path(digest, ext)
+
+        deduplicated = path.exists()
+        if not deduplicated:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+
+        if url:
+            entry = {'digest': digest, 'ext': ext}
+            if etag:
+                entry['etag'] = etag
+            if last_modified:
+                entry['last_modified'] = last_modified
+            with self._lock:
+                self._record_url(url, entry)
+
+        return {'digest': digest, 'path': str(path), 'deduplicated': deduplicated}
+
+    # ------------------------------------------------------------------
+    # Manifestes par appartement
+    # ------------------------------------------------------------------
+
+    def manifest_path(self, apartment_id: str) -> Path:
+        return self.manifests_dir / f"{apartment_id}.json"
+
+    def write_manifest(self, apartment_id: str, photos: List[Dict]):
+        """
+        Enregistre la liste ordonnée des photos d'un appartement
+
+        Args:
+            apartment_id: ID de l'appartement
+            photos: Photos avec au moins 'url', 'digest' et 'path'
+        """
+        self.manifests_dir.mkdir(parents=True, exist_ok=True)
+        manifest = {
+            'apartment_id': str(apartment_id),
+            'photos': [
+                {
+                    'url': photo.get('url'),
+                    'digest': photo.get('digest'),
+                    'path': photo.get('path'),
+                    'alt': photo.get('alt', ''),
+                }
+                for photo in photos if photo.get('digest')
+            ]
+        }
+        path = self.manifest_path(apartment_id)
+        tmp_path = path.with_name(f"{path.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, path)
+
+    def load_manifest(self, apartment_id: str) -> List[Dict]:
+        """Retourne les photos du manifeste d'un appartement ([] si absent)"""
+        path = self.manifest_path(apartment_id)
+        if not path.exists():
+            return []
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                return json.load(f).get('photos', [])
+        except Exception as e:
+            print(f"⚠️ Erreur lecture manifeste {path}: {e}")
+            return []
+
+
+# Instance globale du store
+_global_store = None
+
+def get_photo_store() -> PhotoStore:
+    """Retourne l'instance globale du store de photos"""
+    global _global_store
+    if _global_store is None:
+        _global_store = PhotoStore()
+    return _global_store
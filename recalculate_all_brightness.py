@@ -5,16 +5,25 @@ et met à jour le cache
 """
 
 import json
-import os
 import glob
-from analyze_photos import PhotoAnalyzer
+from concurrent.futures import ThreadPoolExecutor
 from cache_api import get_cache
+from photo_fetcher import get_photo_fetcher
+from photo_store import get_photo_store
+from brightness_engine import get_brightness_engine
 
-def recalculate_all_brightness():
-    """Recalcule le brightness pour toutes les photos"""
+def recalculate_all_brightness(force: bool = False):
+    """
+    Recalcule le brightness pour toutes les photos
+    
+    Args:
+        force: Recalculer aussi les photos dont le digest a déjà un résultat
+    """
     
-    analyzer = PhotoAnalyzer()
     cache = get_cache()
+    store = get_photo_store()
+    fetcher = get_photo_fetcher()
+    engine = get_brightness_engine()
     
     # Trouver tous les fichiers d'appartements
     apartment_files = glob.glob("data/appartements/*.json")
@@ -24,89 +33,69 @@ def recalculate_all_brightness():
     print(f"   {len(apartment_files)} appartements trouvés")
     print()
     
-    total_photos = 0
-    calculated_photos = 0
-    error_photos = 0
-    
+    # 1. Collecter les URLs de toutes les photos
+    photo_urls = []
     for apt_file in apartment_files:
         try:
-            # Charger les données de l'appartement
             with open(apt_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-            
-            apt_id = data.get('id', os.path.basename(apt_file).replace('.json', ''))
-            photos = data.get('photos', [])
-            
-            if not photos:
-                continue
-            
-            print(f"🏠 Appartement {apt_id}: {len(photos)} photos")
-            
-            # Extraire les URLs des photos
-            photo_urls = []
-            for photo in photos:
-                if isinstance(photo, dict):
-                    url = photo.get('url')
-                elif isinstance(photo, str):
-                    url = photo
-                else:
-                    continue
-                
-                if url:
-                    photo_urls.append(url)
-            
-            # Calculer le brightness pour chaque photo
-            for i, photo_url in enumerate(photo_urls, 1):
-                total_photos += 1
-                
-                try:
-                    # Vérifier si déjà en cache
-                    cached_result = cache.get('exposition_photo', photo_url)
-                    
-                    # Calculer le brightness même si en cache (pour le mettre à jour)
-                    print(f"   📸 Photo {i}/{len(photo_urls)}: {photo_url[:60]}...")
-                    
-                    # Télécharger l'image
-                    import requests
-                    response = requests.get(photo_url, timeout=10)
-                    if response.status_code != 200:
-                        print(f"      ❌ Erreur téléchargement: {response.status_code}")
-                        error_photos += 1
-                        continue
-                    
-                    # Calculer le brightness
-                    brightness = analyzer._calculate_photo_brightness(response.content)
-                    
-                    # Mettre à jour le cache
-                    if cached_result:
-                        # Mettre à jour l'entrée existante
-                        cached_result['brightness_value'] = brightness
-                        cache.set('exposition_photo', photo_url, cached_result)
-                        print(f"      ✅ Brightness calculé: {brightness:.3f} (cache mis à jour)")
-                    else:
-                        # Créer une nouvelle entrée minimale
-                        new_result = {
-                            'brightness_value': brightness,
-                            'luminosite_relative': 'moyen',  # Valeur par défaut
-                            'score_luminosite': 5,
-                            'confidence': 0.5
-                        }
-                        cache.set('exposition_photo', photo_url, new_result)
-                        print(f"      ✅ Brightness calculé: {brightness:.3f} (nouvelle entrée)")
-                    
-                    calculated_photos += 1
-                    
-                except Exception as e:
-                    print(f"      ❌ Erreur: {e}")
-                    error_photos += 1
-                    continue
-            
-            print()
-            
         except Exception as e:
             print(f"❌ Erreur traitement {apt_file}: {e}")
-            print()
             continue
+        
+        for photo in data.get('photos', []):
+            if isinstance(photo, dict):
+                url = photo.get('url')
+            elif isinstance(photo, str):
+                url = photo
+            else:
+                continue
+            if url:
+                photo_urls.append(url)
+    
+    # Dédupliquer en gardant l'ordre
+    photo_urls = list(dict.fromkeys(photo_urls))
+    total_photos = len(photo_urls)
+    print(f"📸 {total_photos} photos uniques")
+    
+    # 2. Récupérer les photos (store local + revalidation conditionnelle, en parallèle)
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        fetched = list(executor.map(fetcher.fetch, photo_urls))
+    
+    url_to_digest = {}
+    for url, result in zip(photo_urls, fetched):
+        if result and result.get('digest'):
+            url_to_digest[url] = (result['digest'], result['path'])
+    
+    # 3. Calcul en lot (pool de processus, résultats persistés par digest)
+    brightness_by_digest = engine.compute_many(url_to_digest.values(), force=force)
+    
+    # 4. Mettre à jour le cache
+    calculated_photos = 0
+    for url, (digest, _) in url_to_digest.items():
+        brightness = brightness_by_digest.get(digest)
+        if brightness is None:
+            continue
+        
+        # Même clé que PhotoAnalyzer (digest du contenu), entrée par URL en repli
+        key = store.analysis_key(url)
+        cached_result = cache.get('exposition_photo', key) or cache.get('exposition_photo', url)
+        if cached_result:
+            # Mettre à jour l'entrée existante
+            cached_result['brightness_value'] = brightness
+            cache.set('exposition_photo', key, cached_result)
+        else:
+            # Créer une nouvelle entrée minimale
+            cache.set('exposition_photo', key, {
+                'brightness_value': brightness,
+                'luminosite_relative': 'moyen',  # Valeur par défaut
+                'score_luminosite': 5,
+                'confidence': 0.5
+            })
+        calculated_photos += 1
+    
+    error_photos = total_photos - calculated_photos
+    print()
     
     print("=" * 80)
     print("📊 RÉSUMÉ:")
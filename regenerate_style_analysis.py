@@ -109,17 +109,10 @@ def regenerate_all_style_analysis():
     print("🗑️  Vidage du cache des photos de style pour forcer la régénération...")
     cache = analyzer.cache
     cache_cleared = False
-    if hasattr(cache, 'cache') and isinstance(cache.cache, dict):
-        keys_to_remove = []
-        for key, value in cache.cache.items():
-            if isinstance(value, dict) and value.get('analysis_type') == 'style_photo':
-                keys_to_remove.append(key)
-        for key in keys_to_remove:
-            del cache.cache[key]
-        if keys_to_remove:
-            cache._save_cache()
-            print(f"   ✅ {len(keys_to_remove)} entrées de cache style_photo supprimées")
-            cache_cleared = True
+    removed = cache.delete_by_type('style_photo')
+    if removed:
+        print(f"   ✅ {removed} entrées de cache style_photo supprimées")
+        cache_cleared = True
     if not cache_cleared:
         print("   ℹ️  Aucune entrée de cache style_photo trouvée")
     print()
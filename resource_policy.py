@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Politique de blocage des ressources lourdes pendant le scraping HTML
+
+Installée par JinkaScraper.setup() sur tout le contexte (page.route
+appliqué à toutes les pages, y compris celles du pool). Les requêtes
+inutiles à l'extraction sont annulées avant d'être envoyées:
+
+- traceurs et analytics (quel que soit le type de ressource)
+- scripts tiers (hors jinka.fr et bibliothèques nécessaires: carte, captcha)
+- polices et médias (audio/vidéo)
+- en option, le corps des images: les URLs restent lisibles dans le DOM
+  (src, srcset, data-src), ce qui suffit à extract_photos puisque
+  download_apartment_photos retélécharge les photos via aiohttp.
+  Les tuiles de carte restent chargées pour le screenshot de la carte.
+"""
+
+from collections import Counter
+from urllib.parse import urlsplit
+
+# Domaines du site (scripts de l'application conservés)
+FIRST_PARTY_DOMAINS = ('jinka.fr',)
+
+# Scripts tiers nécessaires: carte Leaflet (souvent servie par un CDN), captcha de connexion
+ALLOWED_SCRIPT_PATTERNS = ('leaflet', 'recaptcha', 'gstatic.com', 'hcaptcha')
+
+# Traceurs et analytics, bloqués quel que soit le type (script, xhr, ping, image...)
+TRACKER_PATTERNS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'facebook.net',
+    'facebook.com/tr',
+    'connect.facebook',
+    'hotjar',
+    'segment.io',
+    'segment.com',
+    'mixpanel',
+    'amplitude',
+    'sentry.io',
+    'intercom',
+    'crisp.chat',
+    'clarity.ms',
+    'criteo',
+    'tiktok',
+    'snapchat',
+    'bing.com/bat',
+)
+
+# Images gardées même quand les images sont bloquées (tuiles de la carte)
+MAP_TILE_PATTERNS = ('tile', 'openstreetmap', 'mapbox', 'cartocdn', 'basemaps', 'stadiamaps')
+
+
+class ResourcePolicy:
+    """Décide, requête par requête, de laisser passer ou d'annuler une ressource"""
+
+    def __init__(self, block_third_party_scripts: bool = True, block_fonts: bool = True,
+                 block_media: bool = True, block_images: bool = False,
+                 first_party_domains=FIRST_PARTY_DOMAINS,
+                 allowed_script_patterns=ALLOWED_SCRIPT_PATTERNS,
+                 keep_image_patterns=MAP_TILE_PATTERNS):
+        """
+        Args:
+            block_third_party_scripts: Annuler les scripts hors domaines du site
+            block_fonts: Annuler les polices
+            block_media: Annuler l'audio et la vidéo
+            block_images: Annuler le corps des images (URLs conservées dans le DOM)
+            first_party_domains: Domaines dont les scripts sont conservés
+            allowed_script_patterns: Scripts tiers conservés (sous-chaînes d'URL)
+            keep_image_patterns: Images conservées même si block_images
+        """
+        self.block_third_party_scripts = block_third_party_scripts
+        self.block_fonts = block_fonts
+        self.block_media = block_media
+        self.block_images = block_images
+        self.first_party_domains = tuple(first_party_domains)
+        self.allowed_script_patterns = tuple(allowed_script_patterns)
+        self.keep_image_patterns = tuple(keep_image_patterns)
+        # Requêtes annulées par type de ressource
+        self.blocked = Counter()
+
+    def is_first_party(self, url: str) -> bool:
+        host = (urlsplit(url).hostname or '').lower()
+        return any(host == domain or host.endswith('.' + domain) for domain in self.first_party_domains)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        """
+        True si la requête doit être annulée
+
+        Args:
+            resource_type: Type Playwright (document, script, image, font, media, xhr...)
+            url: URL de la requête
+        """
+        if not url.startswith(('http://', 'https://')):
+            return False
+        url_lower = url.lower()
+        if resource_type != 'document' and any(pattern in url_lower for pattern in TRACKER_PATTERNS):
+            return True
+        if resource_type == 'font':
+            return self.block_fonts
+        if resource_type == 'media':
+            return self.block_media
+        if resource_type == 'image':
+            return self.block_images and not any(pattern in url_lower for pattern in self.keep_image_patterns)
+        if resource_type == 'script' and self.block_third_party_scripts:
+            return not self.is_first_party(url) and not any(pattern in url_lower for pattern in self.allowed_script_patterns)
+        return False
+
+    async def handle(self, route):
+        """Gestionnaire pour context.route('**/*', ...)"""
+        request = route.request
+        if self.should_block(request.resource_type, request.url):
+            self.blocked[request.resource_type] += 1
+            await route.abort('blockedbyclient')
+        else:
+            await route.continue_()
+
+    def summary(self) -> str:
+        """Résumé des requêtes annulées (ex: '42 requêtes (script: 30, font: 12)')"""
+        total = sum(self.blocked.values())
+        details = ', '.join(f"{resource_type}: {count}" for resource_type, count in self.blocked.most_common())
+        return f"{total} requêtes ({details})" if total else "0 requête"
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Régénération du scorecard HTML dans le processus des serveurs de watch
+
+Remplace le lancement de `python generate_scorecard_html.py` (et
+`python homescore.py`) à chaque changement: les modules, le
+BaignoireExtractor et les cartes déjà générées restent en mémoire, et
+seules les cartes des appartements modifiés sont régénérées.
+"""
+
+import contextlib
+import importlib
+import io
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+
+OUTPUT_FILE = 'output/homepage.html'
+
+# Fichiers dont la modification impose un recalcul des scores avant le HTML
+RESCORING_FILES = ('scoring.py', 'scoring_config.json')
+
+# Modules rechargés (dans cet ordre: dépendances d'abord) quand un fichier .py change
+RELOADABLE_MODULES = (
+    'location_index',
+    'criteria.localisation',
+    'criteria.prix',
+    'criteria.style',
+    'criteria.exposition',
+    'criteria.cuisine',
+    'criteria.baignoire',
+    'criteria',
+    'scoring',
+    'serving_snapshot',
+    'homescore',
+    'analyze_photos',
+    'extract_baignoire',
+    'generate_scorecard_html',
+)
+
+
+class ScorecardRegenerator:
+    """Régénérateur du scorecard HTML gardé en mémoire entre deux changements"""
+
+    def __init__(self, output_file: str = OUTPUT_FILE):
+        self.output_file = output_file
+        self.card_cache = None
+        self.baignoire_extractor = None
+        self.apartments = None
+        self.lock = threading.Lock()
+
+    def regenerate(self, changed_files=None) -> bool:
+        """
+        Régénère le HTML après un changement
+
+        Args:
+            changed_files: Fichiers modifiés (None: régénération complète)
+
+        Returns:
+            True si le HTML a été écrit
+        """
+        with self.lock:
+            changed_files = [os.path.normpath(f) for f in changed_files or []]
+
+            if any(f.endswith('.py') for f in changed_files):
+                if not self.reload_modules():
+                    return False
+
+            needs_rescoring = any(f in RESCORING_FILES for f in changed_files)
+            if needs_rescoring:
+                self.rescore()
+
+            # Les données ne sont relues que si elles ont pu changer (pas pour une simple modification de code)
+            data_changed = not changed_files or needs_rescoring or any(not f.endswith('.py') for f in changed_files)
+            if data_changed:
+                self.apartments = None
+            return self.render()
+
+    def reload_modules(self) -> bool:
+        """Recharge le code modifié (cartes et extracteur repartent de zéro)"""
+        try:
+            for name in RELOADABLE_MODULES:
+                module = sys.modules.get(name)
+                if module is not None:
+                    importlib.reload(module)
+        except Exception as e:
+            print(f"❌ Erreur de rechargement du code: {e}")
+            return False
+
+        self.card_cache = None
+        self.baignoire_extractor = None
+        return True
+
+    def rescore(self) -> bool:
+        """Recalcule et sauvegarde les scores (équivalent de homescore.py sans son HTML)"""
+        import homescore
+        import scoring
+
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f"[{timestamp}] 🔄 Recalcul des scores...", end=' ')
+        try:
+            # Sortie du pipeline masquée, comme l'ancien sous-processus (capture_output)
+            with contextlib.redirect_stdout(io.StringIO()):
+                scraped_apartments = homescore.load_scraped_apartments()
+                scored_apartments = scoring.score_all_apartments(scraped_apartments)
+                if scored_apartments:
+                    homescore.save_scores(scored_apartments)
+            if not scored_apartments:
+                print("⚠️")
+                return False
+            print("✅")
+            return True
+        except Exception as e:
+            print(f"⚠️ ({e})")
+            return False
+
+    def render(self) -> bool:
+        """Génère le HTML depuis les cartes en cache et l'écrit (écriture atomique)"""
+        import generate_scorecard_html
+
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        print(f"[{timestamp}] 🔄 Régénération du HTML...", end=' ')
+        start = time.perf_counter()
+        try:
+            if self.apartments is None:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    self.apartments = generate_scorecard_html.load_scored_apartments()
+            if not self.apartments:
+                print("❌ Aucun appartement scoré trouvé")
+                return False
+
+            if self.baignoire_extractor is None:
+                self.baignoire_extractor = generate_scorecard_html.BaignoireExtractor()
+            if self.card_cache is None:
+                # Cache partagé avec generate_scorecard_html.py (recréé après rechargement du code)
+                self.card_cache = generate_scorecard_html.CardRenderCache()
+
+            html_content = generate_scorecard_html.generate_scorecard_html(
+                self.apartments,
+                baignoire_extractor=self.baignoire_extractor,
+                card_cache=self.card_cache
+            )
+
+            os.makedirs(os.path.dirname(self.output_file) or '.', exist_ok=True)
+            tmp_file = f"{self.output_file}.tmp"
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                f.write(html_content)
+            os.replace(tmp_file, self.output_file)
+
+            print(f"✅ ({(time.perf_counter() - start) * 1000:.0f} ms)")
+            return True
+        except Exception as e:
+            print(f"❌ ({e})")
+            return False
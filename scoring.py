@@ -7,6 +7,11 @@ import json
 import os
 import re
 from criteria.localisation import get_metro_name, get_quartier_name, get_all_metro_stations
+from location_index import get_location_index
+
+# Analyses textuelles IA regroupées par requête lors d'un re-scoring complet
+# (1 = une requête combinée par appartement, faite au fil du scoring)
+TEXT_AI_BATCH_SIZE = int(os.getenv('HOMESCORE_TEXT_AI_BATCH', '1'))
 
 
 def round_to_nearest_5(score):
@@ -63,86 +68,52 @@ def score_localisation(apartment, config):
     tier_config = config['axes']['localisation']['tiers']
     
     # Récupérer localisation, quartier, description, toutes les stations de métro
-    localisation = apartment.get('localisation', '').lower()
-    description = apartment.get('description', '').lower()
-    caracteristiques = apartment.get('caracteristiques', '').lower()
+    localisation = apartment.get('localisation', '')
+    description = apartment.get('description', '')
+    caracteristiques = apartment.get('caracteristiques', '')
     text_combined = f"{localisation} {description} {caracteristiques}"
     
-    quartier = get_quartier_name(apartment)
-    if quartier:
-        quartier = quartier.lower()
+    quartier = get_quartier_name(apartment) or ''
     
     # Récupérer TOUTES les stations de métro (pas seulement la meilleure pour l'affichage)
     all_stations = get_all_metro_stations(apartment)
-    all_stations_lower = [s.lower() for s in all_stations] if all_stations else []
-    
-    # Vérifier tier1 (zones premium) - vérifier toutes les stations et dans le texte
-    tier1_zones = [z.lower() for z in tier_config['tier1']['zones']]
-    for zone in tier1_zones:
-        # Vérifier dans localisation, quartier, texte combiné, ou n'importe quelle station
-        zone_matched = False
-        matched_station = None
-        
-        if zone in localisation or zone in text_combined:
-            zone_matched = True
-        elif quartier and zone in quartier:
-            zone_matched = True
-        else:
-            # Vérifier toutes les stations
-            for station in all_stations_lower:
-                if zone in station or station in zone:
-                    zone_matched = True
-                    matched_station = station
-                    break
-        
-        if zone_matched:
-            score = tier_config['tier1']['score']
-            # Bonus Place de la Réunion
-            if 'place de la réunion' in localisation or (quartier and 'place de la réunion' in quartier) or 'place de la réunion' in text_combined:
-                score += config['bonus']['place_reunion']
-            
-            # Construire la justification avec la station trouvée
-            if matched_station:
-                justification = f"Zone premium: {zone} (métro {matched_station})"
-            else:
-                justification = f"Zone premium: {zone}"
-            
-            return {
-                'score': score,
-                'tier': 'tier1',
-                'justification': justification
-            }
     
-    # Vérifier tier2 (bonnes zones) - vérifier toutes les stations ET dans le texte (pour "Rue des Boulets", "Nation")
-    tier2_zones = [z.lower() for z in tier_config['tier2']['zones']]
-    for zone in tier2_zones:
-        # Vérifier dans localisation, quartier, texte combiné, ou n'importe quelle station
-        zone_matched = False
-        matched_station = None
-        
-        # Chercher dans le texte combiné (description, caractéristiques) pour détecter les rues comme "Rue des Boulets"
-        if zone in localisation or zone in text_combined:
-            zone_matched = True
-        elif quartier and zone in quartier:
-            zone_matched = True
+    # Un seul passage sur le texte et les stations (index compilé depuis la config)
+    # Tier1 (zones premium) puis tier2 (ex: "Rue des Boulets", "Nation")
+    match = get_location_index(config).match(
+        texts=(text_combined, quartier),
+        stations=all_stations,
+        tiers=('tier1', 'tier2')
+    )
+    
+    if match and match['tier'] == 'tier1':
+        score = tier_config['tier1']['score']
+        # Bonus Place de la Réunion
+        if 'place de la réunion' in text_combined.lower() or 'place de la réunion' in quartier.lower():
+            score += config['bonus']['place_reunion']
+        
+        # Construire la justification avec la station trouvée
+        if match['station']:
+            justification = f"Zone premium: {match['zone']} (métro {match['station']})"
         else:
-            # Vérifier toutes les stations (pour "Nation" par exemple)
-            for station in all_stations_lower:
-                if zone in station or station in zone:
-                    zone_matched = True
-                    matched_station = station
-                    break
-        
-        if zone_matched:
-            justification = f"Bonne zone: {zone}"
-            if matched_station:
-                justification += f" (métro {matched_station})"
-            
-            return {
-                'score': tier_config['tier2']['score'],
-                'tier': 'tier2',
-                'justification': justification
-            }
+            justification = f"Zone premium: {match['zone']}"
+        
+        return {
+            'score': score,
+            'tier': 'tier1',
+            'justification': justification
+        }
+    
+    if match and match['tier'] == 'tier2':
+        justification = f"Bonne zone: {match['zone']}"
+        if match['station']:
+            justification += f" (métro {match['station']})"
+        
+        return {
+            'score': tier_config['tier2']['score'],
+            'tier': 'tier2',
+            'justification': justification
+        }
     
     # Par défaut tier3
     return {
@@ -697,6 +668,14 @@ def score_all_apartments(scraped_apartments):
     if not config:
         return []
     
+    # Pré-remplir le cache des analyses textuelles (plusieurs appartements par requête)
+    if TEXT_AI_BATCH_SIZE > 1:
+        from analyze_text_ai import TextAIAnalyzer
+        text_ai_analyzer = TextAIAnalyzer()
+        if text_ai_analyzer.openai_api_key:
+            print(f"🤖 Analyses textuelles par lots de {TEXT_AI_BATCH_SIZE} appartements...")
+            text_ai_analyzer.analyze_all_batch(scraped_apartments, batch_size=TEXT_AI_BATCH_SIZE)
+    
     scored_apartments = []
     for apartment in scraped_apartments:
         score_result = score_apartment(apartment, config)
@@ -5,6 +5,7 @@ Scoring optimisé - Analyse photos UNE SEULE FOIS et réutilise pour style/cuisi
 import json
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 from criteria.localisation import get_metro_name, get_quartier_name, get_all_metro_stations
 from scoring import (
     round_to_nearest_5, load_scoring_config, calculate_prix_m2,
@@ -441,3 +442,41 @@ def score_apartment_optimized(apartment, config):
     
     return result
 
+
+
+def score_all_apartments_optimized(apartments, config, max_workers=4):
+    """
+    Score plusieurs appartements en parallèle (pool de threads)
+    
+    Les appels Vision et les téléchargements de photos sont limités par la latence
+    réseau: N appartements sont traités en même temps, au plus `max_workers`.
+    
+    Args:
+        apartments: List de dicts avec données scrapées
+        config: Dict avec scoring_config.json
+        max_workers: Nombre maximum d'appartements scorés simultanément
+        
+    Returns:
+        List des scores fusionnés avec les données originales, dans l'ordre d'entrée
+        (les appartements en erreur sont ignorés)
+    """
+    total = len(apartments)
+    
+    def _score_one(indexed_apartment):
+        i, apartment = indexed_apartment
+        print(f"\n🏠 Appartement {i}/{total}: {apartment.get('id', 'N/A')}")
+        try:
+            score_result = score_apartment_optimized(apartment, config)
+        except Exception as e:
+            print(f"   ❌ Erreur scoring {apartment.get('id', 'N/A')}: {e}")
+            return None
+        if score_result:
+            # Fusionner avec données originales
+            score_result.update(apartment)
+        return score_result
+    
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        # executor.map préserve l'ordre d'entrée
+        results = list(executor.map(_score_one, enumerate(apartments, 1)))
+    
+    return [result for result in results if result]
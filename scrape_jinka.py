@@ -4,47 +4,100 @@ Scraper Jinka pour extraire les données des appartements
 """
 
 import asyncio
+import copy
 import json
-import math
 import os
 import re
 import aiohttp
 import sys
 import imaplib
 import email
+from contextlib import asynccontextmanager
 from email.header import decode_header
 from datetime import datetime, timedelta
 from playwright.async_api import async_playwright
 from dotenv import load_dotenv
 from extract_exposition import ExpositionExtractor
+from page_readiness import PAGE_DEADLINE_MS, PageReadiness
+from page_snapshot import (
+    GALLERY_IMAGES_JS, GALLERY_SELECTORS, LEAFLET_SELECTORS, PHOTO_URL_PATTERNS, PLACEHOLDER_PATTERNS,
+    SNAPSHOT_SCRIPT, STYLE_KEYWORDS, PageSnapshot, coordinates_from_style, dedupe_photos, etage_from_page,
+    etage_from_section, etage_from_short_formats, select_gallery_photos, style_haussmannien_from_description,
+)
+from photo_derivatives import generate_derivatives
+from photo_manifest import get_photo_manifest
+from resource_policy import ResourcePolicy
+from session_vault import get_session_vault
 
 load_dotenv()
 
+# Modes d'extraction d'une annonce: instantané unique du DOM, ou requêtes sur la page vivante
+EXTRACTION_MODES = ('snapshot', 'live')
+
 class JinkaScraper:
-    def __init__(self):
+    def __init__(self, extraction_mode='snapshot', page_deadline_ms=PAGE_DEADLINE_MS, resource_policy=None,
+                 session_vault=None):
+        """
+        Args:
+            extraction_mode: 'snapshot' (un seul page.evaluate par annonce, champs
+                calculés hors navigateur par page_snapshot.py) ou 'live' (une requête
+                Playwright par champ)
+            page_deadline_ms: Durée maximale des attentes de chargement par page
+                (page_readiness.py)
+            resource_policy: Blocage des ressources inutiles au scraping
+                (resource_policy.py); None: politique par défaut (traceurs, scripts
+                tiers, polices, médias), False: aucun blocage
+            session_vault: Coffre de session (session_vault.py); None: coffre
+                global, False: connexion par email à chaque exécution
+        """
+        if extraction_mode not in EXTRACTION_MODES:
+            raise ValueError(f"Mode d'extraction inconnu: {extraction_mode}")
         self.browser = None
         self.context = None
         self.page = None
         self.apartments = []
         self.exposition_extractor = ExpositionExtractor()
+        self.extraction_mode = extraction_mode
+        self.rate_limit_count = 0
+        # Pool de pages partageant le contexte authentifié (open_page_pool)
+        self.page_pool = None
+        # Attentes de chargement de chaque page (partagé avec les copies de with_page)
+        self.page_deadline_ms = page_deadline_ms
+        self.readiness_by_page = {}
+        self.resource_policy = ResourcePolicy() if resource_policy is None else resource_policy
+        self.session_vault = get_session_vault() if session_vault is None else session_vault
+        # True si le contexte a été ouvert avec une session validée du coffre
+        self.session_restored = False
         
     async def setup(self):
         """Initialise le navigateur et la page"""
         playwright = await async_playwright().start()
         self.browser = await playwright.chromium.launch(headless=False)  # Mode visible
         
+        # Session encore valide: le contexte démarre déjà connecté
+        vault_entry = await self.session_vault.valid_entry() if self.session_vault else None
+        self.session_restored = vault_entry is not None
+        
         # Créer un contexte avec un user-agent réaliste pour éviter les 403
         self.context = await self.browser.new_context(
             user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
             viewport={'width': 1920, 'height': 1080},
             locale='fr-FR',
-            timezone_id='Europe/Paris'
+            timezone_id='Europe/Paris',
+            # Sans service worker, toutes les requêtes passent par la politique de blocage
+            service_workers='block' if self.resource_policy else 'allow',
+            storage_state=vault_entry['storage_state'] if vault_entry else None
         )
-        self.page = await self.context.new_page()
+        if self.resource_policy:
+            # Sur le contexte: s'applique aussi aux pages du pool
+            await self.context.route('**/*', self.resource_policy.handle)
+        self.page = await self.new_page()
+    
+    async def new_page(self):
+        """Ouvre une page dans le contexte du navigateur (cookies de session partagés)"""
+        page = await self.context.new_page()
         
         # Gestionnaire pour détecter les erreurs 429
-        self.rate_limit_count = 0
-        
         async def handle_response(response):
             if response.status == 429:
                 self.rate_limit_count += 1
@@ -53,8 +106,59 @@ class JinkaScraper:
                 print(f"   Rate limiting activé - attente de {wait_time} secondes...")
                 await asyncio.sleep(wait_time)  # asyncio.sleep attend des secondes
         
-        self.page.on('response', handle_response)
+        page.on('response', handle_response)
+        self.readiness_by_page[page] = PageReadiness(page, self.page_deadline_ms)
+        return page
+    
+    @property
+    def readiness(self):
+        """Attentes de chargement de la page courante"""
+        if self.page not in self.readiness_by_page:
+            self.readiness_by_page[self.page] = PageReadiness(self.page, self.page_deadline_ms)
+        return self.readiness_by_page[self.page]
+    
+    async def open_page_pool(self, size):
+        """
+        Ouvre un pool de pages pour scraper plusieurs annonces en parallèle
+        
+        À appeler après login(): les pages partagent le contexte, donc la session.
         
+        Args:
+            size: Nombre de pages (annonces traitées simultanément)
+        """
+        self.page_pool = asyncio.Queue()
+        for _ in range(size):
+            self.page_pool.put_nowait(await self.new_page())
+        print(f"🗂️ Pool de {size} pages ouvert")
+    
+    def with_page(self, page):
+        """Copie du scraper liée à une autre page (navigateur, contexte et résultats partagés)"""
+        worker = copy.copy(self)
+        worker.page = page
+        return worker
+    
+    @asynccontextmanager
+    async def checkout_page(self):
+        """
+        Emprunte une page du pool le temps de scraper une annonce
+        
+        Usage:
+            async with scraper.checkout_page() as worker:
+                data = await worker.scrape_apartment(url)
+        
+        Attend qu'une page se libère si toutes sont empruntées; une page fermée
+        (crash, fermeture manuelle) est remplacée à sa restitution.
+        """
+        if self.page_pool is None:
+            raise RuntimeError("Pool de pages non ouvert (appeler open_page_pool)")
+        page = await self.page_pool.get()
+        try:
+            yield self.with_page(page)
+        finally:
+            if page.is_closed():
+                page = await self.new_page()
+            self.page_pool.put_nowait(page)
+    
     def get_activation_code_from_gmail(self, max_wait_seconds=120):
         """Récupère le code d'activation depuis Gmail"""
         print("📧 Récupération du code d'activation depuis Gmail...")
@@ -207,6 +311,24 @@ class JinkaScraper:
             return None
     
     async def login(self):
+        """Se connecte à Jinka: session du coffre si valide, sinon email avec code d'activation"""
+        if self.session_restored:
+            return True
+        if not await self.login_with_email():
+            return False
+        await self.save_session()
+        return True
+    
+    async def save_session(self):
+        """Enregistre l'état du navigateur dans le coffre pour les prochaines exécutions"""
+        if not self.session_vault:
+            return
+        try:
+            self.session_vault.save(await self.context.storage_state())
+        except Exception as e:
+            print(f"⚠️  Erreur enregistrement de la session: {e}")
+    
+    async def login_with_email(self):
         """Se connecte à Jinka via email avec code d'activation"""
         print("🔐 Connexion à Jinka par email...")
         print(f"📍 ÉTAPE 1: Début de la fonction login()")
@@ -534,89 +656,10 @@ class JinkaScraper:
         print(f"🏠 Scraping de l'alerte: {alert_url}")
         
         try:
-            await self.page.goto(alert_url)
-            await self.page.wait_for_load_state('networkidle')
-            await self.page.wait_for_timeout(2000)
-            
-            # Attendre que la page se charge complètement
-            await self.page.wait_for_timeout(3000)
-            
-            # Essayer différents sélecteurs pour les cartes d'appartements
-            selectors = [
-                'a[href*="alert_result"][href*="ad="]',  # Liens avec alert_result ET ad=
-                'a[href*="alert_result"]',
-                'a[href*="ad="]',
-                'a.sc-bdVaJa.csp.sc-cJSrbW.doPXAe',  # Sélecteur exact d'après l'image
-                'a.sc-bdVaJa',  # Sélecteur plus large
-                '.apartment-card',
-                '[data-testid="apartment-card"]',
-                'a[href*="/alert_result"]'
-            ]
-            
-            apartment_links = None
-            count = 0
-            
-            for selector in selectors:
-                try:
-                    apartment_links = self.page.locator(selector)
-                    count = await apartment_links.count()
-                    if count > 0:
-                        print(f"📋 {count} appartements trouvés avec sélecteur: {selector}")
-                        break
-                except:
-                    continue
-            
-            if count == 0:
-                print("🔍 Aucun appartement trouvé, debug de la page...")
-                # Debug: afficher le contenu de la page
-                page_content = await self.page.content()
-                print(f"📄 Taille de la page: {len(page_content)} caractères")
-                
-                # Chercher tous les liens
-                all_links = self.page.locator('a')
-                all_links_count = await all_links.count()
-                print(f"🔗 Total de liens sur la page: {all_links_count}")
-                
-                # Afficher les premiers liens trouvés
-                for i in range(min(5, all_links_count)):
-                    href = await all_links.nth(i).get_attribute('href')
-                    print(f"   Lien {i+1}: {href}")
-                
+            apartment_urls = await self.collect_apartment_urls(alert_url)
+            if apartment_urls is None:
                 return False
             
-            # Extraire les URLs des appartements
-            apartment_urls = []
-            for i in range(count):
-                href = await apartment_links.nth(i).get_attribute('href')
-                print(f"   Lien {i+1}: href='{href}'")
-                
-                # Chercher les liens avec id= (format loueragile://) ou ad=
-                if href and ('id=' in href or 'ad=' in href):
-                    # Extraire l'ID de l'appartement
-                    apartment_id = None
-                    if 'id=' in href:
-                        import re
-                        match = re.search(r'id=(\d+)', href)
-                        if match:
-                            apartment_id = match.group(1)
-                    elif 'ad=' in href:
-                        import re
-                        match = re.search(r'ad=(\d+)', href)
-                        if match:
-                            apartment_id = match.group(1)
-                    
-                    if apartment_id:
-                        # Construire l'URL standard Jinka
-                        full_url = f"https://www.jinka.fr/alert_result?token=26c2ec3064303aa68ffa43f7c6518733&ad={apartment_id}&from=dashboard_card&from_alert_filter=all&from_alert_page=1"
-                        apartment_urls.append(full_url)
-                        print(f"   ✅ Appartement {i+1} (ID: {apartment_id}): {full_url}")
-                    else:
-                        print(f"   ❌ Lien {i+1} ignoré: impossible d'extraire l'ID")
-                else:
-                    print(f"   ❌ Lien {i+1} ignoré: pas de paramètre 'id=' ou 'ad='")
-            
-            print(f"🔗 {len(apartment_urls)} URLs d'appartements extraites")
-            
             # Scraper chaque appartement
             for i, url in enumerate(apartment_urls):
                 print(f"🏠 Scraping appartement {i+1}/{len(apartment_urls)}")
@@ -634,49 +677,117 @@ class JinkaScraper:
             print(f"❌ Erreur scraping alerte: {e}")
             return False
     
+    async def collect_apartment_urls(self, alert_url):
+        """Extrait les URLs des annonces d'une page d'alerte (None si aucune carte trouvée)"""
+        # Essayer différents sélecteurs pour les cartes d'appartements
+        selectors = [
+            'a[href*="alert_result"][href*="ad="]',  # Liens avec alert_result ET ad=
+            'a[href*="alert_result"]',
+            'a[href*="ad="]',
+            'a.sc-bdVaJa.csp.sc-cJSrbW.doPXAe',  # Sélecteur exact d'après l'image
+            'a.sc-bdVaJa',  # Sélecteur plus large
+            '.apartment-card',
+            '[data-testid="apartment-card"]',
+            'a[href*="/alert_result"]'
+        ]
+        
+        # Attendre le chargement, puis qu'une carte d'appartement soit rendue
+        await self.readiness.goto(alert_url)
+        await self.readiness.selector(', '.join(selectors))
+        
+        apartment_links = None
+        count = 0
+        
+        for selector in selectors:
+            try:
+                apartment_links = self.page.locator(selector)
+                count = await apartment_links.count()
+                if count > 0:
+                    print(f"📋 {count} appartements trouvés avec sélecteur: {selector}")
+                    break
+            except:
+                continue
+        
+        if count == 0:
+            print("🔍 Aucun appartement trouvé, debug de la page...")
+            # Debug: afficher le contenu de la page
+            page_content = await self.page.content()
+            print(f"📄 Taille de la page: {len(page_content)} caractères")
+            
+            # Chercher tous les liens
+            all_links = self.page.locator('a')
+            all_links_count = await all_links.count()
+            print(f"🔗 Total de liens sur la page: {all_links_count}")
+            
+            # Afficher les premiers liens trouvés
+            for i in range(min(5, all_links_count)):
+                href = await all_links.nth(i).get_attribute('href')
+                print(f"   Lien {i+1}: {href}")
+            
+            return None
+        
+        # Extraire les URLs des appartements
+        apartment_urls = []
+        for i in range(count):
+            href = await apartment_links.nth(i).get_attribute('href')
+            print(f"   Lien {i+1}: href='{href}'")
+            
+            # Chercher les liens avec id= (format loueragile://) ou ad=
+            if href and ('id=' in href or 'ad=' in href):
+                # Extraire l'ID de l'appartement
+                apartment_id = None
+                if 'id=' in href:
+                    import re
+                    match = re.search(r'id=(\d+)', href)
+                    if match:
+                        apartment_id = match.group(1)
+                elif 'ad=' in href:
+                    import re
+                    match = re.search(r'ad=(\d+)', href)
+                    if match:
+                        apartment_id = match.group(1)
+                
+                if apartment_id:
+                    # Construire l'URL standard Jinka
+                    full_url = f"https://www.jinka.fr/alert_result?token=26c2ec3064303aa68ffa43f7c6518733&ad={apartment_id}&from=dashboard_card&from_alert_filter=all&from_alert_page=1"
+                    apartment_urls.append(full_url)
+                    print(f"   ✅ Appartement {i+1} (ID: {apartment_id}): {full_url}")
+                else:
+                    print(f"   ❌ Lien {i+1} ignoré: impossible d'extraire l'ID")
+            else:
+                print(f"   ❌ Lien {i+1} ignoré: pas de paramètre 'id=' ou 'ad='")
+        
+        print(f"🔗 {len(apartment_urls)} URLs d'appartements extraites")
+        return apartment_urls
+    
     async def scrape_apartment(self, url):
         """Scrape les détails d'un appartement"""
         try:
-            await self.page.goto(url)
-            await self.page.wait_for_load_state('networkidle')
-            await self.page.wait_for_timeout(2000)
+            # Chargement réel de la page (réseau calme, titre rendu), borné par l'échéance
+            await self.readiness.goto(url)
+            await self.readiness.selector('h1')
             
             # Extraire l'ID de l'appartement
             apartment_id = self.extract_apartment_id(url)
             
             # Extraire les données
-            description = await self.extract_description()
-            caracteristiques = await self.extract_caracteristiques()
-            photos = await self.extract_photos()
-            etage = await self.extract_etage()
-            if etage:
-                print(f"   🏢 Étage trouvé: {etage}")
+            if self.extraction_mode == 'snapshot':
+                fields = await self.extract_from_snapshot(apartment_id)
+            else:
+                fields = await self.extract_live(apartment_id)
+            if fields['etage']:
+                print(f"   🏢 Étage trouvé: {fields['etage']}")
             else:
                 print(f"   ⚠️ Étage non trouvé")
             
             # Télécharger les photos localement
-            await self.download_apartment_photos(apartment_id, photos)
+            await self.download_apartment_photos(apartment_id, fields['photos'])
             
             data = {
                 'id': apartment_id,
                 'url': url,
                 'scraped_at': datetime.now().isoformat(),
-                'titre': await self.extract_titre(),
-                'prix': await self.extract_prix(),
-                'prix_m2': await self.extract_prix_m2(),
-                'localisation': await self.extract_localisation(),
-                'coordinates': await self.extract_coordinates(),
-                'map_info': await self.extract_map_info(apartment_id),
-                'surface': await self.extract_surface(),
-                'pieces': await self.extract_pieces(),
-                'date': await self.extract_date(),
-                'transports': await self.extract_transports(),
-                'description': description,
-                'photos': photos,
-                'caracteristiques': caracteristiques,
-                'etage': etage,
-                'agence': await self.extract_agence(),
-                'style_haussmannien': await self.extract_style_haussmannien()
+                **fields
             }
             
             # Ajouter l'analyse d'exposition contextuelle
@@ -689,6 +800,65 @@ class JinkaScraper:
             print(f"❌ Erreur scraping appartement {url}: {e}")
             return None
     
+    async def take_snapshot(self):
+        """Instantané de la page courante en un seul aller-retour (HTML, texte, images)"""
+        data = await self.page.evaluate(SNAPSHOT_SCRIPT, {
+            'gallerySelectors': GALLERY_SELECTORS,
+            'imageTimeout': self.readiness.remaining_ms(),
+        })
+        return PageSnapshot(**data)
+    
+    async def extract_from_snapshot(self, apartment_id):
+        """Champs de l'annonce calculés hors navigateur depuis un instantané du DOM
+        
+        Seule la carte (screenshot) est encore lue sur la page vivante.
+        """
+        snapshot = await self.take_snapshot()
+        
+        print("   📸 Extraction des photos d'appartement...")
+        alt = self.format_photo_description(snapshot.surface, snapshot.prix_m2, snapshot.etage, snapshot.style_for_photo)
+        photos = snapshot.photos(alt)
+        
+        return {
+            'titre': snapshot.titre,
+            'prix': snapshot.prix,
+            'prix_m2': snapshot.prix_m2,
+            'localisation': snapshot.localisation,
+            'coordinates': snapshot.coordinates,
+            'map_info': await self.extract_map_info(apartment_id, page_text=snapshot.text),
+            'surface': snapshot.surface,
+            'pieces': snapshot.pieces,
+            'date': snapshot.date,
+            'transports': snapshot.transports,
+            'description': snapshot.description,
+            'photos': photos,
+            'caracteristiques': snapshot.caracteristiques,
+            'etage': snapshot.etage,
+            'agence': snapshot.agence,
+            'style_haussmannien': snapshot.style_haussmannien
+        }
+    
+    async def extract_live(self, apartment_id):
+        """Champs de l'annonce lus par des requêtes Playwright sur la page vivante"""
+        return {
+            'titre': await self.extract_titre(),
+            'prix': await self.extract_prix(),
+            'prix_m2': await self.extract_prix_m2(),
+            'localisation': await self.extract_localisation(),
+            'coordinates': await self.extract_coordinates(),
+            'map_info': await self.extract_map_info(apartment_id),
+            'surface': await self.extract_surface(),
+            'pieces': await self.extract_pieces(),
+            'date': await self.extract_date(),
+            'transports': await self.extract_transports(),
+            'description': await self.extract_description(),
+            'photos': await self.extract_photos(),
+            'caracteristiques': await self.extract_caracteristiques(),
+            'etage': await self.extract_etage(),
+            'agence': await self.extract_agence(),
+            'style_haussmannien': await self.extract_style_haussmannien()
+        }
+    
     def extract_apartment_id(self, url):
         """Extrait l'ID de l'appartement depuis l'URL"""
         match = re.search(r'ad=(\d+)', url)
@@ -791,38 +961,9 @@ class JinkaScraper:
                     except:
                         pass
                 
-                if caracteristiques_text:
-                    # PRIORITÉ 1: Chercher RDC d'abord (car peut être mal interprété comme étage)
-                    if re.search(r'\bRDC\b|rez-de-chaussée|rez de chaussée|rez-de-jardin', caracteristiques_text, re.IGNORECASE):
-                        return "RDC"
-                    
-                    # Patterns pour trouver l'étage dans les caractéristiques (plus complets)
-                    etage_patterns = [
-                        r'(\d+)(?:er?|e|ème?)\s*étage',
-                        r'étage\s*(\d+)',
-                        r'(\d+)(?:er?|e|ème?)\s*ét\.',
-                        r'Étage[:\s]+(\d+)',
-                        r'étage[:\s]+(\d+)',
-                        r'(\d+)\s*étage',  # Format simple "2 étage"
-                        r'étage\s*:\s*(\d+)',  # Format "étage: 2"
-                    ]
-                    
-                    for pattern in etage_patterns:
-                        matches = re.findall(pattern, caracteristiques_text, re.IGNORECASE)
-                        if matches:
-                            etage_num = matches[0]
-                            # Vérifier le contexte pour éviter les faux positifs (arrondissements)
-                            match_obj = re.search(pattern, caracteristiques_text, re.IGNORECASE)
-                            if match_obj:
-                                start = max(0, match_obj.start() - 20)
-                                end = min(len(caracteristiques_text), match_obj.end() + 20)
-                                context = caracteristiques_text[start:end].lower()
-                                # Exclure si c'est un arrondissement
-                                if not any(word in context for word in ['arrondissement', 'arr.', 'arr ', 'paris']):
-                                    if etage_num == '1':
-                                        return "1er étage"
-                                    else:
-                                        return f"{etage_num}e étage"
+                etage = etage_from_section(caracteristiques_text)
+                if etage:
+                    return etage
             except Exception as e:
                 print(f"  ⚠️ Erreur extraction étage depuis caractéristiques: {e}")
                 pass  # Continuer si l'extraction depuis caractéristiques échoue
@@ -831,39 +972,9 @@ class JinkaScraper:
             page_content = await self.page.content()
             page_text = await self.page.text_content('body') or ""
             
-            # PRIORITÉ 1: Chercher RDC d'abord (car peut être mal interprété comme étage)
-            if re.search(r'\bRDC\b|rez-de-chaussée|rez de chaussée|rez-de-jardin', page_text, re.IGNORECASE):
-                return "RDC"
-            
-            # Patterns pour trouver l'étage (plus robustes)
-            # Priorité aux patterns avec "étage" explicite
-            etage_patterns = [
-                r'(\d+)(?:er?|e|ème?)\s*étage',
-                r'étage\s*(\d+)',
-                r'(\d+)(?:er?|e|ème?)\s*ét\.',
-                r'au\s+(\d+)(?:er?|e|ème?)\s*étage',
-                r'(\d+)(?:er?|e|ème?)\s*étage\s*(?:avec|sans)',
-                r'étage\s*:\s*(\d+)',
-                r'(\d+)\s*étage',  # Format simple "2 étage"
-            ]
-            
-            for pattern in etage_patterns:
-                matches = re.findall(pattern, page_content, re.IGNORECASE)
-                if matches:
-                    etage_num = matches[0]
-                    # Vérifier le contexte pour éviter les faux positifs (arrondissements)
-                    match_obj = re.search(pattern, page_text, re.IGNORECASE)
-                    if match_obj:
-                        start = max(0, match_obj.start() - 30)
-                        end = min(len(page_text), match_obj.end() + 30)
-                        context = page_text[start:end].lower()
-                        # Exclure si c'est un arrondissement ou une zone géographique
-                        if not any(word in context for word in ['arrondissement', 'arr.', 'arr ', 'paris', '750']):
-                            # Formater comme "4e étage" ou "1er étage"
-                            if etage_num == '1':
-                                return "1er étage"
-                            else:
-                                return f"{etage_num}e étage"
+            etage = etage_from_page(page_content, page_text)
+            if etage:
+                return etage
             
             # Chercher les formats courts comme "2e" dans la section Caractéristiques uniquement
             # (pour éviter les faux positifs comme "10e arrondissement")
@@ -874,41 +985,12 @@ class JinkaScraper:
                     char_container = caracteristiques_elem.first.locator('..')
                     char_text = await char_container.text_content() or ""
                     
-                    # Patterns pour formats courts dans caractéristiques
-                    short_patterns = [
-                        r'(\d+)(?:er|e|ème)(?:\s|,|\.|$)',  # Format "2e" suivi d'espace/ponctuation
-                    ]
-                    
-                    for pattern in short_patterns:
-                        matches = re.findall(pattern, char_text, re.IGNORECASE)
-                        if matches:
-                            # Prendre le premier match qui est probablement l'étage
-                            # Les caractéristiques listent généralement: pièces, étage, exposition, etc.
-                            for match in matches[:3]:  # Vérifier les 3 premiers matches au cas où
-                                etage_num = match if isinstance(match, str) else str(match)
-                                # Vérifier le contexte autour pour confirmer
-                                match_obj = re.search(re.escape(etage_num) + r'(?:er|e|ème)?', char_text, re.IGNORECASE)
-                                if match_obj:
-                                    start = max(0, match_obj.start() - 30)
-                                    end = min(len(char_text), match_obj.end() + 30)
-                                    context = char_text[start:end].lower()
-                                    # Si le contexte suggère un étage (pas un arrondissement ou autre)
-                                    if any(word in context for word in ['étage', 'ét.', 'ét', 'ascenseur', 'rdc', 'rez']):
-                                        # Éviter les faux positifs comme "10e arrondissement", "Paris 20e", "75020"
-                                        if not any(word in context for word in ['arrondissement', 'arr.', 'arr ', 'paris', '750']):
-                                            # Exclure les grands nombres qui sont probablement des arrondissements
-                                            if int(etage_num) <= 10:  # Les étages normaux sont <= 10
-                                                if etage_num == '1':
-                                                    return "1er étage"
-                                                else:
-                                                    return f"{etage_num}e étage"
+                    etage = etage_from_short_formats(char_text)
+                    if etage:
+                        return etage
             except:
                 pass
             
-            # Chercher RDC (dernier recours)
-            if re.search(r'\bRDC\b|rez-de-chaussée|rez de chaussée|rez-de-jardin', page_text, re.IGNORECASE):
-                return "RDC"
-            
             return None
         except Exception as e:
             print(f"  ⚠️ Erreur extraction étage: {e}")
@@ -920,20 +1002,7 @@ class JinkaScraper:
             page_text = await self.page.text_content('body') or ""
             
             # Chercher des indices de style haussmannien
-            style_keywords = {
-                'haussmannien': 'Haussmannien',
-                'haussmann': 'Haussmannien',
-                'moulures': 'Haussmannien',
-                'parquet': 'Haussmannien',
-                'cheminée': 'Haussmannien',
-                'restauré': 'Haussmannien',
-                'contemporain': 'Contemporain',
-                'moderne': 'Moderne',
-                'ancien': 'Ancien',
-                'neuf': 'Neuf'
-            }
-            
-            for keyword, style in style_keywords.items():
+            for keyword, style in STYLE_KEYWORDS.items():
                 if re.search(keyword, page_text, re.IGNORECASE):
                     return style
             
@@ -1153,8 +1222,13 @@ class JinkaScraper:
         except:
             return "Description non trouvée"
     
-    async def extract_map_info(self, apartment_id=None):
-        """Extrait les informations de la carte (rues, quartier, métros)"""
+    async def extract_map_info(self, apartment_id=None, page_text=None):
+        """Extrait les informations de la carte (rues, quartier, métros)
+        
+        Args:
+            apartment_id: ID de l'appartement (nom du screenshot)
+            page_text: Texte de la page déjà lu (instantané), relu sur la page sinon
+        """
         try:
             print("   🗺️ Analyse de la carte...")
             
@@ -1164,26 +1238,19 @@ class JinkaScraper:
             # Prendre un screenshot de la carte pour analyse
             map_element = self.page.locator('.leaflet-container, [class*="map"], [class*="carte"]').first
             if await map_element.count() > 0:
-                # Attendre que la carte se charge complètement pour cet appartement
-                # Attendre que les tuiles de la carte soient chargées
-                await self.page.wait_for_timeout(1000)
-                
-                # Attendre que la carte soit visible et chargée
-                try:
-                    await map_element.wait_for(state='visible', timeout=5000)
-                except:
-                    pass
-                
-                # Attendre un peu plus pour que la carte se centre sur l'appartement
-                await self.page.wait_for_timeout(2000)
+                # Attendre que la carte soit visible
+                await self.readiness.visible(map_element)
                 
                 # Scroller vers la carte pour s'assurer qu'elle est visible
                 try:
                     await map_element.scroll_into_view_if_needed()
-                    await self.page.wait_for_timeout(1000)
                 except:
                     pass
                 
+                # Attendre que les tuiles soient chargées et la carte centrée (fin d'animation)
+                if not await self.readiness.map_tiles(map_element):
+                    print("   ⚠️ Carte incomplète à l'échéance, screenshot en l'état")
+                
                 # Prendre un screenshot de la carte avec l'ID de l'appartement dans le nom
                 if apartment_id:
                     screenshot_path = f"data/screenshots/map_{apartment_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
@@ -1193,15 +1260,8 @@ class JinkaScraper:
                 await map_element.screenshot(path=screenshot_path)
                 print(f"   📸 Screenshot de la carte sauvegardé: {screenshot_path}")
             
-            # Extraire le texte visible sur la carte
-            map_text = ""
-            try:
-                map_text = await map_element.text_content()
-            except:
-                pass
-            
             # Chercher des noms de rues dans le contenu de la page
-            page_content = await self.page.text_content('body')
+            page_content = page_text if page_text is not None else await self.page.text_content('body')
             
             # Patterns pour identifier les rues et quartiers
             street_patterns = [
@@ -1364,15 +1424,8 @@ class JinkaScraper:
         """Extrait les coordonnées GPS depuis la carte Leaflet"""
         try:
             # Chercher les éléments de la carte Leaflet avec différents sélecteurs
-            leaflet_selectors = [
-                '.leaflet-proxy',
-                '.leaflet-map-pane', 
-                '.leaflet-container',
-                '[class*="leaflet"]'
-            ]
-            
             coordinates = None
-            for selector in leaflet_selectors:
+            for selector in LEAFLET_SELECTORS:
                 elements = self.page.locator(selector)
                 count = await elements.count()
                 
@@ -1381,54 +1434,7 @@ class JinkaScraper:
                     style = await element.get_attribute('style')
                     
                     if style and 'translate3d' in style:
-                        print(f"   🔍 Style trouvé: {style[:100]}...")
-                        
-                        # Extraire les coordonnées du transform avec regex plus robuste
-                        import re
-                        patterns = [
-                            r'translate3d\(([^,]+),\s*([^,]+),\s*([^)]+)\)',
-                            r'translate3d\(([^,]+),\s*([^,]+),\s*([^)]+)\)',
-                            r'transform:\s*translate3d\(([^,]+),\s*([^,]+),\s*([^)]+)\)'
-                        ]
-                        
-                        for pattern in patterns:
-                            match = re.search(pattern, style)
-                            if match:
-                                try:
-                                    x_str = match.group(1).strip()
-                                    y_str = match.group(2).strip()
-                                    scale_str = match.group(3).strip()
-                                    
-                                    print(f"   📍 Coordonnées brutes: x={x_str}, y={y_str}, scale={scale_str}")
-                                    
-                                    # Nettoyer et convertir les valeurs
-                                    x = float(x_str.replace('px', '').replace('e+', 'e'))
-                                    y = float(y_str.replace('px', '').replace('e+', 'e'))
-                                    scale = float(scale_str.replace('px', '')) if scale_str != '0px' else 1.0
-                                    
-                                    # Vérifier que les valeurs sont valides (pas 0)
-                                    if abs(x) > 1000 and abs(y) > 1000:  # Coordonnées Web Mercator valides
-                                        # Convertir les coordonnées Web Mercator en lat/lng
-                                        lon = (x / 20037508.34) * 180
-                                        lat = (y / 20037508.34) * 180
-                                        lat = 180 / 3.14159265359 * (2 * math.atan(math.exp(lat * 3.14159265359 / 180)) - 3.14159265359 / 2)
-                                        
-                                        coordinates = {
-                                            "latitude": round(lat, 6),
-                                            "longitude": round(lon, 6),
-                                            "raw_x": x,
-                                            "raw_y": y,
-                                            "scale": scale
-                                        }
-                                        print(f"   ✅ Coordonnées converties: {lat:.6f}, {lon:.6f}")
-                                        break
-                                    else:
-                                        print(f"   ⚠️ Coordonnées invalides (trop petites): x={x}, y={y}")
-                                        
-                                except ValueError as ve:
-                                    print(f"   ❌ Erreur de conversion: {ve}")
-                                    continue
-                        
+                        coordinates = coordinates_from_style(style)
                         if coordinates:
                             break
                 
@@ -1450,77 +1456,7 @@ class JinkaScraper:
         try:
             # Récupérer la description
             description = await self.extract_description()
-            if description == "Description non trouvée":
-                return {"score": 0, "elements": [], "keywords": []}
-            
-            # Mots-clés haussmanniens étendus
-            haussmann_keywords = {
-                'architectural': [
-                    'haussmannien', 'haussmannienne', 'haussmann',
-                    'moulures', 'moulure', 'mouluré', 'moulurée',
-                    'cheminée', 'cheminées', 'cheminée de marbre',
-                    'parquet', 'parquets', 'parquet d\'origine', 'parquet ancien',
-                    'corniches', 'corniche', 'corniche moulurée',
-                    'rosaces', 'rosace', 'rosace de plafond',
-                    'balcon', 'balcons', 'balcon en fer forgé', 'balcon forgé',
-                    'fer forgé', 'fer forgée', 'grille en fer forgé',
-                    'hauteur sous plafond', 'haut plafond', 'plafond haut',
-                    'escalier', 'escaliers', 'escalier d\'honneur'
-                ],
-                'caractère': [
-                    'caractère', 'caractères', 'caractéristique',
-                    'restauré', 'restaurée', 'rénové', 'rénovée',
-                    'authentique', 'authentiques', 'original', 'originale',
-                    'époque', 'période', 'époque haussmannienne',
-                    'ancien', 'ancienne', 'ancien immeuble',
-                    'vieux', 'vieille', 'vieux immeuble',
-                    'charme', 'charmant', 'charmante',
-                    'prestige', 'prestigieux', 'prestigieuse',
-                    'noble', 'noblesse', 'noblesse des matériaux'
-                ],
-                'matériaux': [
-                    'marbre', 'marbres', 'marbre de carrare',
-                    'bois', 'bois noble', 'bois précieux',
-                    'pierre', 'pierres', 'pierre de taille',
-                    'stuc', 'stucs', 'stuc décoratif',
-                    'plâtre', 'plâtres', 'plâtre moulé',
-                    'métal', 'métaux', 'métal forgé'
-                ],
-                'détails': [
-                    'moulure', 'moulures', 'moulure de plafond',
-                    'décoration', 'décoratif', 'décorative',
-                    'ornement', 'ornements', 'ornemental',
-                    'détail', 'détails', 'détail architectural',
-                    'finesse', 'finesses', 'finitions',
-                    'élégance', 'élégant', 'élégante'
-                ]
-            }
-            
-            # Chercher les mots-clés par catégorie
-            found_by_category = {}
-            total_found = 0
-            all_keywords = []
-            
-            for category, keywords in haussmann_keywords.items():
-                found_in_category = []
-                for keyword in keywords:
-                    if keyword.lower() in description.lower():
-                        found_in_category.append(keyword)
-                        all_keywords.append(keyword)
-                        total_found += 1
-                
-                if found_in_category:
-                    found_by_category[category] = found_in_category
-            
-            # Calculer un score de style
-            style_score = min(100, (total_found * 10) + 20)  # 10 points par mot-clé + 20 de base
-            
-            return {
-                "score": style_score,
-                "elements": found_by_category,
-                "keywords": all_keywords,
-                "total_found": total_found
-            }
+            return style_haussmannien_from_description(description)
             
         except Exception as e:
             return {"score": 0, "elements": [], "keywords": [], "error": str(e)}
@@ -1547,327 +1483,42 @@ class JinkaScraper:
             
             photos = []
             
-            # Attendre un peu plus longtemps pour le chargement des images lazy
-            await asyncio.sleep(1)
-            
-            # Scroller un peu pour déclencher le chargement lazy si nécessaire
+            # Scroller un peu pour déclencher le chargement lazy si nécessaire,
+            # puis attendre que les images demandées soient chargées
             await self.page.evaluate('window.scrollTo(0, 200)')
-            await asyncio.sleep(0.5)
+            await self.readiness.network_quiet()
+            await self.readiness.images_complete()
             await self.page.evaluate('window.scrollTo(0, 0)')
-            await asyncio.sleep(0.5)
             
             # Méthode 1: Cibler la div galerie principale (sc-cJSrbW juBoVb ou sc-gPEVay jnWxBz)
             # Aussi chercher dans les divs cachées avec display="none" qui contiennent toutes les photos
-            gallery_selectors = [
-                'div.sc-cJSrbW.juBoVb',  # Structure actuelle visible dans l'image
-                'div.sc-gPEVay.jnWxBz',  # Ancienne structure
-                '[class*="sc-cJSrbW"][class*="juBoVb"]',  # Sélecteurs partiels
-                '[class*="sc-gPEVay"][class*="jnWxBz"]',
-                'div.sc-bdVaJa.InsofV',  # Div cachée avec toutes les photos (display="none")
-                '[class*="sc-bdVaJa"][class*="InsofV"]',  # Sélecteur partiel
-                'div[style*="display: none"]',  # Toute div cachée
-            ]
-            
-            gallery_found = False
-            for selector in gallery_selectors:
+            alt = self.format_photo_description(surface, prix_m2, etage, style)
+            for selector in GALLERY_SELECTORS:
                 try:
                     gallery_div = self.page.locator(selector)
                     if await gallery_div.count() > 0:
                         print(f"      🎯 Div galerie trouvée ({selector}), extraction des images visibles...")
-                        gallery_found = True
                         
                         # Extraire toutes les images de la galerie (visibles ET cachées avec preloader)
                         gallery_element = await gallery_div.first.element_handle()
-                        img_elements = await gallery_element.evaluate('''
-                            el => {
-                                // Obtenir toutes les images dans l'ordre exact du DOM (même cachées)
-                                const allImgs = Array.from(el.querySelectorAll('img'));
-                                
-                                // Extraire les infos avec position visuelle pour tri correct
-                                return allImgs.map((img, domIndex) => {
-                                    const rect = img.getBoundingClientRect();
-                                    const computedStyle = window.getComputedStyle(img);
-                                    return {
-                                        domIndex: domIndex,  // Index dans le DOM
-                                        src: img.src || img.getAttribute('data-src') || img.getAttribute('data-lazy-src') || '',
-                                        alt: img.alt || '',
-                                        width: img.naturalWidth || img.width || 0,
-                                        height: img.naturalHeight || img.height || 0,
-                                        display: computedStyle.display,
-                                        visibility: computedStyle.visibility,
-                                        top: rect.top,  // Position top pour tri visuel
-                                        left: rect.left  // Position left pour tri visuel
-                                    };
-                                }).filter(img => {
-                                    // Garder toutes les images avec une URL valide
-                                    if (!img.src) return false;
-                                    
-                                    const srcLower = img.src.toLowerCase();
-                                    const altLower = img.alt.toLowerCase();
-                                    
-                                    // Vérifier si l'image est visible (pas display:none et position non-0,0)
-                                    const isVisible = img.display !== 'none' && (img.top !== 0 || img.left !== 0);
-                                    const hasGoodDimensions = img.width > 200 && img.height > 200;
-                                    
-                                    // 1. Exclure les placeholders explicites (toujours)
-                                    if (srcLower.includes('placeholder')) return false;
-                                    
-                                    // 2. LOGIQUE AMÉLIORÉE : Accepter les images VISIBLES même si FNAIM
-                                    // Si l'image est visible ET a de bonnes dimensions, c'est probablement une vraie photo
-                                    if (isVisible && hasGoodDimensions) {
-                                        // Accepter les images visibles même si elles utilisent FNAIM
-                                        // Car elles sont affichées sur la page
-                                        return true;
-                                    }
-                                    
-                                    // 3. Pour les images cachées ou petites, filtrer les placeholders FNAIM
-                                    const placeholderUrlPatterns = [
-                                        'imagesv2.fnaim.fr/images1/img/',  // Placeholder FNAIM
-                                        'placeholder',
-                                        'placeholder.jpg',
-                                        'placeholder.png',
-                                        'no-image',
-                                        'default-image',
-                                        'missing-image',
-                                    ];
-                                    const isPlaceholderUrl = placeholderUrlPatterns.some(pattern => srcLower.includes(pattern));
-                                    if (isPlaceholderUrl && !isVisible) {
-                                        // Si c'est un placeholder ET que l'image n'est pas visible, exclure
-                                        return false;
-                                    }
-                                    
-                                    // 4. Exclure les images avec alt="preloader" SI cachées ET placeholder FNAIM
-                                    if ((altLower.includes('preloader') || altLower === 'preloader') && 
-                                        srcLower.includes('imagesv2.fnaim.fr/images1/img/') && 
-                                        !isVisible) {
-                                        return false;
-                                    }
-                                    
-                                    // 5. Détecter les vraies photos d'appartements (patterns étendus)
-                                    const photoPatterns = [
-                                        'loueragile', 
-                                        'upload_pro_ad', 
-                                        'media.apimo.pro', 
-                                        'studio-net.fr', 
-                                        'images.century21.fr', 
-                                        'biens', 
-                                        'apartement', 
-                                        'transopera', 
-                                        'staticlbi', 
-                                        'uploadcaregdc', 
-                                        'uploadcare', 
-                                        's3.amazonaws.com', 
-                                        'googleusercontent.com', 
-                                        'cdn.safti.fr', 
-                                        'safti.fr', 
-                                        'paruvendu.fr', 
-                                        'immo-facile.com', 
-                                        'mms.seloger.com', 
-                                        'seloger.com',
-                                        'api.jinka.fr/apiv2/media/imgsrv',  // Proxy Jinka pour vraies photos
-                                        'photos.ubif',  // Photos originales via proxy Jinka
-                                        'res.cloudinary.com',  // Cloudinary (souvent utilisé pour photos immo)
-                                        'cloudinary.com',
-                                        'photos.',  // Pattern générique pour photos (mais pas "placeholder")
-                                        'imagesv2.fnaim.fr',  // Accepter FNAIM si image visible avec bonnes dimensions
-                                    ];
-                                    const hasValidPhotoPattern = photoPatterns.some(pattern => srcLower.includes(pattern));
-                                    
-                                    // 6. Si c'est une vraie photo (pattern valide), on la garde
-                                    // OU si c'est une image visible avec bonnes dimensions (même FNAIM)
-                                    if (hasValidPhotoPattern || (isVisible && hasGoodDimensions)) {
-                                        return true;
-                                    }
-                                    
-                                    return false;
-                                });
-                            }
-                        ''')
-                        
-                        # Extraire les photos avec leur index DOM pour préserver l'ordre de Jinka
-                        photos_with_position = []
-                        for img_data in img_elements:
-                            try:
-                                src_to_use = img_data.get('src', '')
-                                if not src_to_use:
-                                    continue
-                                
-                                # Vérifier que c'est une vraie photo (pas un logo)
-                                src_lower = src_to_use.lower()
-                                alt_lower = img_data.get('alt', '').lower()
-                                
-                                if 'logo' in src_lower or 'source_logos' in src_lower:
-                                    continue
-                                
-                                # Vérifier si l'image est visible (position non-0,0 et bonnes dimensions)
-                                position_top = img_data.get('position_top', 0)
-                                position_left = img_data.get('position_left', 0)
-                                width = img_data.get('width', 0)
-                                height = img_data.get('height', 0)
-                                is_visible = (position_top != 0 or position_left != 0)
-                                has_good_dimensions = width > 200 and height > 200
-                                
-                                # LOGIQUE AMÉLIORÉE : Accepter les images VISIBLES même si FNAIM
-                                # Si l'image est visible ET a de bonnes dimensions, c'est probablement une vraie photo
-                                if is_visible and has_good_dimensions:
-                                    # Accepter les images visibles même si elles utilisent FNAIM
-                                    # Car elles sont affichées sur la page
-                                    pass  # Continuer pour ajouter la photo
-                                else:
-                                    # Pour les images cachées ou petites, filtrer les placeholders FNAIM
-                                    placeholder_patterns = [
-                                        'imagesv2.fnaim.fr/images1/img/',  # Placeholder FNAIM
-                                        'placeholder',
-                                        'placeholder.jpg',
-                                        'no-image',
-                                        'default-image',
-                                    ]
-                                    if any(pattern in src_lower for pattern in placeholder_patterns):
-                                        continue
-                                    
-                                    # Si alt="preloader" ET placeholder FNAIM ET pas visible, exclure
-                                    if 'preloader' in alt_lower and 'imagesv2.fnaim.fr/images1/img/' in src_lower:
-                                        continue
-                                
-                                # Accepter les URLs de vraies photos d'appartements (patterns étendus)
-                                # OU accepter les images visibles avec bonnes dimensions (même FNAIM)
-                                photo_patterns = [
-                                    'loueragile', 
-                                    'upload_pro_ad', 
-                                    'media.apimo.pro', 
-                                    'studio-net.fr', 
-                                    'images.century21.fr', 
-                                    'biens', 
-                                    'apartement', 
-                                    'transopera', 
-                                    'staticlbi', 
-                                    'uploadcaregdc', 
-                                    'uploadcare', 
-                                    's3.amazonaws.com', 
-                                    'googleusercontent.com', 
-                                    'cdn.safti.fr', 
-                                    'safti.fr', 
-                                    'paruvendu.fr', 
-                                    'immo-facile.com', 
-                                    'mms.seloger.com', 
-                                    'seloger.com',
-                                    'api.jinka.fr/apiv2/media/imgsrv',  # Proxy Jinka
-                                    'photos.ubif',  # Photos via proxy Jinka
-                                    'res.cloudinary.com',
-                                    'cloudinary.com',
-                                    'photos.',
-                                    'imagesv2.fnaim.fr',  # Accepter FNAIM si image visible
-                                ]
-                                has_valid_pattern = any(pattern in src_lower for pattern in photo_patterns)
-                                
-                                # Accepter si pattern valide OU si image visible avec bonnes dimensions
-                                if not has_valid_pattern and not (is_visible and has_good_dimensions):
-                                    continue
-                                
-                                # Vérifier les dimensions de l'image (exclure les très petites comme les logos)
-                                width = img_data.get('width', 0)
-                                height = img_data.get('height', 0)
-                                
-                                # Les logos font généralement ~128x128px, les vraies photos sont beaucoup plus grandes
-                                # On exclut seulement les images très petites (< 200px)
-                                if width > 0 and height > 0:
-                                    if width < 200 or height < 200:
-                                        # Probablement un logo ou icône (ex: logo immobilier 128x128), on skip
-                                        continue
-                                
-                                # Formater la description complète avec toutes les infos
-                                alt = self.format_photo_description(surface, prix_m2, etage, style)
-                                
-                                position_top = img_data.get('top', 0)
-                                position_left = img_data.get('left', 0)
-                                
-                                # Garder toutes les photos valides, même si cachées (display="none")
-                                # Les photos avec alt="preloader" dans des divs cachées sont souvent les vraies photos
-                                
-                                photos_with_position.append({
-                                    'url': src_to_use,
-                                    'alt': alt or 'appartement',
-                                    'selector': 'gallery_div_visible',
-                                    'width': width,
-                                    'height': height,
-                                    'dom_index': img_data.get('domIndex', 0),
-                                    'position_top': position_top,
-                                    'position_left': position_left
-                                })
-                            except Exception as e:
-                                continue
-                        
-                        # Dédupliquer par URL, en gardant la photo avec la meilleure position (visible de préférence)
-                        url_to_photo = {}
-                        for photo in photos_with_position:
-                            url = photo['url']
-                            top = photo.get('position_top', 0)
-                            left = photo.get('position_left', 0)
-                            
-                            # Si on a déjà cette URL
-                            if url in url_to_photo:
-                                existing_top = url_to_photo[url].get('position_top', 0)
-                                existing_left = url_to_photo[url].get('position_left', 0)
-                                
-                                # Préférer la photo avec position non-0,0 (visible)
-                                if (top != 0 or left != 0) and (existing_top == 0 and existing_left == 0):
-                                    # Nouvelle photo est visible, remplacer
-                                    url_to_photo[url] = photo
-                                elif (top == 0 and left == 0) and (existing_top != 0 or existing_left != 0):
-                                    # Photo existante est visible, garder celle-là
-                                    pass
-                                else:
-                                    # Les deux ont même type de position, garder la première
-                                    pass
-                            else:
-                                # Première occurrence de cette URL
-                                url_to_photo[url] = photo
-                        
-                        photos_with_position = list(url_to_photo.values())
-                        
-                        # Séparer les photos visibles (position != 0,0) des photos cachées (0,0)
-                        visible_photos = [p for p in photos_with_position if p.get('position_top', 0) != 0 or p.get('position_left', 0) != 0]
-                        hidden_photos = [p for p in photos_with_position if p.get('position_top', 0) == 0 and p.get('position_left', 0) == 0]
+                        img_elements = await gallery_element.evaluate(GALLERY_IMAGES_JS)
                         
-                        # Trier les photos visibles par position (top puis left) pour l'ordre visuel
-                        visible_photos.sort(key=lambda x: (x.get('position_top', 0), x.get('position_left', 0)))
-                        
-                        # Trier les photos cachées par index DOM pour préserver l'ordre de Jinka
-                        hidden_photos.sort(key=lambda x: x.get('dom_index', 0))
-                        
-                        # Combiner : photos visibles d'abord, puis photos cachées dans l'ordre DOM
-                        photos_with_position = visible_photos + hidden_photos
-                        print(f"      ✅ {len(visible_photos)} photos visibles + {len(hidden_photos)} photos cachées = {len(photos_with_position)} photos au total")
-                        
-                        # Ajouter les photos dans l'ordre correct (ordre visuel de Jinka)
-                        for photo_with_pos in photos_with_position:
-                            photo = {k: v for k, v in photo_with_pos.items() if k not in ['dom_index', 'position_top', 'position_left']}
-                            photos.append(photo)
-                            print(f"      📸 Photo galerie (top: {photo_with_pos.get('position_top', 0):.0f}, left: {photo_with_pos.get('position_left', 0):.0f}, {photo_with_pos['width']}x{photo_with_pos['height']}): {photo_with_pos['url'][:60]}...")
-                        
-                        if len(photos) > 0:
-                            # Ne pas break, continuer à chercher dans d'autres sélecteurs pour accumuler toutes les photos
-                            pass
+                        # Continuer avec les autres sélecteurs pour accumuler toutes les photos
+                        photos.extend(select_gallery_photos(img_elements, alt))
                 except Exception as e:
                     continue
             
             # Après avoir cherché dans toutes les galeries, dédupliquer
             if len(photos) > 0:
-                unique_photos_temp = []
-                seen_urls_temp = set()
-                for photo in photos:
-                    if photo['url'] not in seen_urls_temp:
-                        unique_photos_temp.append(photo)
-                        seen_urls_temp.add(photo['url'])
-                photos = unique_photos_temp
+                photos = dedupe_photos(photos)
                 print(f"      ✅ {len(photos)} photos uniques trouvées après déduplication")
             
             # Méthode 2: Si pas de photos dans la galerie, chercher les images visibles avec URLs d'appartement
             if len(photos) == 0:
                 print("      ⚠️ Aucune photo dans la galerie, recherche d'images visibles...")
                 
-                # Attendre un peu pour que les images lazy-loaded se chargent
-                await asyncio.sleep(2)
+                # Attendre que les images lazy-loaded se chargent
+                await self.readiness.images_complete()
                 
                 # Chercher UNIQUEMENT les images visibles avec URLs d'appartement
                 all_visible_images = await self.page.locator('img:visible').all()
@@ -1916,49 +1567,14 @@ class JinkaScraper:
                             pass  # Continuer pour ajouter la photo
                         else:
                             # Pour les images cachées ou petites, filtrer les placeholders FNAIM
-                            placeholder_patterns = [
-                                'imagesv2.fnaim.fr/images1/img/',  # Placeholder FNAIM
-                                'placeholder',
-                                'placeholder.jpg',
-                                'no-image',
-                                'default-image',
-                            ]
-                            if any(pattern in src_lower for pattern in placeholder_patterns):
+                            if any(pattern in src_lower for pattern in PLACEHOLDER_PATTERNS):
                                 continue
                             
                             # Si alt="preloader" ET placeholder FNAIM ET pas visible, exclure
                             if 'preloader' in alt_lower and 'imagesv2.fnaim.fr/images1/img/' in src_lower:
                                 continue
                         
-                        # Accepter les URLs de vraies photos d'appartements (patterns étendus)
-                        photo_patterns = [
-                            'loueragile', 
-                            'upload_pro_ad', 
-                            'media.apimo.pro', 
-                            'studio-net.fr', 
-                            'images.century21.fr', 
-                            'biens', 
-                            'apartement', 
-                            'transopera', 
-                            'staticlbi', 
-                            'uploadcaregdc', 
-                            'uploadcare', 
-                            's3.amazonaws.com', 
-                            'googleusercontent.com', 
-                            'cdn.safti.fr', 
-                            'safti.fr', 
-                            'paruvendu.fr', 
-                            'immo-facile.com', 
-                            'mms.seloger.com', 
-                            'seloger.com',
-                            'api.jinka.fr/apiv2/media/imgsrv',  # Proxy Jinka
-                            'photos.ubif',  # Photos via proxy Jinka
-                            'res.cloudinary.com',
-                            'cloudinary.com',
-                            'photos.',
-                            'imagesv2.fnaim.fr',  # Accepter FNAIM si image visible
-                        ]
-                        if src_to_use and any(pattern in src_lower for pattern in photo_patterns):
+                        if src_to_use and any(pattern in src_lower for pattern in PHOTO_URL_PATTERNS):
                             # Exclure les logos (mais pas si image visible avec bonnes dimensions)
                             if 'logo' in src_lower or 'source_logos' in src_lower:
                                 if not (is_visible and width > 200 and height > 200):
@@ -2021,14 +1637,7 @@ class JinkaScraper:
                                 pass  # Continuer pour ajouter la photo
                             else:
                                 # Pour les images cachées ou petites, filtrer les placeholders FNAIM
-                                placeholder_patterns = [
-                                    'imagesv2.fnaim.fr/images1/img/',  # Placeholder FNAIM
-                                    'placeholder',
-                                    'placeholder.jpg',
-                                    'no-image',
-                                    'default-image',
-                                ]
-                                if any(pattern in src_lower for pattern in placeholder_patterns):
+                                if any(pattern in src_lower for pattern in PLACEHOLDER_PATTERNS):
                                     continue
                                 
                                 # Si alt="preloader" ET placeholder FNAIM ET pas visible, exclure
@@ -2036,34 +1645,7 @@ class JinkaScraper:
                                     continue
                             
                             # Filtrer par URL (patterns étendus) OU accepter si visible avec bonnes dimensions
-                            photo_patterns = [
-                                'loueragile', 
-                                'upload_pro_ad', 
-                                'media.apimo.pro', 
-                                'studio-net.fr', 
-                                'images.century21.fr', 
-                                'biens', 
-                                'apartement', 
-                                'transopera', 
-                                'staticlbi', 
-                                'uploadcaregdc', 
-                                'uploadcare', 
-                                's3.amazonaws.com', 
-                                'googleusercontent.com', 
-                                'cdn.safti.fr', 
-                                'safti.fr', 
-                                'paruvendu.fr', 
-                                'immo-facile.com', 
-                                'mms.seloger.com', 
-                                'seloger.com',
-                                'api.jinka.fr/apiv2/media/imgsrv',  # Proxy Jinka
-                                'photos.ubif',  # Photos via proxy Jinka
-                                'res.cloudinary.com',
-                                'cloudinary.com',
-                                'photos.',
-                                'imagesv2.fnaim.fr',  # Accepter FNAIM si image visible
-                            ]
-                            has_valid_pattern = any(pattern in src_lower for pattern in photo_patterns)
+                            has_valid_pattern = any(pattern in src_lower for pattern in PHOTO_URL_PATTERNS)
                             
                             # Accepter si pattern valide OU si image visible avec bonnes dimensions
                             if not has_valid_pattern and not (is_visible and width > 200 and height > 200):
@@ -2093,12 +1675,7 @@ class JinkaScraper:
                             continue
             
             # Dédupliquer
-            unique_photos = []
-            seen_urls = set()
-            for photo in photos:
-                if photo['url'] not in seen_urls:
-                    unique_photos.append(photo)
-                    seen_urls.add(photo['url'])
+            unique_photos = dedupe_photos(photos)
             
             print(f"   ✅ {len(unique_photos)} photos d'appartement trouvées")
             return unique_photos  # Retourner toutes les photos disponibles
@@ -2202,6 +1779,10 @@ class JinkaScraper:
                                     final_filename = f"{photos_dir}/photo{photo_number}.jpg"
                                     os.rename(temp_filename, final_filename)
                                     valid_photos.append(final_filename)
+                                    # Déclinaisons responsive (WebP/JPEG) hors de la boucle asyncio
+                                    derivatives = await asyncio.to_thread(generate_derivatives, final_filename, force=True)
+                                    if derivatives is not None:
+                                        get_photo_manifest().record_derivatives(final_filename, derivatives)
                                     print(f"      📸 Photo {photo_number} téléchargée: {final_filename} ({len(content)} bytes)")
                                 else:
                                     # Supprimer la photo invalide
@@ -2214,6 +1795,8 @@ class JinkaScraper:
                         if os.path.exists(temp_filename):
                             os.remove(temp_filename)
             
+            # Liste ordonnée lue par le rendu HTML (sans parcourir le dossier)
+            get_photo_manifest().record(apartment_id, 'photos', valid_photos)
             print(f"      ✅ {len(valid_photos)} photos d'appartement téléchargées dans {photos_dir}/")
                         
         except Exception as e:
@@ -2251,6 +1834,8 @@ class JinkaScraper:
     
     async def cleanup(self):
         """Ferme le navigateur"""
+        if self.resource_policy and self.resource_policy.blocked:
+            print(f"🚫 Ressources bloquées: {self.resource_policy.summary()}")
         if self.browser:
             await self.browser.close()
 
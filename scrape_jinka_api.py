@@ -13,6 +13,7 @@ from urllib.parse import urlparse, parse_qs
 from jinka_api_client import JinkaAPIClient
 from api_data_adapter import adapt_api_to_scraped_format, adapt_dashboard_to_apartment_list
 from extract_exposition import ExpositionExtractor
+from listing_index import ListingIndex, compute_listing_fingerprint
 
 
 class JinkaAPIScraper:
@@ -26,8 +27,26 @@ class JinkaAPIScraper:
     - Plus facile à déboguer
     """
     
-    def __init__(self):
-        """Initialise le scraper API"""
+    def __init__(
+        self,
+        max_concurrent: int = 5,
+        requests_per_second: float = 10.0,
+        incremental: bool = False,
+        listing_index: Optional[ListingIndex] = None
+    ):
+        """
+        Initialise le scraper API
+        
+        Args:
+            max_concurrent: Nombre maximum de détails d'appartements récupérés en parallèle
+            requests_per_second: Débit maximal de requêtes API (partagé par toutes les tâches)
+            incremental: Ne récupérer les détails que des annonces nouvelles ou modifiées
+            listing_index: Index des annonces à utiliser (data/listing_index.json par défaut)
+        """
+        self.incremental = incremental
+        self.listing_index = listing_index or (ListingIndex() if incremental else None)
+        self.max_concurrent = max(1, max_concurrent)
+        self.requests_per_second = requests_per_second
         self.api_client: Optional[JinkaAPIClient] = None
         self.apartments: List[Dict[str, Any]] = []
         self.exposition_extractor = ExpositionExtractor()
@@ -36,7 +55,11 @@ class JinkaAPIScraper:
     async def setup(self):
         """Initialise le client API"""
         print("🔧 Initialisation du client API...")
-        self.api_client = JinkaAPIClient(enable_cache=True)
+        self.api_client = JinkaAPIClient(
+            enable_cache=True,
+            requests_per_second=self.requests_per_second,
+            burst=self.max_concurrent
+        )
         print("✅ Client API initialisé")
     
     async def login(self) -> bool:
@@ -92,6 +115,10 @@ class JinkaAPIScraper:
         """
         Scrape toutes les pages d'une alerte via l'API
         
+        Les détails sont récupérés en parallèle (au plus `max_concurrent` à la fois) et la
+        page suivante du dashboard est préchargée pendant ce temps. L'ordre du résultat
+        reste celui du dashboard (page par page).
+        
         Args:
             alert_url: URL de l'alerte
             filter_type: Type de filtre ("all", "seen", "unseen", etc.)
@@ -118,69 +145,134 @@ class JinkaAPIScraper:
         all_apartments = []
         page = 1
         has_more = True
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        if self.listing_index:
+            self.listing_index.reset_stats()
         
-        while has_more and page <= max_pages:
-            print(f"\n📄 Page {page}/{max_pages}...")
-            
-            # Récupérer le dashboard de la page
-            dashboard_data = await self.api_client.get_alert_dashboard(
-                alert_token=self.alert_token,
-                filter_type=filter_type,
-                page=page
-            )
-            
-            if not dashboard_data:
-                print(f"⚠️  Aucune donnée pour la page {page}")
-                break
-            
-            # Extraire les appartements de cette page
-            page_apartments = adapt_dashboard_to_apartment_list(dashboard_data)
-            
-            if not page_apartments:
-                print(f"✅ Fin des résultats (page {page})")
-                has_more = False
-                break
-            
-            print(f"   {len(page_apartments)} appartements trouvés sur cette page")
-            
-            # Vérifier la pagination dans la réponse API
-            pagination_info = dashboard_data.get('pagination', {})
-            if pagination_info:
-                total = pagination_info.get('total', 0)
-                current_page = pagination_info.get('page', page)
-                per_page = pagination_info.get('per_page', len(page_apartments))
-                has_more_pages = pagination_info.get('has_more', None)
+        # Le dashboard de la page suivante est récupéré pendant le scraping des détails
+        next_dashboard_task = asyncio.create_task(
+            self._fetch_dashboard(filter_type, page)
+        )
+        
+        try:
+            while has_more and page <= max_pages:
+                print(f"\n📄 Page {page}/{max_pages}...")
+                
+                # Récupérer le dashboard de la page
+                dashboard_data = await next_dashboard_task
+                next_dashboard_task = None
+                
+                if not dashboard_data:
+                    print(f"⚠️  Aucune donnée pour la page {page}")
+                    break
                 
-                if total > 0:
-                    print(f"   📊 Total: {total} appartements | Page {current_page} | {per_page} par page")
+                # Extraire les appartements de cette page
+                page_apartments = adapt_dashboard_to_apartment_list(dashboard_data)
                 
-                # Si has_more est explicitement False, on arrête
-                if has_more_pages is False:
+                if not page_apartments:
+                    print(f"✅ Fin des résultats (page {page})")
                     has_more = False
-            
-            # Scraper les détails de chaque appartement
-            for apt_info in page_apartments:
-                apartment_id = apt_info['id']
-                apartment_data = await self.scrape_apartment(apt_info['url'])
+                    break
                 
-                if apartment_data:
-                    all_apartments.append(apartment_data)
-                    print(f"   ✅ {apartment_id}: {apartment_data.get('titre', 'N/A')[:50]}")
-                else:
-                    print(f"   ⚠️  {apartment_id}: Échec du scraping")
-            
-            # Si on n'a pas d'info de pagination explicite, on continue tant qu'on a des résultats
-            # et qu'on n'a pas atteint max_pages
-            if len(page_apartments) == 0:
-                has_more = False
-            
-            page += 1
+                print(f"   {len(page_apartments)} appartements trouvés sur cette page")
+                
+                # Vérifier la pagination dans la réponse API
+                pagination_info = dashboard_data.get('pagination', {})
+                if pagination_info:
+                    total = pagination_info.get('total', 0)
+                    current_page = pagination_info.get('page', page)
+                    per_page = pagination_info.get('per_page', len(page_apartments))
+                    has_more_pages = pagination_info.get('has_more', None)
+                    
+                    if total > 0:
+                        print(f"   📊 Total: {total} appartements | Page {current_page} | {per_page} par page")
+                    
+                    # Si has_more est explicitement False, on arrête
+                    if has_more_pages is False:
+                        has_more = False
+                
+                # Lancer la récupération de la page suivante en parallèle des détails
+                if has_more and page < max_pages:
+                    next_dashboard_task = asyncio.create_task(
+                        self._fetch_dashboard(filter_type, page + 1)
+                    )
+                
+                # Empreintes du dashboard (mode incrémental)
+                raw_ads = {str(ad.get('id', '')): ad for ad in dashboard_data.get('ads', [])}
+                
+                # Scraper les détails de chaque appartement (en parallèle, ordre préservé)
+                results = await asyncio.gather(*[
+                    self._scrape_listing(semaphore, apt_info, raw_ads.get(apt_info['id'], {}))
+                    for apt_info in page_apartments
+                ])
+                
+                for apt_info, apartment_data in zip(page_apartments, results):
+                    apartment_id = apt_info['id']
+                    if apartment_data:
+                        all_apartments.append(apartment_data)
+                        print(f"   ✅ {apartment_id}: {apartment_data.get('titre', 'N/A')[:50]}")
+                    else:
+                        print(f"   ⚠️  {apartment_id}: Échec du scraping")
+                
+                page += 1
+        finally:
+            if next_dashboard_task and not next_dashboard_task.done():
+                next_dashboard_task.cancel()
         
         self.apartments = all_apartments
         print(f"\n✅ Scraping terminé: {len(all_apartments)} appartements au total")
         
+        if self.listing_index:
+            self.listing_index.save()
+            stats = self.listing_index.stats
+            print(f"   📇 Index: {stats['new']} nouveaux, {stats['changed']} modifiés, "
+                  f"{stats['unchanged']} inchangés (détails réutilisés)")
+        
         return all_apartments
     
+    async def _fetch_dashboard(self, filter_type: str, page: int) -> Optional[Dict[str, Any]]:
+        """Récupère une page du dashboard de l'alerte courante"""
+        return await self.api_client.get_alert_dashboard(
+            alert_token=self.alert_token,
+            filter_type=filter_type,
+            page=page
+        )
+    
+    async def _scrape_apartment_bounded(
+        self,
+        semaphore: asyncio.Semaphore,
+        url: str
+    ) -> Optional[Dict[str, Any]]:
+        """Scrape un appartement en respectant la limite de concurrence"""
+        async with semaphore:
+            try:
+                return await self.scrape_apartment(url)
+            except Exception as e:
+                print(f"❌ Erreur lors du scraping de {url}: {e}")
+                return None
+    
+    async def _scrape_listing(
+        self,
+        semaphore: asyncio.Semaphore,
+        apt_info: Dict[str, str],
+        raw_ad: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Récupère les détails d'une annonce, ou les reprend de l'index si elle n'a pas changé
+        """
+        if not self.listing_index or not raw_ad:
+            return await self._scrape_apartment_bounded(semaphore, apt_info['url'])
+        
+        fingerprint = compute_listing_fingerprint(raw_ad)
+        cached = self.listing_index.get_unchanged(apt_info['id'], fingerprint)
+        if cached:
+            return cached
+        
+        apartment_data = await self._scrape_apartment_bounded(semaphore, apt_info['url'])
+        if apartment_data:
+            self.listing_index.update(apt_info['id'], fingerprint, apartment_data)
+        return apartment_data
+    
     async def scrape_apartment(self, url: str) -> Optional[Dict[str, Any]]:
         """
         Scrape les détails d'un appartement via l'API
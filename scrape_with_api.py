@@ -25,7 +25,8 @@ async def scrape_alert_with_api(alert_url: str, filter_type: str = "all"):
     print(f"Filtre: {filter_type}")
     print()
     
-    scraper = JinkaAPIScraper()
+    # Mode incrémental: seules les annonces nouvelles ou modifiées sont re-téléchargées
+    scraper = JinkaAPIScraper(incremental=True)
     
     try:
         # Initialisation
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Snapshot de service - appartements scorés et pré-enrichis pour le backend
+
+Le pipeline de scoring écrit, après chaque sauvegarde des scores, un fichier
+unique data/serving/apartments_snapshot.json contenant les appartements
+fusionnés (load_scored_apartments) et enrichis (enrich_apartment_with_indices),
+avec leurs photos locales et leurs déclinaisons responsive (local_photos,
+telles qu'enregistrées au téléchargement, avant le scoring qui écrit le snapshot).
+Le backend le charge en une passe au lieu de refaire fusion et formatage.
+
+Le snapshot est versionné: il est ignoré si son format ou sa version
+d'enrichissement ne correspondent plus au code, ou si l'un des fichiers
+sources a changé depuis sa génération.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from criteria import format_cuisine, format_baignoire, format_style, format_exposition
+from photo_derivatives import responsive_image
+from photo_manifest import get_photo_manifest
+
+SNAPSHOT_FILE = 'data/serving/apartments_snapshot.json'
+SNAPSHOT_FORMAT_VERSION = 1
+# À incrémenter à chaque changement de enrich_apartment_with_indices ou des formatters
+ENRICHMENT_VERSION = 2
+
+SCORES_FILE = 'data/scores/all_apartments_scores.json'
+SCRAPED_FILE = 'data/scraped_apartments.json'
+APPARTEMENTS_DIR = 'data/appartements'
+SCORING_CONFIG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_config.json')
+
+# Importer la fonction de scoring pour valider les scores style
+try:
+    from scoring import score_style
+    _scoring_config = None
+    def load_scoring_config():
+        """Charge la configuration de scoring"""
+        global _scoring_config
+        if _scoring_config is None:
+            try:
+                with open(SCORING_CONFIG_FILE, 'r', encoding='utf-8') as f:
+                    _scoring_config = json.load(f)
+            except Exception as e:
+                print(f"⚠️ Erreur chargement scoring_config: {e}")
+                _scoring_config = {}
+        return _scoring_config
+except ImportError:
+    print("⚠️ Module scoring non disponible, validation style désactivée")
+    score_style = None
+    load_scoring_config = None
+
+def validate_style_score(apartment: Dict[str, Any]) -> Dict[str, Any]:
+    """Valide et corrige le score style selon les règles strictes"""
+    if not score_style or 'scores_detaille' not in apartment:
+        return apartment
+    
+    try:
+        config = load_scoring_config()
+        if not config or 'axes' not in config or 'style' not in config['axes']:
+            return apartment
+        
+        # Utiliser score_style pour calculer le score selon les règles
+        style_result = score_style(apartment, config)
+        
+        # Override le score style dans scores_detaille avec les valeurs calculées
+        if 'style' not in apartment['scores_detaille']:
+            apartment['scores_detaille']['style'] = {}
+        
+        apartment['scores_detaille']['style']['score'] = style_result['score']
+        apartment['scores_detaille']['style']['tier'] = style_result['tier']
+        apartment['scores_detaille']['style']['justification'] = style_result['justification']
+        if style_result.get('confidence'):
+            apartment['scores_detaille']['style']['confidence'] = style_result['confidence']
+        
+    except Exception as e:
+        # En cas d'erreur, ne pas bloquer le chargement
+        print(f"⚠️ Erreur validation style pour {apartment.get('id')}: {e}")
+    
+    return apartment
+
+def validate_ensoleillement_score(apartment: Dict[str, Any]) -> Dict[str, Any]:
+    """Valide et recalcule le score ensoleillement selon les nouvelles règles de vote"""
+    if 'scores_detaille' not in apartment:
+        return apartment
+    
+    try:
+        from scoring import score_ensoleillement
+        config = load_scoring_config()
+        if not config or 'axes' not in config or 'ensoleillement' not in config['axes']:
+            return apartment
+        
+        # Recalculer le score avec les nouvelles règles
+        ensoleillement_result = score_ensoleillement(apartment, config)
+        
+        # Mettre à jour le score dans scores_detaille
+        if 'ensoleillement' not in apartment['scores_detaille']:
+            apartment['scores_detaille']['ensoleillement'] = {}
+        
+        apartment['scores_detaille']['ensoleillement']['score'] = ensoleillement_result['score']
+        apartment['scores_detaille']['ensoleillement']['tier'] = ensoleillement_result['tier']
+        apartment['scores_detaille']['ensoleillement']['justification'] = ensoleillement_result['justification']
+        if ensoleillement_result.get('confidence'):
+            apartment['scores_detaille']['ensoleillement']['confidence'] = ensoleillement_result['confidence']
+        
+    except Exception as e:
+        # En cas d'erreur, ne pas bloquer le chargement
+        print(f"⚠️ Erreur validation ensoleillement pour {apartment.get('id')}: {e}")
+        import traceback
+        traceback.print_exc()
+    
+    return apartment
+
+def local_photo_sources(apartment_id) -> List[Dict[str, str]]:
+    """Photos locales d'un appartement: {'src', 'srcset', 'webp_srcset'} servis sous /data"""
+    if not apartment_id:
+        return []
+    manifest = get_photo_manifest()
+    return [
+        responsive_image(f"/{path}", path, manifest.derivatives_for(path))
+        for path in manifest.photos_for(apartment_id)
+    ]
+
+def enrich_apartment_with_indices(apartment: Dict[str, Any]) -> Dict[str, Any]:
+    """Enrichit un appartement avec les indices formatés depuis le module criteria"""
+    try:
+        # Valider les scores selon les règles strictes
+        apartment = validate_style_score(apartment)
+        apartment = validate_ensoleillement_score(apartment)
+        
+        # Enrichir avec les indices pour cuisine, baignoire et style
+        if 'scores_detaille' in apartment:
+            # Cuisine
+            if 'cuisine' in apartment.get('scores_detaille', {}):
+                try:
+                    cuisine_formatted = format_cuisine(apartment)
+                    if 'formatted_data' not in apartment:
+                        apartment['formatted_data'] = {}
+                    apartment['formatted_data']['cuisine'] = {
+                        'indices': cuisine_formatted.get('indices')
+                    }
+                except Exception as e:
+                    # En cas d'erreur, utiliser la phrase par défaut
+                    if 'formatted_data' not in apartment:
+                        apartment['formatted_data'] = {}
+                    apartment['formatted_data']['cuisine'] = {
+                        'indices': "Style expo cuisine et baignoire"
+                    }
+            
+            # Baignoire
+            if 'baignoire' in apartment.get('scores_detaille', {}):
+                try:
+                    baignoire_formatted = format_baignoire(apartment)
+                    if 'formatted_data' not in apartment:
+                        apartment['formatted_data'] = {}
+                    apartment['formatted_data']['baignoire'] = {
+                        'main_value': baignoire_formatted.get('main_value'),
+                        'indices': baignoire_formatted.get('indices'),
+                        'confidence': baignoire_formatted.get('confidence')
+                    }
+                except Exception as e:
+                    # En cas d'erreur, utiliser la phrase par défaut
+                    if 'formatted_data' not in apartment:
+                        apartment['formatted_data'] = {}
+                    apartment['formatted_data']['baignoire'] = {
+                        'main_value': 'Non',
+                        'indices': "Style expo cuisine et baignoire",
+                        'confidence': None
+                    }
+            
+            # Style
+            if 'style' in apartment.get('scores_detaille', {}):
+                try:
+                    style_formatted = format_style(apartment)
+                    if 'formatted_data' not in apartment:
+                        apartment['formatted_data'] = {}
+                    apartment['formatted_data']['style'] = {
+                        'indices': style_formatted.get('indices')  # Peut être None si pas d'indices trouvés
+                    }
+                except Exception as e:
+                    # En cas d'erreur, ne pas mettre de fallback générique
+                    # Le frontend gérera l'affichage si pas d'indices
+                    if 'formatted_data' not in apartment:
+                        apartment['formatted_data'] = {}
+                    apartment['formatted_data']['style'] = {
+                        'indices': None
+                    }
+            
+            # Exposition
+            # Créer formatted_data.exposition si l'appartement a soit scores_detaille.ensoleillement, soit exposition (depuis scraping), soit etage_num depuis API
+            has_ensoleillement_score = 'ensoleillement' in apartment.get('scores_detaille', {})
+            exposition_obj = apartment.get('exposition', {})
+            has_exposition_data = bool(exposition_obj.get('exposition'))
+            has_etage_num = 'etage_num' in exposition_obj.get('details', {})
+            
+            if has_ensoleillement_score or has_exposition_data or has_etage_num:
+                try:
+                    exposition_formatted = format_exposition(apartment)
+                    if 'formatted_data' not in apartment:
+                        apartment['formatted_data'] = {}
+                    apartment['formatted_data']['exposition'] = {
+                        'main_value': exposition_formatted.get('main_value'),
+                        'indices': exposition_formatted.get('indices'),
+                        'confidence': exposition_formatted.get('confidence')
+                    }
+                except Exception as e:
+                    # Logger l'erreur pour debug
+                    import traceback
+                    print(f"❌ Erreur format_exposition pour {apartment.get('id')}: {e}")
+                    print(traceback.format_exc())
+                    # En cas d'erreur, ne pas ajouter de données formatées
+                    pass
+        
+        # Photos locales avec srcset (WebP/JPEG) depuis le manifeste des photos
+        apartment['local_photos'] = local_photo_sources(apartment.get('id'))
+    except Exception as e:
+        # Ne pas faire échouer la requête si l'enrichissement échoue
+        pass
+    
+    return apartment
+
+
+def snapshot_sources() -> Dict[str, Any]:
+    """Empreinte des fichiers lus par load_scored_apartments et du manifeste des photos (mtimes, tailles)"""
+    sources = {}
+    for key, path in (('scores', SCORES_FILE), ('scraped', SCRAPED_FILE), ('config', SCORING_CONFIG_FILE)):
+        sources[key] = os.path.getmtime(path) if os.path.exists(path) else None
+
+    apartment_files = list(Path(APPARTEMENTS_DIR).glob('*.json')) if os.path.isdir(APPARTEMENTS_DIR) else []
+    sources['appartements'] = [
+        len(apartment_files),
+        max((f.stat().st_mtime for f in apartment_files), default=None)
+    ]
+    sources['photos'] = photo_manifest_fingerprint()
+    return sources
+
+def photo_manifest_fingerprint() -> Optional[List[float]]:
+    """Taille et mtime du journal des photos (local_photos: téléchargements, déclinaisons)"""
+    manifest_file = get_photo_manifest().manifest_file
+    if not os.path.exists(manifest_file):
+        return None
+    return [os.path.getsize(manifest_file), os.path.getmtime(manifest_file)]
+
+def build_enriched_apartments() -> List[Dict[str, Any]]:
+    """Fusionne scores et données scrapées puis enrichit chaque appartement"""
+    from generate_scorecard_html import load_scored_apartments
+    apartments = load_scored_apartments()
+    get_photo_manifest().refresh()
+    return [enrich_apartment_with_indices(apt) for apt in apartments]
+
+def save_serving_snapshot(apartments: List[Dict[str, Any]], sources: Optional[Dict[str, Any]] = None,
+                          snapshot_file: str = SNAPSHOT_FILE) -> str:
+    """
+    Écrit le snapshot de service (écriture atomique)
+
+    Args:
+        apartments: Appartements déjà enrichis
+        sources: Empreinte des sources lue AVANT la construction (défaut: empreinte actuelle)
+        snapshot_file: Chemin du snapshot
+
+    Returns:
+        Chemin du snapshot écrit
+    """
+    snapshot = {
+        'format_version': SNAPSHOT_FORMAT_VERSION,
+        'enrichment_version': ENRICHMENT_VERSION,
+        'generated_at': datetime.now().isoformat(),
+        'sources': sources if sources is not None else snapshot_sources(),
+        'apartments': apartments,
+    }
+
+    os.makedirs(os.path.dirname(snapshot_file) or '.', exist_ok=True)
+    tmp_file = f"{snapshot_file}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        # Format compact: fichier lu par le backend, pas par un humain
+        json.dump(snapshot, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_file, snapshot_file)
+    return snapshot_file
+
+def build_serving_snapshot(snapshot_file: str = SNAPSHOT_FILE) -> List[Dict[str, Any]]:
+    """Construit et écrit le snapshot depuis les fichiers de scores et scrapés"""
+    sources = snapshot_sources()
+    apartments = build_enriched_apartments()
+    # L'enrichissement enregistre lui-même les appartements encore inconnus du manifeste
+    sources['photos'] = photo_manifest_fingerprint()
+    save_serving_snapshot(apartments, sources=sources, snapshot_file=snapshot_file)
+    return apartments
+
+def load_serving_snapshot(snapshot_file: str = SNAPSHOT_FILE) -> Optional[List[Dict[str, Any]]]:
+    """
+    Charge le snapshot de service s'il est à jour
+
+    Returns:
+        Liste des appartements enrichis, ou None si le snapshot est absent,
+        illisible, d'une autre version ou plus ancien que ses sources
+    """
+    try:
+        with open(snapshot_file, 'r', encoding='utf-8') as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(snapshot, dict):
+        return None
+    if snapshot.get('format_version') != SNAPSHOT_FORMAT_VERSION or snapshot.get('enrichment_version') != ENRICHMENT_VERSION:
+        return None
+    if snapshot.get('sources') != snapshot_sources():
+        return None
+
+    apartments = snapshot.get('apartments')
+    return apartments if isinstance(apartments, list) else None
+
+
+if __name__ == "__main__":
+    # Reconstruction manuelle (ex: après un script qui modifie les scores directement)
+    apartments = build_serving_snapshot()
+    print(f"✅ Snapshot de service généré: {SNAPSHOT_FILE} ({len(apartments)} appartements)")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Coffre de session Jinka (état du navigateur + token API persistés)
+
+La connexion par email (code d'activation lu dans Gmail, jusqu'à 2 min) et
+le lancement de Playwright ne servent qu'à obtenir les cookies de session,
+dont LA_API_TOKEN. Le coffre les garde entre deux exécutions:
+
+- data/session_vault.json (permissions 600):
+  {"storage_state": {...}, "api_token": ..., "expires_at": ..., "saved_at": ...}
+- expiration: la plus proche entre le cookie LA_API_TOKEN, le champ exp du
+  token (s'il s'agit d'un JWT) et saved_at + DEFAULT_SESSION_TTL
+- validation par un appel authentifié léger (GET /user/authenticated);
+  un refus (401/403) efface le coffre
+
+JinkaScraper.setup() ouvre son contexte avec l'état du coffre s'il est
+valide (login() n'a alors rien à faire) et login() l'enregistre après une
+connexion par email. JinkaAPIClient.login() s'en sert sans lancer de
+navigateur.
+"""
+
+import base64
+import json
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+import aiohttp
+
+SESSION_VAULT_FILE = 'data/session_vault.json'
+API_TOKEN_COOKIE = 'LA_API_TOKEN'
+VALIDATION_URL = 'https://api.jinka.fr/apiv2/user/authenticated'
+
+# Durée de vie supposée d'une session sans expiration connue
+DEFAULT_SESSION_TTL = timedelta(days=7)
+# Marge avant expiration: une session qui expire dans l'exécution est renouvelée
+EXPIRY_MARGIN = timedelta(minutes=10)
+VALIDATION_TIMEOUT = 10  # secondes
+
+
+def api_token_from_cookies(cookies) -> Optional[str]:
+    """Valeur du cookie LA_API_TOKEN (None si absent)"""
+    for cookie in cookies:
+        if cookie.get('name') == API_TOKEN_COOKIE:
+            return cookie.get('value')
+    return None
+
+
+def jwt_expiry(token: str) -> Optional[float]:
+    """Champ exp (timestamp) d'un token JWT, sans vérifier la signature (None sinon)"""
+    parts = token.split('.')
+    if len(parts) != 3:
+        return None
+    try:
+        payload = parts[1] + '=' * (-len(parts[1]) % 4)
+        exp = json.loads(base64.urlsafe_b64decode(payload)).get('exp')
+        return float(exp) if exp else None
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def cookie_header(cookies) -> str:
+    return '; '.join(f"{cookie['name']}={cookie['value']}" for cookie in cookies)
+
+
+class SessionVault:
+    """État de session persistant, avec expiration et validation"""
+
+    def __init__(self, vault_file: str = SESSION_VAULT_FILE, validation_url: str = VALIDATION_URL):
+        """
+        Args:
+            vault_file: Fichier JSON du coffre
+            validation_url: Endpoint authentifié léger utilisé pour valider la session
+        """
+        self.vault_file = vault_file
+        self.validation_url = validation_url
+
+    def save(self, storage_state: Dict) -> Optional[Dict]:
+        """
+        Enregistre l'état du navigateur après une connexion réussie
+
+        Args:
+            storage_state: Résultat de context.storage_state() (cookies, origins)
+
+        Returns:
+            Entrée enregistrée, ou None si l'état ne contient pas de token API
+        """
+        api_token = api_token_from_cookies(storage_state.get('cookies', []))
+        if not api_token:
+            print("⚠️  Session non enregistrée: cookie LA_API_TOKEN absent")
+            return None
+
+        now = time.time()
+        candidates = [now + DEFAULT_SESSION_TTL.total_seconds()]
+        for cookie in storage_state.get('cookies', []):
+            if cookie.get('name') == API_TOKEN_COOKIE and cookie.get('expires', -1) > 0:
+                candidates.append(cookie['expires'])
+        token_expiry = jwt_expiry(api_token)
+        if token_expiry:
+            candidates.append(token_expiry)
+
+        entry = {
+            'storage_state': storage_state,
+            'api_token': api_token,
+            'expires_at': datetime.fromtimestamp(min(candidates)).isoformat(),
+            'saved_at': datetime.fromtimestamp(now).isoformat(),
+        }
+        os.makedirs(os.path.dirname(self.vault_file) or '.', exist_ok=True)
+        tmp_file = f"{self.vault_file}.tmp"
+        # Cookies de session: lisibles par l'utilisateur seulement
+        fd = os.open(tmp_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp_file, self.vault_file)
+        print(f"🔑 Session enregistrée (valide jusqu'au {entry['expires_at'][:16]})")
+        return entry
+
+    def load(self) -> Optional[Dict]:
+        """Entrée du coffre si elle existe et n'est pas (presque) expirée, None sinon"""
+        try:
+            with open(self.vault_file, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            expires_at = datetime.fromisoformat(entry['expires_at'])
+        except (OSError, ValueError, KeyError):
+            return None
+        if datetime.now() + EXPIRY_MARGIN >= expires_at:
+            print("⏰ Session du coffre expirée")
+            return None
+        return entry
+
+    def clear(self):
+        """Efface le coffre (session refusée ou expirée)"""
+        if os.path.exists(self.vault_file):
+            os.remove(self.vault_file)
+
+    async def validate(self, entry: Dict) -> bool:
+        """
+        Vérifie la session par un appel authentifié léger
+
+        Un refus explicite (401/403, ou utilisateur non authentifié) efface le coffre;
+        une erreur réseau invalide seulement cette tentative.
+        """
+        headers = {
+            'Cookie': cookie_header(entry['storage_state'].get('cookies', [])),
+            'Authorization': f"Bearer {entry['api_token']}",
+            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36',
+            'Origin': 'https://www.jinka.fr',
+            'Referer': 'https://www.jinka.fr/',
+            'Accept': 'application/json',
+        }
+        try:
+            timeout = aiohttp.ClientTimeout(total=VALIDATION_TIMEOUT)
+            async with aiohttp.ClientSession(timeout=timeout) as session:
+                async with session.get(self.validation_url, headers=headers) as response:
+                    if response.status in (401, 403):
+                        print(f"🔒 Session refusée par l'API (HTTP {response.status})")
+                        self.clear()
+                        return False
+                    if response.status != 200:
+                        print(f"⚠️  Validation de session impossible (HTTP {response.status})")
+                        return False
+                    body = await response.json(content_type=None)
+        except Exception as e:
+            print(f"⚠️  Validation de session impossible: {e}")
+            return False
+
+        if isinstance(body, dict) and body.get('authenticated') is False:
+            print("🔒 Session non authentifiée")
+            self.clear()
+            return False
+        return True
+
+    async def valid_entry(self) -> Optional[Dict]:
+        """Entrée du coffre non expirée et validée par l'API, None sinon"""
+        entry = self.load()
+        if entry is None:
+            return None
+        if not await self.validate(entry):
+            return None
+        print("✅ Session restaurée depuis le coffre (connexion par email évitée)")
+        return entry
+
+
+# Instance globale du coffre
+_global_vault = None
+
+def get_session_vault() -> SessionVault:
+    """Retourne l'instance globale du coffre de session"""
+    global _global_vault
+    if _global_vault is None:
+        _global_vault = SessionVault()
+    return _global_vault
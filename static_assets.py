@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Fichiers statiques préparés pour le service HTTP (scorecard)
+
+- ETag fort: empreinte SHA-256 du contenu (recalculée seulement si mtime/taille
+  changent), ou digest déjà présent dans le nom pour les blobs du store de photos
+- HTML/CSS/JS/JSON/SVG précompressés une fois par version (gzip et, si le module
+  brotli est installé, brotli), gardés en mémoire
+- Chemins adressés par contenu (data/photo_store/blobs/...) marqués immuables
+"""
+
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+from typing import Dict, Optional
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+COMPRESSIBLE_TYPES = ('text/', 'application/javascript', 'application/json', 'image/svg+xml')
+# Préférence du serveur quand le client accepte plusieurs encodages
+ENCODINGS = ('br', 'gzip') if HAS_BROTLI else ('gzip',)
+
+# Blobs du store (et leurs déclinaisons): le nom contient le SHA-256 du contenu
+CONTENT_ADDRESSED_PATTERN = re.compile(
+    r'(^|/)data/photo_store/blobs/[0-9a-f]{2}/[0-9a-f]{2}/(derivatives/)?(?P<digest>[0-9a-f]{64})(?P<variant>\.w\d+)?\.\w+$'
+)
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+
+
+def is_compressible(content_type: str) -> bool:
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+def compress_variants(body: bytes) -> Dict[str, bytes]:
+    """Versions compressées d'un contenu (seulement celles plus petites que l'original)"""
+    variants = {'gzip': gzip.compress(body, compresslevel=9, mtime=0)}
+    if HAS_BROTLI:
+        variants['br'] = brotli.compress(body, quality=11)
+    return {encoding: data for encoding, data in variants.items() if len(data) < len(body)}
+
+
+class StaticAsset:
+    """Un fichier servi: type, ETag fort, politique de cache et versions compressées"""
+
+    def __init__(self, path: str, stat: os.stat_result, content_type: str, etag: str,
+                 immutable: bool = False, body: Optional[bytes] = None,
+                 variants: Optional[Dict[str, bytes]] = None):
+        self.path = path
+        self.mtime_ns = stat.st_mtime_ns
+        self.size = stat.st_size
+        self.mtime = stat.st_mtime
+        self.content_type = content_type
+        self.etag = etag
+        self.immutable = immutable
+        # Contenu gardé en mémoire pour les fichiers compressibles uniquement
+        self.body = body
+        self.variants = variants or {}
+
+    @property
+    def cache_control(self) -> str:
+        return IMMUTABLE_CACHE_CONTROL if self.immutable else REVALIDATE_CACHE_CONTROL
+
+    @property
+    def compressible(self) -> bool:
+        return self.body is not None
+
+    def etag_for(self, encoding: Optional[str]) -> str:
+        """ETag fort de la représentation (distinct pour chaque encodage)"""
+        return f'"{self.etag}-{encoding}"' if encoding else f'"{self.etag}"'
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Encodage à utiliser pour un en-tête Accept-Encoding (None: identité)"""
+        if not self.variants or not accept_encoding:
+            return None
+        accepted = set()
+        for token in accept_encoding.split(','):
+            name, *params = token.strip().split(';')
+            quality = 1.0
+            for param in params:
+                key, _, value = param.strip().partition('=')
+                if key == 'q':
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(name.strip().lower())
+        for encoding in ENCODINGS:
+            if encoding in self.variants and (encoding in accepted or '*' in accepted):
+                return encoding
+        return None
+
+
+class StaticAssetCache:
+    """Cache des StaticAsset, invalidé par mtime/taille (un stat par requête)"""
+
+    def __init__(self):
+        self._assets: Dict[str, StaticAsset] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[StaticAsset]:
+        """
+        Retourne l'asset d'un fichier (préparé au premier accès ou après modification)
+
+        Args:
+            path: Chemin du fichier sur disque
+
+        Returns:
+            StaticAsset, ou None si le fichier n'existe pas (ou est un dossier)
+        """
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+
+        with self._lock:
+            asset = self._assets.get(path)
+        if asset is not None and asset.mtime_ns == stat.st_mtime_ns and asset.size == stat.st_size:
+            return asset
+
+        asset = self._build(path, stat)
+        with self._lock:
+            self._assets[path] = asset
+        return asset
+
+    def warm(self, path: str) -> Optional[StaticAsset]:
+        """Prépare un fichier tout juste écrit (ex: HTML régénéré) avant la première requête"""
+        return self.get(path)
+
+    @staticmethod
+    def _build(path: str, stat: os.stat_result) -> StaticAsset:
+        content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        normalized = path.replace(os.sep, '/')
+
+        match = CONTENT_ADDRESSED_PATTERN.search(normalized)
+        if match:
+            # Le nom suffit: pas besoin de relire le fichier
+            etag = match.group('digest')[:32] + (match.group('variant') or '')
+            return StaticAsset(path, stat, content_type, etag, immutable=True)
+
+        with open(path, 'rb') as f:
+            body = f.read()
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        if is_compressible(content_type):
+            return StaticAsset(path, stat, content_type, etag, body=body, variants=compress_variants(body))
+        return StaticAsset(path, stat, content_type, etag)
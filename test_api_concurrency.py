@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests du rate limiter partagé et de la récupération concurrente des détails (scraper API)
+"""
+
+import asyncio
+import random
+import time
+
+from jinka_api_client import TokenBucketRateLimiter
+from scrape_jinka_api import JinkaAPIScraper
+
+ALERT_TOKEN = '26c2ec3064303aa68ffa43f7c6518733'
+
+
+class FakeAPIClient:
+    """Dashboard de 2 pages de 4 annonces, la 3e page est vide"""
+
+    def __init__(self):
+        self.dashboard_calls = []
+
+    async def get_alert_dashboard(self, alert_token, filter_type='all', page=1):
+        self.dashboard_calls.append(page)
+        await asyncio.sleep(0.01)
+        ads = [{'id': page * 100 + i} for i in range(4)] if page <= 2 else []
+        return {'ads': ads, 'token': alert_token}
+
+
+def test_rate_and_burst():
+    """Rafale initiale immédiate, puis `rate` jetons par seconde; pause globale respectée"""
+    print("🧪 Test 1: débit et rafale du rate limiter...")
+
+    async def run():
+        limiter = TokenBucketRateLimiter(rate=20, burst=4)
+
+        start = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        assert time.monotonic() - start < 0.05
+
+        # 4 jetons supplémentaires à 20/s: ~0.2s, même répartis entre tâches concurrentes
+        start = time.monotonic()
+        await asyncio.gather(*[limiter.acquire() for _ in range(4)])
+        assert 0.15 <= time.monotonic() - start < 0.4
+
+        # Pause (ex: après un 429): toutes les requêtes attendent
+        limiter.pause(0.2)
+        start = time.monotonic()
+        await limiter.acquire()
+        assert time.monotonic() - start >= 0.2
+
+    asyncio.run(run())
+    print("   ✅ OK")
+
+
+def test_details_gathered_in_page_order():
+    """Détails récupérés en parallèle (au plus max_concurrent), résultat dans l'ordre du dashboard"""
+    print("\n🧪 Test 2: ordre des détails récupérés en parallèle...")
+
+    scraper = JinkaAPIScraper(max_concurrent=3)
+    scraper.api_client = FakeAPIClient()
+    running = {'now': 0, 'max': 0}
+
+    async def scrape_apartment(url):
+        running['now'] += 1
+        running['max'] = max(running['max'], running['now'])
+        # Durées aléatoires: les réponses arrivent dans le désordre
+        await asyncio.sleep(random.uniform(0.005, 0.03))
+        running['now'] -= 1
+        return {'id': url.rsplit('ad=', 1)[1], 'titre': 'Appartement'}
+
+    scraper.scrape_apartment = scrape_apartment
+    random.seed(4)
+    apartments = asyncio.run(scraper.scrape_alert_page(
+        f"https://www.jinka.fr/asrenter/alert/dashboard/{ALERT_TOKEN}", max_pages=5
+    ))
+
+    assert [apt['id'] for apt in apartments] == ['100', '101', '102', '103', '200', '201', '202', '203']
+    assert 1 < running['max'] <= 3
+    assert scraper.api_client.dashboard_calls == [1, 2, 3]
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_rate_and_burst()
+    test_details_gathered_in_page_order()
+    print("\n✅ Tous les tests de concurrence du scraper API sont passés")
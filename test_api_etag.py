@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests de l'encodage des réponses de /api/apartments (cache par version, gzip, ETag/304)
+"""
+
+import json
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend.api import apartments as api
+
+APPARTEMENTS = [
+    {'id': i, 'score_total': 50 + i, 'tier': 'tier2', 'prix': '450 000 €', 'surface': '50 m²',
+     'description': 'Appartement lumineux, parquet, moulures. ' * 10}
+    for i in range(20)
+]
+
+
+def _load(apartments):
+    """Installe un jeu de données dans le cache de l'API (sans fichiers)"""
+    api.invalidate_cache()
+    api._cached_apartments = apartments
+    api._cache_timestamp = float('inf')
+    api.build_indexes(apartments)
+
+
+def test_encoded_once_and_revalidated():
+    """Liste encodée une fois par version, servie en gzip, 304 tant que les données ne changent pas"""
+    print("🧪 Test: gzip, ETag et 304...")
+    _load(APPARTEMENTS)
+    app = FastAPI()
+    app.include_router(api.router)
+    client = TestClient(app)
+
+    response = client.get('/api/apartments', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 200
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.json() == json.loads(json.dumps(APPARTEMENTS))
+    etag = response.headers['etag']
+    assert etag.endswith('-gzip"')
+
+    # Même version des données: 304 sans corps
+    response = client.get('/api/apartments', headers={'If-None-Match': etag})
+    assert response.status_code == 304 and response.content == b''
+
+    # Représentation non compressée: ETag fort distinct, 304 sur l'une ou l'autre
+    identity = client.get('/api/apartments', headers={'Accept-Encoding': 'identity'})
+    assert 'content-encoding' not in identity.headers
+    assert identity.headers['etag'] != etag and identity.headers['etag'] == etag.replace('-gzip"', '"')
+    assert client.get('/api/apartments', headers={'If-None-Match': identity.headers['etag']}).status_code == 304
+
+    # Une page a son propre ETag et n'est encodée qu'une fois
+    page = client.get('/api/apartments?sort=score&limit=5')
+    assert [apt['id'] for apt in page.json()['items']] == [19, 18, 17, 16, 15]
+    assert page.headers['etag'] != etag
+    cached = len(api._response_cache)
+    assert client.get('/api/apartments?sort=score&limit=5', headers={'If-None-Match': page.headers['etag']}).status_code == 304
+    assert client.get('/api/apartments?limit=5&sort=score').json() == page.json()
+    assert len(api._response_cache) == cached
+
+    # Appartement seul: même mécanisme, 404 inchangé
+    single = client.get('/api/apartments/3')
+    assert single.json()['id'] == 3
+    assert client.get('/api/apartments/3', headers={'If-None-Match': single.headers['etag']}).status_code == 304
+    assert client.get('/api/apartments/999').status_code == 404
+    assert client.get('/api/apartments?sort=inconnu').status_code == 400
+
+    # Nouvelle version des données: l'ancien ETag ne correspond plus
+    apartments = [dict(apt) for apt in APPARTEMENTS]
+    apartments[0]['score_total'] = 99
+    _load(apartments)
+    response = client.get('/api/apartments', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and response.json()[0]['score_total'] == 99
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_encoded_once_and_revalidated()
+    print("\n✅ Test de l'encodage des réponses de l'API passé")
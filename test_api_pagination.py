@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests du filtrage, du tri et de la pagination de /api/apartments
+"""
+
+import threading
+
+from backend.api import apartments as api
+
+APPARTEMENTS = [
+    {'id': 1, 'score_total': 60, 'tier': 'tier2', 'prix': '450 000 €', 'surface': '50 m²', 'map_info': {'quartier': 'Pyrénées'}},
+    {'id': 2, 'score_total': 85, 'tier': 'tier1', 'prix': '500 000 €', 'surface': '62 m²', 'map_info': {'quartier': 'Ménilmontant'}},
+    {'id': 3, 'score_total': 40, 'tier': 'tier3', 'prix': '380 000 €', 'surface': '35 m²', 'map_info': {'quartier': 'Belleville'}},
+    {'id': 4, 'score_total': 75, 'tier': 'tier1', 'prix': '620 000 €', 'surface': '70 m²', 'map_info': {'quartier': 'Ménilmontant'},
+     'scores_detaille': {'localisation': {'justification': 'Proche métro Gambetta'}}},
+]
+
+
+def _load(apartments):
+    """Installe un jeu de données dans le cache de l'API (sans fichiers)"""
+    api.invalidate_cache()
+    api._cached_apartments = apartments
+    api._cache_timestamp = float('inf')
+    api.build_indexes(apartments)
+
+
+def test_filters_and_sort():
+    """Filtres tier/score/quartier/métro et tri par prix/m²"""
+    print("🧪 Test 1: filtres et tri...")
+    _load(APPARTEMENTS)
+
+    ids = lambda result: [apt['id'] for apt in result['items']]
+    assert ids(api.query_apartments()) == [1, 2, 3, 4]
+    assert ids(api.query_apartments(sort='score')) == [2, 4, 1, 3]
+    assert ids(api.query_apartments(tier='tier1', sort='score', order='asc')) == [4, 2]
+    assert ids(api.query_apartments(min_score=70, quartier='menilmontant')) == [2, 4]
+    assert ids(api.query_apartments(metro='gambetta')) == [4]
+    # Prix/m²: 9000, 8064, 10857, 8857
+    assert ids(api.query_apartments(prix_m2_max=9000, sort='prix_m2', order='asc')) == [2, 4, 1]
+
+    print("   ✅ OK")
+
+
+def test_cursor_pagination():
+    """Les pages successives couvrent tous les résultats, sans doublon"""
+    print("\n🧪 Test 2: pagination par curseur...")
+    _load(APPARTEMENTS)
+
+    page = api.query_apartments(sort='score', limit=3)
+    assert [apt['id'] for apt in page['items']] == [2, 4, 1]
+    assert page['total'] == 4 and page['next_cursor']
+
+    page = api.query_apartments(sort='score', limit=3, cursor=page['next_cursor'])
+    assert [apt['id'] for apt in page['items']] == [3]
+    assert page['next_cursor'] is None
+
+    assert api._apartments_by_id['3']['score_total'] == 40
+
+    print("   ✅ OK")
+
+
+def test_mega_score_sort():
+    """Tri par mega score (formule des cartes): exposition et cuisine selon la valeur affichée"""
+    print("\n🧪 Test 3: tri par mega score...")
+
+    apartments = [
+        # score_total le plus haut, mais exposition sombre et cuisine fermée: mega score 30
+        {'id': 'a', 'score_total': 90, 'scores_detaille': {
+            'localisation': {'score': 20}, 'prix': {'score': 10},
+            'ensoleillement': {'score': 20, 'tier': 'tier1'}, 'cuisine': {'score': 10, 'tier': 'tier1'}},
+         'formatted_data': {'exposition': {'main_value': 'Sombre'}}},
+        # 20 + 20 (plein sud) + 10 (cuisine ouverte) = 50
+        {'id': 'b', 'score_total': 50, 'scores_detaille': {
+            'localisation': {'score': 20}, 'ensoleillement': {'score': 0, 'tier': 'tier3'}, 'cuisine': {'score': 0}},
+         'exposition': {'exposition': 'Sud-Ouest'}, 'style_analysis': {'cuisine': {'ouverte': True}}},
+        # 10 + 10 (luminosité moyenne) = 20
+        {'id': 'c', 'score_total': 70, 'scores_detaille': {
+            'prix': {'score': 10}, 'ensoleillement': {'score': 20, 'tier': 'tier1'}},
+         'style_analysis': {'luminosite': {'type': 'Bonne'}}},
+    ]
+    assert [api.mega_score(apt) for apt in apartments] == [30, 50, 20]
+
+    _load(apartments)
+    first = api.query_apartments(sort='mega_score', limit=2)
+    assert [apt['id'] for apt in first['items']] == ['b', 'a']
+    rest = api.query_apartments(sort='mega_score', limit=2, cursor=first['next_cursor'])
+    assert [apt['id'] for apt in rest['items']] == ['c'] and rest['next_cursor'] is None
+
+    print("   ✅ OK")
+
+
+def test_reload_from_another_thread():
+    """Index remplacés par un autre thread (WatchService) pendant les requêtes: vues cohérentes"""
+    print("\n🧪 Test 4: rechargement concurrent des index...")
+    _load(APPARTEMENTS)
+    others = [dict(apt, id=apt['id'] + 10) for apt in APPARTEMENTS]
+    stop = threading.Event()
+
+    def reload():
+        while not stop.is_set():
+            for apartments in (others, APPARTEMENTS):
+                api.invalidate_cache()
+                api._cached_apartments = apartments
+                api._cache_timestamp = float('inf')
+                api.build_indexes(apartments)
+
+    thread = threading.Thread(target=reload)
+    thread.start()
+    try:
+        for _ in range(2000):
+            result = api.query_apartments(sort='prix', order='asc', limit=2)
+            ids = [apt['id'] for apt in result['items']]
+            assert ids in ([3, 1], [13, 11]), ids
+            assert result['total'] == 4
+    finally:
+        stop.set()
+        thread.join()
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_filters_and_sort()
+    test_cursor_pagination()
+    test_mega_score_sort()
+    test_reload_from_another_thread()
+    print("\n✅ Tous les tests de pagination de l'API sont passés")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests du calcul de luminosité en lot
+"""
+
+import os
+import tempfile
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from brightness_engine import BrightnessEngine, compute_brightness
+
+
+def _jpeg_bytes(color, size=(1600, 1200)) -> bytes:
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='JPEG', quality=95)
+    return buffer.getvalue()
+
+
+def test_brightness_matches_reference_luminance():
+    """La luminosité en mode draft correspond à la formule de référence"""
+    print("🧪 Test 1: luminance de référence...")
+
+    color = (200, 120, 40)
+    expected = (0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2]) / 255.0
+
+    assert abs(compute_brightness(_jpeg_bytes(color)) - expected) < 0.02
+    assert compute_brightness(_jpeg_bytes((0, 0, 0))) < 0.05
+    assert compute_brightness(_jpeg_bytes((255, 255, 255))) > 0.95
+    assert compute_brightness(b'pas une image') == 0.5
+
+    print("   ✅ OK")
+
+
+def test_palette_and_bilevel_png():
+    """PNG en palette ('P') ou 1 bit plus grands que la réduction: luminosité calculée"""
+    print("\n🧪 Test 2: PNG en palette et 1 bit...")
+
+    color = (200, 120, 40)
+    expected = (0.299 * color[0] + 0.587 * color[1] + 0.114 * color[2]) / 255.0
+    buffer = BytesIO()
+    Image.new('RGB', (1600, 1200), color).convert('P').save(buffer, format='PNG')
+    assert abs(compute_brightness(buffer.getvalue()) - expected) < 0.02
+
+    buffer = BytesIO()
+    Image.new('1', (1600, 1200), 1).save(buffer, format='PNG')
+    assert compute_brightness(buffer.getvalue()) > 0.95
+
+    print("   ✅ OK")
+
+
+def test_batch_results_persisted_by_digest():
+    """Les résultats du lot sont persistés et réutilisés par digest"""
+    print("\n🧪 Test 3: calcul en lot persisté...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        photos = []
+        for i, color in enumerate([(10, 10, 10), (240, 240, 240)]):
+            path = os.path.join(tmp, f'photo{i}.jpg')
+            with open(path, 'wb') as f:
+                f.write(_jpeg_bytes(color, size=(400, 300)))
+            photos.append((f'digest{i}', path))
+
+        results_file = os.path.join(tmp, 'brightness.json')
+        engine = BrightnessEngine(results_file=results_file, max_workers=2)
+        results = engine.compute_many(photos)
+        assert results['digest0'] < 0.1 < 0.9 < results['digest1']
+
+        reloaded = BrightnessEngine(results_file=results_file)
+        assert np.isclose(reloaded.get('digest1'), results['digest1'])
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_brightness_matches_reference_luminance()
+    test_palette_and_bilevel_png()
+    test_batch_results_persisted_by_digest()
+    print("\n✅ Tous les tests de luminosité sont passés")
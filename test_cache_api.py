@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Tests du cache API (stockage SQLite)
+"""
+
+import json
+import os
+import tempfile
+
+from cache_api import APICache
+
+
+def test_cache_set_get_stats():
+    """Test set/get/stats/clear sur la base SQLite"""
+    print("🧪 Test 1: set/get/stats/clear...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = APICache(cache_file=os.path.join(tmp, 'cache.db'), legacy_json_file=None)
+
+        assert cache.get('style', 'texte') is None
+        cache.set('style', 'texte', {'style': 'haussmannien'})
+        cache.set('cuisine', 'texte', {'ouverte': True})
+
+        assert cache.get('style', 'texte') == {'style': 'haussmannien'}
+        stats = cache.stats()
+        assert stats['total_entries'] == 2
+        assert stats['by_type'] == {'style': 1, 'cuisine': 1}
+
+        assert cache.delete_by_type('style') == 1
+        assert cache.get('style', 'texte') is None
+
+        cache.clear()
+        assert cache.stats()['total_entries'] == 0
+        cache.close()
+
+    print("   ✅ OK")
+
+
+def test_cache_persistence_and_legacy_import():
+    """Test import de l'ancien cache JSON et persistance entre instances"""
+    print("\n🧪 Test 2: import JSON + persistance...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, 'api_cache.json')
+        db_file = os.path.join(tmp, 'api_cache.db')
+
+        reference = APICache(cache_file=os.path.join(tmp, 'ref.db'), legacy_json_file=None)
+        key = reference._generate_key('exposition', 'description')
+        reference.close()
+
+        legacy = {
+            key: {
+                'result': {'exposition': 'sud'},
+                'cached_at': '2999-01-01T00:00:00',
+                'analysis_type': 'exposition',
+                'input_hash': 'abcd1234'
+            }
+        }
+        with open(legacy_file, 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+
+        cache = APICache(cache_file=db_file, legacy_json_file=legacy_file)
+        assert cache.get('exposition', 'description') == {'exposition': 'sud'}
+        cache.set('baignoire', 'photo.jpg', {'has_baignoire': False})
+        cache.close()
+
+        reopened = APICache(cache_file=db_file, legacy_json_file=legacy_file)
+        assert reopened.get('baignoire', 'photo.jpg') == {'has_baignoire': False}
+        assert reopened.stats()['total_entries'] == 2
+        reopened.close()
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_cache_set_get_stats()
+    test_cache_persistence_and_legacy_import()
+    print("\n✅ Tous les tests du cache sont passés")
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests du cache de rendu des cartes du scorecard
+"""
+
+import copy
+import os
+import tempfile
+
+import generate_scorecard_html as gsh
+import photo_manifest
+
+APPARTEMENTS = [
+    {'id': str(i), 'url': f'https://www.jinka.fr/{i}', 'prix': f'{400 + i * 10} 000 €', 'surface': '50 m²',
+     'score_total': 80 - i, 'scores_detaille': {'prix': {'score': 10, 'tier': 'tier2', 'justification': 'Prix correct'}}}
+    for i in range(4)
+]
+
+
+def test_cards_reused_across_runs():
+    """Une seconde génération reprend toutes les cartes; un changement de gabarit les invalide"""
+    print("🧪 Test: cache des cartes entre deux générations...")
+
+    previous = photo_manifest._global_manifest
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'cards.json')
+        photo_manifest._global_manifest = photo_manifest.PhotoManifest(os.path.join(tmp, 'photo_manifest.jsonl'))
+
+        first = gsh.CardRenderCache(cache_file)
+        html = gsh.generate_scorecard_html(copy.deepcopy(APPARTEMENTS), card_cache=first)
+        assert first.rendered == 4
+        assert html == gsh.generate_scorecard_html(copy.deepcopy(APPARTEMENTS))
+
+        # Nouveau processus: tout vient du fichier de cache
+        second = gsh.CardRenderCache(cache_file)
+        assert gsh.generate_scorecard_html(copy.deepcopy(APPARTEMENTS), card_cache=second) == html
+        assert second.rendered == 0
+
+        # Un appartement modifié: une seule carte régénérée
+        apartments = copy.deepcopy(APPARTEMENTS)
+        apartments[1]['surface'] = '52 m²'
+        third = gsh.CardRenderCache(cache_file)
+        gsh.generate_scorecard_html(apartments, card_cache=third)
+        assert third.rendered == 1
+
+        # Nouvelle version du gabarit: cache ignoré
+        version = gsh.CARD_TEMPLATE_VERSION
+        gsh.CARD_TEMPLATE_VERSION, gsh._card_template_signature = version + 1, None
+        try:
+            assert gsh.CardRenderCache(cache_file).cards == {}
+        finally:
+            gsh.CARD_TEMPLATE_VERSION, gsh._card_template_signature = version, None
+            photo_manifest._global_manifest = previous
+
+    print("   ✅ OK")
+
+
+class DegradedBaignoireExtractor:
+    """Extraction baignoire toujours en repli texte (timeout de l'analyse photos)"""
+
+    def __init__(self):
+        self.degraded_results = 0
+
+    def extract_baignoire_ultimate(self, apartment):
+        self.degraded_results += 1
+        return {'score': 0, 'tier': 'tier3', 'has_baignoire': False, 'has_douche': False,
+                'justification': 'Non mentionné (analyse photos timeout)', 'degraded': True}
+
+
+def test_degraded_cards_not_cached():
+    """Une carte rendue avec un résultat baignoire de repli n'est pas conservée"""
+    print("\n🧪 Test: cartes avec baignoire en repli...")
+
+    previous = photo_manifest._global_manifest
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = os.path.join(tmp, 'cards.json')
+        photo_manifest._global_manifest = photo_manifest.PhotoManifest(os.path.join(tmp, 'photo_manifest.jsonl'))
+        try:
+            first = gsh.CardRenderCache(cache_file)
+            gsh.generate_scorecard_html(copy.deepcopy(APPARTEMENTS), DegradedBaignoireExtractor(), card_cache=first)
+            assert first.rendered == 4
+
+            second = gsh.CardRenderCache(cache_file)
+            assert second.cards == {}
+            gsh.generate_scorecard_html(copy.deepcopy(APPARTEMENTS), card_cache=second)
+            assert second.rendered == 4
+        finally:
+            photo_manifest._global_manifest = previous
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_cards_reused_across_runs()
+    test_degraded_cards_not_cached()
+    print("\n✅ Test du cache des cartes passé")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests de la surveillance de fichiers partagée (debounce coalescent)
+"""
+
+import os
+import tempfile
+import threading
+import time
+
+import file_watcher
+from file_watcher import FileWatcher
+
+
+def _watch_burst(tmp):
+    """Rafale d'écritures (dont un remplacement atomique) → lots reçus par le callback"""
+    scores = os.path.join(tmp, 'scores.json')
+    other = os.path.join(tmp, 'autre.json')
+    with open(scores, 'w') as f:
+        f.write('[]')
+
+    batches = []
+    received = threading.Event()
+
+    def callback(changed_files):
+        batches.append(changed_files)
+        received.set()
+
+    watcher = FileWatcher([scores], callback, debounce_seconds=0.3, poll_interval=0.05)
+    watcher.start()
+    try:
+        time.sleep(0.2)
+        for i in range(5):
+            with open(scores, 'w') as f:
+                f.write(f'[{i}]')
+            time.sleep(0.02)
+        # Écriture atomique, comme json.dump dans un .tmp puis os.replace
+        with open(scores + '.tmp', 'w') as f:
+            f.write('[5]')
+        os.replace(scores + '.tmp', scores)
+        with open(other, 'w') as f:
+            f.write('{}')
+
+        assert received.wait(5)
+        time.sleep(0.5)
+    finally:
+        watcher.stop()
+    return scores, batches
+
+
+def test_events_are_coalesced():
+    """Une rafale de modifications donne un seul appel, sans fichiers hors liste"""
+    print("🧪 Test 1: regroupement des événements...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scores, batches = _watch_burst(tmp)
+        assert batches == [[scores]], batches
+
+    print("   ✅ OK")
+
+
+def test_polling_fallback():
+    """Sans watchdog, le polling des mtimes déclenche le même callback"""
+    print("\n🧪 Test 2: repli en polling...")
+
+    has_watchdog = file_watcher.HAS_WATCHDOG
+    file_watcher.HAS_WATCHDOG = False
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            scores, batches = _watch_burst(tmp)
+            assert batches and all(batch == [scores] for batch in batches), batches
+    finally:
+        file_watcher.HAS_WATCHDOG = has_watchdog
+
+    print("   ✅ OK")
+
+
+def test_missing_directory_created_later():
+    """Dossier absent au démarrage (ex: data/scores/): fichier détecté après sa création"""
+    print("\n🧪 Test 3: dossier créé après le démarrage...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scores = os.path.join(tmp, 'data', 'scores', 'all_apartments_scores.json')
+        batches = []
+        received = threading.Event()
+
+        def callback(changed_files):
+            batches.append(changed_files)
+            received.set()
+
+        watcher = FileWatcher([scores], callback, debounce_seconds=0.2, poll_interval=0.05)
+        watcher.start()
+        try:
+            time.sleep(0.2)
+            os.makedirs(os.path.dirname(scores))
+            with open(scores, 'w') as f:
+                f.write('[]')
+            assert received.wait(5)
+            time.sleep(0.3)
+
+            # Dossier désormais surveillé directement: les modifications suivantes arrivent aussi
+            received.clear()
+            with open(scores, 'w') as f:
+                f.write('[1]')
+            assert received.wait(5)
+        finally:
+            watcher.stop()
+        assert batches and all(batch == [scores] for batch in batches), batches
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_events_are_coalesced()
+    test_polling_fallback()
+    test_missing_directory_created_later()
+    print("\n✅ Tous les tests de surveillance de fichiers sont passés")
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests de l'index des annonces (scraping incrémental)
+"""
+
+import os
+import tempfile
+
+from listing_index import ListingIndex, compute_listing_fingerprint
+
+
+def test_fingerprint_changes_with_dashboard_fields():
+    """L'empreinte change si le prix ou les photos changent"""
+    print("🧪 Test 1: empreinte des annonces...")
+
+    ad = {'id': '90931157', 'rent': 775000, 'area': 70, 'images': 'https://a.jpg,https://b.jpg'}
+    fingerprint = compute_listing_fingerprint(ad)
+
+    assert fingerprint == compute_listing_fingerprint(dict(ad))
+    assert fingerprint != compute_listing_fingerprint({**ad, 'rent': 760000})
+    assert fingerprint != compute_listing_fingerprint({**ad, 'images': 'https://a.jpg'})
+
+    print("   ✅ OK")
+
+
+def test_index_reuses_unchanged_listings():
+    """Les annonces inchangées sont reprises de l'index après rechargement"""
+    print("\n🧪 Test 2: réutilisation des annonces inchangées...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        index_file = os.path.join(tmp, 'listing_index.json')
+        ad = {'id': '90931157', 'rent': 775000, 'area': 70}
+        fingerprint = compute_listing_fingerprint(ad)
+
+        index = ListingIndex(index_file)
+        assert index.get_unchanged('90931157', fingerprint) is None
+        index.update('90931157', fingerprint, {'id': '90931157', 'titre': 'Appartement 3 pièces'})
+        index.save()
+
+        reloaded = ListingIndex(index_file)
+        assert reloaded.get_unchanged('90931157', fingerprint) == {'id': '90931157', 'titre': 'Appartement 3 pièces'}
+        changed = compute_listing_fingerprint({**ad, 'rent': 760000})
+        assert reloaded.get_unchanged('90931157', changed) is None
+        assert reloaded.stats == {'new': 0, 'changed': 1, 'unchanged': 1}
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_fingerprint_changes_with_dashboard_fields()
+    test_index_reuses_unchanged_listings()
+    print("\n✅ Tous les tests de l'index sont passés")
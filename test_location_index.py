@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+Tests de l'index de localisation compilé
+"""
+
+from location_index import LocationIndex, normalize_location
+
+TIERS = {
+    'tier1': {'zones': ["Place de la Réunion", "Ménilmontant", "Avron"]},
+    'tier2': {'zones': ["Pyrénées", "Rue des Boulets", "20e arrondissement"]},
+    'tier3': {'zones': ["Reste du 20e"]},
+}
+
+
+def test_match_returns_tier_zone_and_station():
+    """Un seul appel retourne tier, zone et station (texte prioritaire, accents ignorés)"""
+    print("🧪 Test 1: tier, zone et station...")
+
+    index = LocationIndex(TIERS)
+    assert normalize_location("Ménilmontant") == "menilmontant"
+
+    # Zone tier2 dans le texte, zone tier1 via une station: le tier1 l'emporte
+    match = index.match(texts=["Proche rue des Boulets"], stations=["Gambetta", "Menilmontant"])
+    assert match == {'tier': 'tier1', 'zone': 'ménilmontant', 'station': 'menilmontant'}
+
+    # Même zone dans le texte et via une station: pas de station dans le résultat
+    match = index.match(texts=["Métro Pyrenees"], stations=["Pyrénées"], tiers=('tier1', 'tier2'))
+    assert match == {'tier': 'tier2', 'zone': 'pyrénées', 'station': None}
+
+    assert index.match(texts=["Paris 19e"], stations=["Reste du 20e"], tiers=('tier1', 'tier2')) is None
+
+    print("   ✅ OK")
+
+
+def test_station_tier_keeps_best_tier():
+    """Le tier d'une station est le meilleur tier parmi les zones correspondantes"""
+    print("\n🧪 Test 2: tier des stations...")
+
+    index = LocationIndex(TIERS)
+    assert index.station_tier("Avron") == 'tier1'
+    assert index.station_tier("Pyrenees") == 'tier2'
+    # "20e" est aussi un mot d'une zone tier2
+    assert index.station_tier("Reste du 20e") == 'tier2'
+    assert index.station_tier("Gambetta") is None
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_match_returns_tier_zone_and_station()
+    test_station_tier_keeps_best_tier()
+    print("\n✅ Tous les tests de l'index de localisation sont passés")
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Tests du pool de pages du scraper Jinka (scraping parallèle d'annonces)
+"""
+
+import asyncio
+
+from scrape_jinka import JinkaScraper
+
+
+class FakePage:
+    """Page Playwright minimale: navigation simulée"""
+
+    def __init__(self, number):
+        self.number = number
+        self.url = None
+        self.closed = False
+
+    def on(self, event, handler):
+        pass
+
+    def is_closed(self):
+        return self.closed
+
+    async def goto(self, url):
+        self.url = url
+        await asyncio.sleep(0.01)
+
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        page = FakePage(len(self.pages) + 1)
+        self.pages.append(page)
+        return page
+
+
+def test_pages_checked_out_in_parallel():
+    """Chaque annonce a sa page; la concurrence est bornée par la taille du pool"""
+    print("🧪 Test: pool de pages partagé par les annonces...")
+
+    async def run():
+        scraper = JinkaScraper()
+        scraper.context = FakeContext()
+        await scraper.open_page_pool(2)
+
+        active = set()
+        peak = 0
+        visited = {}
+
+        async def scrape(url):
+            nonlocal peak
+            async with scraper.checkout_page() as worker:
+                assert worker.page not in active, "page partagée entre deux annonces"
+                active.add(worker.page)
+                peak = max(peak, len(active))
+                await worker.page.goto(url)
+                # La page reste sur l'annonce pendant tout son traitement
+                await asyncio.sleep(0.01)
+                assert worker.page.url == url
+                visited[url] = worker.page.number
+                active.discard(worker.page)
+                if url.endswith('=3'):
+                    worker.page.closed = True
+
+        await asyncio.gather(*(scrape(f"https://www.jinka.fr/alert_result?ad={i}") for i in range(6)))
+
+        assert peak == 2
+        assert len(visited) == 6
+        # La page fermée a été remplacée: le pool garde sa taille
+        assert scraper.page_pool.qsize() == 2
+        assert all(not page.closed for page in scraper.page_pool._queue)
+        assert len(scraper.context.pages) == 3
+
+    asyncio.run(run())
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_pages_checked_out_in_parallel()
+    print("\n✅ Test du pool de pages passé")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Tests des attentes de chargement du scraper (réseau calme, échéance par page)
+"""
+
+import asyncio
+import time
+
+from page_readiness import PageReadiness
+
+
+class FakePage:
+    """Page minimale: écouteurs d'événements et navigation instantanée"""
+
+    def __init__(self):
+        self.handlers = {}
+        self.selector_waits = 0
+
+    def on(self, event, handler):
+        self.handlers.setdefault(event, []).append(handler)
+
+    def emit(self, event, request):
+        for handler in self.handlers.get(event, []):
+            handler(request)
+
+    async def goto(self, url, wait_until=None, timeout=None):
+        assert wait_until == 'domcontentloaded' and timeout > 0
+        self.emit('request', 'document')
+        self.emit('requestfinished', 'document')
+
+    async def wait_for_selector(self, selector, state=None, timeout=None):
+        self.selector_waits += 1
+
+
+def test_network_quiet_after_last_request():
+    """La page est prête dès que le réseau est calme, sans pause fixe"""
+    print("🧪 Test 1: attente du calme réseau...")
+
+    async def run():
+        page = FakePage()
+        readiness = PageReadiness(page, deadline_ms=2000, quiet_ms=100)
+        start = time.monotonic()
+        await readiness.goto('https://www.jinka.fr/alert_result?ad=1')
+        assert time.monotonic() - start < 0.5
+
+        # Une image encore en cours retarde la fin jusqu'à sa réponse + fenêtre calme
+        page.emit('request', 'photo1.jpg')
+        asyncio.get_running_loop().call_later(0.2, page.emit, 'requestfinished', 'photo1.jpg')
+        start = time.monotonic()
+        assert await readiness.network_quiet()
+        assert 0.25 <= time.monotonic() - start < 1.0
+
+    asyncio.run(run())
+    print("   ✅ OK")
+
+
+def test_deadline_bounds_every_wait():
+    """Une requête qui ne finit jamais coûte au plus l'échéance de la page"""
+    print("\n🧪 Test 2: échéance globale par page...")
+
+    async def run():
+        page = FakePage()
+        readiness = PageReadiness(page, deadline_ms=300, quiet_ms=100)
+        await readiness.goto('https://www.jinka.fr/alert_result?ad=2')
+        page.emit('request', 'long-polling')
+
+        start = time.monotonic()
+        assert not await readiness.network_quiet()
+        assert time.monotonic() - start < 0.6
+
+        # Échéance atteinte: les attentes suivantes ne sollicitent plus la page
+        assert readiness.remaining_ms() == 0
+        assert not await readiness.selector('h1')
+        assert page.selector_waits == 0
+
+        # Nouvelle navigation: nouvelle échéance
+        page.emit('requestfailed', 'long-polling')
+        await readiness.goto('https://www.jinka.fr/alert_result?ad=3')
+        assert await readiness.selector('h1') and page.selector_waits == 1
+
+    asyncio.run(run())
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_network_quiet_after_last_request()
+    test_deadline_bounds_every_wait()
+    print("\n✅ Tous les tests des attentes de chargement sont passés")
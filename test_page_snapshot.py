@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests de l'extraction hors navigateur depuis un instantané du DOM
+"""
+
+from page_snapshot import GALLERY_SELECTORS, PageSnapshot, SNAPSHOT_SCRIPT
+
+HTML = """
+<html><head><script>var etage = "9e étage";</script></head><body>
+<h1>Bel appartement lumineux</h1>
+<div class="hmmXKG">450 000 €</div>
+<div><span>6 250 €/m²</span></div>
+<div class="infos"><span>72 m²</span><span>3 pièces</span></div>
+<p>Publiée le 12 mars à 10h</p>
+<div class="bloc"><h3>Caractéristiques</h3><ul><li>3e étage</li><li>Ascenseur</li></ul></div>
+<div class="fz-16 sc-bdVaJa bDXQKW"><h3>Proche des stations</h3>
+  <ul><li><span>Jourdain</span></li><li><span>Pyrénées</span></li></ul></div>
+<div class="annonce-description">Superbe appartement haussmannien avec moulures, parquet d'origine
+  et cheminée de marbre, au coeur du quartier Jourdain, proche des commerces.</div>
+<div class="leaflet-proxy" style="transform: translate3d(261000px, 6250000px, 0px);"></div>
+<div>AGENCE DU PARC</div>
+</body></html>
+"""
+
+GALLERY = [
+    {'domIndex': 0, 'src': 'https://loueragile.fr/photo-b.jpg', 'alt': '', 'width': 800, 'height': 600, 'top': 0, 'left': 0},
+    {'domIndex': 1, 'src': 'https://loueragile.fr/photo-a.jpg', 'alt': '', 'width': 800, 'height': 600, 'top': 120, 'left': 40},
+    {'domIndex': 2, 'src': 'https://loueragile.fr/logo-agence.png', 'alt': '', 'width': 800, 'height': 600, 'top': 0, 'left': 0},
+    {'domIndex': 3, 'src': 'https://loueragile.fr/icone.jpg', 'alt': '', 'width': 128, 'height': 128, 'top': 0, 'left': 0},
+    {'domIndex': 4, 'src': 'https://loueragile.fr/photo-a.jpg', 'alt': '', 'width': 800, 'height': 600, 'top': 0, 'left': 0},
+]
+
+
+def _snapshot(galleries=None, images=None):
+    text = PageSnapshot(HTML).body.get_text()
+    return PageSnapshot(HTML, text=text, galleries=galleries, images=images)
+
+
+def test_fields_parsed_offline():
+    """Tous les champs sont calculés depuis le HTML, sans page vivante"""
+    print("🧪 Test 1: champs extraits de l'instantané...")
+
+    snapshot = _snapshot()
+    assert snapshot.titre == "Bel appartement lumineux"
+    assert snapshot.prix == "450 000 €"
+    assert snapshot.prix_m2 == "6 250 € / m²"
+    assert snapshot.surface == "72 m²"
+    assert snapshot.pieces == "3 pièces"
+    assert snapshot.date == "Publiée le 12 mars à 10h"
+    # Étage pris dans la section Caractéristiques (pas dans le script de la page)
+    assert snapshot.etage == "3e étage"
+    assert snapshot.caracteristiques == "3e étageAscenseur"
+    assert snapshot.transports == ["Jourdain", "Pyrénées"]
+    assert snapshot.localisation == "Proche de Jourdain, Pyrénées"
+    assert snapshot.description.startswith("Superbe appartement haussmannien")
+    assert snapshot.style_for_photo == "Haussmannien"
+    assert 'moulures' in snapshot.style_haussmannien['keywords']
+    assert snapshot.agence == "AGENCE DU PARC"
+    assert snapshot.coordinates['latitude'] is not None and snapshot.coordinates['raw_x'] == 261000.0
+
+    print("   ✅ OK")
+
+
+def test_photos_from_gallery_and_page():
+    """Galerie: visibles triées par position puis cachées dans l'ordre du DOM; sinon images de la page"""
+    print("\n🧪 Test 2: photos de l'instantané...")
+
+    galleries = [GALLERY] + [None] * (len(GALLERY_SELECTORS) - 1)
+    photos = _snapshot(galleries=galleries).photos("72 m² · 3e étage")
+    assert [photo['url'] for photo in photos] == ['https://loueragile.fr/photo-a.jpg', 'https://loueragile.fr/photo-b.jpg']
+    assert photos[0]['alt'] == "72 m² · 3e étage" and photos[0]['selector'] == 'gallery_div_visible'
+
+    images = [
+        {'src': 'https://cdn.safti.fr/1.jpg', 'alt': '', 'width': 1024, 'height': 768, 'display': 'block',
+         'visibility': 'visible', 'box_width': 400, 'box_height': 300},
+        {'src': 'https://cdn.safti.fr/cachee.jpg', 'alt': '', 'width': 1024, 'height': 768, 'display': 'none',
+         'visibility': 'visible', 'box_width': 0, 'box_height': 0},
+    ]
+    photos = _snapshot(galleries=[None] * len(GALLERY_SELECTORS), images=images).photos("72 m²")
+    assert [photo['url'] for photo in photos] == ['https://cdn.safti.fr/1.jpg']
+    assert photos[0]['selector'] == 'global_search_visible'
+
+    # Le script embarque la collecte de galerie (un seul aller-retour)
+    assert 'collectGallery' in SNAPSHOT_SCRIPT and '@@' not in SNAPSHOT_SCRIPT
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_fields_parsed_offline()
+    test_photos_from_gallery_and_page()
+    print("\n✅ Tous les tests de l'instantané du DOM sont passés")
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests du scoring en parallèle (pool de threads) et du chargement parallèle des photos
+"""
+
+import os
+import random
+import tempfile
+import threading
+import time
+
+import scoring_optimized
+from analyze_apartment_unified import UnifiedApartmentAnalyzer
+from scoring import load_scoring_config
+
+APPARTEMENTS = [
+    {
+        'id': str(90000000 + i),
+        'prix': f"{350000 + i * 25000} €",
+        'surface': f"{40 + i * 3} m²",
+        'localisation': 'Paris 11e (75011) - Oberkampf',
+        'etage': f"{i % 6}ème étage",
+        'description': 'Appartement lumineux' + (' avec baignoire' if i % 2 else ''),
+        'caracteristiques': 'Parquet',
+        'photos': [],
+    }
+    for i in range(8)
+]
+
+
+def fake_analyze_photos_once(apartment):
+    """Analyse photos simulée: déterministe, durée variable, une erreur"""
+    time.sleep(random.uniform(0.005, 0.03))
+    if apartment['id'].endswith('5'):
+        raise RuntimeError("Vision indisponible")
+    i = int(apartment['id'][-1])
+    return {
+        'style_analysis': {'style': {'type': 'haussmannien' if i % 3 == 0 else 'moderne', 'confidence': 0.8}},
+        'cuisine_result': {'ouverte': i % 2 == 0, 'confidence': 0.7},
+        'baignoire_result': {'has_baignoire': i % 2 == 1, 'confidence': 0.9},
+        'luminosite': None,
+    }
+
+
+class FakeFetcher:
+    """Téléchargement simulé (0.05s par photo), échec pour les URLs 'broken'"""
+
+    def __init__(self):
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def fetch_bytes(self, url, timeout=None):
+        with self.lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.05)
+        with self.lock:
+            self.active -= 1
+        return None if 'broken' in url else url.encode()
+
+
+def test_parallel_matches_sequential():
+    """Mêmes résultats, dans le même ordre, avec 1 ou 4 threads (appartement en erreur ignoré)"""
+    print("🧪 Test 1: scoring parallèle = scoring séquentiel...")
+
+    config = load_scoring_config()
+    original = scoring_optimized.analyze_photos_once
+    scoring_optimized.analyze_photos_once = fake_analyze_photos_once
+    try:
+        sequential = scoring_optimized.score_all_apartments_optimized(APPARTEMENTS, config, max_workers=1)
+        parallel = scoring_optimized.score_all_apartments_optimized(APPARTEMENTS, config, max_workers=4)
+    finally:
+        scoring_optimized.analyze_photos_once = original
+
+    expected_ids = [apt['id'] for apt in APPARTEMENTS if not apt['id'].endswith('5')]
+    assert [result['id'] for result in sequential] == expected_ids
+    assert parallel == sequential
+
+    print("   ✅ OK")
+
+
+def test_photos_loaded_in_parallel_in_order():
+    """Photos chargées en parallèle, ordre conservé, échecs ignorés, fichiers locaux lus"""
+    print("\n🧪 Test 2: chargement parallèle des photos...")
+
+    analyzer = UnifiedApartmentAnalyzer()
+    analyzer.photo_fetcher = FakeFetcher()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        local_path = os.path.join(tmp, 'photo1.jpg')
+        with open(local_path, 'wb') as f:
+            f.write(b'local')
+
+        photos = [
+            {'url': 'https://img/1.jpg', 'local_path': local_path},
+            {'url': 'https://img/2.jpg'},
+            {'url': 'https://img/broken.jpg'},
+            {'url': 'https://img/4.jpg'},
+            {'url': 'https://img/5.jpg'},
+            {'url': 'https://img/6.jpg'},
+        ]
+        start = time.monotonic()
+        loaded = analyzer._load_photos_for_analysis(photos, max_photos=5)
+        elapsed = time.monotonic() - start
+
+    assert loaded == [b'local', b'https://img/2.jpg', b'https://img/4.jpg', b'https://img/5.jpg']
+    assert analyzer.photo_fetcher.max_active == 4
+    assert elapsed < 0.15
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_parallel_matches_sequential()
+    test_photos_loaded_in_parallel_in_order()
+    print("\n✅ Tous les tests du scoring parallèle sont passés")
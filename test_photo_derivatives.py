@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Tests des déclinaisons responsive des photos (WebP/JPEG, srcset)
+"""
+
+import os
+import tempfile
+
+from PIL import Image
+
+import generate_scorecard_html as gsh
+import photo_manifest
+import serving_snapshot
+from photo_derivatives import derivative_path, generate_derivatives
+from photo_manifest import PhotoManifest
+
+
+def test_derivatives_and_srcset():
+    """Les déclinaisons sont générées à côté de l'original et servies en srcset (HTML et API)"""
+    print("🧪 Test: déclinaisons et srcset...")
+
+    cwd = os.getcwd()
+    previous = photo_manifest._global_manifest
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            os.makedirs('data/photos/7')
+            photos = []
+            for i, size in enumerate([(1200, 800), (300, 200)], 1):
+                path = f'data/photos/7/photo{i}.jpg'
+                Image.new('RGB', size, (180, 120, 60)).save(path, quality=95)
+                photos.append(path)
+
+            manifest = photo_manifest._global_manifest = PhotoManifest()
+            manifest.record('7', 'photos', photos)
+            for path in photos:
+                manifest.record_derivatives(path, generate_derivatives(path))
+
+            # Pas d'agrandissement: la petite photo n'a aucune déclinaison
+            assert manifest.derivatives_for(photos[0]) == {'width': 1200, 'widths': [320, 640, 960]}
+            assert manifest.derivatives_for(photos[1]) == {'width': 300, 'widths': []}
+            with Image.open(derivative_path(photos[0], 640, 'webp')) as image:
+                assert image.format == 'WEBP' and image.size == (640, 427)
+            assert os.path.getsize(derivative_path(photos[0], 320, 'jpg')) < os.path.getsize(photos[0])
+            # Les dossiers de photos ne listent pas les déclinaisons
+            assert photo_manifest.scan_photo_dir('photos', '7') == photos
+
+            slide = gsh.render_photo_img('../' + photos[0], 0)
+            assert '<source type="image/webp" srcset="../data/photos/7/derivatives/photo1.w320.webp 320w' in slide
+            assert '../data/photos/7/photo1.jpg 1200w' in slide
+            assert gsh.render_photo_img('../' + photos[1], 1).startswith('<img src="../data/photos/7/photo2.jpg" alt="Photo 2" loading="lazy"')
+
+            local_photos = serving_snapshot.local_photo_sources('7')
+            assert local_photos[0]['src'] == '/data/photos/7/photo1.jpg'
+            assert '/data/photos/7/derivatives/photo1.w960.webp 960w' in local_photos[0]['webp_srcset']
+            assert local_photos[1]['srcset'] == ''
+        finally:
+            photo_manifest._global_manifest = previous
+            os.chdir(cwd)
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_derivatives_and_srcset()
+    print("\n✅ Test des déclinaisons de photos passé")
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests de la couche de téléchargement des photos (revalidation conditionnelle)
+"""
+
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from photo_fetcher import PhotoFetcher
+from photo_store import PhotoStore
+
+
+class _PhotoHandler(BaseHTTPRequestHandler):
+    """Sert une photo avec ETag et répond 304 si inchangée"""
+    body = b'\xff\xd8\xff fake jpeg'
+    etag = '"v1"'
+    full_responses = 0
+    requests = 0
+
+    def do_GET(self):
+        type(self).requests += 1
+        if self.path == '/no-validators.jpg':
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(self.body)))
+            self.end_headers()
+            self.wfile.write(self.body)
+            return
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        type(self).full_responses += 1
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(self.body)))
+        self.end_headers()
+        self.wfile.write(self.body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_photo_downloaded_once_then_revalidated():
+    """Une photo inchangée n'est téléchargée qu'une fois (puis 304)"""
+    print("🧪 Test 1: téléchargement conditionnel...")
+
+    server = HTTPServer(('127.0.0.1', 0), _PhotoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/photo.jpg"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PhotoStore(root_dir=os.path.join(tmp, 'photo_store'))
+
+            fetcher = PhotoFetcher(store=store)
+            assert fetcher.fetch_bytes(url) == _PhotoHandler.body
+            assert fetcher.fetch_bytes(url) == _PhotoHandler.body
+            assert fetcher.stats['memory_hits'] == 1
+
+            # Nouveau run: revalidation conditionnelle, pas de corps
+            second_run = PhotoFetcher(store=store)
+            assert second_run.fetch_bytes(url) == _PhotoHandler.body
+            assert second_run.stats['not_modified'] == 1
+            assert _PhotoHandler.full_responses == 1
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+def test_photo_without_validators_served_from_store():
+    """Sans ETag ni Last-Modified: pas de nouveau téléchargement au run suivant (sauf force)"""
+    print("\n🧪 Test 2: photo stockée sans validateurs...")
+
+    server = HTTPServer(('127.0.0.1', 0), _PhotoHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    url = f"http://127.0.0.1:{server.server_port}/no-validators.jpg"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PhotoStore(root_dir=os.path.join(tmp, 'photo_store'))
+            assert PhotoFetcher(store=store).fetch_bytes(url) == _PhotoHandler.body
+            requests_before = _PhotoHandler.requests
+
+            second_run = PhotoFetcher(store=store)
+            assert second_run.fetch_bytes(url) == _PhotoHandler.body
+            assert second_run.stats['store_hits'] == 1
+            assert _PhotoHandler.requests == requests_before
+
+            assert second_run.fetch_bytes(url, force=True) == _PhotoHandler.body
+            assert _PhotoHandler.requests == requests_before + 1
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_photo_downloaded_once_then_revalidated()
+    test_photo_without_validators_served_from_store()
+    print("\n✅ Tests du fetcher de photos passés")
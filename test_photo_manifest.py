@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests du manifeste persistant des photos locales
+"""
+
+import os
+import tempfile
+
+import generate_scorecard_html as gsh
+import photo_manifest
+from photo_manifest import PhotoManifest
+
+
+def test_recorded_photos_survive_restart():
+    """Les listes enregistrées par les téléchargements sont relues (et rafraîchies) sans scan"""
+    print("🧪 Test 1: manifeste enregistré par les téléchargements...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest_file = os.path.join(tmp, 'photo_manifest.jsonl')
+        manifest = PhotoManifest(manifest_file)
+        manifest.record('90931157', 'photos', ['data/photos/90931157/photo1.jpg', 'data/photos/90931157/photo2.jpg'])
+        manifest.record('90931157', 'store', ['data/photo_store/blobs/ab/cd/abcd.jpg'])
+
+        # Le store est prioritaire sur les dossiers de photos
+        reloaded = PhotoManifest(manifest_file)
+        assert reloaded.photos_for('90931157') == ['data/photo_store/blobs/ab/cd/abcd.jpg']
+
+        # Mise à jour par un autre processus: visible après refresh
+        manifest.record('90931157', 'store', [])
+        reloaded.refresh()
+        assert reloaded.photos_for('90931157') == ['data/photos/90931157/photo1.jpg', 'data/photos/90931157/photo2.jpg']
+
+        # Compaction du journal: rechargement complet
+        manifest.rebuild()
+        reloaded.refresh()
+        assert reloaded.photos_for('90931157') == []
+
+    print("   ✅ OK")
+
+
+def test_legacy_directories_scanned_once():
+    """Un appartement antérieur au manifeste est scanné une fois, puis servi sans I/O"""
+    print("\n🧪 Test 2: reprise des dossiers existants...")
+
+    cwd = os.getcwd()
+    previous = photo_manifest._global_manifest
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            os.makedirs('data/photos/42')
+            for filename in ('photo2.jpg', 'photo10.jpg', 'photo1.jpg', 'logo-agence.png', 'notes.txt'):
+                with open(f'data/photos/42/{filename}', 'wb') as f:
+                    f.write(b'x')
+
+            photo_manifest._global_manifest = PhotoManifest()
+            expected = ['../data/photos/42/photo1.jpg', '../data/photos/42/photo2.jpg', '../data/photos/42/photo10.jpg']
+            assert gsh.get_all_apartment_photos({'id': '42'}) == expected
+
+            # Les rendus suivants ne relisent pas le dossier
+            for filename in os.listdir('data/photos/42'):
+                os.remove(f'data/photos/42/{filename}')
+            assert gsh.get_all_apartment_photos({'id': '42'}) == expected
+            assert PhotoManifest().photos_for('42') == [path[len('../'):] for path in expected]
+        finally:
+            photo_manifest._global_manifest = previous
+            os.chdir(cwd)
+
+    print("   ✅ OK")
+
+
+def test_empty_entry_rescanned():
+    """Un appartement enregistré sans photo est rescanné (photos écrites hors manifeste)"""
+    print("\n🧪 Test 3: entrée vide rescannée...")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            manifest = PhotoManifest()
+            assert manifest.photos_for('77') == []
+
+            # Téléchargement par un script qui ne tient pas le manifeste à jour
+            os.makedirs('data/photos/77')
+            with open('data/photos/77/photo1.jpg', 'wb') as f:
+                f.write(b'x')
+            assert manifest.photos_for('77') == ['data/photos/77/photo1.jpg']
+        finally:
+            os.chdir(cwd)
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_recorded_photos_survive_restart()
+    test_legacy_directories_scanned_once()
+    test_empty_entry_rescanned()
+    print("\n✅ Tous les tests du manifeste de photos sont passés")
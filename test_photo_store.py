@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Tests du store de photos adressé par contenu
+"""
+
+import os
+import tempfile
+
+from photo_store import PhotoStore
+
+
+def test_identical_photos_stored_once():
+    """Une même photo publiée sous deux URLs n'est stockée qu'une fois"""
+    print("🧪 Test 1: déduplication par contenu...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PhotoStore(root_dir=os.path.join(tmp, 'photo_store'))
+        content = b'\xff\xd8\xff fake jpeg'
+
+        first = store.put(content, url='https://agence-a.fr/photo.jpg')
+        second = store.put(content, url='https://agence-b.fr/autre.jpg')
+
+        assert first['digest'] == second['digest']
+        assert first['path'] == second['path']
+        assert not first['deduplicated'] and second['deduplicated']
+        assert store.analysis_key('https://agence-a.fr/photo.jpg') == store.analysis_key('https://agence-b.fr/autre.jpg')
+
+        # L'index URL → digest est relu depuis le journal
+        reloaded = PhotoStore(root_dir=os.path.join(tmp, 'photo_store'))
+        assert reloaded.lookup_url('https://agence-b.fr/autre.jpg') == first['path']
+        assert reloaded.lookup_url('https://inconnue.fr/x.jpg') is None
+
+    print("   ✅ OK")
+
+
+def test_manifest_keeps_photo_order():
+    """Le manifeste conserve l'ordre des photos de l'appartement"""
+    print("\n🧪 Test 2: manifeste par appartement...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PhotoStore(root_dir=os.path.join(tmp, 'photo_store'))
+        photos = []
+        for i in range(3):
+            stored = store.put(f'photo {i}'.encode(), url=f'https://cdn.fr/{i}.jpg')
+            photos.append({'url': f'https://cdn.fr/{i}.jpg', 'digest': stored['digest'], 'path': stored['path']})
+
+        store.write_manifest('90931157', photos)
+        manifest = store.load_manifest('90931157')
+
+        assert [p['url'] for p in manifest] == [p['url'] for p in photos]
+        assert store.load_manifest('inconnu') == []
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_identical_photos_stored_once()
+    test_manifest_keeps_photo_order()
+    print("\n✅ Tous les tests du store de photos sont passés")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests de la politique de blocage des ressources du scraper
+"""
+
+import asyncio
+
+from resource_policy import ResourcePolicy
+
+
+class FakeRequest:
+    def __init__(self, resource_type, url):
+        self.resource_type = resource_type
+        self.url = url
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = FakeRequest(resource_type, url)
+        self.outcome = None
+
+    async def abort(self, error_code=None):
+        self.outcome = 'abort'
+
+    async def continue_(self):
+        self.outcome = 'continue'
+
+
+def test_default_policy():
+    """Traceurs, scripts tiers, polices et médias annulés; le site, la carte et les images passent"""
+    print("🧪 Test 1: politique par défaut...")
+
+    policy = ResourcePolicy()
+    assert policy.should_block('script', 'https://www.googletagmanager.com/gtm.js?id=GTM-1')
+    assert policy.should_block('xhr', 'https://www.google-analytics.com/g/collect?v=2')
+    assert policy.should_block('script', 'https://cdn.example-widgets.com/chat.js')
+    assert policy.should_block('font', 'https://www.jinka.fr/fonts/inter.woff2')
+    assert policy.should_block('media', 'https://www.jinka.fr/video/intro.mp4')
+
+    assert not policy.should_block('document', 'https://www.jinka.fr/alert_result?ad=1')
+    assert not policy.should_block('script', 'https://www.jinka.fr/_next/static/chunks/main.js')
+    assert not policy.should_block('script', 'https://unpkg.com/leaflet@1.9.4/dist/leaflet.js')
+    assert not policy.should_block('xhr', 'https://api.jinka.fr/apiv2/alert/1/dashboard')
+    assert not policy.should_block('image', 'https://loueragile.fr/photo.jpg')
+    assert not policy.should_block('image', 'data:image/png;base64,AAAA')
+
+    print("   ✅ OK")
+
+
+def test_image_bodies_optional():
+    """Les images peuvent être annulées, sauf les tuiles de la carte"""
+    print("\n🧪 Test 2: blocage optionnel des images...")
+
+    policy = ResourcePolicy(block_images=True)
+    routes = [
+        FakeRoute('image', 'https://loueragile.fr/upload_pro_ad/photo1.jpg'),
+        FakeRoute('image', 'https://a.tile.openstreetmap.org/15/16598/11273.png'),
+        FakeRoute('font', 'https://fonts.gstatic.com/s/inter.woff2'),
+        FakeRoute('document', 'https://www.jinka.fr/alert_result?ad=1'),
+    ]
+
+    async def run():
+        for route in routes:
+            await policy.handle(route)
+
+    asyncio.run(run())
+    assert [route.outcome for route in routes] == ['abort', 'continue', 'abort', 'continue']
+    assert policy.blocked == {'image': 1, 'font': 1}
+    assert policy.summary() == "2 requêtes (image: 1, font: 1)"
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_default_policy()
+    test_image_bodies_optional()
+    print("\n✅ Tous les tests de la politique de blocage sont passés")
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests du service HTTP du scorecard (ETag, précompression, cache immuable, Range)
+"""
+
+import gzip
+import hashlib
+import http.client
+import os
+import tempfile
+import threading
+from functools import partial
+from http.server import ThreadingHTTPServer
+
+from watch_scorecard_server import ScorecardHTTPHandler
+
+HTML = ("<html><body>" + "<div class='scorecard'>Appartement</div>" * 200 + "</body></html>").encode()
+PHOTO = bytes(range(256)) * 40
+
+
+def _request(port, path, headers=None, method='GET'):
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    connection.request(method, path, headers=headers or {})
+    response = connection.getresponse()
+    body = response.read()
+    connection.close()
+    return response, body
+
+
+def test_conditional_compressed_and_ranged_responses():
+    """HTML compressé puis 304, photo adressée par contenu immuable, Range sur les photos"""
+    print("🧪 Test: ETag, compression, cache immuable et Range...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.makedirs(os.path.join(tmp, 'output'))
+        with open(os.path.join(tmp, 'output', 'homepage.html'), 'wb') as f:
+            f.write(HTML)
+        digest = hashlib.sha256(PHOTO).hexdigest()
+        blob_dir = os.path.join(tmp, 'data', 'photo_store', 'blobs', digest[:2], digest[2:4])
+        os.makedirs(blob_dir)
+        with open(os.path.join(blob_dir, f'{digest}.jpg'), 'wb') as f:
+            f.write(PHOTO)
+        os.makedirs(os.path.join(tmp, 'data', 'photos', '1'))
+        with open(os.path.join(tmp, 'data', 'photos', '1', 'photo1.jpg'), 'wb') as f:
+            f.write(PHOTO)
+
+        server = ThreadingHTTPServer(('127.0.0.1', 0), partial(ScorecardHTTPHandler, directory=tmp))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        port = server.server_port
+        try:
+            # HTML: version gzip servie d'après Accept-Encoding, puis 304
+            response, body = _request(port, '/', {'Accept-Encoding': 'gzip'})
+            assert response.status == 200 and response.getheader('Content-Encoding') == 'gzip'
+            assert gzip.decompress(body) == HTML and len(body) < len(HTML)
+            assert response.getheader('Cache-Control') == 'no-cache'
+            etag = response.getheader('ETag')
+            response, body = _request(port, '/output/homepage.html', {'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+            assert response.status == 304 and body == b''
+
+            # Sans Accept-Encoding: représentation identité (ETag distinct)
+            response, body = _request(port, '/output/homepage.html')
+            assert body == HTML and response.getheader('ETag') != etag
+
+            # Blob du store: cache immuable, ETag tiré du nom
+            blob_path = f'/data/photo_store/blobs/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+            response, body = _request(port, blob_path)
+            assert body == PHOTO and 'immutable' in response.getheader('Cache-Control')
+            assert response.getheader('ETag') == f'"{digest[:32]}"'
+
+            # Photo non adressée par contenu: revalidation + Range
+            response, body = _request(port, '/data/photos/1/photo1.jpg', {'Range': 'bytes=100-199'})
+            assert response.status == 206 and body == PHOTO[100:200]
+            assert response.getheader('Content-Range') == f'bytes 100-199/{len(PHOTO)}'
+            assert response.getheader('Cache-Control') == 'no-cache'
+            response, body = _request(port, '/data/photos/1/photo1.jpg', {'Range': 'bytes=-10'})
+            assert response.status == 206 and body == PHOTO[-10:]
+            response, _ = _request(port, '/data/photos/1/photo1.jpg', {'Range': f'bytes={len(PHOTO)}-'})
+            assert response.status == 416
+
+            # If-Range périmé: fichier complet
+            response, body = _request(port, '/data/photos/1/photo1.jpg', {'Range': 'bytes=0-9', 'If-Range': '"ancien"'})
+            assert response.status == 200 and body == PHOTO
+
+            response, body = _request(port, '/absent.html')
+            assert response.status == 404
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_conditional_compressed_and_ranged_responses()
+    print("\n✅ Test du service HTTP du scorecard passé")
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Tests de la régénération du scorecard HTML dans le processus
+"""
+
+import json
+import os
+import tempfile
+
+import generate_scorecard_html
+from scorecard_regenerator import ScorecardRegenerator
+
+SCORES_FILE = 'data/scores/all_apartments_scores.json'
+
+
+def _apartment(i, score):
+    return {
+        'id': str(i), 'url': f'https://www.jinka.fr/{i}', 'prix': '450 000 €', 'surface': '50 m²',
+        'localisation': 'Paris 20e', 'score_total': score, 'tier': 'tier2',
+        'scores_detaille': {'prix': {'score': 10, 'tier': 'tier2', 'justification': 'Prix correct'}},
+    }
+
+
+def _write_scores(apartments):
+    with open(SCORES_FILE, 'w', encoding='utf-8') as f:
+        json.dump(apartments, f)
+
+
+def test_only_changed_cards_are_rendered():
+    """Après une modification, seule la carte de l'appartement modifié est régénérée"""
+    print("🧪 Test: régénération incrémentale...")
+
+    rendered = []
+    render_apartment_card = generate_scorecard_html.render_apartment_card
+
+    def counting_render(apartment, carousel_id, baignoire_extractor):
+        rendered.append(apartment['id'])
+        return render_apartment_card(apartment, carousel_id, baignoire_extractor)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        generate_scorecard_html.render_apartment_card = counting_render
+        try:
+            os.makedirs('data/scores')
+            apartments = [_apartment(i, 90 - i) for i in range(5)]
+            _write_scores(apartments)
+
+            regenerator = ScorecardRegenerator()
+            assert regenerator.regenerate()
+            assert sorted(rendered) == ['0', '1', '2', '3', '4']
+
+            # Modification d'un appartement sans changement de classement
+            rendered.clear()
+            apartments[2]['prix'] = '440 000 €'
+            _write_scores(apartments)
+            assert regenerator.regenerate([SCORES_FILE])
+            assert rendered == ['2']
+
+            # Le HTML assemblé est identique à une génération complète
+            with open('output/homepage.html', encoding='utf-8') as f:
+                html = f.read()
+            assert html == generate_scorecard_html.generate_scorecard_html(generate_scorecard_html.load_scored_apartments())
+        finally:
+            generate_scorecard_html.render_apartment_card = render_apartment_card
+            os.chdir(cwd)
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_only_changed_cards_are_rendered()
+    print("\n✅ Test de la régénération incrémentale passé")
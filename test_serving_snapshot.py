@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Tests du snapshot de service pré-enrichi
+"""
+
+import json
+import os
+import tempfile
+
+import serving_snapshot
+
+APPARTEMENTS = [
+    {'id': '1', 'score_total': 70, 'tier': 'tier1', 'scores_detaille': {'cuisine': {'score': 10, 'tier': 'tier1', 'justification': 'Cuisine ouverte'}}},
+    {'id': '2', 'score_total': 40, 'tier': 'tier3', 'scores_detaille': {}},
+]
+
+
+def test_snapshot_roundtrip_and_staleness():
+    """Le snapshot est rechargé tel quel, puis ignoré dès que les scores ou les photos changent"""
+    print("🧪 Test: snapshot de service...")
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            os.makedirs('data/scores')
+            with open(serving_snapshot.SCORES_FILE, 'w', encoding='utf-8') as f:
+                json.dump(APPARTEMENTS, f)
+
+            apartments = serving_snapshot.build_serving_snapshot()
+            assert [apt['id'] for apt in apartments] == ['1', '2']
+            assert 'cuisine' in apartments[0]['formatted_data']
+            assert serving_snapshot.load_serving_snapshot() == apartments
+
+            # Re-scoring: le snapshot ne correspond plus aux sources
+            stat = os.stat(serving_snapshot.SCORES_FILE)
+            os.utime(serving_snapshot.SCORES_FILE, (stat.st_atime, stat.st_mtime + 10))
+            assert serving_snapshot.load_serving_snapshot() is None
+
+            # Photos téléchargées (manifeste mis à jour): srcset à recalculer
+            apartments = serving_snapshot.build_serving_snapshot()
+            assert serving_snapshot.load_serving_snapshot() == apartments
+            serving_snapshot.get_photo_manifest().record('1', 'photos', ['data/photos/1/photo1.jpg'])
+            assert serving_snapshot.load_serving_snapshot() is None
+
+            # Changement de version d'enrichissement: snapshot ignoré
+            serving_snapshot.build_serving_snapshot()
+            serving_snapshot.ENRICHMENT_VERSION += 1
+            try:
+                assert serving_snapshot.load_serving_snapshot() is None
+            finally:
+                serving_snapshot.ENRICHMENT_VERSION -= 1
+        finally:
+            os.chdir(cwd)
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_snapshot_roundtrip_and_staleness()
+    print("\n✅ Test du snapshot de service passé")
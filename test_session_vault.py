@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests du coffre de session (état du navigateur + token API persistés)
+"""
+
+import asyncio
+import base64
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from session_vault import SessionVault, jwt_expiry
+
+
+def make_jwt(exp):
+    payload = base64.urlsafe_b64encode(json.dumps({'exp': exp}).encode()).decode().rstrip('=')
+    return f"eyJhbGciOiJIUzI1NiJ9.{payload}.signature"
+
+
+def storage_state(token, expires=-1):
+    return {
+        'cookies': [
+            {'name': 'LA_API_TOKEN', 'value': token, 'domain': '.jinka.fr', 'path': '/', 'expires': expires},
+            {'name': 'session', 'value': 'abc', 'domain': 'www.jinka.fr', 'path': '/', 'expires': -1},
+        ],
+        'origins': [],
+    }
+
+
+class AuthHandler(BaseHTTPRequestHandler):
+    """GET /user/authenticated: 200 pour le bon token, 401 sinon"""
+
+    calls = 0
+
+    def do_GET(self):
+        AuthHandler.calls += 1
+        ok = self.headers.get('Authorization') == 'Bearer good-token' and 'session=abc' in self.headers.get('Cookie', '')
+        body = json.dumps({'authenticated': True} if ok else {'error': 'unauthorized'}).encode()
+        self.send_response(200 if ok else 401)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_save_and_expiry():
+    """Expiration la plus proche (cookie, JWT, TTL par défaut), fichier privé"""
+    print("🧪 Test 1: enregistrement et expiration...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        vault = SessionVault(os.path.join(tmp, 'data', 'session_vault.json'))
+        assert vault.load() is None
+
+        # Sans LA_API_TOKEN: rien n'est enregistré
+        assert vault.save({'cookies': [], 'origins': []}) is None
+        assert not os.path.exists(vault.vault_file)
+
+        in_two_days = time.time() + 2 * 86400
+        entry = vault.save(storage_state('good-token', expires=in_two_days))
+        assert stat.S_IMODE(os.stat(vault.vault_file).st_mode) == 0o600
+        assert vault.load()['api_token'] == 'good-token'
+        assert entry['expires_at'].startswith(time.strftime('%Y-%m-%d', time.localtime(in_two_days)))
+
+        # JWT expirant dans 5 minutes: sous la marge, la session n'est plus utilisée
+        token = make_jwt(int(time.time()) + 300)
+        assert jwt_expiry(token) is not None and jwt_expiry('opaque-token') is None
+        vault.save(storage_state(token, expires=in_two_days))
+        assert vault.load() is None
+
+    print("   ✅ OK")
+
+
+def test_validate():
+    """Session acceptée réutilisée; session refusée effacée du coffre"""
+    print("\n🧪 Test 2: validation par appel authentifié...")
+
+    server = HTTPServer(('127.0.0.1', 0), AuthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/apiv2/user/authenticated"
+
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            vault = SessionVault(os.path.join(tmp, 'session_vault.json'), validation_url=url)
+
+            vault.save(storage_state('good-token'))
+            entry = asyncio.run(vault.valid_entry())
+            assert entry and entry['storage_state']['cookies'][0]['value'] == 'good-token'
+
+            vault.save(storage_state('revoked-token'))
+            assert asyncio.run(vault.valid_entry()) is None
+            assert not os.path.exists(vault.vault_file)
+
+            # Coffre vide: aucun appel réseau
+            calls = AuthHandler.calls
+            assert asyncio.run(vault.valid_entry()) is None
+            assert AuthHandler.calls == calls
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_save_and_expiry()
+    test_validate()
+    print("\n✅ Tous les tests du coffre de session sont passés")
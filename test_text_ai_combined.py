@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tests de l'analyse textuelle combinée (une requête pour les 4 critères)
+"""
+
+import json
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+from analyze_text_ai import TextAIAnalyzer
+from cache_api import APICache
+
+ANALYSE = {
+    'exposition': {'exposition': 'sud', 'confiance_globale': 0.7, 'est_faux_positif': False},
+    'baignoire': {'baignoire_presente': True, 'douche_seule': False, 'confiance': 0.9},
+    'cuisine': {'cuisine_ouverte': True, 'confiance': 0.8},
+    'style': {'style': 'haussmannien', 'confiance_globale': 0.9},
+}
+
+
+class _ChatHandler(BaseHTTPRequestHandler):
+    """Simule /chat/completions: une analyse combinée par appartement du prompt"""
+    requests_count = 0
+    individual_count = 0
+    fail_combined = False
+
+    def do_POST(self):
+        type(self).requests_count += 1
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        prompt = payload['messages'][-1]['content']
+        if 'response_format' not in payload:
+            # Requête d'un critère individuel: champs des 4 analyses réunis
+            type(self).individual_count += 1
+            content = {key: value for analyse in ANALYSE.values() for key, value in analyse.items()}
+        elif type(self).fail_combined:
+            self.send_response(500)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        else:
+            apartments = prompt.count('### APPARTEMENT')
+            content = {'appartements': [ANALYSE] * apartments} if apartments else ANALYSE
+
+        body = json.dumps({'choices': [{'message': {'content': json.dumps(content)}}]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_server():
+    server = HTTPServer(('127.0.0.1', 0), _ChatHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    _ChatHandler.requests_count = 0
+    _ChatHandler.individual_count = 0
+    _ChatHandler.fail_combined = False
+    return server
+
+
+def _make_analyzer(tmp, port):
+    analyzer = TextAIAnalyzer()
+    analyzer.openai_api_key = 'test'
+    analyzer.openai_base_url = f"http://127.0.0.1:{port}"
+    analyzer.cache = APICache(
+        cache_file=os.path.join(tmp, 'api_cache.db'),
+        legacy_json_file=os.path.join(tmp, 'absent.json')
+    )
+    return analyzer
+
+
+def test_four_criteria_single_request():
+    """Les 4 critères d'un appartement ne coûtent qu'une requête"""
+    print("🧪 Test 1: une requête pour 4 critères...")
+
+    server = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            analyzer = _make_analyzer(tmp, server.server_port)
+            description, caracteristiques = "Haussmannien plein sud, baignoire", "Parquet"
+
+            assert analyzer.analyze_exposition(description, caracteristiques)['exposition'] == 'sud'
+            assert analyzer.analyze_baignoire(description, caracteristiques)['baignoire_presente'] is True
+            assert analyzer.analyze_cuisine_ouverte(description, caracteristiques)['available']
+            assert analyzer.analyze_style(description, caracteristiques)['style'] == 'haussmannien'
+            assert _ChatHandler.requests_count == 1
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+def test_batch_fills_per_apartment_cache():
+    """Un lot de plusieurs appartements est analysé en une requête et mis en cache par appartement"""
+    print("\n🧪 Test 2: lot d'appartements...")
+
+    server = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            analyzer = _make_analyzer(tmp, server.server_port)
+            apartments = [
+                {'description': f"Appartement {i}", 'caracteristiques': "Balcon", 'etage': "4ème étage"}
+                for i in range(3)
+            ]
+
+            results = analyzer.analyze_all_batch(apartments, batch_size=3)
+            assert [r['available'] for r in results] == [True] * 3
+            assert _ChatHandler.requests_count == 1
+
+            # Critères demandés ensuite (avec ou sans étage): servis par le cache
+            for apartment in apartments:
+                assert analyzer.analyze_cuisine_ouverte(apartment['description'], apartment['caracteristiques'])['cuisine_ouverte']
+                assert analyzer.analyze_exposition(apartment['description'], apartment['caracteristiques'], apartment['etage'])['available']
+            assert _ChatHandler.requests_count == 1
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+def test_per_criterion_cache_reused():
+    """Les résultats individuels déjà en cache évitent la requête combinée"""
+    print("\n🧪 Test 3: cache des critères individuels...")
+
+    server = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            analyzer = _make_analyzer(tmp, server.server_port)
+            description, caracteristiques, etage = "Plein sud, baignoire", "Parquet", "3ème étage"
+            for analysis_type, result in ANALYSE.items():
+                prompt = analyzer._build_prompt(analysis_type, description, caracteristiques, etage)
+                analyzer.cache.set(analysis_type, prompt, {**result, 'available': True})
+
+            results = analyzer.analyze_all_batch(
+                [{'description': description, 'caracteristiques': caracteristiques, 'etage': etage}]
+            )
+            assert results[0]['style']['style'] == 'haussmannien'
+            assert analyzer.analyze_exposition(description, caracteristiques, etage)['exposition'] == 'sud'
+            assert _ChatHandler.requests_count == 0
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+def test_combined_failure_falls_back():
+    """Échec de la requête combinée: envoyée une seule fois, puis chaque critère seul (cache d'abord)"""
+    print("\n🧪 Test 4: repli sur les critères individuels...")
+
+    server = _start_server()
+    _ChatHandler.fail_combined = True
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            analyzer = _make_analyzer(tmp, server.server_port)
+            description, caracteristiques = "Cuisine ouverte", "Balcon"
+            prompt = analyzer._build_prompt('baignoire', description, caracteristiques)
+            analyzer.cache.set('baignoire', prompt, {'baignoire_presente': False, 'available': True})
+
+            assert analyzer.analyze_baignoire(description, caracteristiques)['baignoire_presente'] is False
+            assert analyzer.analyze_cuisine_ouverte(description, caracteristiques)['cuisine_ouverte'] is True
+            analyzer.analyze_style(description, caracteristiques)
+            assert _ChatHandler.individual_count == 2
+            assert _ChatHandler.requests_count == 1 + _ChatHandler.individual_count
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+def test_exposition_with_other_etage():
+    """Analyse combinée faite sans étage: seule l'exposition est redemandée avec l'étage"""
+    print("\n🧪 Test 5: exposition avec étage après les autres critères...")
+
+    server = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            analyzer = _make_analyzer(tmp, server.server_port)
+            description, caracteristiques = "Lumineux, vue dégagée", "Ascenseur"
+
+            assert analyzer.analyze_baignoire(description, caracteristiques)['available']
+            assert analyzer.analyze_exposition(description, caracteristiques, "6ème étage")['available']
+            assert analyzer.analyze_exposition(description, caracteristiques, "6ème étage")['available']
+            assert analyzer.analyze_style(description, caracteristiques)['available']
+            assert _ChatHandler.requests_count == 2 and _ChatHandler.individual_count == 1
+    finally:
+        server.shutdown()
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_four_criteria_single_request()
+    test_batch_fills_per_apartment_cache()
+    test_per_criterion_cache_reused()
+    test_combined_failure_falls_back()
+    test_exposition_with_other_etage()
+    print("\n✅ Tous les tests de l'analyse textuelle combinée sont passés")
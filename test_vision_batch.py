@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests du mode batch de l'analyse Vision unifiée (transport local simulé)
+"""
+
+import json
+import os
+import tempfile
+
+from analyze_apartment_unified import UnifiedApartmentAnalyzer
+from cache_api import APICache
+from vision_batch import LocalBatchTransport, VisionBatchJob
+
+REPONSE_VISION = {
+    'style': {'type': 'haussmannien', 'confidence': 0.9, 'score': 20},
+    'cuisine': {'ouverte': True, 'confidence': 0.8, 'score': 10},
+    'salle_de_bain': {'baignoire': True, 'confidence': 0.7, 'score': 10},
+    'luminosite': {'type': 'excellente', 'confidence': 0.8, 'score': 10},
+    'photos_analyzed': 1
+}
+
+
+def _stub_handler(body):
+    """Simule /chat/completions: vérifie la requête et renvoie une analyse fixe"""
+    assert body['messages'][0]['content'][1]['type'] == 'image_url'
+    return {'choices': [{'message': {'content': json.dumps(REPONSE_VISION)}}]}
+
+
+def test_batch_results_ingested_into_cache():
+    """Les requêtes en attente passent par le job batch et finissent dans APICache"""
+    print("🧪 Test: job batch Vision → cache...")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        photo_path = os.path.join(tmp, 'photo.jpg')
+        with open(photo_path, 'wb') as f:
+            f.write(b'\xff\xd8\xff fake jpeg')
+
+        analyzer = UnifiedApartmentAnalyzer()
+        analyzer.cache = APICache(
+            cache_file=os.path.join(tmp, 'api_cache.db'),
+            legacy_json_file=os.path.join(tmp, 'absent.json')
+        )
+        apartments = [
+            {'id': str(i), 'description': 'Bel appartement', 'photos': [{'url': f'https://cdn.fr/{i}.jpg', 'local_path': photo_path}]}
+            for i in range(3)
+        ] + [{'id': 'sans_photos', 'photos': []}]
+
+        job = VisionBatchJob(name='test', job_dir=os.path.join(tmp, 'jobs'), analyzer=analyzer)
+        stats = job.prepare(apartments)
+        assert stats['pending'] == 3 and stats['skipped'] == 1
+
+        transport = LocalBatchTransport(_stub_handler)
+        assert job.submit(transport)
+        assert job.wait(transport, poll_interval=0) == 'completed'
+        assert job.ingest(transport) == {'ingested': 3, 'failed': 0}
+
+        # L'analyse synchrone retrouve le résultat sans appel API
+        result = analyzer.analyze_apartment_unified(apartments[0])
+        assert result['style']['type'] == 'haussmannien'
+        assert result['baignoire']['presente'] is True
+
+        # Un nouveau job n'a plus rien à soumettre
+        assert VisionBatchJob(name='suivant', job_dir=os.path.join(tmp, 'jobs'), analyzer=analyzer).prepare(apartments)['cached'] == 3
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_batch_results_ingested_into_cache()
+    print("\n✅ Test du mode batch Vision passé")
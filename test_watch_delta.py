@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Tests des deltas par appartement envoyés par le service de surveillance
+"""
+
+from backend.watch_service import WatchService
+
+
+class _FakeWatchService(WatchService):
+    """Service alimenté par une liste en mémoire au lieu de l'API"""
+    records = []
+
+    def load_records(self):
+        return [dict(apt) for apt in self.records]
+
+
+def test_delta_and_resume():
+    """Seuls les appartements modifiés sont envoyés, numérotés pour la reprise"""
+    print("🧪 Test: deltas et reprise...")
+
+    _FakeWatchService.records = [{'id': 1, 'score_total': 50}, {'id': 2, 'score_total': 60}]
+    sent = []
+    service = _FakeWatchService(broadcast_callback=sent.append, debounce_seconds=0)
+    assert service.sequence == 0
+
+    _FakeWatchService.records = [{'id': 1, 'score_total': 55}, {'id': 3, 'score_total': 70}]
+    service.notify_change(['data/scores/all_apartments_scores.json'])
+    delta = sent[-1]
+    assert delta['type'] == 'apartments_delta' and delta['seq'] == 1
+    assert delta['updated'] == [{'id': 1, 'score_total': 55}]
+    assert delta['added'] == [{'id': 3, 'score_total': 70}]
+    assert delta['removed'] == ['2']
+
+    # Fichier réécrit sans changement de contenu: aucune notification
+    service.notify_change(['data/scores/all_apartments_scores.json'])
+    assert len(sent) == 1
+
+    # Reprise: messages manqués, rien de nouveau, ou rechargement complet
+    assert [m['seq'] for m in service.messages_since(0)] == [1]
+    assert service.messages_since(1) == []
+    assert service.messages_since(5) is None
+
+    print("   ✅ OK")
+
+
+if __name__ == "__main__":
+    test_delta_and_resume()
+    print("\n✅ Test des deltas WebSocket passé")
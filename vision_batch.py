@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Mode batch (hors ligne) de l'analyse Vision unifiée
+
+Pour les re-scorings complets (nuit):
+1. prepare: les analyses absentes du cache sont écrites dans un fichier JSONL
+   (une requête /chat/completions par appartement, clé _get_cache_input_data)
+2. submit: le fichier est soumis via un transport (API Batch OpenAI ou local)
+3. poll / ingest: quand le job est terminé, les résultats sont ingérés dans
+   APICache ("unified_analysis"), où analyze_apartment_unified les retrouve
+
+L'état du job (batch_id, custom_id → clé de cache) est sauvegardé à côté du
+fichier JSONL: la collecte peut se faire plus tard, dans un autre processus.
+"""
+
+import hashlib
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+
+from analyze_apartment_unified import UnifiedApartmentAnalyzer
+
+# Limite de taille d'un fichier de job (API Batch: 200 Mo par fichier)
+MAX_JOB_FILE_BYTES = 190 * 1024 * 1024
+
+# Statuts finaux d'un job batch
+FINAL_STATUSES = ('completed', 'failed', 'expired', 'cancelled')
+INGESTABLE_STATUSES = ('completed', 'expired')
+
+
+class BatchTransport(ABC):
+    """Transport de jobs batch: soumission, état et résultats"""
+
+    @abstractmethod
+    def submit(self, job_file: str) -> str:
+        """Soumet un fichier JSONL de requêtes et retourne l'identifiant du job"""
+
+    @abstractmethod
+    def status(self, batch_id: str) -> str:
+        """État du job ('validating', 'in_progress', 'completed', 'failed'...)"""
+
+    @abstractmethod
+    def results(self, batch_id: str) -> Iterable[Dict]:
+        """Lignes de résultat au format batch: {'custom_id', 'response': {'status_code', 'body'}}"""
+
+
+class OpenAIBatchTransport(BatchTransport):
+    """Transport vers l'API Batch OpenAI (/v1/files + /v1/batches)"""
+
+    def __init__(self, api_key: Optional[str] = None, base_url: str = "https://api.openai.com/v1",
+                 completion_window: str = '24h', timeout: float = 120):
+        self.api_key = api_key or os.getenv('OPENAI_API_KEY')
+        self.base_url = base_url
+        self.completion_window = completion_window
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers['Authorization'] = f'Bearer {self.api_key}'
+
+    def submit(self, job_file: str) -> str:
+        with open(job_file, 'rb') as f:
+            response = self.session.post(
+                f"{self.base_url}/files",
+                data={'purpose': 'batch'},
+                files={'file': (os.path.basename(job_file), f, 'application/jsonl')},
+                timeout=self.timeout
+            )
+        response.raise_for_status()
+        input_file_id = response.json()['id']
+
+        response = self.session.post(
+            f"{self.base_url}/batches",
+            json={
+                'input_file_id': input_file_id,
+                'endpoint': '/v1/chat/completions',
+                'completion_window': self.completion_window
+            },
+            timeout=self.timeout
+        )
+        response.raise_for_status()
+        return response.json()['id']
+
+    def _get_batch(self, batch_id: str) -> Dict:
+        response = self.session.get(f"{self.base_url}/batches/{batch_id}", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def status(self, batch_id: str) -> str:
+        return self._get_batch(batch_id).get('status', 'unknown')
+
+    def results(self, batch_id: str) -> Iterable[Dict]:
+        batch = self._get_batch(batch_id)
+        # Résultats réussis, puis requêtes en erreur
+        for file_id in (batch.get('output_file_id'), batch.get('error_file_id')):
+            if not file_id:
+                continue
+            response = self.session.get(f"{self.base_url}/files/{file_id}/content", timeout=self.timeout)
+            response.raise_for_status()
+            for line in response.text.splitlines():
+                if line.strip():
+                    yield json.loads(line)
+
+
+class LocalBatchTransport(BatchTransport):
+    """
+    Transport local: exécute chaque requête du job avec un handler
+
+    Utile pour les tests (handler simulé) ou pour rejouer un job sans API Batch.
+    Le fichier de sortie est écrit au format de l'API Batch.
+    """
+
+    def __init__(self, handler: Callable[[Dict], Dict]):
+        """
+        Args:
+            handler: Fonction corps de requête → corps de réponse /chat/completions
+        """
+        self.handler = handler
+
+    def submit(self, job_file: str) -> str:
+        output_file = f"{os.path.splitext(job_file)[0]}.output.jsonl"
+        with open(job_file, 'r', encoding='utf-8') as f_in, open(output_file, 'w', encoding='utf-8') as f_out:
+            for line in f_in:
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                try:
+                    response = {'status_code': 200, 'body': self.handler(request['body'])}
+                except Exception as e:
+                    response = {'status_code': 500, 'body': {'error': str(e)}}
+                f_out.write(json.dumps({'custom_id': request['custom_id'], 'response': response}) + '\n')
+        return output_file
+
+    def status(self, batch_id: str) -> str:
+        return 'completed' if os.path.exists(batch_id) else 'failed'
+
+    def results(self, batch_id: str) -> Iterable[Dict]:
+        with open(batch_id, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+class VisionBatchJob:
+    """Job batch d'analyses Vision unifiées (fichier JSONL + état persistant)"""
+
+    def __init__(self, name: Optional[str] = None, job_dir: str = 'data/vision_batches',
+                 analyzer: Optional[UnifiedApartmentAnalyzer] = None):
+        """
+        Args:
+            name: Nom du job (horodatage par défaut)
+            job_dir: Dossier des fichiers de job et d'état
+            analyzer: Analyseur unifié (construction des requêtes, parsing, cache)
+        """
+        self.name = name or datetime.now().strftime('vision_%Y%m%d_%H%M%S')
+        self.job_dir = job_dir
+        self.job_file = os.path.join(job_dir, f"{self.name}.jsonl")
+        self.state_file = os.path.join(job_dir, f"{self.name}.state.json")
+        self.analyzer = analyzer or UnifiedApartmentAnalyzer()
+        self.state = self._load_state()
+
+    def _load_state(self) -> Dict:
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except Exception as e:
+                print(f"⚠️ Erreur chargement état {self.state_file}: {e}")
+        return {'batch_id': None, 'status': 'new', 'requests': {}}
+
+    def _save_state(self):
+        os.makedirs(self.job_dir, exist_ok=True)
+        tmp_file = f"{self.state_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, self.state_file)
+
+    def prepare(self, apartments: List[Dict], max_photos: int = 5) -> Dict[str, int]:
+        """
+        Écrit les requêtes en attente (absentes du cache) dans le fichier JSONL
+
+        Returns:
+            Stats: 'pending' (écrites), 'cached', 'skipped' (sans photos), 'deferred' (fichier plein)
+        """
+        stats = {'pending': 0, 'cached': 0, 'skipped': 0, 'deferred': 0}
+        requests_by_id = {}
+        os.makedirs(self.job_dir, exist_ok=True)
+
+        with open(self.job_file, 'w', encoding='utf-8') as f:
+            for apartment in apartments:
+                apartment_id = str(apartment.get('id', 'unknown'))
+                photos = [p if isinstance(p, dict) else {'url': p} for p in apartment.get('photos', []) or []]
+                if not photos:
+                    stats['skipped'] += 1
+                    continue
+
+                cache_input = self.analyzer._get_cache_input_data(apartment_id, photos)
+                custom_id = f"{apartment_id}-{hashlib.md5(cache_input.encode('utf-8')).hexdigest()[:12]}"
+                if custom_id in requests_by_id:
+                    continue
+                if self.analyzer.cache.get("unified_analysis", cache_input):
+                    stats['cached'] += 1
+                    continue
+                if f.tell() >= MAX_JOB_FILE_BYTES:
+                    # Traité par le prochain job
+                    stats['deferred'] += 1
+                    continue
+
+                payload = self.analyzer._build_unified_payload(
+                    apartment.get('description', ''),
+                    apartment.get('caracteristiques', ''),
+                    photos,
+                    max_photos=max_photos
+                )
+                if not payload:
+                    stats['skipped'] += 1
+                    continue
+
+                f.write(json.dumps({
+                    'custom_id': custom_id,
+                    'method': 'POST',
+                    'url': '/v1/chat/completions',
+                    'body': payload
+                }) + '\n')
+                requests_by_id[custom_id] = {'apartment_id': apartment_id, 'cache_input': cache_input}
+                stats['pending'] += 1
+
+        self.state = {'batch_id': None, 'status': 'prepared', 'requests': requests_by_id}
+        self._save_state()
+        return stats
+
+    def submit(self, transport: BatchTransport) -> Optional[str]:
+        """Soumet le fichier de job (rien à faire si aucune requête en attente)"""
+        if not self.state['requests']:
+            self.state['status'] = 'completed'
+            self._save_state()
+            return None
+
+        self.state['batch_id'] = transport.submit(self.job_file)
+        self.state['status'] = 'submitted'
+        self.state['submitted_at'] = datetime.now().isoformat()
+        self._save_state()
+        return self.state['batch_id']
+
+    def poll(self, transport: BatchTransport) -> str:
+        """Relit l'état du job auprès du transport"""
+        if self.state.get('batch_id') and self.state['status'] not in FINAL_STATUSES + ('ingested',):
+            self.state['status'] = transport.status(self.state['batch_id'])
+            self._save_state()
+        return self.state['status']
+
+    def wait(self, transport: BatchTransport, poll_interval: float = 60, timeout: Optional[float] = None) -> str:
+        """Attend un état final (ou le timeout) en relisant l'état toutes les poll_interval secondes"""
+        start = time.monotonic()
+        status = self.poll(transport)
+        while status not in FINAL_STATUSES + ('ingested',):
+            if timeout is not None and time.monotonic() - start >= timeout:
+                break
+            time.sleep(poll_interval)
+            status = self.poll(transport)
+        return status
+
+    def ingest(self, transport: BatchTransport) -> Dict[str, int]:
+        """
+        Ingère les résultats d'un job terminé (ou expiré) dans APICache
+
+        Returns:
+            Stats: 'ingested', 'failed'
+        """
+        stats = {'ingested': 0, 'failed': 0}
+        # Un job expiré conserve les résultats des requêtes terminées
+        if self.state['status'] not in INGESTABLE_STATUSES or not self.state.get('batch_id'):
+            return stats
+
+        for line in transport.results(self.state['batch_id']):
+            request = self.state['requests'].get(line.get('custom_id'))
+            if not request:
+                continue
+
+            response = line.get('response') or {}
+            analysis = None
+            if response.get('status_code') == 200:
+                try:
+                    response_text = response['body']['choices'][0]['message']['content'].strip()
+                    analysis = self.analyzer._parse_unified_response(response_text, request['apartment_id'])
+                except (KeyError, IndexError, TypeError) as e:
+                    print(f"   ⚠️  Réponse batch invalide pour {request['apartment_id']}: {e}")
+
+            if analysis:
+                self.analyzer.cache.set("unified_analysis", request['cache_input'], analysis)
+                stats['ingested'] += 1
+            else:
+                stats['failed'] += 1
+
+        self.state['status'] = 'ingested'
+        self.state['ingested_at'] = datetime.now().isoformat()
+        self._save_state()
+        return stats
+
+
+def run_vision_batch(apartments: List[Dict], transport: BatchTransport, job_dir: str = 'data/vision_batches',
+                     poll_interval: float = 60, timeout: Optional[float] = None) -> Dict[str, int]:
+    """
+    Prépare, soumet, attend et ingère un job batch d'analyses Vision
+
+    Returns:
+        Stats fusionnées de prepare() et ingest()
+    """
+    job = VisionBatchJob(job_dir=job_dir)
+    stats = job.prepare(apartments)
+    print(f"📦 Job {job.name}: {stats['pending']} requêtes, {stats['cached']} déjà en cache")
+
+    if job.submit(transport):
+        status = job.wait(transport, poll_interval=poll_interval, timeout=timeout)
+        print(f"   État du job: {status}")
+        stats.update(job.ingest(transport))
+    return stats
+
+
+def _latest_job_name(job_dir: str) -> Optional[str]:
+    """Dernier job soumis et pas encore ingéré"""
+    if not os.path.exists(job_dir):
+        return None
+    for state_file in sorted(os.listdir(job_dir), reverse=True):
+        if not state_file.endswith('.state.json'):
+            continue
+        try:
+            with open(os.path.join(job_dir, state_file), 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except Exception:
+            continue
+        if state.get('batch_id') and state.get('status') != 'ingested':
+            return state_file[:-len('.state.json')]
+    return None
+
+
+def main():
+    """
+    Usage:
+        python vision_batch.py submit          # prépare et soumet un job (sans attendre)
+        python vision_batch.py collect [nom]   # relit l'état et ingère si terminé
+        python vision_batch.py run             # soumet, attend et ingère
+    """
+    command = sys.argv[1] if len(sys.argv) > 1 else 'run'
+    job_dir = 'data/vision_batches'
+    transport = OpenAIBatchTransport()
+
+    if command == 'collect':
+        name = sys.argv[2] if len(sys.argv) > 2 else _latest_job_name(job_dir)
+        if not name:
+            print("❌ Aucun job en attente")
+            return
+        job = VisionBatchJob(name=name, job_dir=job_dir)
+        status = job.poll(transport)
+        print(f"📦 Job {name}: {status}")
+        if status in INGESTABLE_STATUSES:
+            stats = job.ingest(transport)
+            print(f"✅ {stats['ingested']} analyses ingérées, {stats['failed']} en échec")
+        return
+
+    from data_loader import load_apartments
+    apartments = load_apartments(prefer_api=True)
+    if not apartments:
+        print("❌ Aucun appartement trouvé")
+        return
+
+    if command == 'submit':
+        job = VisionBatchJob(job_dir=job_dir)
+        stats = job.prepare(apartments)
+        batch_id = job.submit(transport)
+        print(f"📦 Job {job.name}: {stats['pending']} requêtes, {stats['cached']} déjà en cache")
+        if batch_id:
+            print(f"   Soumis: {batch_id} (récupérer avec: python vision_batch.py collect {job.name})")
+    else:
+        stats = run_vision_batch(apartments, transport, job_dir=job_dir)
+        print(f"✅ {stats.get('ingested', 0)} analyses ingérées, {stats.get('failed', 0)} en échec")
+
+
+if __name__ == "__main__":
+    main()
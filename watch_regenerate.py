@@ -8,7 +8,7 @@ import time
 import os
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
-import subprocess
+from scorecard_regenerator import ScorecardRegenerator
 
 class RegenerateHandler(FileSystemEventHandler):
     """Handler qui régénère le HTML quand les fichiers changent"""
@@ -16,6 +16,8 @@ class RegenerateHandler(FileSystemEventHandler):
     def __init__(self):
         self.last_regenerated = 0
         self.debounce_seconds = 2  # Attendre 2 secondes avant de régénérer
+        # Régénération dans le processus: modules, extracteur et cartes restent en mémoire
+        self.regenerator = ScorecardRegenerator()
     
     def on_modified(self, event):
         """Appelé quand un fichier est modifié"""
@@ -31,26 +33,9 @@ class RegenerateHandler(FileSystemEventHandler):
             
             self.last_regenerated = current_time
             print(f"\n🔄 Fichier modifié: {event.src_path}")
-            print("📝 Régénération du HTML...")
             
-            try:
-                # Exécuter le script de génération
-                result = subprocess.run(
-                    ['python', 'generate_scorecard_html.py'],
-                    capture_output=True,
-                    text=True,
-                    timeout=60
-                )
-                
-                if result.returncode == 0:
-                    print("✅ HTML régénéré avec succès!")
-                    if result.stdout:
-                        print(result.stdout)
-                else:
-                    print("❌ Erreur lors de la régénération:")
-                    print(result.stderr)
-            except Exception as e:
-                print(f"❌ Erreur: {e}")
+            if self.regenerator.regenerate([event.src_path]):
+                print("✅ HTML régénéré avec succès!")
 
 def main():
     """Fonction principale"""
@@ -7,48 +7,159 @@ Fonctionnalités:
 - Surveille les fichiers et régénère automatiquement le HTML
 - Auto-refresh du navigateur quand le HTML change (via WebSocket ou polling)
 - Interface simple pour voir les changements en direct
+- Fichiers servis avec ETag fort (304 au rechargement), HTML/CSS/JS
+  précompressés (gzip/brotli), photos adressées par contenu en cache
+  immuable et requêtes Range
 """
 
 import time
 import os
-import subprocess
+import re
 import threading
 from pathlib import Path
-from datetime import datetime
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from email.utils import formatdate
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
 import webbrowser
 
-try:
-    from watchdog.observers import Observer
-    from watchdog.events import FileSystemEventHandler
-    HAS_WATCHDOG = True
-except ImportError:
-    HAS_WATCHDOG = False
+from file_watcher import FileWatcher, HAS_WATCHDOG
+from scorecard_regenerator import ScorecardRegenerator
+from static_assets import StaticAssetCache
+
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+if not HAS_WATCHDOG:
     print("⚠️  watchdog non installé, utilisation du polling simple")
     print("   Installez avec: pip install watchdog")
 
 class ScorecardHTTPHandler(SimpleHTTPRequestHandler):
-    """Handler HTTP personnalisé avec auto-refresh"""
+    """Handler HTTP: ETag fort, précompression, cache immuable des photos adressées par contenu, Range"""
+    
+    # Cache partagé quand le handler est utilisé sans ScorecardWatcherServer
+    default_asset_cache = StaticAssetCache()
     
     def __init__(self, *args, watcher=None, **kwargs):
         self.watcher = watcher
+        self.asset_cache = watcher.asset_cache if watcher is not None else self.default_asset_cache
         super().__init__(*args, **kwargs)
     
-    def end_headers(self):
-        """Ajoute les headers pour éviter le cache"""
-        self.send_header('Cache-Control', 'no-store, no-cache, must-revalidate')
-        self.send_header('Pragma', 'no-cache')
-        self.send_header('Expires', '0')
-        super().end_headers()
-    
     def do_GET(self):
         """Gère les requêtes GET"""
+        self.serve_asset(head=False)
+    
+    def do_HEAD(self):
+        """Gère les requêtes HEAD (en-têtes seuls)"""
+        self.serve_asset(head=True)
+    
+    def serve_asset(self, head):
+        """Sert un fichier statique (304, 206 ou 200 selon les en-têtes de la requête)"""
         if self.path == '/' or self.path == '/homepage.html':
             # Rediriger vers le fichier HTML
             self.path = '/output/homepage.html'
         
-        # Servir les fichiers statiques
-        return super().do_GET()
+        fs_path = self.translate_path(self.path)
+        if os.path.isdir(fs_path):
+            # Listing de dossier: comportement standard
+            return super().do_HEAD() if head else super().do_GET()
+        
+        asset = self.asset_cache.get(fs_path)
+        if asset is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+        
+        encoding = asset.negotiate(self.headers.get('Accept-Encoding'))
+        etag = asset.etag_for(encoding)
+        
+        if self._etag_matches(self.headers.get('If-None-Match'), etag):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._send_cache_headers(asset, etag)
+            self.end_headers()
+            return
+        
+        body = asset.variants[encoding] if encoding else asset.body
+        size = len(body) if body is not None else asset.size
+        
+        # Range: représentation non compressée uniquement, si If-Range correspond
+        byte_range = None
+        range_header = self.headers.get('Range')
+        if range_header and encoding is None and self.headers.get('If-Range', etag) == etag:
+            byte_range = self._parse_range(range_header, size)
+            if byte_range == 'unsatisfiable':
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f'bytes */{size}')
+                self.send_header('Content-Length', '0')
+                self._send_cache_headers(asset, etag)
+                self.end_headers()
+                return
+        
+        start, end = byte_range if byte_range else (0, size - 1)
+        if byte_range:
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header('Content-Range', f'bytes {start}-{end}/{size}')
+        else:
+            self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', asset.content_type)
+        self.send_header('Content-Length', str(max(0, end - start + 1)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self._send_cache_headers(asset, etag)
+        self.end_headers()
+        
+        if head or size == 0:
+            return
+        if body is not None:
+            self.wfile.write(body[start:end + 1])
+        else:
+            self._copy_file_range(asset.path, start, end - start + 1)
+    
+    def _send_cache_headers(self, asset, etag):
+        self.send_header('ETag', etag)
+        self.send_header('Cache-Control', asset.cache_control)
+        self.send_header('Last-Modified', formatdate(asset.mtime, usegmt=True))
+        if asset.compressible:
+            self.send_header('Vary', 'Accept-Encoding')
+        else:
+            self.send_header('Accept-Ranges', 'bytes')
+    
+    @staticmethod
+    def _etag_matches(if_none_match, etag):
+        """Comparaison faible de If-None-Match (RFC 9110)"""
+        if not if_none_match:
+            return False
+        if if_none_match.strip() == '*':
+            return True
+        candidates = [tag.strip() for tag in if_none_match.split(',')]
+        return any(tag.removeprefix('W/') == etag for tag in candidates)
+    
+    @staticmethod
+    def _parse_range(range_header, size):
+        """(début, fin) d'un Range 'bytes=a-b' unique, None si ignoré, 'unsatisfiable' si hors limites"""
+        match = RANGE_PATTERN.match(range_header.strip())
+        if not match or match.groups() == ('', ''):
+            # Plusieurs plages ou syntaxe inconnue: réponse complète
+            return None
+        first, last = match.groups()
+        if first == '':
+            # Suffixe: les N derniers octets
+            length = int(last)
+            if length == 0:
+                return 'unsatisfiable'
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return 'unsatisfiable'
+        return start, end
+    
+    def _copy_file_range(self, path, start, length):
+        with open(path, 'rb') as f:
+            f.seek(start)
+            while length > 0:
+                chunk = f.read(min(64 * 1024, length))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                length -= len(chunk)
     
     def log_message(self, format, *args):
         """Désactive les logs verbeux"""
@@ -60,12 +171,13 @@ class ScorecardWatcherServer:
     def __init__(self, port=8000, debounce_seconds=2):
         self.port = port
         self.debounce_seconds = debounce_seconds
-        self.last_regenerated = 0
-        self.cache_file = '.watch_scorecard_cache.txt'
         self.files_to_watch = self._get_files_to_watch()
         self.http_server = None
-        self.watcher_thread = None
-        self.init_cache()
+        self.watcher = None
+        # Fichiers servis (ETag, versions compressées), préparés dès la régénération
+        self.asset_cache = StaticAssetCache()
+        # Modules, extracteur et cartes gardés en mémoire entre deux régénérations
+        self.regenerator = ScorecardRegenerator()
     
     def _get_files_to_watch(self):
         """Détermine tous les fichiers à surveiller"""
@@ -112,129 +224,21 @@ class ScorecardWatcherServer:
         
         return files
     
-    def init_cache(self):
-        """Initialise le cache"""
-        cache = {}
-        for filepath in self.files_to_watch:
-            if os.path.exists(filepath):
-                cache[filepath] = os.path.getmtime(filepath)
-        self.save_cache(cache)
-    
-    def load_cache(self):
-        """Charge le cache"""
-        cache = {}
-        if os.path.exists(self.cache_file):
-            try:
-                with open(self.cache_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if ':' in line:
-                            filepath, mtime = line.split(':', 1)
-                            cache[filepath] = float(mtime)
-            except:
-                pass
-        return cache
-    
-    def save_cache(self, cache):
-        """Sauvegarde le cache"""
-        try:
-            with open(self.cache_file, 'w') as f:
-                for filepath, mtime in cache.items():
-                    f.write(f"{filepath}:{mtime}\n")
-        except:
-            pass
-    
-    def check_changes(self):
-        """Vérifie si des fichiers ont changé"""
-        cache = self.load_cache()
-        changed_files = []
-        
-        for filepath in self.files_to_watch:
-            if not os.path.exists(filepath):
-                continue
-            
-            current_mtime = os.path.getmtime(filepath)
-            cached_mtime = cache.get(filepath, 0)
-            
-            if current_mtime > cached_mtime:
-                changed_files.append(filepath)
-                cache[filepath] = current_mtime
-        
-        if changed_files:
-            self.save_cache(cache)
-        
-        return changed_files
-    
     def regenerate_html(self, changed_files=None):
-        """Régénère le HTML, et recalcule les scores si nécessaire"""
-        current_time = time.time()
-        if current_time - self.last_regenerated < self.debounce_seconds:
-            return False
-        
-        self.last_regenerated = current_time
-        
-        # Vérifier si scoring.py ou scoring_config.json ont changé
-        needs_rescoring = False
-        if changed_files:
-            scoring_files = ['scoring.py', 'scoring_config.json']
-            needs_rescoring = any(f in changed_files for f in scoring_files)
-        
-        # Recalculer les scores si nécessaire
-        if needs_rescoring:
-            timestamp = datetime.now().strftime('%H:%M:%S')
-            print(f"[{timestamp}] 🔄 Recalcul des scores...", end=' ')
-            
-            try:
-                result = subprocess.run(
-                    ['python', 'homescore.py'],
-                    capture_output=True,
-                    text=True,
-                    timeout=300
-                )
-                
-                if result.returncode == 0:
-                    print("✅")
-                else:
-                    print("⚠️")
-            except Exception as e:
-                print(f"⚠️ ({e})")
-        
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        print(f"[{timestamp}] 🔄 Régénération du HTML...", end=' ')
-        
-        try:
-            result = subprocess.run(
-                ['python', 'generate_scorecard_html.py'],
-                capture_output=True,
-                text=True,
-                timeout=120
-            )
-            
-            if result.returncode == 0:
-                print("✅")
-                return True
-            else:
-                print("❌")
-                print(f"   Erreur: {result.stderr[:200]}")
-                return False
-        except Exception as e:
-            print(f"❌ ({e})")
-            return False
-    
-    def watch_loop(self):
-        """Boucle de surveillance"""
-        while True:
-            changed_files = self.check_changes()
-            if changed_files:
-                self.regenerate_html(changed_files=changed_files)
-            time.sleep(1)
+        """Régénère le HTML (dans le processus), et recalcule les scores si nécessaire"""
+        regenerated = self.regenerator.regenerate(changed_files)
+        if regenerated:
+            # Compression faite ici plutôt qu'à la première requête du navigateur
+            self.asset_cache.warm(os.path.abspath(self.regenerator.output_file))
+        return regenerated
     
     def start_http_server(self):
         """Démarre le serveur HTTP"""
         os.chdir(Path(__file__).parent)
         
         handler = lambda *args, **kwargs: ScorecardHTTPHandler(*args, watcher=self, **kwargs)
-        self.http_server = HTTPServer(('localhost', self.port), handler)
+        # Un thread par requête: les photos d'une page se chargent en parallèle
+        self.http_server = ThreadingHTTPServer(('localhost', self.port), handler)
         
         print(f"🌐 Serveur HTTP démarré sur http://localhost:{self.port}")
         print(f"   Ouvrez http://localhost:{self.port}/output/homepage.html dans votre navigateur")
@@ -264,19 +268,23 @@ class ScorecardWatcherServer:
         print("\n💡 Modifiez les fichiers pour voir les changements en direct")
         print("   Appuyez sur Ctrl+C pour arrêter\n")
         
-        # Démarrer le thread de surveillance
-        self.watcher_thread = threading.Thread(target=self.watch_loop, daemon=True)
-        self.watcher_thread.start()
+        # Démarrer la surveillance (changements regroupés pendant debounce_seconds)
+        self.watcher = FileWatcher(
+            self.files_to_watch,
+            lambda changed_files: self.regenerate_html(changed_files=changed_files),
+            debounce_seconds=self.debounce_seconds
+        )
+        self.watcher.start()
         
         # Démarrer le serveur HTTP (bloquant)
         self.start_http_server()
     
     def stop(self):
         """Arrête le serveur"""
+        if self.watcher:
+            self.watcher.stop()
         if self.http_server:
             self.http_server.shutdown()
-        if os.path.exists(self.cache_file):
-            os.remove(self.cache_file)
 
 def main():
     """Fonction principale"""